@@ -0,0 +1,531 @@
+"""
+命令行入口（不依赖Qt，可在没有图形界面的服务器上运行）
+
+使用示例:
+    python -m app.cli transcribe "videos/*.mp4"
+    python -m app.cli subtitle "subs/**/*.srt" --translate --target-language 英语
+    python -m app.cli process video.mp4 --set LLM.LLMService=OpenAI --json
+    python -m app.cli process "videos/*.mp4" --pool llm=4 --buffer ffmpeg=1
+    python -m app.cli transcribe "videos/*.mp4" --order sjf
+    python -m app.cli serve --port 8770 --pool llm=4
+    python -m app.cli process "videos/*.mp4" --queue /mnt/shared/queue
+    python -m app.cli worker --queue /mnt/shared/queue --pool local_asr=2
+    python -m app.cli process video.mp4 --trace trace.jsonl
+    python -m app.cli trace trace.jsonl --job video.mp4
+"""
+
+import argparse
+import glob
+import json
+import sys
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.entities import TranscribeModelEnum
+from app.core.settings import HeadlessConfig
+from app.core.task_scheduler import (
+    DEFAULT_BUFFERS,
+    DEFAULT_POOLS,
+    ORDER_FIFO,
+    ORDER_SJF,
+    ORDERS,
+    RESOURCE_FFMPEG,
+    RESOURCE_LLM,
+    RESOURCE_LOCAL_ASR,
+    RESOURCE_NETWORK_ASR,
+    Stage,
+    TaskScheduler,
+)
+from app.core.utils import tracing
+from app.core.utils.logger import setup_logger
+
+logger = setup_logger("cli")
+
+# 在本地运行的转录模型（与批量处理一致，和在线转录分开限制并发）
+LOCAL_TRANSCRIBE_MODELS = {
+    TranscribeModelEnum.FASTER_WHISPER,
+    TranscribeModelEnum.WHISPER_CPP,
+}
+
+# 同一文件的进度输出最小间隔（秒），阶段开始和结束总会输出
+PROGRESS_INTERVAL = 0.5
+
+
+class ProgressPrinter:
+    """输出任务进度：普通文本或每行一个JSON事件（--json）"""
+
+    def __init__(self, as_json: bool = False):
+        self.as_json = as_json
+        self._lock = threading.Lock()
+        self._last: Dict[str, float] = {}
+
+    def progress(
+        self,
+        file_path: str,
+        stage: str,
+        value: int,
+        message: str,
+        eta: Optional[Callable[[], Optional[float]]] = None,
+    ) -> None:
+        """
+        输出阶段进度
+
+        Args:
+            eta: 获取任务剩余时间（秒）的函数，只在实际输出时调用
+        """
+        now = time.monotonic()
+        with self._lock:
+            if 0 < value < 100 and now - self._last.get(file_path, 0) < PROGRESS_INTERVAL:
+                return
+            self._last[file_path] = now
+        seconds = eta() if eta else None
+        remaining = ""
+        if seconds is not None:
+            from app.core.throughput import format_eta
+
+            remaining = f"  剩余 {format_eta(seconds)}"
+        self._emit(
+            {
+                "event": "progress",
+                "file": file_path,
+                "stage": stage,
+                "progress": value,
+                "message": message,
+                "eta": None if seconds is None else round(seconds, 1),
+            },
+            f"[{stage}] {value:3d}% {message}{remaining}  {file_path}",
+        )
+
+    def done(self, file_path: str, output: Optional[str]) -> None:
+        self._emit(
+            {"event": "done", "file": file_path, "output": output},
+            f"完成: {file_path} -> {output}",
+        )
+
+    def error(self, file_path: str, error: str) -> None:
+        self._emit(
+            {"event": "error", "file": file_path, "error": error},
+            f"失败: {file_path}: {error}",
+        )
+
+    def _emit(self, event: Dict[str, Any], text: str) -> None:
+        line = json.dumps(event, ensure_ascii=False) if self.as_json else text
+        with self._lock:
+            print(line, flush=True)
+
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """
+    展开输入的文件路径或通配符（支持 ** 递归匹配），去重并保持顺序
+
+    Args:
+        patterns: 文件路径或通配符
+
+    Returns:
+        List[str]: 匹配的文件
+    """
+    files: List[str] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for path in matches:
+            if path not in files:
+                files.append(path)
+    return files
+
+
+def build_config(args: argparse.Namespace) -> HeadlessConfig:
+    """读取设置文件，并应用命令行中的配置项"""
+    config = HeadlessConfig(args.settings)
+    if args.command in ("subtitle", "process"):
+        if args.translate:
+            config.set("need_translate", True)
+        if args.optimize:
+            config.set("need_optimize", True)
+        if args.split:
+            config.set("need_split", True)
+        if args.target_language:
+            config.set("target_language", args.target_language)
+        if args.translator:
+            config.set("translator_service", args.translator)
+    if args.command == "process":
+        if args.no_video:
+            config.set("need_video", False)
+        if args.soft_subtitle:
+            config.set("soft_subtitle", True)
+    if args.transcribe_model:
+        config.set("transcribe_model", args.transcribe_model)
+    for assignment in args.set:
+        key, sep, value = assignment.partition("=")
+        if not sep:
+            raise ValueError(f"配置项格式应为 KEY=VALUE: {assignment}")
+        config.set(key.strip(), value)
+    return config
+
+
+class CliRunner:
+    """
+    把每个文件按阶段提交到调度器执行（与批量处理的阶段划分一致）。
+    指定 dispatcher 时阶段不在本机执行，而是交给分布式队列中的工作进程
+    """
+
+    def __init__(
+        self,
+        command: str,
+        config: HeadlessConfig,
+        printer: ProgressPrinter,
+        dispatcher: Optional[Any] = None,
+        pools: Optional[Dict[str, int]] = None,
+        buffers: Optional[Dict[str, int]] = None,
+        order: str = ORDER_FIFO,
+    ):
+        self.command = command
+        self.config = config
+        self.printer = printer
+        self.dispatcher = dispatcher
+        self.scheduler = TaskScheduler(
+            dispatcher.pools if dispatcher else pools, buffers, order
+        )
+        self.failed: List[str] = []
+
+    def run(self, files: List[str]) -> int:
+        """
+        处理所有文件
+
+        Args:
+            files: 输入文件
+
+        Returns:
+            int: 失败的文件数
+        """
+        # 计时模型依赖数据库，延迟导入以加快启动
+        from app.core.throughput import estimate_stages
+
+        for file_path in files:
+            stages = self._build_stages(file_path)
+            self.scheduler.submit(
+                file_path,
+                stages,
+                on_done=self._on_done,
+                estimates=estimate_stages(file_path, [s.name for s in stages]),
+            )
+        try:
+            while not self.scheduler.wait(timeout=0.5):
+                pass
+        except KeyboardInterrupt:
+            logger.info("用户中断，取消所有任务")
+            self.scheduler.shutdown()
+            raise
+        self.scheduler.shutdown()
+        return len(self.failed)
+
+    def _build_stages(self, file_path: str) -> List[Stage]:
+        if self.command == "subtitle":
+            return [self._stage("subtitle", RESOURCE_LLM, file_path)]
+
+        if self.config.transcribe_model.value in LOCAL_TRANSCRIBE_MODELS:
+            asr_resource = RESOURCE_LOCAL_ASR
+        else:
+            asr_resource = RESOURCE_NETWORK_ASR
+        stages = [self._stage("transcribe", asr_resource, file_path)]
+        if self.command == "process":
+            stages.append(
+                self._stage("subtitle", RESOURCE_LLM, file_path, ["transcribe"])
+            )
+            if self.config.need_video.value:
+                stages.append(
+                    self._stage("synthesize", RESOURCE_FFMPEG, file_path, ["subtitle"])
+                )
+        return stages
+
+    def _stage(
+        self, name: str, resource: str, file_path: str, deps: Optional[List[str]] = None
+    ) -> Stage:
+        return Stage(
+            name,
+            resource,
+            partial(self._run_stage, name, resource, file_path),
+            deps or [],
+        )
+
+    def _run_stage(
+        self, stage: str, resource: str, file_path: str, results: Dict[str, Any]
+    ) -> Optional[str]:
+        progress = partial(self._progress, file_path, stage)
+        if self.dispatcher:
+            return self.dispatcher.run(
+                stage, resource, self.command, file_path, results, progress
+            )
+
+        from app.core.pipeline import create_stage_task, run_stage_task
+
+        task = create_stage_task(stage, self.command, file_path, results)
+        return run_stage_task(stage, task, progress)
+
+    def _progress(self, file_path: str, stage: str, value: int, message: str) -> None:
+        self.printer.progress(
+            file_path,
+            stage,
+            value,
+            message,
+            eta=lambda: self.scheduler.etas().get(file_path) if value < 100 else None,
+        )
+
+    def _on_done(
+        self, file_path: str, error: Optional[BaseException], results: Dict[str, Any]
+    ) -> None:
+        if self.dispatcher:
+            self.dispatcher.release(file_path)
+        if error is not None:
+            self.failed.append(file_path)
+            logger.error(f"处理失败: {file_path}: {error}")
+            self.printer.error(file_path, str(error))
+            return
+        last_stage = self._build_stages(file_path)[-1].name
+        self.printer.done(file_path, results.get(last_stage))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="VideoCaptioner 命令行：转录、字幕处理（断句、优化、翻译）、视频合成",
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="+", help="输入文件或通配符（支持 **）")
+    common.add_argument("--settings", help="设置文件路径，默认使用图形界面的设置")
+    common.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="修改配置项，如 need_translate=true 或 Subtitle.TargetLanguage=英语",
+    )
+    common.add_argument("--transcribe-model", help="转录模型（TranscribeModelEnum 的值）")
+    common.add_argument("--json", action="store_true", help="每行输出一个JSON进度事件")
+    common.add_argument(
+        "--queue",
+        help="分布式队列（共享目录或 redis://主机:端口/数据库），阶段交给工作进程执行",
+    )
+    common.add_argument(
+        "--pool",
+        action="append",
+        default=[],
+        metavar="RESOURCE=N",
+        help="资源同时执行的阶段数，如 llm=4（资源: " + ", ".join(DEFAULT_POOLS) + "）",
+    )
+    common.add_argument(
+        "--buffer",
+        action="append",
+        default=[],
+        metavar="RESOURCE=N",
+        help="等待资源执行的阶段数上限，达到上限时上游阶段暂停，如 ffmpeg=1",
+    )
+    common.add_argument(
+        "--order",
+        choices=(ORDER_FIFO, ORDER_SJF),
+        default=ORDER_FIFO,
+        help="任务顺序：fifo 按提交顺序，sjf 按历史耗时估计短任务优先",
+    )
+    add_trace_options(common)
+
+    subtitle_options = argparse.ArgumentParser(add_help=False)
+    subtitle_options.add_argument("--translate", action="store_true", help="翻译字幕")
+    subtitle_options.add_argument("--optimize", action="store_true", help="优化字幕")
+    subtitle_options.add_argument("--split", action="store_true", help="重新断句")
+    subtitle_options.add_argument("--target-language", help="翻译目标语言")
+    subtitle_options.add_argument("--translator", help="翻译服务")
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("transcribe", parents=[common], help="转录音视频生成字幕")
+    subparsers.add_parser(
+        "subtitle", parents=[common, subtitle_options], help="处理字幕文件"
+    )
+    process = subparsers.add_parser(
+        "process",
+        parents=[common, subtitle_options],
+        help="全流程：转录、字幕处理、视频合成",
+    )
+    process.add_argument("--no-video", action="store_true", help="不合成视频")
+    process.add_argument("--soft-subtitle", action="store_true", help="使用软字幕")
+
+    serve = subparsers.add_parser("serve", help="启动后台服务，通过本地HTTP接口提交任务")
+    serve.add_argument("--host", default="127.0.0.1", help="监听地址")
+    serve.add_argument("--port", type=int, default=8770, help="监听端口")
+    serve.add_argument("--settings", help="设置文件路径，默认使用图形界面的设置")
+    serve.add_argument(
+        "--pool",
+        action="append",
+        default=[],
+        metavar="RESOURCE=N",
+        help="资源同时执行的阶段数，如 llm=4（资源: "
+        + ", ".join(DEFAULT_POOLS)
+        + "）",
+    )
+    serve.add_argument(
+        "--buffer",
+        action="append",
+        default=[],
+        metavar="RESOURCE=N",
+        help="等待资源执行的阶段数上限，达到上限时上游阶段暂停，如 ffmpeg=1",
+    )
+    serve.add_argument(
+        "--order",
+        choices=ORDERS,
+        default=ORDER_FIFO,
+        help="任务顺序：fifo 按提交顺序，sjf 短任务优先，deadline 截止时间早的优先",
+    )
+    serve.add_argument("--token", help="访问令牌，设置后请求需携带 Bearer 令牌")
+    add_trace_options(serve)
+
+    worker = subparsers.add_parser("worker", help="启动工作进程，从分布式队列领取阶段执行")
+    worker.add_argument(
+        "--queue", required=True, help="分布式队列（共享目录或 redis://主机:端口/数据库）"
+    )
+    worker.add_argument(
+        "--pool",
+        action="append",
+        default=[],
+        metavar="RESOURCE=N",
+        help="资源同时执行的阶段数，如 local_asr=2",
+    )
+    worker.add_argument(
+        "--only",
+        action="append",
+        default=[],
+        metavar="RESOURCE",
+        help="只领取指定资源的阶段（可重复）",
+    )
+    worker.add_argument("--worker-id", help="工作进程标识，默认为 主机名-进程号")
+    add_trace_options(worker)
+
+    trace = subparsers.add_parser("trace", help="显示追踪文件中各任务的关键路径")
+    trace.add_argument("files", nargs="+", help="追踪文件（可同时读取工作进程的文件）")
+    trace.add_argument("--job", help="只显示输入文件或任务ID包含该文本的任务")
+    trace.add_argument(
+        "--limit", type=int, default=10, help="最多显示最近的几个任务，0 表示全部"
+    )
+    trace.add_argument("--top", type=int, default=10, help="汇总显示的步骤数")
+    return parser
+
+
+def add_trace_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--trace", metavar="FILE", help="记录各步骤的耗时，追加写入追踪文件（JSONL）"
+    )
+    parser.add_argument(
+        "--trace-format",
+        choices=tracing.FORMATS,
+        default=tracing.FORMAT_JSONL,
+        help="追踪文件格式：jsonl 或 otlp（OpenTelemetry JSON，每行一个导出请求）",
+    )
+
+
+def parse_pools(
+    assignments: List[str], defaults: Optional[Dict[str, int]] = None
+) -> Dict[str, int]:
+    """解析 RESOURCE=N 形式的并发或缓冲区配置（defaults 默认为 DEFAULT_POOLS）"""
+    pools = dict(DEFAULT_POOLS if defaults is None else defaults)
+    for assignment in assignments:
+        resource, sep, value = assignment.partition("=")
+        if (
+            not sep
+            or resource not in DEFAULT_POOLS
+            or not value.isdigit()
+            or int(value) < 1
+        ):
+            raise ValueError(f"配置格式应为 RESOURCE=N: {assignment}")
+        pools[resource] = int(value)
+    return pools
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "trace":
+        from app.core.utils.trace_viewer import render_file
+
+        try:
+            print(render_file(args.files, args.job, args.limit, args.top))
+        except OSError as e:
+            print(f"读取追踪文件失败: {e}", file=sys.stderr)
+            return 2
+        return 0
+    if args.trace:
+        tracing.configure(args.trace, args.trace_format)
+    if args.command == "serve":
+        try:
+            pools = parse_pools(args.pool)
+            buffers = parse_pools(args.buffer, DEFAULT_BUFFERS)
+        except ValueError as e:
+            print(f"配置错误: {e}", file=sys.stderr)
+            return 2
+        from app.daemon import serve
+
+        serve(
+            args.host, args.port, args.settings, pools, args.token, buffers, args.order
+        )
+        return 0
+    if args.command == "worker":
+        return run_worker(args)
+
+    try:
+        config = build_config(args)
+        pools = parse_pools(args.pool)
+        buffers = parse_pools(args.buffer, DEFAULT_BUFFERS)
+    except (KeyError, ValueError) as e:
+        print(f"配置错误: {e}", file=sys.stderr)
+        return 2
+
+    from app.core import task_factory
+
+    task_factory.set_config(config)
+
+    dispatcher = None
+    if args.queue:
+        from app.core.work_queue import open_queue
+        from app.distributed import RemoteDispatcher
+
+        dispatcher = RemoteDispatcher(open_queue(args.queue), config)
+
+    files = expand_inputs(args.inputs)
+    printer = ProgressPrinter(as_json=args.json)
+    try:
+        failed = CliRunner(
+            args.command, config, printer, dispatcher, pools, buffers, args.order
+        ).run(files)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if dispatcher:
+            dispatcher.stop()
+    return 1 if failed else 0
+
+
+def run_worker(args: argparse.Namespace) -> int:
+    """启动工作进程，直到被中断"""
+    from app.core.work_queue import open_queue
+    from app.distributed import Worker
+
+    try:
+        pools = parse_pools(args.pool)
+        queue = open_queue(args.queue)
+    except ValueError as e:
+        print(f"配置错误: {e}", file=sys.stderr)
+        return 2
+    if args.only:
+        unknown = [resource for resource in args.only if resource not in pools]
+        if unknown:
+            print(f"配置错误: 未知的资源类型: {unknown}", file=sys.stderr)
+            return 2
+        pools = {resource: pools[resource] for resource in args.only}
+
+    worker = Worker(queue, pools, args.worker_id)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -237,6 +237,19 @@ class Config(QConfig):
         "Subtitle", "NeedsRemovePunctuation", True, BoolValidator()
     )
     custom_prompt_text = ConfigItem("Subtitle", "CustomPromptText", "")
+    incremental_process = ConfigItem(
+        "Subtitle", "IncrementalProcess", False, BoolValidator()
+    )
+    fuse_optimize_translate = ConfigItem(
+        "Subtitle", "FuseOptimizeTranslate", False, BoolValidator()
+    )
+    use_translation_memory = ConfigItem(
+        "Subtitle", "UseTranslationMemory", False, BoolValidator()
+    )
+    hedge_requests = ConfigItem("Subtitle", "HedgeRequests", False, BoolValidator())
+    hedge_api_base = ConfigItem("Subtitle", "HedgeApiBase", "")
+    hedge_api_key = ConfigItem("Subtitle", "HedgeApiKey", "")
+    hedge_model = ConfigItem("Subtitle", "HedgeModel", "")
 
     # ------------------- 字幕合成配置 -------------------
     soft_subtitle = ConfigItem("Video", "SoftSubtitle", False, BoolValidator())
@@ -249,6 +262,13 @@ class Config(QConfig):
 
     # ------------------- 保存配置 -------------------
     work_dir = ConfigItem("Save", "Work_Dir", WORK_PATH, FolderValidator())
+    use_stage_cache = ConfigItem("Save", "UseStageCache", True, BoolValidator())
+
+    # ------------------- 批量处理配置 -------------------
+    # 任务顺序：fifo 按提交顺序，sjf 按历史耗时估计短任务优先
+    batch_order = OptionsConfigItem(
+        "BatchProcess", "Order", "fifo", OptionsValidator(["fifo", "sjf"])
+    )
 
     # ------------------- 软件页面配置 -------------------
     micaEnabled = ConfigItem("MainWindow", "MicaEnabled", False, BoolValidator())
@@ -7,6 +7,7 @@ from qfluentwidgets import (
 from qfluentwidgets import FluentIcon as FIF
 
 from app.common.config import cfg
+from app.components.LineEditSettingCard import LineEditSettingCard
 from app.components.SpinBoxSettingCard import SpinBoxSettingCard
 
 
@@ -63,6 +64,66 @@ class SubtitleSettingDialog(MessageBoxBase):
             self,
         )
 
+        self.incremental_process_card = SwitchSettingCard(
+            FIF.SYNC,
+            self.tr("增量处理"),
+            self.tr("按内容分块，修改字幕后重新优化/翻译时只处理有变化的部分"),
+            cfg.incremental_process,
+            self,
+        )
+
+        self.fuse_optimize_translate_card = SwitchSettingCard(
+            FIF.LINK,
+            self.tr("合并优化与翻译"),
+            self.tr("同时开启优化和翻译时，在一次请求中完成（仅OpenAI翻译）"),
+            cfg.fuse_optimize_translate,
+            self,
+        )
+
+        self.translation_memory_card = SwitchSettingCard(
+            FIF.HISTORY,
+            self.tr("翻译记忆"),
+            self.tr("复用历史上相同字幕的译文，相似字幕的译文作为翻译参考"),
+            cfg.use_translation_memory,
+            self,
+        )
+
+        self.hedge_requests_card = SwitchSettingCard(
+            FIF.SPEED_HIGH,
+            self.tr("对冲请求"),
+            self.tr("请求耗时明显超过平时时，再发出一个相同请求并取先返回的结果"),
+            cfg.hedge_requests,
+            self,
+        )
+
+        # 对冲请求的备用服务（未配置时对冲请求发往同一服务）
+        self.hedge_api_base_card = LineEditSettingCard(
+            cfg.hedge_api_base,
+            FIF.LINK,
+            self.tr("备用服务 Base URL"),
+            self.tr("对冲请求发往的备用LLM服务，留空时使用当前服务"),
+            "https://api.openai.com/v1",
+            self,
+        )
+
+        self.hedge_api_key_card = LineEditSettingCard(
+            cfg.hedge_api_key,
+            FIF.FINGERPRINT,
+            self.tr("备用服务 API Key"),
+            self.tr("备用LLM服务的 API Key"),
+            "sk-",
+            self,
+        )
+
+        self.hedge_model_card = LineEditSettingCard(
+            cfg.hedge_model,
+            FIF.ROBOT,
+            self.tr("备用服务模型"),
+            self.tr("备用LLM服务使用的模型，留空时与当前模型相同"),
+            "",
+            self,
+        )
+
         # 添加到布局
         self.viewLayout.addWidget(self.titleLabel)
         self.viewLayout.addWidget(self.split_card)
@@ -70,6 +131,13 @@ class SubtitleSettingDialog(MessageBoxBase):
         self.viewLayout.addWidget(self.word_count_cjk_card)
         self.viewLayout.addWidget(self.word_count_english_card)
         self.viewLayout.addWidget(self.remove_punctuation_card)
+        self.viewLayout.addWidget(self.incremental_process_card)
+        self.viewLayout.addWidget(self.fuse_optimize_translate_card)
+        self.viewLayout.addWidget(self.translation_memory_card)
+        self.viewLayout.addWidget(self.hedge_requests_card)
+        self.viewLayout.addWidget(self.hedge_api_base_card)
+        self.viewLayout.addWidget(self.hedge_api_key_card)
+        self.viewLayout.addWidget(self.hedge_model_card)
         # 设置间距
 
         self.viewLayout.setSpacing(10)
@@ -6,6 +6,8 @@ import re
 from pathlib import Path
 from typing import List, Tuple, Optional
 
+from app.core.utils import tracing
+
 
 def handle_long_path(path: str) -> str:
     """处理Windows系统中的长路径问题
@@ -195,6 +197,7 @@ class ASRData:
             )
         return self
 
+    @tracing.traced("file.write")
     def save(
         self, save_path: str, ass_style: Optional[str] = None, layout: str = "原文在上"
     ) -> None:
@@ -223,6 +226,11 @@ class ASRData:
             self.to_ass(save_path=save_path, style_str=ass_style, layout=layout)
         else:
             raise ValueError(f"Unsupported file extension: {save_path}")
+        tracing.current_span().set(
+            format=Path(save_path).suffix.lstrip("."),
+            segments=len(self.segments),
+            bytes=tracing.file_size(save_path),
+        )
 
     def to_txt(self, save_path=None, layout: str = "原文在上") -> str:
         """Convert to plain text subtitle format (without timestamps)"""
@@ -5,6 +5,7 @@ from typing import Optional, Union
 
 from app.config import CACHE_PATH
 from app.core.storage.cache_manager import CacheManager
+from app.core.utils import tracing
 
 from .asr_data import ASRData, ASRDataSeg
 
@@ -41,13 +42,17 @@ class BaseASR:
         crc32_value = zlib.crc32(self.file_binary) & 0xFFFFFFFF
         self.crc32_hex = format(crc32_value, "08x")
 
+    @tracing.traced("asr.run")
     def run(self, callback=None, **kwargs) -> ASRData:
+        span = tracing.current_span()
+        span.set(asr=self.__class__.__name__, audio_bytes=len(self.file_binary or b""))
         if self.use_cache:
             cached_result = self.cache_manager.get_asr_result(
                 self._get_key(), self.__class__.__name__
             )
             if cached_result:
                 segments = self._make_segments(cached_result)
+                span.set(cache_hit=True, segments=len(segments))
 
                 return ASRData(segments)
 
@@ -59,6 +64,7 @@ class BaseASR:
             )
 
         segments = self._make_segments(resp_data)
+        span.set(cache_hit=False, segments=len(segments))
         return ASRData(segments)
 
     def _get_key(self):
@@ -129,6 +129,7 @@ class SplitTypeEnum(Enum):
 
     SEMANTIC = "语义分段"
     SENTENCE = "句子分段"
+    OFFLINE = "本地分段"  # 不调用LLM，使用动态规划断句
 
 
 class TargetLanguageEnum(Enum):
@@ -503,6 +504,8 @@ class TranscribeConfig:
     transcribe_model: Optional[TranscribeModelEnum] = None
     transcribe_language: str = ""
     use_asr_cache: bool = True
+    # 阶段缓存（输入和配置都未变化时直接恢复上次的输出）
+    use_stage_cache: bool = True
     need_word_time_stamp: bool = True
     # Whisper Cpp 配置
     whisper_model: Optional[WhisperModelEnum] = None
@@ -550,6 +553,19 @@ class SubtitleConfig:
     subtitle_style: Optional[str] = None
     need_remove_punctuation: bool = False
     custom_prompt_text: Optional[str] = None
+    # 增量处理（按内容分块，只重新处理内容变化的分块）
+    incremental_process: bool = False
+    # 同时优化和翻译时，在同一次LLM请求中完成
+    fuse_optimize_translate: bool = False
+    # 翻译记忆（复用历史上相同字幕的译文，相似字幕的译文作为参考）
+    use_translation_memory: bool = False
+    # 对冲请求（请求耗时超过p95时再发出一个请求，可发往备用LLM服务）
+    hedge_requests: bool = False
+    hedge_base_url: Optional[str] = None
+    hedge_api_key: Optional[str] = None
+    hedge_model: Optional[str] = None
+    # 阶段缓存（输入和配置都未变化时直接恢复上次的输出）
+    use_stage_cache: bool = True
 
 
 @dataclass
@@ -558,6 +574,8 @@ class SynthesisConfig:
 
     need_video: bool = True
     soft_subtitle: bool = True
+    # 阶段缓存（输入和配置都未变化时直接恢复上次的输出）
+    use_stage_cache: bool = True
 
 
 @dataclass
@@ -0,0 +1,661 @@
+"""
+不依赖Qt的处理流程：转录、字幕处理（断句、优化、翻译）、视频合成
+
+与 TranscriptThread、VideoSynthesisThread 的处理逻辑一致（SubtitleThread 直接调用 run_subtitle），
+供命令行等没有图形界面的场景使用。进度通过 progress(进度, 消息) 回调报告。
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import CACHE_PATH
+from app.core.entities import (
+    SplitTypeEnum,
+    SubtitleConfig,
+    SubtitleTask,
+    SynthesisTask,
+    TranscribeModelEnum,
+    TranscribeTask,
+    TranslatorServiceEnum,
+)
+from app.core.storage.artifact_cache import ArtifactCache
+from app.core.throughput import get_throughput_model
+from app.core.utils import tracing
+from app.core.utils.logger import setup_logger
+
+logger = setup_logger("pipeline")
+
+ProgressCallback = Callable[[int, str], None]
+# 字幕内容更新回调：(字幕数据, 是否为全部字幕)，批次完成时只包含该批次的字幕
+UpdateCallback = Callable[[Dict, bool], None]
+
+# 公益服务的每日调用次数限制（与界面线程一致）
+MAX_DAILY_ASR_CALLS = 40
+MAX_DAILY_LLM_CALLS = 30
+PUBLIC_LLM_BASE_URL = "https://ddg.bkfeng.top/v1"
+
+SPLIT_TYPE_MAP = {
+    SplitTypeEnum.SEMANTIC: "semantic",
+    SplitTypeEnum.SENTENCE: "sentence",
+    SplitTypeEnum.OFFLINE: "offline",
+}
+
+# 不需要LLM的翻译服务
+_MACHINE_TRANSLATORS = (
+    TranslatorServiceEnum.DEEPLX,
+    TranslatorServiceEnum.BING,
+    TranslatorServiceEnum.GOOGLE,
+)
+
+
+# 字幕处理各步骤的输出依赖的配置字段（修改翻译配置时仍可复用断句和优化的结果）
+STEP_CONFIG_FIELDS = {
+    "split": ("split_type", "llm_model", "max_word_count_cjk", "max_word_count_english"),
+    "optimize": ("llm_model", "custom_prompt_text", "batch_size"),
+    "translate": (
+        "translator_service",
+        "target_language",
+        "llm_model",
+        "custom_prompt_text",
+        "batch_size",
+        "need_reflect",
+        "need_optimize",
+        "fuse_optimize_translate",
+    ),
+}
+
+
+def _noop_progress(progress: int, message: str) -> None:
+    pass
+
+
+def _noop_update(data: Dict, full: bool) -> None:
+    pass
+
+
+def get_stage_cache(config: Any) -> Optional[ArtifactCache]:
+    """配置开启阶段缓存时返回 ArtifactCache，否则返回None"""
+    if config is None or not getattr(config, "use_stage_cache", False):
+        return None
+    return ArtifactCache()
+
+
+def extract_audio(
+    file_path: str, cache: Optional[ArtifactCache] = None
+) -> Tuple[str, bool]:
+    """
+    从音视频文件提取转录用的音频（开启阶段缓存时按文件内容缓存）
+
+    Args:
+        file_path: 音视频文件
+        cache: 阶段缓存
+
+    Returns:
+        (音频文件路径, 是否为用完需要删除的临时文件)
+    """
+    from app.core.utils.video_utils import video2audio
+
+    key = cache.make_key("audio", [file_path]) if cache else ""
+    if cache:
+        cached = cache.get_file(key, "audio.wav")
+        if cached:
+            logger.info(f"使用缓存的音频: {cached}")
+            return cached, False
+
+    temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    temp_file.close()
+    if not video2audio(file_path, output=temp_file.name):
+        os.unlink(temp_file.name)
+        raise RuntimeError("音频转换失败")
+    if cache:
+        return cache.put_file(key, "audio.wav", temp_file.name, move=True), False
+    return temp_file.name, True
+
+
+def cached_step(
+    cache: Optional[ArtifactCache],
+    step: str,
+    asr_data: Any,
+    config: Any,
+    compute: Callable[[Any], Any],
+    complete: Optional[Callable[[], bool]] = None,
+) -> Any:
+    """
+    执行字幕处理步骤（断句、优化、翻译），输入字幕和相关配置相同时直接返回缓存的结果
+
+    Args:
+        cache: 阶段缓存，为None时直接执行
+        step: 步骤名称（STEP_CONFIG_FIELDS 的键）
+        asr_data: 输入字幕
+        config: 字幕处理配置
+        compute: 执行步骤的函数 compute(asr_data) -> ASRData
+        complete: 执行后判断结果是否完整（没有失败的字幕），不完整的结果不缓存
+
+    Returns:
+        ASRData: 处理后的字幕
+    """
+    from app.core.bk_asr.asr_data import ASRData
+
+    with tracing.span(f"subtitle.{step}", segments=len(asr_data.segments)) as span:
+        if cache is None:
+            return compute(asr_data)
+        params = {name: getattr(config, name) for name in STEP_CONFIG_FIELDS[step]}
+        key = cache.make_key(f"subtitle.{step}", [], asr_data.to_json(), params)
+        data = cache.get_json(key)
+        span.set(cache_hit=data is not None)
+        if data is not None:
+            logger.info(f"使用缓存的字幕处理结果: {step}")
+            return ASRData.from_json(data)
+        result = compute(asr_data)
+        if complete is not None and not complete():
+            logger.warning(f"字幕处理结果不完整，不保存到阶段缓存: {step}")
+            return result
+        cache.put_json(key, result.to_json())
+        return result
+
+
+def save_subtitle_stage(
+    cache: Optional[ArtifactCache],
+    key: str,
+    outputs: List[str],
+    asr_data: Any,
+    complete: bool,
+) -> None:
+    """
+    保存字幕处理阶段的输出到阶段缓存；有失败的字幕（如翻译失败）时删除该条目，下次重新处理
+
+    Args:
+        cache: 阶段缓存，为None时不保存
+        key: 缓存键
+        outputs: 阶段输出的文件
+        asr_data: 处理后的字幕
+        complete: 各步骤是否都没有失败的字幕
+    """
+    if cache is None:
+        return
+    if complete:
+        cache.save(key, outputs, data=asr_data.to_json())
+    else:
+        logger.warning("字幕处理有失败的字幕，不保存到阶段缓存")
+        cache.discard(key)
+
+
+def transcribe_cache_key(cache: ArtifactCache, task: TranscribeTask) -> str:
+    """转录阶段的缓存键（输入文件 + 转录配置 + 输出路径）"""
+    return cache.make_key(
+        "transcribe", [task.file_path], task.transcribe_config, task.output_path
+    )
+
+
+def subtitle_cache_key(cache: ArtifactCache, task: SubtitleTask) -> str:
+    """字幕处理阶段的缓存键（字幕文件 + 字幕配置 + 输出路径）"""
+    return cache.make_key(
+        "subtitle",
+        [task.subtitle_path],
+        task.subtitle_config,
+        task.output_path,
+        task.video_path,
+        task.need_next_task,
+    )
+
+
+def synthesis_cache_key(cache: ArtifactCache, task: SynthesisTask) -> str:
+    """视频合成阶段的缓存键（视频和字幕文件 + 合成配置 + 输出路径）"""
+    return cache.make_key(
+        "synthesize",
+        [task.video_path, task.subtitle_path],
+        task.synthesis_config,
+        task.output_path,
+    )
+
+
+def _service_manager():
+    from app.core.storage.cache_manager import ServiceUsageManager
+    from app.core.storage.database import DatabaseManager
+
+    return ServiceUsageManager(DatabaseManager(str(CACHE_PATH)))
+
+
+def run_transcribe(
+    task: TranscribeTask, progress: Optional[ProgressCallback] = None
+) -> TranscribeTask:
+    """
+    转录音视频文件并保存字幕
+
+    Args:
+        task: 转录任务
+        progress: 进度回调
+
+    Returns:
+        TranscribeTask: 转录任务（output_path 为字幕文件路径）
+    """
+    from app.core.bk_asr import transcribe
+
+    progress = progress or _noop_progress
+    config = task.transcribe_config
+    if not task.file_path:
+        raise ValueError("文件路径为空")
+    if not Path(task.file_path).exists():
+        raise ValueError(f"视频文件不存在: {task.file_path}")
+    if not config:
+        raise ValueError("转录配置为空")
+    if not task.output_path:
+        raise ValueError("输出路径为空")
+
+    # 已下载的字幕文件（视频链接任务可能先下载了字幕）
+    if task.need_next_task:
+        subtitle_dir = Path(task.file_path).parent / "subtitle"
+        downloaded = (
+            sorted(subtitle_dir.glob("【下载字幕】*")) if subtitle_dir.exists() else []
+        )
+        if downloaded:
+            task.output_path = str(downloaded[0])
+            logger.info(f"字幕文件已下载，跳过转录: {task.output_path}")
+            progress(100, "字幕已下载")
+            return task
+
+    cache = get_stage_cache(config)
+    cache_key = transcribe_cache_key(cache, task) if cache else ""
+    if cache and cache.restore(cache_key) is not None:
+        progress(100, "转录完成（缓存）")
+        return task
+
+    public_asr = config.transcribe_model in (
+        TranscribeModelEnum.BIJIAN,
+        TranscribeModelEnum.JIANYING,
+    )
+    service_manager = _service_manager() if public_asr else None
+    if service_manager and not service_manager.check_service_available(
+        "asr", MAX_DAILY_ASR_CALLS
+    ):
+        raise RuntimeError("公益ASR服务已达到每日使用限制，建议使用本地转录")
+
+    started = time.monotonic()
+    progress(5, "转换音频中")
+    audio_path, is_temp = extract_audio(task.file_path, cache)
+    try:
+        progress(20, "语音转录中")
+        asr_data = transcribe(
+            audio_path,
+            config,
+            callback=lambda value, message: progress(
+                int(min(20 + value * 0.8, 100)), message
+            ),
+        )
+        if service_manager:
+            service_manager.increment_usage("asr", MAX_DAILY_ASR_CALLS)
+
+        output_path = Path(task.output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        asr_data.to_srt(save_path=str(output_path))
+        logger.info(f"字幕文件已保存到: {output_path}")
+    finally:
+        if is_temp and os.path.exists(audio_path):
+            try:
+                os.unlink(audio_path)
+            except OSError as e:
+                logger.warning(f"清理临时文件失败: {e}")
+    get_throughput_model().record_task("transcribe", task, time.monotonic() - started)
+    if cache:
+        cache.save(cache_key, [task.output_path])
+
+    progress(100, "转录完成")
+    return task
+
+
+@tracing.traced("llm.check")
+def _check_llm_service(task: SubtitleTask) -> None:
+    """
+    检查任务配置的LLM服务是否可用
+
+    服务地址和API Key 在创建断句、优化和翻译器时按任务显式传入，不写入环境变量：
+    同一进程中并发处理的任务（批量处理、分布式工作进程）可以使用不同的LLM配置
+    """
+    from app.core.utils.endpoint_health import endpoint_health
+
+    config = task.subtitle_config
+    if config.base_url == PUBLIC_LLM_BASE_URL:
+        if not _service_manager().check_service_available("llm", MAX_DAILY_LLM_CALLS):
+            raise RuntimeError(
+                f"公益LLM服务已达到每日使用限制 {MAX_DAILY_LLM_CALLS} 次，建议使用自己的API"
+            )
+        config.thread_num = 5
+        config.batch_size = 10
+    elif config.base_url and config.api_key:
+        ok, message = endpoint_health.check(
+            config.base_url, config.api_key, config.llm_model or "gpt-3.5-turbo"
+        )
+        if not ok:
+            raise RuntimeError(f"OpenAI API 测试失败, 请检查LLM配置: {message}")
+    else:
+        raise RuntimeError("OpenAI API 未配置, 请检查LLM配置")
+
+
+def llm_service_kwargs(config: SubtitleConfig) -> Dict[str, Any]:
+    """任务的LLM服务配置（主服务及对冲请求的备用服务），作为参数传给断句、优化和翻译器"""
+    return {
+        "base_url": config.base_url,
+        "api_key": config.api_key,
+        "hedge_base_url": config.hedge_base_url or "",
+        "hedge_api_key": config.hedge_api_key or "",
+        "hedge_model": config.hedge_model or config.llm_model or "",
+    }
+
+
+def run_subtitle(
+    task: SubtitleTask,
+    progress: Optional[ProgressCallback] = None,
+    on_update: Optional[UpdateCallback] = None,
+    on_processor: Optional[Callable[[Any], None]] = None,
+) -> SubtitleTask:
+    """
+    处理字幕：断句、优化、翻译并保存
+
+    Args:
+        task: 字幕任务
+        progress: 进度回调
+        on_update: 字幕内容更新回调（界面实时显示处理结果）
+        on_processor: 创建断句、优化和翻译器时的回调（调用方可以通过其 stop() 终止处理）
+
+    Returns:
+        SubtitleTask: 字幕任务（output_path 为处理后的字幕文件路径）
+    """
+    from app.core.bk_asr.asr_data import ASRData
+    from app.core.subtitle_processor.optimize import SubtitleOptimizer
+    from app.core.subtitle_processor.split import SubtitleSplitter
+    from app.core.subtitle_processor.translate import (
+        TranslatorFactory,
+        TranslatorType,
+    )
+
+    progress = progress or _noop_progress
+    on_update = on_update or _noop_update
+    on_processor = on_processor or (lambda processor: None)
+    config = task.subtitle_config
+    if not task.subtitle_path or not config:
+        raise ValueError("字幕文件路径或字幕配置为空")
+
+    subtitle_path = Path(task.subtitle_path)
+    output_name = subtitle_path.stem.replace("【原始字幕】", "").replace(
+        "【下载字幕】", ""
+    )
+    split_path = str(subtitle_path.parent / f"【断句字幕】{output_name}.srt")
+    cache = get_stage_cache(config)
+    cache_key = subtitle_cache_key(cache, task) if cache else ""
+    entry = cache.restore(cache_key) if cache else None
+    if entry is not None:
+        if entry.get("data"):
+            on_update(entry["data"], True)
+        progress(100, "优化完成（缓存）")
+        return task
+    started = time.monotonic()
+    # 本阶段写入的文件（保存到阶段缓存）
+    outputs: List[str] = []
+    # 优化、翻译是否都没有失败的字幕（有失败时不缓存，下次重新处理）
+    complete = True
+    asr_data = ASRData.from_subtitle_file(str(subtitle_path))
+
+    # 1. 分割成字词级时间戳
+    if config.need_split and not asr_data.is_word_timestamp():
+        asr_data.split_to_word_segments()
+
+    split_type = config.split_type or SplitTypeEnum.SEMANTIC
+    need_llm_split = asr_data.is_word_timestamp() and split_type != SplitTypeEnum.OFFLINE
+    need_llm_translate = (
+        config.need_translate and config.translator_service not in _MACHINE_TRANSLATORS
+    )
+    if config.need_optimize or need_llm_split or need_llm_translate:
+        progress(2, "开始验证API配置...")
+        _check_llm_service(task)
+
+    # 2. 重新断句
+    if asr_data.is_word_timestamp():
+        progress(5, "字幕断句...")
+        if need_llm_split and not config.llm_model:
+            raise RuntimeError("字幕断句需要配置LLM模型")
+        splitter = SubtitleSplitter(
+            thread_num=config.thread_num,
+            model=config.llm_model or "",
+            temperature=0.3,
+            timeout=60,
+            retry_times=1,
+            split_type=SPLIT_TYPE_MAP[split_type],
+            max_word_count_cjk=config.max_word_count_cjk,
+            max_word_count_english=config.max_word_count_english,
+            base_url=config.base_url,
+            api_key=config.api_key,
+        )
+        on_processor(splitter)
+        asr_data = cached_step(
+            cache, "split", asr_data, config, splitter.split_subtitle
+        )
+        asr_data.save(save_path=split_path)
+        outputs.append(split_path)
+        on_update(asr_data.to_json(), True)
+
+    total = max(1, len(asr_data.segments))
+    finished = [0]
+
+    def callback(result: Dict) -> None:
+        finished[0] += len(result)
+        value = min(int(finished[0] / total * 100), 100)
+        progress(value, f"{value}% 处理字幕")
+        on_update(result, False)
+
+    # 融合模式：使用OpenAI翻译时，优化和翻译在同一次请求中完成
+    fuse_optimize = (
+        config.need_optimize
+        and config.need_translate
+        and config.fuse_optimize_translate
+        and config.translator_service == TranslatorServiceEnum.OPENAI
+        and not config.need_reflect
+    )
+
+    # 3. 优化字幕
+    if config.need_optimize and not fuse_optimize:
+        progress(0, "优化字幕...")
+        if not config.llm_model:
+            raise RuntimeError("字幕优化需要配置LLM模型")
+        optimizer = SubtitleOptimizer(
+            custom_prompt=config.custom_prompt_text or "",
+            model=config.llm_model,
+            batch_num=config.batch_size,
+            thread_num=config.thread_num,
+            update_callback=callback,
+            incremental=config.incremental_process,
+            hedge=config.hedge_requests,
+            **llm_service_kwargs(config),
+        )
+        on_processor(optimizer)
+        asr_data = cached_step(
+            cache,
+            "optimize",
+            asr_data,
+            config,
+            optimizer.optimize_subtitle,
+            complete=lambda: optimizer.failed_count == 0,
+        )
+        complete = complete and optimizer.failed_count == 0
+        on_update(asr_data.to_json(), True)
+
+    # 4. 翻译字幕
+    translator_map = {
+        TranslatorServiceEnum.OPENAI: TranslatorType.OPENAI,
+        TranslatorServiceEnum.DEEPLX: TranslatorType.DEEPLX,
+        TranslatorServiceEnum.BING: TranslatorType.BING,
+        TranslatorServiceEnum.GOOGLE: TranslatorType.GOOGLE,
+    }
+    if config.need_translate:
+        progress(0, "优化并翻译字幕..." if fuse_optimize else "翻译字幕...")
+        finished[0] = 0
+        if not config.translator_service:
+            raise RuntimeError("翻译服务未配置")
+        if config.translator_service == TranslatorServiceEnum.OPENAI and not (
+            config.llm_model
+        ):
+            raise RuntimeError("使用OpenAI翻译需要配置LLM模型")
+        translator = TranslatorFactory.create_translator(
+            translator_type=translator_map[config.translator_service],
+            thread_num=config.thread_num,
+            batch_num=config.batch_size,
+            target_language=str(config.target_language or "zh-CN"),
+            model=config.llm_model or "",
+            custom_prompt=config.custom_prompt_text or "",
+            is_reflect=config.need_reflect,
+            need_optimize=fuse_optimize,
+            update_callback=callback,
+            incremental=config.incremental_process,
+            use_memory=config.use_translation_memory,
+            hedge=config.hedge_requests,
+            deeplx_endpoint=config.deeplx_endpoint,
+            **llm_service_kwargs(config),
+        )
+        on_processor(translator)
+        asr_data = cached_step(
+            cache,
+            "translate",
+            asr_data,
+            config,
+            translator.translate_subtitle,
+            complete=lambda: translator.failed_count == 0,
+        )
+        complete = complete and translator.failed_count == 0
+        if config.need_remove_punctuation:
+            asr_data.remove_punctuation()
+        on_update(asr_data.to_json(), True)
+        # 保存各种布局的字幕（全流程任务）
+        if task.need_next_task and task.video_path:
+            for layout in ["原文在上", "译文在上", "仅原文", "仅译文"]:
+                save_path = str(
+                    subtitle_path.parent / f"{Path(task.video_path).stem}-{layout}.srt"
+                )
+                asr_data.save(
+                    save_path=save_path,
+                    ass_style=config.subtitle_style or "",
+                    layout=layout,
+                )
+                outputs.append(save_path)
+
+    # 5. 保存字幕
+    layout = config.subtitle_layout or "仅译文"
+    asr_data.save(
+        save_path=task.output_path or "",
+        ass_style=config.subtitle_style or "",
+        layout=layout,
+    )
+    logger.info(f"字幕保存到 {task.output_path}")
+    outputs.append(task.output_path or "")
+    if task.need_next_task and task.video_path:
+        video_path = Path(task.video_path)
+        srt_path = str(video_path.parent / f"{video_path.stem}.srt")
+        asr_data.to_srt(save_path=srt_path, layout=layout)
+        outputs.append(srt_path)
+    else:
+        # 删除断句文件（对于仅字幕任务）
+        smart_split_path = subtitle_path.parent / f"【智能断句】{subtitle_path.stem}.srt"
+        if smart_split_path.exists():
+            smart_split_path.unlink()
+    get_throughput_model().record_task("subtitle", task, time.monotonic() - started)
+    save_subtitle_stage(cache, cache_key, outputs, asr_data, complete)
+
+    progress(100, "优化完成")
+    return task
+
+
+def run_synthesis(
+    task: SynthesisTask, progress: Optional[ProgressCallback] = None
+) -> SynthesisTask:
+    """
+    将字幕合成到视频中
+
+    Args:
+        task: 视频合成任务
+        progress: 进度回调
+
+    Returns:
+        SynthesisTask: 视频合成任务（output_path 为输出视频路径）
+    """
+    from app.core.utils.video_utils import add_subtitles
+
+    progress = progress or _noop_progress
+    config = task.synthesis_config
+    if config and not config.need_video:
+        logger.info("不需要合成视频，跳过")
+        progress(100, "合成完成")
+        return task
+    if not task.video_path or not task.subtitle_path or not task.output_path:
+        raise ValueError("视频路径、字幕路径或输出路径为空")
+
+    cache = get_stage_cache(config)
+    cache_key = synthesis_cache_key(cache, task) if cache else ""
+    if cache and cache.restore(cache_key) is not None:
+        progress(100, "合成完成（缓存）")
+        return task
+
+    started = time.monotonic()
+    progress(5, "正在合成")
+    add_subtitles(
+        task.video_path,
+        task.subtitle_path,
+        task.output_path,
+        soft_subtitle=config.soft_subtitle if config else False,
+        progress_callback=lambda value, message: progress(
+            int(5 + int(value) / 100 * 95), message
+        ),
+    )
+    logger.info(f"视频合成完成，保存路径: {task.output_path}")
+    get_throughput_model().record_task("synthesize", task, time.monotonic() - started)
+    if cache:
+        cache.save(cache_key, [task.output_path])
+    progress(100, "合成完成")
+    return task
+
+
+# 阶段名称 -> 执行函数（与批量处理、命令行的阶段划分一致）
+STAGE_RUNNERS = {
+    "transcribe": run_transcribe,
+    "subtitle": run_subtitle,
+    "synthesize": run_synthesis,
+}
+
+
+def create_stage_task(
+    stage: str, command: str, file_path: str, results: Dict[str, Any]
+) -> Any:
+    """
+    使用 TaskFactory 创建阶段的任务（读取 task_factory 当前的配置）
+
+    Args:
+        stage: 阶段名称（transcribe、subtitle、synthesize）
+        command: 任务类型（transcribe、subtitle、process）
+        file_path: 输入文件
+        results: 依赖阶段的结果（阶段名称 -> 输出文件路径）
+
+    Returns:
+        TranscribeTask、SubtitleTask 或 SynthesisTask
+    """
+    from app.core.task_factory import TaskFactory
+
+    if stage == "transcribe":
+        return TaskFactory.create_transcribe_task(
+            file_path, need_next_task=command != "transcribe"
+        )
+    if stage == "subtitle":
+        if "transcribe" in results:
+            return TaskFactory.create_subtitle_task(
+                results["transcribe"], file_path, need_next_task=True
+            )
+        return TaskFactory.create_subtitle_task(file_path)
+    if stage == "synthesize":
+        return TaskFactory.create_synthesis_task(file_path, results["subtitle"])
+    raise ValueError(f"未知的阶段: {stage}")
+
+
+def run_stage_task(
+    stage: str, task: Any, progress: Optional[ProgressCallback] = None
+) -> Optional[str]:
+    """执行阶段的任务，返回输出文件路径"""
+    return STAGE_RUNNERS[stage](task, progress).output_path
@@ -0,0 +1,236 @@
+import json
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import SETTINGS_PATH, WORK_PATH
+from app.core.entities import (
+    FasterWhisperModelEnum,
+    LLMServiceEnum,
+    SplitTypeEnum,
+    TargetLanguageEnum,
+    TranscribeLanguageEnum,
+    TranscribeModelEnum,
+    TranslatorServiceEnum,
+    VadMethodEnum,
+    WhisperModelEnum,
+)
+from app.core.utils.logger import setup_logger
+
+logger = setup_logger("settings")
+
+# 任务需要的配置项：属性名 -> (分组, 名称, 默认值)
+# 与 app/common/config.py 中的 Config 保持一致（那里依赖Qt，命令行模式不能导入）
+SETTINGS_SCHEMA: Dict[str, Tuple[str, str, Any]] = {
+    # LLM配置
+    "llm_service": ("LLM", "LLMService", LLMServiceEnum.PUBLIC),
+    "openai_model": ("LLM", "OpenAI_Model", "gpt-4o-mini"),
+    "openai_api_key": ("LLM", "OpenAI_API_Key", ""),
+    "openai_api_base": ("LLM", "OpenAI_API_Base", "https://api.openai.com/v1"),
+    "silicon_cloud_model": ("LLM", "SiliconCloud_Model", "gpt-4o-mini"),
+    "silicon_cloud_api_key": ("LLM", "SiliconCloud_API_Key", ""),
+    "silicon_cloud_api_base": (
+        "LLM",
+        "SiliconCloud_API_Base",
+        "https://api.siliconflow.cn/v1",
+    ),
+    "deepseek_model": ("LLM", "DeepSeek_Model", "deepseek-chat"),
+    "deepseek_api_key": ("LLM", "DeepSeek_API_Key", ""),
+    "deepseek_api_base": ("LLM", "DeepSeek_API_Base", "https://api.deepseek.com/v1"),
+    "ollama_model": ("LLM", "Ollama_Model", "llama2"),
+    "ollama_api_key": ("LLM", "Ollama_API_Key", "ollama"),
+    "ollama_api_base": ("LLM", "Ollama_API_Base", "http://localhost:11434/v1"),
+    "lm_studio_model": ("LLM", "LmStudio_Model", "qwen2.5:7b"),
+    "lm_studio_api_key": ("LLM", "LmStudio_API_Key", "lmstudio"),
+    "lm_studio_api_base": ("LLM", "LmStudio_API_Base", "http://localhost:1234/v1"),
+    "gemini_model": ("LLM", "Gemini_Model", "gemini-pro"),
+    "gemini_api_key": ("LLM", "Gemini_API_Key", ""),
+    "gemini_api_base": (
+        "LLM",
+        "Gemini_API_Base",
+        "https://generativelanguage.googleapis.com/v1beta/openai/",
+    ),
+    "chatglm_model": ("LLM", "ChatGLM_Model", "glm-4"),
+    "chatglm_api_key": ("LLM", "ChatGLM_API_Key", ""),
+    "chatglm_api_base": (
+        "LLM",
+        "ChatGLM_API_Base",
+        "https://open.bigmodel.cn/api/paas/v4",
+    ),
+    "public_model": ("LLM", "Public_Model", "gpt-4o-mini"),
+    "public_api_key": (
+        "LLM",
+        "Public_API_Key",
+        "please-do-not-use-for-personal-purposes",
+    ),
+    "public_api_base": ("LLM", "Public_API_Base", "https://ddg.bkfeng.top/v1"),
+    # 翻译配置
+    "translator_service": (
+        "Translate",
+        "TranslatorServiceEnum",
+        TranslatorServiceEnum.BING,
+    ),
+    "need_reflect_translate": ("Translate", "NeedReflectTranslate", False),
+    "deeplx_endpoint": ("Translate", "DeeplxEndpoint", ""),
+    "batch_size": ("Translate", "BatchSize", 10),
+    "thread_num": ("Translate", "ThreadNum", 10),
+    # 转录配置
+    "transcribe_model": ("Transcribe", "TranscribeModel", TranscribeModelEnum.BIJIAN),
+    "use_asr_cache": ("Transcribe", "UseASRCache", True),
+    "transcribe_language": (
+        "Transcribe",
+        "TranscribeLanguage",
+        TranscribeLanguageEnum.ENGLISH,
+    ),
+    # Whisper Cpp 配置
+    "whisper_model": ("Whisper", "WhisperModel", WhisperModelEnum.TINY),
+    # Faster Whisper 配置
+    "faster_whisper_program": ("FasterWhisper", "Program", "faster-whisper-xxl"),
+    "faster_whisper_model": ("FasterWhisper", "Model", FasterWhisperModelEnum.TINY),
+    "faster_whisper_model_dir": ("FasterWhisper", "ModelDir", ""),
+    "faster_whisper_device": ("FasterWhisper", "Device", "cuda"),
+    "faster_whisper_vad_filter": ("FasterWhisper", "VadFilter", True),
+    "faster_whisper_vad_threshold": ("FasterWhisper", "VadThreshold", 0.4),
+    "faster_whisper_vad_method": (
+        "FasterWhisper",
+        "VadMethod",
+        VadMethodEnum.SILERO_V4,
+    ),
+    "faster_whisper_ff_mdx_kim2": ("FasterWhisper", "FfMdxKim2", False),
+    "faster_whisper_one_word": ("FasterWhisper", "OneWord", True),
+    "faster_whisper_prompt": ("FasterWhisper", "Prompt", ""),
+    # Whisper API 配置
+    "whisper_api_base": ("WhisperAPI", "WhisperApiBase", ""),
+    "whisper_api_key": ("WhisperAPI", "WhisperApiKey", ""),
+    "whisper_api_model": ("WhisperAPI", "WhisperApiModel", ""),
+    "whisper_api_prompt": ("WhisperAPI", "WhisperApiPrompt", ""),
+    # 字幕配置
+    "need_optimize": ("Subtitle", "NeedOptimize", False),
+    "need_translate": ("Subtitle", "NeedTranslate", False),
+    "need_split": ("Subtitle", "NeedSplit", False),
+    "split_type": ("Subtitle", "SplitType", SplitTypeEnum.SENTENCE),
+    "target_language": (
+        "Subtitle",
+        "TargetLanguage",
+        TargetLanguageEnum.CHINESE_SIMPLIFIED,
+    ),
+    "max_word_count_cjk": ("Subtitle", "MaxWordCountCJK", 25),
+    "max_word_count_english": ("Subtitle", "MaxWordCountEnglish", 20),
+    "needs_remove_punctuation": ("Subtitle", "NeedsRemovePunctuation", True),
+    "custom_prompt_text": ("Subtitle", "CustomPromptText", ""),
+    "incremental_process": ("Subtitle", "IncrementalProcess", False),
+    "fuse_optimize_translate": ("Subtitle", "FuseOptimizeTranslate", False),
+    "use_translation_memory": ("Subtitle", "UseTranslationMemory", False),
+    "hedge_requests": ("Subtitle", "HedgeRequests", False),
+    "hedge_api_base": ("Subtitle", "HedgeApiBase", ""),
+    "hedge_api_key": ("Subtitle", "HedgeApiKey", ""),
+    "hedge_model": ("Subtitle", "HedgeModel", ""),
+    # 字幕合成配置
+    "soft_subtitle": ("Video", "SoftSubtitle", False),
+    "need_video": ("Video", "NeedVideo", True),
+    # 字幕样式配置
+    "subtitle_style_name": ("SubtitleStyle", "StyleName", "default"),
+    "subtitle_layout": ("SubtitleStyle", "Layout", "译文在上"),
+    # 保存配置
+    "work_dir": ("Save", "Work_Dir", str(WORK_PATH)),
+    "use_stage_cache": ("Save", "UseStageCache", True),
+}
+
+
+class SettingItem:
+    """配置项（与 qfluentwidgets 的 ConfigItem 一样通过 .value 访问）"""
+
+    def __init__(self, group: str, name: str, default: Any):
+        self.group = group
+        self.name = name
+        self.default = default
+        self.value = default
+
+    @property
+    def key(self) -> str:
+        return f"{self.group}.{self.name}"
+
+    def parse(self, value: Any) -> Any:
+        """将设置文件或命令行中的值转换为配置项的类型，无法转换时抛出 ValueError"""
+        default = self.default
+        if isinstance(default, Enum):
+            enum_type = type(default)
+            for member in enum_type:
+                if value in (member.value, member.name):
+                    return member
+            raise ValueError(f"{self.key} 的取值无效: {value}")
+        if isinstance(default, bool):
+            if isinstance(value, str):
+                lowered = value.strip().lower()
+                if lowered in ("1", "true", "yes", "on"):
+                    return True
+                if lowered in ("0", "false", "no", "off"):
+                    return False
+                raise ValueError(f"{self.key} 的取值无效: {value}")
+            return bool(value)
+        if isinstance(default, (int, float)):
+            return type(default)(value)
+        return "" if value is None else str(value)
+
+
+class HeadlessConfig:
+    """
+    不依赖Qt的配置读取：读取图形界面保存的 settings.json，
+    提供与 app.common.config.cfg 相同的 cfg.<配置项>.value 接口
+
+    使用示例:
+        config = HeadlessConfig()
+        config.set("need_translate", True)
+        config.target_language.value
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else SETTINGS_PATH
+        self._items = {
+            attr: SettingItem(group, name, default)
+            for attr, (group, name, default) in SETTINGS_SCHEMA.items()
+        }
+        self.load()
+
+    def __getattr__(self, attr: str) -> SettingItem:
+        items = self.__dict__.get("_items", {})
+        if attr in items:
+            return items[attr]
+        raise AttributeError(attr)
+
+    def load(self) -> None:
+        """从设置文件读取配置，无效的值使用默认值"""
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取设置文件失败: {self.path}: {e}")
+            return
+        for item in self._items.values():
+            group = data.get(item.group)
+            if not isinstance(group, dict) or item.name not in group:
+                continue
+            try:
+                item.value = item.parse(group[item.name])
+            except (TypeError, ValueError) as e:
+                logger.warning(f"设置项无效，使用默认值: {e}")
+
+    def set(self, attr: str, value: Any) -> None:
+        """
+        修改配置项（只在内存中生效）
+
+        Args:
+            attr: 属性名（如 need_translate）或 分组.名称（如 Subtitle.NeedTranslate）
+            value: 新的值（字符串会按配置项类型转换）
+        """
+        item = self._items.get(attr) or next(
+            (item for item in self._items.values() if item.key == attr), None
+        )
+        if item is None:
+            raise KeyError(f"未知的配置项: {attr}")
+        item.value = item.parse(value)
+
+    def items(self) -> Dict[str, Any]:
+        """所有配置项的当前值"""
+        return {attr: item.value for attr, item in self._items.items()}
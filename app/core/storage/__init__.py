@@ -1,11 +1,38 @@
 # app/core/storage/__init__.py
+from .artifact_cache import ArtifactCache
 from .cache_manager import CacheManager
-from .models import ASRCache, LLMCache, TranslationCache, UsageStatistics
+from .job_store import JobRecord, JobStore
+from .models import (
+    ASRCache,
+    BatchJob,
+    BatchJobStage,
+    LLMCache,
+    StageTiming,
+    TranslationCache,
+    UsageStatistics,
+)
+from .timing_store import TimingRecord, TimingStore
+from .translation_memory import (
+    TranslationMatch,
+    TranslationMemory,
+    get_translation_memory,
+)
 
 __all__ = [
+    "ArtifactCache",
     "CacheManager",
     "TranslationCache",
     "LLMCache",
     "UsageStatistics",
     "ASRCache",
+    "BatchJob",
+    "BatchJobStage",
+    "JobStore",
+    "JobRecord",
+    "StageTiming",
+    "TimingStore",
+    "TimingRecord",
+    "TranslationMemory",
+    "TranslationMatch",
+    "get_translation_memory",
 ]
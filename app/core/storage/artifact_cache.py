@@ -0,0 +1,262 @@
+# app/core/storage/artifact_cache.py
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import CACHE_PATH
+from app.core.utils import tracing
+
+from .job_store import config_hash, file_fingerprint, inputs_hash
+
+logger = logging.getLogger(__name__)
+
+# 阶段缓存的最大总大小，超过时删除最久未使用的条目
+ARTIFACT_CACHE_MAX_SIZE = 20 * 1024 * 1024 * 1024
+# 两次检查缓存大小的最小间隔（秒）
+CLEANUP_INTERVAL = 600
+# 计算缓存键时忽略的配置字段（不影响阶段输出）
+IGNORED_CONFIG_FIELDS = frozenset(
+    {
+        "use_stage_cache",
+        "use_asr_cache",
+        "api_key",
+        "whisper_api_key",
+        "thread_num",
+        "hedge_requests",
+        "hedge_base_url",
+        "hedge_api_key",
+        "hedge_model",
+    }
+)
+
+_MANIFEST = "manifest.json"
+
+
+def _relevant(config: Any) -> Any:
+    """去掉不影响输出的配置字段"""
+    if hasattr(config, "__dataclass_fields__"):
+        return {
+            name: getattr(config, name)
+            for name in config.__dataclass_fields__
+            if name not in IGNORED_CONFIG_FIELDS
+        }
+    return config
+
+
+def _copy(source: str, target: str) -> None:
+    """复制文件（先写入临时文件再替换）"""
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    tmp = f"{target}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+class ArtifactCache:
+    """
+    阶段产物缓存：以 hash(输入文件内容) + hash(相关配置) 为键，保存阶段输出的文件和数据
+
+    重新处理相同的文件且配置未变化时，直接恢复输出文件，跳过音频提取、转录、
+    断句、优化、翻译和视频合成。
+
+    使用示例:
+        cache = ArtifactCache()
+        key = cache.make_key("synthesize", [video, subtitle], config, output)
+        if cache.restore(key) is None:
+            ...  # 执行阶段
+            cache.save(key, [output])
+    """
+
+    _last_cleanup = 0.0
+    _cleanup_lock = threading.Lock()
+
+    def __init__(
+        self, root: Optional[str] = None, max_size: int = ARTIFACT_CACHE_MAX_SIZE
+    ):
+        self.root = Path(root) if root else CACHE_PATH / "artifacts"
+        self.max_size = max_size
+
+    def make_key(self, stage: str, inputs: Iterable[Optional[str]], *configs: Any) -> str:
+        """
+        计算缓存键
+
+        Args:
+            stage: 阶段名称
+            inputs: 输入文件（按内容计算哈希）
+            *configs: 影响输出的配置（数据类、字典、字符串等）
+
+        Returns:
+            str: 缓存键
+        """
+        data = json.dumps(
+            [stage, inputs_hash(inputs), config_hash(*map(_relevant, configs))]
+        )
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get_file(self, key: str, name: str) -> Optional[str]:
+        """获取缓存的文件，不存在时返回None"""
+        path = self._dir(key) / name
+        if not path.is_file():
+            return None
+        self._touch(key)
+        return str(path)
+
+    def put_file(self, key: str, name: str, source: str, move: bool = False) -> str:
+        """
+        保存文件到缓存
+
+        Args:
+            key: 缓存键
+            name: 文件名
+            source: 源文件
+            move: 是否移动源文件（而不是复制）
+
+        Returns:
+            str: 缓存中的文件路径
+        """
+        target = self._dir(key) / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if move:
+            shutil.move(source, target)
+        else:
+            _copy(source, str(target))
+        self._maybe_cleanup()
+        return str(target)
+
+    def get_json(self, key: str) -> Optional[Any]:
+        """获取缓存的数据，不存在时返回None"""
+        path = self.get_file(key, "data.json")
+        if path is None:
+            return None
+        try:
+            return json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put_json(self, key: str, data: Any) -> None:
+        """保存数据到缓存"""
+        self._write_json(key, "data.json", data)
+
+    @tracing.traced("cache.save")
+    def save(self, key: str, paths: Iterable[Optional[str]], data: Any = None) -> None:
+        """
+        保存阶段的输出文件（恢复时复制回原路径）
+
+        Args:
+            key: 缓存键
+            paths: 输出文件
+            data: 附带保存的数据（如字幕内容）
+        """
+        files: List[Dict[str, str]] = []
+        seen = set()
+        for path in paths:
+            if not path or path in seen or not os.path.isfile(path):
+                continue
+            seen.add(path)
+            name = f"{len(files)}{Path(path).suffix}"
+            _copy(path, str(self._dir(key) / name))
+            files.append(
+                {
+                    "path": os.path.abspath(path),
+                    "file": name,
+                    "fingerprint": file_fingerprint(path),
+                }
+            )
+        # 清单最后写入，保存到一半的条目不会被使用
+        self._write_json(key, _MANIFEST, {"files": files, "data": data})
+        tracing.current_span().set(
+            files=len(files),
+            bytes=sum(os.path.getsize(self._dir(key) / item["file"]) for item in files),
+        )
+        self._maybe_cleanup()
+
+    @tracing.traced("cache.stage")
+    def restore(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        把缓存的输出文件恢复到原路径（内容相同的文件不重写）
+
+        Returns:
+            清单 {"files": [...], "data": 附带的数据}；未缓存或缓存文件缺失时返回None
+        """
+        span = tracing.current_span().set(hit=False)
+        path = self._dir(key) / _MANIFEST
+        try:
+            manifest = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        files = manifest.get("files", [])
+        if not all((self._dir(key) / item["file"]).is_file() for item in files):
+            return None
+        for item in files:
+            if os.path.isfile(item["path"]) and (
+                file_fingerprint(item["path"]) == item["fingerprint"]
+            ):
+                continue
+            _copy(str(self._dir(key) / item["file"]), item["path"])
+        self._touch(key)
+        span.set(hit=True, files=len(files))
+        logger.info(f"使用阶段缓存，恢复 {len(files)} 个文件")
+        return manifest
+
+    def discard(self, key: str) -> None:
+        """删除缓存条目（阶段输出不完整时，避免之后恢复不完整的结果）"""
+        shutil.rmtree(self._dir(key), ignore_errors=True)
+
+    def cleanup(self) -> None:
+        """缓存超过最大大小时，删除最久未使用的条目，直到不超过最大大小的 90%"""
+        entries = []
+        total = 0
+        for prefix in self.root.glob("*"):
+            for entry in prefix.glob("*"):
+                if not entry.is_dir():
+                    continue
+                size = sum(f.stat().st_size for f in entry.glob("*") if f.is_file())
+                entries.append((entry.stat().st_mtime, size, entry))
+                total += size
+        if total <= self.max_size:
+            return
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= self.max_size * 0.9:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+        logger.info(f"阶段缓存清理完成，当前大小: {total / 1024 / 1024:.0f}MB")
+
+    def _dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _touch(self, key: str) -> None:
+        """更新条目的使用时间（用于清理最久未使用的条目）"""
+        try:
+            os.utime(self._dir(key))
+        except OSError:
+            pass
+
+    def _write_json(self, key: str, name: str, data: Any) -> None:
+        directory = self._dir(key)
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f".{name}.{uuid.uuid4().hex[:8]}.tmp"
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, directory / name)
+
+    def _maybe_cleanup(self) -> None:
+        now = time.time()
+        with ArtifactCache._cleanup_lock:
+            if now - ArtifactCache._last_cleanup < CLEANUP_INTERVAL:
+                return
+            ArtifactCache._last_cleanup = now
+        try:
+            self.cleanup()
+        except OSError as e:
+            logger.warning(f"阶段缓存清理失败: {e}")
@@ -7,6 +7,8 @@ from typing import Any, Dict, Optional
 
 from sqlalchemy import and_
 
+from app.core.utils import tracing
+
 from .constants import CACHE_CONFIG, OperationType, TranslatorType
 from .database import DatabaseManager
 from .models import (
@@ -81,6 +83,7 @@ class CacheManager(BaseManager):
         except Exception as e:
             self._handle_db_error("cleanup_old_cache", e)
 
+    @tracing.traced("cache.translation")
     def get_translation(
         self, text: str, translator_type: str, **params
     ) -> Optional[str]:
@@ -97,6 +100,7 @@ class CacheManager(BaseManager):
                     .filter_by(content_hash=hash_key, translator_type=translator_type)
                     .first()
                 )
+                tracing.current_span().set(hit=cache_result is not None)
                 return str(cache_result.translated_text) if cache_result else None
         except Exception as e:
             self.logger.error(f"Error getting translation cache: {str(e)}")
@@ -127,6 +131,7 @@ class CacheManager(BaseManager):
             self.logger.error(f"Error setting translation cache: {str(e)}")
             raise
 
+    @tracing.traced("cache.llm")
     def get_llm_result(self, prompt: str, model_name: str, **params) -> Optional[str]:
         """获取LLM结果缓存"""
         if not prompt or not model_name:
@@ -140,6 +145,7 @@ class CacheManager(BaseManager):
                     .filter_by(content_hash=hash_key, model_name=model_name)
                     .first()
                 )
+                tracing.current_span().set(hit=result is not None)
                 return str(result.result) if result else None
         except Exception as e:
             self.logger.error(f"Error getting LLM cache: {str(e)}")
@@ -239,6 +245,7 @@ class CacheManager(BaseManager):
             self.logger.error(f"Error getting usage stats: {str(e)}")
             return {}
 
+    @tracing.traced("cache.asr")
     def get_asr_result(self, crc32_hex: str, asr_type: str) -> Optional[dict]:
         """获取语音识别缓存结果"""
         if not crc32_hex or not asr_type:
@@ -251,6 +258,7 @@ class CacheManager(BaseManager):
                     .filter_by(crc32_hex=crc32_hex, asr_type=asr_type)
                     .first()
                 )
+                tracing.current_span().set(hit=result is not None)
                 return result.result_data if result else None  # type: ignore
         except Exception as e:
             self.logger.error(f"Error getting ASR cache: {str(e)}")
@@ -21,3 +21,13 @@ CACHE_CONFIG = {
     "db_filename": "cache.db",
     "cleanup_threshold": 10000,  # 触发清理的记录数阈值
 }
+
+
+class JobStatus(Enum):
+    """批量任务及其阶段的状态"""
+
+    WAITING = "waiting"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
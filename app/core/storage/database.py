@@ -1,6 +1,7 @@
 # app/core/storage/database.py
 import logging
 import os
+import threading
 from contextlib import contextmanager
 
 from sqlalchemy import create_engine
@@ -11,6 +12,9 @@ from .models import Base
 
 logger = logging.getLogger(__name__)
 
+# 多个线程同时初始化数据库时，建表需要串行（否则可能重复建表报错）
+_init_lock = threading.Lock()
+
 
 class DatabaseManager:
     """数据库管理类，负责数据库连接和会话管理"""
@@ -34,7 +38,8 @@ class DatabaseManager:
                 max_overflow=10,
                 pool_recycle=3600,
             )
-            Base.metadata.create_all(self._engine)
+            with _init_lock:
+                Base.metadata.create_all(self._engine)
             self._session_maker = sessionmaker(bind=self._engine)
             # logger.info(f"Database initialized at {self.db_path}")
         except Exception as e:
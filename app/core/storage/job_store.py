@@ -0,0 +1,265 @@
+# app/core/storage/job_store.py
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional
+
+from .constants import JobStatus
+from .database import DatabaseManager
+from .models import BatchJob, BatchJobStage
+
+logger = logging.getLogger(__name__)
+
+# 计算文件指纹时，超过该大小的文件只读取开头、中间、结尾各一段
+FINGERPRINT_SAMPLE_SIZE = 1024 * 1024
+
+_UNFINISHED = (JobStatus.WAITING.value, JobStatus.RUNNING.value)
+
+
+@dataclass(frozen=True)
+class JobRecord:
+    """
+    持久化的批量任务
+
+    Attributes:
+        job_id: 任务ID
+        file_path: 输入文件
+        task_type: 任务类型（BatchTaskType 的名称）
+        status: 任务状态
+    """
+
+    job_id: int
+    file_path: str
+    task_type: str
+    status: str
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    计算文件内容的指纹（大文件只读取开头、中间、结尾各 1MB，加上文件大小）
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        str: 指纹，文件不存在时返回空字符串
+    """
+    if not path or not os.path.isfile(path):
+        return ""
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        if size <= FINGERPRINT_SAMPLE_SIZE * 3:
+            digest.update(f.read())
+        else:
+            for offset in (0, size // 2, size - FINGERPRINT_SAMPLE_SIZE):
+                f.seek(offset)
+                digest.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+    return digest.hexdigest()
+
+
+def inputs_hash(paths: Iterable[Optional[str]]) -> str:
+    """多个输入文件的内容哈希"""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(file_fingerprint(path or "").encode())
+    return digest.hexdigest()
+
+
+def _to_jsonable(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return _to_jsonable(dataclasses.asdict(value))
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def config_hash(*configs: Any) -> str:
+    """配置（数据类、字典等）的哈希"""
+    data = json.dumps(_to_jsonable(configs), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class JobStore:
+    """
+    批量任务的持久化存储：记录每个任务及其阶段的状态、输入哈希、配置哈希和产物路径
+
+    程序崩溃或重启后，通过 unfinished_jobs() 找到未完成的任务重新提交；
+    已完成的阶段在输入和配置都未变化、产物文件仍存在时直接返回记录的结果。
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+
+    def create_job(self, file_path: str, task_type: str) -> int:
+        """
+        创建任务，同一文件和类型已有未完成的任务时返回该任务
+
+        Args:
+            file_path: 输入文件
+            task_type: 任务类型
+
+        Returns:
+            int: 任务ID
+        """
+        with self.db_manager.get_session() as session:
+            job_id = (
+                session.query(BatchJob.id)
+                .filter(
+                    BatchJob.file_path == file_path,
+                    BatchJob.task_type == task_type,
+                    BatchJob.status.in_(_UNFINISHED),
+                )
+                .order_by(BatchJob.id.desc())
+                .scalar()
+            )
+            if job_id is not None:
+                return job_id
+            job = BatchJob(
+                file_path=file_path,
+                task_type=task_type,
+                status=JobStatus.WAITING.value,
+            )
+            session.add(job)
+            session.flush()
+            return job.id  # type: ignore
+
+    def unfinished_jobs(self) -> List[JobRecord]:
+        """未完成（等待中或执行中）的任务，按创建顺序排列"""
+        with self.db_manager.get_session() as session:
+            rows = (
+                session.query(
+                    BatchJob.id, BatchJob.file_path, BatchJob.task_type, BatchJob.status
+                )
+                .filter(BatchJob.status.in_(_UNFINISHED))
+                .order_by(BatchJob.id)
+                .all()
+            )
+            return [JobRecord(*row) for row in rows]
+
+    def set_job_status(self, job_id: int, status: JobStatus, error: str = "") -> None:
+        """更新任务状态"""
+        with self.db_manager.get_session() as session:
+            session.query(BatchJob).filter_by(id=job_id).update(
+                {
+                    "status": status.value,
+                    "error": error,
+                    "updated_at": datetime.utcnow(),
+                }
+            )
+
+    def get_checkpoint(
+        self, job_id: int, stage: str, input_hash: str, config_hash: str
+    ) -> Optional[Any]:
+        """
+        获取已完成阶段的结果
+
+        Args:
+            job_id: 任务ID
+            stage: 阶段名称
+            input_hash: 当前输入的哈希
+            config_hash: 当前配置的哈希
+
+        Returns:
+            阶段结果；阶段未完成、输入或配置已变化、产物文件不存在时返回None
+        """
+        with self.db_manager.get_session() as session:
+            record = (
+                session.query(
+                    BatchJobStage.status,
+                    BatchJobStage.input_hash,
+                    BatchJobStage.config_hash,
+                    BatchJobStage.artifacts,
+                )
+                .filter_by(job_id=job_id, name=stage)
+                .first()
+            )
+        if record is None:
+            return None
+        status, saved_input_hash, saved_config_hash, artifacts = record
+        if status != JobStatus.COMPLETED.value:
+            return None
+        if saved_input_hash != input_hash or saved_config_hash != config_hash:
+            return None
+        artifacts = artifacts or {}
+        paths = artifacts.get("paths", [])
+        if not all(path and os.path.exists(path) for path in paths):
+            return None
+        return artifacts.get("result")
+
+    def start_stage(
+        self, job_id: int, stage: str, input_hash: str, config_hash: str
+    ) -> None:
+        """记录阶段开始执行"""
+        self._save_stage(job_id, stage, JobStatus.RUNNING, input_hash, config_hash)
+        self.set_job_status(job_id, JobStatus.RUNNING)
+
+    def complete_stage(
+        self,
+        job_id: int,
+        stage: str,
+        input_hash: str,
+        config_hash: str,
+        result: Any,
+        paths: Iterable[str] = (),
+    ) -> None:
+        """
+        记录阶段完成
+
+        Args:
+            job_id: 任务ID
+            stage: 阶段名称
+            input_hash: 输入的哈希
+            config_hash: 配置的哈希
+            result: 阶段结果（需可序列化为JSON）
+            paths: 阶段产物的文件路径（恢复时检查是否仍存在）
+        """
+        artifacts = {"result": result, "paths": list(paths)}
+        self._save_stage(
+            job_id, stage, JobStatus.COMPLETED, input_hash, config_hash, artifacts
+        )
+
+    def fail_stage(self, job_id: int, stage: str, error: str) -> None:
+        """记录阶段失败"""
+        self._save_stage(job_id, stage, JobStatus.FAILED, error=error)
+
+    def _save_stage(
+        self,
+        job_id: int,
+        stage: str,
+        status: JobStatus,
+        input_hash: Optional[str] = None,
+        config_hash: Optional[str] = None,
+        artifacts: Optional[dict] = None,
+        error: str = "",
+    ) -> None:
+        values: Dict[Any, Any] = {
+            "status": status.value,
+            "error": error,
+            "updated_at": datetime.utcnow(),
+        }
+        if input_hash is not None:
+            values["input_hash"] = input_hash
+        if config_hash is not None:
+            values["config_hash"] = config_hash
+        if artifacts is not None or status != JobStatus.FAILED:
+            values["artifacts"] = artifacts
+        with self.db_manager.get_session() as session:
+            updated = (
+                session.query(BatchJobStage)
+                .filter_by(job_id=job_id, name=stage)
+                .update(values)
+            )
+            if not updated:
+                session.add(BatchJobStage(job_id=job_id, name=stage, **values))
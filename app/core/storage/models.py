@@ -1,7 +1,17 @@
 # app/core/storage/models.py
 from datetime import date, datetime
 
-from sqlalchemy import JSON, Column, Date, DateTime, Index, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -110,3 +120,61 @@ class DailyServiceUsage(Base):
             elif isinstance(kwargs["usage_date"], date):
                 pass
         super().__init__(**kwargs)
+
+
+class BatchJob(Base):
+    """批量处理任务表（用于重启后恢复未完成的任务）"""
+
+    __tablename__ = "batch_job"
+
+    id = Column(Integer, primary_key=True)
+    file_path = Column(Text, nullable=False)
+    task_type = Column(String(50), nullable=False)  # BatchTaskType 的名称
+    status = Column(String(20), nullable=False, index=True)
+    error = Column(Text, default="")
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<BatchJob(id={self.id}, type={self.task_type}, status={self.status})>"
+
+
+class BatchJobStage(Base):
+    """批量处理任务的阶段检查点表"""
+
+    __tablename__ = "batch_job_stage"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, nullable=False)
+    name = Column(String(50), nullable=False)  # 阶段名称
+    status = Column(String(20), nullable=False)
+    input_hash = Column(String(64), default="")  # 输入文件内容的哈希
+    config_hash = Column(String(64), default="")  # 阶段配置的哈希
+    artifacts = Column(JSON)  # 阶段结果及产物路径
+    error = Column(Text, default="")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (Index("idx_batch_job_stage", job_id, name, unique=True),)
+
+    def __repr__(self):
+        return f"<BatchJobStage(job={self.job_id}, name={self.name}, status={self.status})>"
+
+
+class StageTiming(Base):
+    """阶段耗时记录表（用于估计处理时间）"""
+
+    __tablename__ = "stage_timing"
+
+    id = Column(Integer, primary_key=True)
+    stage = Column(String(50), nullable=False)  # 阶段名称
+    profile = Column(String(200), nullable=False)  # 模型、设备等影响速度的配置
+    media_seconds = Column(Float, default=0)  # 音视频（或字幕）时长
+    segments = Column(Integer, default=0)  # 字幕条数
+    chars = Column(Integer, default=0)  # 字幕字符数
+    seconds = Column(Float, nullable=False)  # 阶段耗时
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("idx_stage_timing", stage, profile),)
+
+    def __repr__(self):
+        return f"<StageTiming(stage={self.stage}, profile={self.profile}, seconds={self.seconds:.1f})>"
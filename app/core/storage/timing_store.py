@@ -0,0 +1,90 @@
+# app/core/storage/timing_store.py
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .database import DatabaseManager
+from .models import StageTiming
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TimingRecord:
+    """
+    一次阶段执行的耗时及输入特征
+
+    Attributes:
+        stage: 阶段名称
+        profile: 模型、设备等影响速度的配置
+        media_seconds: 音视频（或字幕）时长
+        segments: 字幕条数
+        chars: 字幕字符数
+        seconds: 阶段耗时
+    """
+
+    stage: str
+    profile: str
+    media_seconds: float
+    segments: int
+    chars: int
+    seconds: float
+
+
+class TimingStore:
+    """阶段耗时记录的持久化存储"""
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+
+    def add(self, record: TimingRecord) -> None:
+        """保存一条耗时记录"""
+        with self.db_manager.get_session() as session:
+            session.add(
+                StageTiming(
+                    stage=record.stage,
+                    profile=record.profile,
+                    media_seconds=record.media_seconds,
+                    segments=record.segments,
+                    chars=record.chars,
+                    seconds=record.seconds,
+                )
+            )
+
+    def recent(
+        self, stage: str, profile: Optional[str] = None, limit: int = 200
+    ) -> List[TimingRecord]:
+        """
+        最近的耗时记录
+
+        Args:
+            stage: 阶段名称
+            profile: 配置，为None时返回该阶段所有配置的记录
+            limit: 最多返回的记录数
+
+        Returns:
+            List[TimingRecord]: 耗时记录，最新的在前
+        """
+        with self.db_manager.get_session() as session:
+            query = session.query(StageTiming).filter(StageTiming.stage == stage)
+            if profile is not None:
+                query = query.filter(StageTiming.profile == profile)
+            rows = (
+                query.with_entities(
+                    StageTiming.stage,
+                    StageTiming.profile,
+                    StageTiming.media_seconds,
+                    StageTiming.segments,
+                    StageTiming.chars,
+                    StageTiming.seconds,
+                )
+                .order_by(StageTiming.id.desc())
+                .limit(limit)
+                .all()
+            )
+            return [
+                TimingRecord(
+                    name, config, media or 0.0, segments or 0, chars or 0, seconds
+                )
+                for name, config, media, segments, chars, seconds in rows
+            ]
@@ -0,0 +1,388 @@
+# app/core/storage/translation_memory.py
+import json
+import logging
+import math
+import threading
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from app.core.utils.text_metrics import is_mainly_cjk
+
+from .models import LLMCache, TranslationCache
+
+logger = logging.getLogger(__name__)
+
+# 翻译记忆配置
+CJK_GRAM_SIZE = 2  # 中日韩等文字的n-gram长度
+GRAM_SIZE = 3  # 其余文字的n-gram长度
+MAX_MEMORY_ENTRIES = 50000  # 每种目标语言最多保存的历史翻译条数
+MAX_SCAN_ROWS = 20000  # 从每张缓存表中最多读取的记录数
+HINT_SIMILARITY = 0.6  # 作为参考译文的最低相似度
+PREFILL_SIMILARITY = 1.0  # 直接复用译文的最低相似度（1.0 表示原文完全相同，只有空白不同）
+
+# 不加入翻译记忆的译文（翻译失败标记）
+_INVALID_TRANSLATIONS = {"", "ERROR", "TRANSLATION ERROR"}
+
+
+@dataclass(frozen=True)
+class TranslationMatch:
+    """
+    翻译记忆的匹配结果
+
+    Attributes:
+        source: 历史原文
+        translation: 历史译文
+        similarity: 相似度，只有原文完全相同（只有空白不同）时为 1.0
+        origin: 译文来源（翻译器及其参数的标识）
+    """
+
+    source: str
+    translation: str
+    similarity: float
+    origin: str = ""
+
+
+@dataclass(frozen=True)
+class _Entry:
+    source: str
+    translation: str
+    origin: str
+    grams: FrozenSet[str]
+
+
+def normalize_text(text: str) -> str:
+    """
+    归一化文本：全角转半角、转小写、去除标点，连续空白合并为一个空格
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        str: 归一化后的文本
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    chars = [ch if ch.isalnum() else " " for ch in text]
+    return " ".join("".join(chars).split())
+
+
+def exact_text(text: str) -> str:
+    """
+    完全匹配时比较的文本：只合并连续空白（大小写、标点不同的原文译文可能不同，不直接复用）
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        str: 去除首尾空白、连续空白合并为一个空格的文本
+    """
+    return " ".join(text.split())
+
+
+def text_grams(normalized: str) -> FrozenSet[str]:
+    """
+    计算归一化文本的字符n-gram集合（中日韩文字使用二元组，其余使用三元组）
+
+    Args:
+        normalized: 归一化后的文本
+
+    Returns:
+        FrozenSet[str]: n-gram集合
+    """
+    size = CJK_GRAM_SIZE if is_mainly_cjk(normalized) else GRAM_SIZE
+    if len(normalized) <= size:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(
+        normalized[i : i + size] for i in range(len(normalized) - size + 1)
+    )
+
+
+def llm_origin(model: str, prompt_hash: str) -> str:
+    """LLM翻译结果的来源标识（模型和提示词都相同时才直接复用译文）"""
+    return f"llm:{model}:{prompt_hash}"
+
+
+class TranslationMemory:
+    """
+    翻译记忆：原文完全相同时直接匹配，近似匹配基于归一化文本的字符n-gram倒排索引（线程安全）
+
+    查询时按倒排列表从短到长只探查必要数量的n-gram来生成候选
+    （Jaccard相似度 >= t 的候选至少包含查询的 ceil(t*k) 个n-gram），
+    再用长度过滤和集合交集计算精确的相似度
+
+    使用示例:
+        memory = TranslationMemory()
+        memory.add("Welcome back to the channel!", "欢迎回到频道！", origin="google")
+        memory.lookup("welcome back to my channel")
+    """
+
+    def __init__(self, max_entries: int = MAX_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: List[_Entry] = []
+        self._sizes: List[int] = []  # 每个条目的n-gram数，用于长度过滤
+        # 原文（exact_text）-> {来源: 条目序号}
+        self._exact: Dict[str, Dict[str, int]] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, source: str, translation: str, origin: str = "") -> bool:
+        """
+        添加一条翻译，同一来源下相同的原文只保留最新的译文
+
+        Args:
+            source: 原文
+            translation: 译文
+            origin: 译文来源
+
+        Returns:
+            bool: 是否添加成功
+        """
+        if not source or not translation or "||ERROR" in translation:
+            return False
+        if translation.strip() in _INVALID_TRANSLATIONS:
+            return False
+        # 译文与原文相同时通常是翻译失败后返回的原文，不加入
+        if translation.strip() == source.strip():
+            return False
+        normalized = normalize_text(source)
+        if not normalized:
+            return False
+        with self._lock:
+            by_origin = self._exact.setdefault(exact_text(source), {})
+            index = by_origin.get(origin)
+            if index is not None:
+                grams = self._entries[index].grams
+                self._entries[index] = _Entry(source, translation, origin, grams)
+                return True
+            if len(self._entries) >= self.max_entries:
+                return False
+            grams = text_grams(normalized)
+            index = len(self._entries)
+            self._entries.append(_Entry(source, translation, origin, grams))
+            self._sizes.append(len(grams))
+            by_origin[origin] = index
+            for gram in grams:
+                self._postings[gram].append(index)
+        return True
+
+    def add_many(self, items: Iterable[Tuple[str, str, str]]) -> int:
+        """批量添加 (原文, 译文, 来源)，返回添加成功的条数"""
+        return sum(1 for item in items if self.add(*item))
+
+    def lookup(
+        self,
+        text: str,
+        min_similarity: float = HINT_SIMILARITY,
+        limit: int = 1,
+        origin: Optional[str] = None,
+    ) -> List[TranslationMatch]:
+        """
+        查找相似的历史翻译
+
+        Args:
+            text: 待翻译的文本
+            min_similarity: 最低相似度（n-gram集合的Jaccard相似度）
+            limit: 最多返回的条数
+            origin: 只查找该来源的译文，为None时不限来源
+
+        Returns:
+            List[TranslationMatch]: 按相似度从高到低排列的匹配结果
+        """
+        normalized = normalize_text(text)
+        if not normalized:
+            return []
+        grams = text_grams(normalized)
+        min_similarity = max(min_similarity, 1e-6)
+
+        with self._lock:
+            # 原文完全相同的条目
+            by_origin = self._exact.get(exact_text(text), {})
+            if origin is None:
+                exact = sorted(by_origin.values(), reverse=True)
+            else:
+                exact = [by_origin[origin]] if origin in by_origin else []
+            matches = [self._match(index, 1.0) for index in exact[:limit]]
+            if min_similarity >= 1.0 or len(matches) >= limit:
+                return matches
+
+            k = len(grams)
+            probe_count = k - math.ceil(min_similarity * k) + 1
+            probe = sorted(grams, key=lambda g: len(self._postings.get(g, ())))
+            candidates: Set[int] = set()
+            for gram in probe[:probe_count]:
+                candidates.update(self._postings.get(gram, ()))
+            candidates.difference_update(exact)
+
+            # 长度过滤：|B| 不在 [t*k, k/t] 范围内时相似度不可能达到 t
+            min_size = min_similarity * k
+            max_size = k / min_similarity
+            sizes = self._sizes
+            scored = []
+            for index in candidates:
+                size = sizes[index]
+                if size < min_size or size > max_size:
+                    continue
+                entry = self._entries[index]
+                if origin is not None and entry.origin != origin:
+                    continue
+                overlap = len(grams & entry.grams)
+                similarity = overlap / (k + size - overlap)
+                if similarity >= min_similarity:
+                    # 原文不同（包括只有大小写、标点不同）时相似度不记为 1.0
+                    scored.append((min(similarity, 0.99), index))
+
+            scored.sort(key=lambda item: (-item[0], -item[1]))
+            for similarity, index in scored[: limit - len(matches)]:
+                matches.append(self._match(index, similarity))
+        return matches
+
+    def _match(self, index: int, similarity: float) -> TranslationMatch:
+        entry = self._entries[index]
+        return TranslationMatch(
+            entry.source, entry.translation, similarity, entry.origin
+        )
+
+    def load_from_cache(
+        self,
+        cache_manager: Any,
+        target_languages: Iterable[str],
+        max_rows: int = MAX_SCAN_ROWS,
+    ) -> int:
+        """
+        从翻译缓存（TranslationCache）和LLM缓存（LLMCache）中加载历史翻译
+
+        Args:
+            cache_manager: 缓存管理器
+            target_languages: 目标语言（不同翻译器的缓存参数中语言写法不同，可传入多个）
+            max_rows: 每张表最多读取的记录数（按时间从新到旧）
+
+        Returns:
+            int: 加载的条数
+        """
+        languages = {lang for lang in target_languages if lang}
+        items: List[Tuple[str, str, str]] = []
+        try:
+            with cache_manager.db_manager.get_session() as session:
+                for model in (TranslationCache, LLMCache):
+                    rows = (
+                        session.query(model).order_by(model.id.desc()).limit(max_rows)
+                    )
+                    for row in rows:
+                        params = row.params or {}
+                        if params.get("target_language") not in languages:
+                            continue
+                        if model is TranslationCache:
+                            items.append(
+                                (
+                                    row.source_text,
+                                    row.translated_text,
+                                    row.translator_type,
+                                )
+                            )
+                            continue
+                        origin = llm_origin(
+                            row.model_name, params.get("prompt_hash", "")
+                        )
+                        for source, translation in parse_llm_translations(
+                            row.prompt, row.result, params.get("need_optimize", False)
+                        ):
+                            items.append((source, translation, origin))
+        except Exception as e:
+            logger.error(f"加载翻译记忆失败: {str(e)}")
+            return 0
+        # 按时间从旧到新添加，使同一原文保留最新的译文
+        return self.add_many(reversed(items))
+
+
+def parse_llm_translations(
+    prompt: Any, result: Any, fused: bool = False
+) -> List[Tuple[str, str]]:
+    """
+    从LLM翻译的输入输出中解析出 (原文, 译文) 列表
+
+    Args:
+        prompt: 输入的字幕块（JSON字符串或字典），单条翻译时为原文
+        result: 输出的结果（JSON字符串或字典），单条翻译时为译文
+        fused: 是否为优化与翻译融合模式（结果为 "优化后原文||译文"）
+
+    Returns:
+        List[Tuple[str, str]]: (原文, 译文) 列表
+    """
+    try:
+        source_chunk = json.loads(prompt) if isinstance(prompt, str) else prompt
+        result_chunk = json.loads(result) if isinstance(result, str) else result
+    except (ValueError, TypeError):
+        # 单条翻译模式：提示词即原文，结果即译文
+        return [(prompt, result)] if isinstance(result, str) else []
+    if not isinstance(source_chunk, dict) or not isinstance(result_chunk, dict):
+        return []
+
+    pairs = []
+    for key, value in result_chunk.items():
+        source = source_chunk.get(key)
+        if not isinstance(source, str):
+            continue
+        if isinstance(value, dict):
+            value = value.get("revised_translation") or value.get("translation")
+        if not isinstance(value, str):
+            continue
+        if fused:
+            # 原文可能已被优化修改，只在未修改时使用
+            optimized, _, value = value.partition("||")
+            if exact_text(optimized) != exact_text(source):
+                continue
+        pairs.append((source, value))
+    return pairs
+
+
+_memories: Dict[Tuple[str, FrozenSet[str]], TranslationMemory] = {}
+_memories_lock = threading.Lock()
+
+
+def get_translation_memory(
+    cache_manager: Any, target_languages: Iterable[str]
+) -> TranslationMemory:
+    """
+    获取指定目标语言的翻译记忆（进程内共享，首次使用时从缓存数据库加载）
+
+    Args:
+        cache_manager: 缓存管理器
+        target_languages: 目标语言（同一语言的不同写法）
+
+    Returns:
+        TranslationMemory: 翻译记忆
+    """
+    languages = frozenset(lang for lang in target_languages if lang)
+    key = (str(cache_manager.db_manager.db_path), languages)
+    with _memories_lock:
+        memory = _memories.get(key)
+        if memory is None:
+            memory = TranslationMemory()
+            count = memory.load_from_cache(cache_manager, languages)
+            logger.info(f"已加载翻译记忆 {count} 条")
+            _memories[key] = memory
+    return memory
+
+
+if __name__ == "__main__":
+    import random
+    import string
+    import time
+
+    random.seed(0)
+    memory = TranslationMemory()
+    words = ["".join(random.choices(string.ascii_lowercase, k=5)) for _ in range(3000)]
+    for i in range(MAX_MEMORY_ENTRIES - 1):
+        memory.add(" ".join(random.choices(words, k=8)), f"译文{i}", "google")
+    memory.add("Welcome back to the channel, everyone!", "欢迎回到频道，各位！", "google")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        found = memory.lookup("welcome back to my channel everyone")
+    elapsed = (time.perf_counter() - start) / 1000 * 1000
+    print(f"条目数: {len(memory)}, 平均查询耗时: {elapsed:.3f} ms")
+    print(found)
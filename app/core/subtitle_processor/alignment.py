@@ -1,4 +1,233 @@
 import difflib
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.core.utils import tracing
+
+# 与 difflib.Differ._fancy_replace 相同的相似度阈值
+SIMILAR_CUTOFF = 0.75
+SIMILAR_START = 0.74
+# 替换块的行对数不超过该值时按 ndiff 的方式在整个块内寻找最相似的行对（配对与 ndiff 相同），
+# 超过时先在对角线附近寻找锚点，锚点之间的小块再按 ndiff 的方式配对
+MAX_EXACT_PAIRS = 2500
+# 寻找锚点时，每个目标行只与对角线位置前后 ANCHOR_WINDOW 行内的源行比较
+ANCHOR_WINDOW = 8
+
+
+class _PairSimilarity:
+    """
+    替换块内行对相似度的惰性缓存。
+
+    difflib 在每一层递归中都会重新计算子块内所有行对的相似度，
+    这里对每个行对最多计算一次 quick_ratio / ratio，并复用以目标行为 seq2 的匹配器。
+    """
+
+    def __init__(self, a: List[str], b: List[str]):
+        self.a = a
+        self.b = b
+        self._matchers: Dict[int, difflib.SequenceMatcher] = {}
+        self._quick: Dict[Tuple[int, int], float] = {}
+        self._ratio: Dict[Tuple[int, int], float] = {}
+
+    def _matcher(self, i: int, j: int) -> difflib.SequenceMatcher:
+        matcher = self._matchers.get(j)
+        if matcher is None:
+            matcher = difflib.SequenceMatcher(difflib.IS_CHARACTER_JUNK)
+            matcher.set_seq2(self.b[j])
+            self._matchers[j] = matcher
+        if matcher.a is not self.a[i]:  # type: ignore
+            matcher.set_seq1(self.a[i])
+        return matcher
+
+    def ratio_above(self, i: int, j: int, threshold: float) -> Optional[float]:
+        """返回行对的相似度，如果不大于 threshold 则返回 None"""
+        la, lb = len(self.a[i]), len(self.b[j])
+        # real_quick_ratio: 仅由长度决定的上界
+        if la + lb == 0 or 2.0 * min(la, lb) / (la + lb) <= threshold:
+            return None
+        key = (i, j)
+        quick = self._quick.get(key)
+        if quick is None:
+            quick = self._matcher(i, j).quick_ratio()
+            self._quick[key] = quick
+        if quick <= threshold:
+            return None
+        ratio = self._ratio.get(key)
+        if ratio is None:
+            ratio = self._matcher(i, j).ratio()
+            self._ratio[key] = ratio
+        return ratio if ratio > threshold else None
+
+    def has_changes(self, i: int, j: int) -> Tuple[bool, bool]:
+        """判断相似行对在源行/目标行上是否存在字符级差异（决定是否输出 '?' 行）"""
+        a_changed = b_changed = False
+        for tag, _, _, _, _ in self._matcher(i, j).get_opcodes():
+            if tag in ("replace", "delete"):
+                a_changed = True
+            if tag in ("replace", "insert"):
+                b_changed = True
+        return a_changed, b_changed
+
+
+class LineDiffer:
+    """
+    行级差异比较器，输出与 difflib.ndiff 相同格式的差异行。
+
+    - 先将每一行映射为整数ID，在ID序列上做行级匹配
+    - 仅在发生替换的块内做相似行配对，且每个行对的相似度只计算一次
+    - 不生成 '?' 行中的字符级标记内容（配对只依赖于 '?' 行是否存在）
+
+    ndiff 在替换块内每次都比较所有行对（n×m），块很大时（例如每一行都被改写）耗时
+    随行数平方增长。行对数不超过 MAX_EXACT_PAIRS 的块配对与 ndiff 完全相同；
+    更大的块先用对角线附近的相似行对做锚点（patience diff 的最长递增子序列），
+    只在锚点之间的小块内做完整比较，配对可能与 ndiff 不同。
+
+    替换块较小时（大部分行未修改）耗时主要在行级匹配和配对上，只比 ndiff 快约 1.2~2 倍；
+    逐行改写的 2000 行字幕约快 20 倍，耗时随行数线性增长。
+    基准测试和与 ndiff 的一致性检查见 scripts/bench_alignment.py。
+    """
+
+    def compare(self, a: List[str], b: List[str]) -> Iterator[str]:
+        line_ids: Dict[str, int] = {}
+        a_ids = [line_ids.setdefault(line, len(line_ids)) for line in a]
+        b_ids = [line_ids.setdefault(line, len(line_ids)) for line in b]
+
+        similarity = _PairSimilarity(a, b)
+        matcher = difflib.SequenceMatcher(None, a_ids, b_ids)
+        for tag, alo, ahi, blo, bhi in matcher.get_opcodes():
+            if tag == "replace":
+                yield from self._replace(similarity, alo, ahi, blo, bhi)
+            elif tag == "delete":
+                yield from self._dump("-", a, alo, ahi)
+            elif tag == "insert":
+                yield from self._dump("+", b, blo, bhi)
+            elif tag == "equal":
+                yield from self._dump(" ", a, alo, ahi)
+            else:
+                raise ValueError(f"unknown tag {tag!r}")
+
+    @staticmethod
+    def _dump(tag: str, lines: List[str], lo: int, hi: int) -> Iterator[str]:
+        for i in range(lo, hi):
+            yield f"{tag} {lines[i]}"
+
+    def _replace(
+        self, sim: _PairSimilarity, alo: int, ahi: int, blo: int, bhi: int
+    ) -> Iterator[str]:
+        """处理替换块：较大的块先按锚点切分，否则按 ndiff 的方式配对"""
+        if (ahi - alo) * (bhi - blo) > MAX_EXACT_PAIRS:
+            anchors = self._anchors(sim, alo, ahi, blo, bhi)
+            if anchors:
+                for i, j in anchors:
+                    yield from self._helper(sim, alo, i, blo, j)
+                    yield from self._pair(sim, i, j)
+                    alo, blo = i + 1, j + 1
+                yield from self._helper(sim, alo, ahi, blo, bhi)
+                return
+        yield from self._fancy_replace(sim, alo, ahi, blo, bhi)
+
+    @staticmethod
+    def _anchors(
+        sim: _PairSimilarity, alo: int, ahi: int, blo: int, bhi: int
+    ) -> List[Tuple[int, int]]:
+        """
+        为每个目标行在对角线附近寻找最相似的源行（相似度不低于 SIMILAR_CUTOFF），
+        返回其中源行和目标行位置都递增的最长序列
+        """
+        scale = (ahi - alo) / (bhi - blo)
+        candidates: List[Tuple[int, int]] = []
+        for j in range(blo, bhi):
+            center = alo + int((j - blo) * scale)
+            best_ratio, best_i = SIMILAR_START, -1
+            for i in range(
+                max(alo, center - ANCHOR_WINDOW), min(ahi, center + ANCHOR_WINDOW + 1)
+            ):
+                ratio = sim.ratio_above(i, j, best_ratio)
+                if ratio is not None:
+                    best_ratio, best_i = ratio, i
+            if best_ratio >= SIMILAR_CUTOFF:
+                candidates.append((best_i, j))
+
+        # 最长递增子序列（patience sorting）：tails[k] 为长度 k+1 的序列末尾的候选
+        tails: List[int] = []
+        tail_rows: List[int] = []
+        previous = [-1] * len(candidates)
+        for n, (i, _) in enumerate(candidates):
+            k = bisect_left(tail_rows, i)
+            if k:
+                previous[n] = tails[k - 1]
+            if k == len(tails):
+                tails.append(n)
+                tail_rows.append(i)
+            else:
+                tails[k] = n
+                tail_rows[k] = i
+        anchors: List[Tuple[int, int]] = []
+        n = tails[-1] if tails else -1
+        while n >= 0:
+            anchors.append(candidates[n])
+            n = previous[n]
+        anchors.reverse()
+        return anchors
+
+    def _pair(self, sim: _PairSimilarity, i: int, j: int) -> Iterator[str]:
+        """输出一对相同或相似的行"""
+        if sim.a[i] == sim.b[j]:
+            yield f"  {sim.a[i]}"
+            return
+        a_changed, b_changed = sim.has_changes(i, j)
+        yield f"- {sim.a[i]}"
+        if a_changed:
+            yield "? ^\n"
+        yield f"+ {sim.b[j]}"
+        if b_changed:
+            yield "? ^\n"
+
+    def _fancy_replace(
+        self, sim: _PairSimilarity, alo: int, ahi: int, blo: int, bhi: int
+    ) -> Iterator[str]:
+        """在替换块中寻找最相似的行对作为同步点，递归处理两侧（与 ndiff 相同）"""
+        a, b = sim.a, sim.b
+        best_ratio = SIMILAR_START
+        best_i = best_j = -1
+        eqi = eqj = None
+
+        for j in range(blo, bhi):
+            for i in range(alo, ahi):
+                if a[i] == b[j]:
+                    if eqi is None:
+                        eqi, eqj = i, j
+                    continue
+                ratio = sim.ratio_above(i, j, best_ratio)
+                if ratio is not None:
+                    best_ratio, best_i, best_j = ratio, i, j
+
+        if best_ratio < SIMILAR_CUTOFF:
+            if eqi is None or eqj is None:
+                # 没有相似行，也没有相同行，直接整体替换（较短的一侧先输出）
+                if bhi - blo < ahi - alo:
+                    yield from self._dump("+", b, blo, bhi)
+                    yield from self._dump("-", a, alo, ahi)
+                else:
+                    yield from self._dump("-", a, alo, ahi)
+                    yield from self._dump("+", b, blo, bhi)
+                return
+            best_i, best_j = eqi, eqj
+
+        yield from self._helper(sim, alo, best_i, blo, best_j)
+        yield from self._pair(sim, best_i, best_j)
+        yield from self._helper(sim, best_i + 1, ahi, best_j + 1, bhi)
+
+    def _helper(
+        self, sim: _PairSimilarity, alo: int, ahi: int, blo: int, bhi: int
+    ) -> Iterator[str]:
+        if alo < ahi:
+            if blo < bhi:
+                yield from self._replace(sim, alo, ahi, blo, bhi)
+            else:
+                yield from self._dump("-", sim.a, alo, ahi)
+        elif blo < bhi:
+            yield from self._dump("+", sim.b, blo, bhi)
 
 
 class SubtitleAligner:
@@ -22,6 +251,7 @@ class SubtitleAligner:
     def __init__(self):
         self.line_numbers = [0, 0]
 
+    @tracing.traced("align.lines")
     def align_texts(self, source_text, target_text):
         """
         Align two texts and return the paired lines.
@@ -33,6 +263,13 @@ class SubtitleAligner:
         Returns:
             tuple: Two lists containing aligned lines from source and target texts.
         """
+        diff_iterator = LineDiffer().compare(source_text, target_text)
+        return self._pair_lines(diff_iterator)
+
+    def _align_texts_ndiff(self, source_text, target_text):
+        """
+        Reference implementation based on difflib.ndiff (kept for benchmarks).
+        """
         diff_iterator = difflib.ndiff(source_text, target_text)
         return self._pair_lines(diff_iterator)
 
@@ -0,0 +1,126 @@
+import zlib
+from typing import Dict, List, Tuple
+
+
+def _line_hash(text: str) -> int:
+    """计算单行字幕的稳定哈希（与进程无关，保证多次运行切分一致）"""
+    return zlib.crc32(" ".join(text.split()).encode("utf-8"))
+
+
+def content_defined_bounds(
+    texts: List[str], batch_num: int
+) -> List[Tuple[int, int]]:
+    """
+    基于内容的分块：由字幕内容决定分块边界，而不是固定的条数
+
+    当前块不少于 batch_num // 2 行后，若某一行的哈希满足
+    hash % (batch_num - batch_num // 2) == 0，则在该行之后切分（平均块长约为 batch_num）；
+    块达到 batch_num * 3 行时强制切分。
+    修改某一行只会影响它所在的块（以及它恰好是边界行时相邻的块），
+    其后的块边界保持不变，可以继续命中缓存。
+
+    Args:
+        texts: 字幕文本列表
+        batch_num: 平均每块的字幕条数
+
+    Returns:
+        每个分块在列表中的区间 [start, end)
+    """
+    batch_num = max(1, batch_num)
+    min_size = max(1, batch_num // 2)
+    divisor = max(1, batch_num - min_size)
+    max_size = batch_num * 3
+
+    bounds = []
+    start = 0
+    for i, text in enumerate(texts):
+        size = i - start + 1
+        if size >= max_size or (
+            size >= min_size and _line_hash(text) % divisor == 0
+        ):
+            bounds.append((start, i + 1))
+            start = i + 1
+    if start < len(texts):
+        bounds.append((start, len(texts)))
+    return bounds
+
+
+def content_defined_windows(
+    texts: List[str], window_chars: int, divisor: int = 4
+) -> List[Tuple[int, int]]:
+    """
+    按字符数的内容分块：用于将长文本分成约 window_chars 字符的窗口
+
+    当前窗口不少于 window_chars * 3 // 4 个字符后，在哈希满足
+    hash % divisor == 0 的文本之后切分；加入下一段会超过 window_chars * 3 // 2
+    个字符时强制切分。与 content_defined_bounds 一样，修改某段文本只会影响它附近的窗口。
+
+    Args:
+        texts: 文本片段列表（如字幕行或句子）
+        window_chars: 每个窗口的目标字符数
+        divisor: 满足最小长度后平均再经过多少段切分
+
+    Returns:
+        每个窗口在列表中的区间 [start, end)
+    """
+    min_chars = max(1, window_chars * 3 // 4)
+    max_chars = max(min_chars, window_chars * 3 // 2)
+    divisor = max(1, divisor)
+
+    bounds = []
+    start = 0
+    size = 0
+    for i, text in enumerate(texts):
+        if i > start and size + len(text) > max_chars:
+            bounds.append((start, i))
+            start = i
+            size = 0
+        size += len(text)
+        if size >= min_chars and _line_hash(text) % divisor == 0:
+            bounds.append((start, i + 1))
+            start = i + 1
+            size = 0
+    if start < len(texts):
+        bounds.append((start, len(texts)))
+    return bounds
+
+
+def to_relative_keys(chunk: Dict[str, str]) -> Tuple[Dict[str, str], int]:
+    """
+    将分块的字幕编号改为从1开始的相对编号，使缓存键与分块所在位置无关
+
+    Args:
+        chunk: 以绝对编号为键的字幕块
+
+    Returns:
+        (以相对编号为键的字幕块, 编号偏移量)
+    """
+    offset = int(next(iter(chunk))) - 1 if chunk else 0
+    relative = {str(i): text for i, text in enumerate(chunk.values(), 1)}
+    return relative, offset
+
+
+def to_absolute_keys(chunk: Dict[str, str], offset: int) -> Dict[str, str]:
+    """
+    将相对编号的结果映射回绝对编号
+
+    Args:
+        chunk: 以相对编号为键的结果
+        offset: 编号偏移量
+
+    Returns:
+        以绝对编号为键的结果
+    """
+    return {str(int(key) + offset): text for key, text in chunk.items()}
+
+
+if __name__ == "__main__":
+    import random
+
+    random.seed(0)
+    lines = [f"line {random.random():.6f}" for _ in range(200)]
+    before = {tuple(lines[s:e]) for s, e in content_defined_bounds(lines, 10)}
+    lines.insert(50, "inserted line")
+    after = [tuple(lines[s:e]) for s, e in content_defined_bounds(lines, 10)]
+    changed = [chunk for chunk in after if chunk not in before]
+    print(f"分块数: {len(after)}, 需要重新处理的分块数: {len(changed)}")
@@ -0,0 +1,176 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.utils.logger import setup_logger
+
+logger = setup_logger("line_batch")
+
+# 多行合并翻译时的行分隔符（机器翻译会保留换行）
+LINE_DELIMITER = "\n"
+# 至少这么多行的请求只返回一行时，认为翻译服务不保留换行，之后改为逐行请求
+MIN_LINES_TO_DETECT_JOIN = 3
+
+
+def new_line_state() -> Dict[str, bool]:
+    """多次 translate_lines 调用间共享的状态（翻译服务是否保留换行）"""
+    return {"multiline": True}
+
+
+def truncate_to(text: str, max_chars: int, measure: Callable[[str], int] = len) -> str:
+    """
+    截断超过长度限制的文本（单行超长时请求会直接失败）
+
+    Args:
+        text: 文本
+        max_chars: 最大长度
+        measure: 计算长度的函数
+
+    Returns:
+        str: 长度不超过 max_chars 的最长前缀
+    """
+    if measure(text) <= max_chars:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if measure(text[:middle]) <= max_chars:
+            low = middle
+        else:
+            high = middle - 1
+    logger.warning(f"文本超过长度限制 {max_chars}，已截断: {text[:30]}...")
+    return text[:low]
+
+
+def pack_lines(
+    texts: List[str],
+    max_chars: int,
+    max_lines: int = 0,
+    measure: Callable[[str], int] = len,
+) -> List[Tuple[int, int]]:
+    """
+    将多行文本按顺序打包，每包合并后的长度不超过 max_chars
+
+    Args:
+        texts: 文本列表（不含换行）
+        max_chars: 每包合并后（含分隔符）的最大长度
+        max_lines: 每包的最大行数，0 表示不限制
+        measure: 计算长度的函数（例如按URL编码后的长度计算）
+
+    Returns:
+        每包在列表中的区间 [start, end)，单行超长时单独成包
+    """
+    bounds = []
+    start = 0
+    size = 0
+    delimiter_size = measure(LINE_DELIMITER)
+    for i, text in enumerate(texts):
+        text_size = measure(text)
+        added = text_size if i == start else size + delimiter_size + text_size
+        full = max_lines and i - start >= max_lines
+        if i > start and (added > max_chars or full):
+            bounds.append((start, i))
+            start = i
+            size = text_size
+        else:
+            size = added
+    if start < len(texts):
+        bounds.append((start, len(texts)))
+    return bounds
+
+
+def translate_lines(
+    texts: List[str],
+    translate_text: Callable[[str], str],
+    max_chars: int,
+    max_lines: int = 0,
+    measure: Callable[[str], int] = len,
+    state: Optional[Dict[str, bool]] = None,
+) -> List[Optional[str]]:
+    """
+    多行合并请求翻译：用换行连接多行文本一次翻译，再按换行拆分回各行
+
+    译文行数与原文不一致时（翻译服务合并或拆分了行），将该包二分后分别重试，
+    直到单行请求为止。合并请求失败时逐行重试（只有失败的行为 None）；
+    多行请求只返回一行时（翻译服务不保留换行），该包及之后的请求都逐行翻译。
+
+    Args:
+        texts: 待翻译的文本列表
+        translate_text: 翻译一段文本的函数
+        max_chars: 每次请求的最大长度，超长的单行会被截断
+        max_lines: 每次请求的最大行数，0 表示不限制
+        measure: 计算长度的函数
+        state: 多次调用间共享的状态（new_line_state()），为None时只在本次调用内有效
+
+    Returns:
+        与 texts 一一对应的译文，请求失败的行为 None
+    """
+    results: List[Optional[str]] = [None] * len(texts)
+    # 空行不参与翻译（翻译服务会丢弃空行，导致行数对不上）
+    indexes = [i for i, text in enumerate(texts) if text.strip()]
+    for i, text in enumerate(texts):
+        if not text.strip():
+            results[i] = text
+    # 行内换行替换为空格，保证分隔符只出现在行之间
+    lines = [
+        truncate_to(" ".join(texts[i].split()), max_chars, measure) for i in indexes
+    ]
+    state = state if state is not None else new_line_state()
+
+    for start, end in pack_lines(lines, max_chars, max_lines, measure):
+        for offset, translated in enumerate(
+            _translate_group(lines[start:end], translate_text, state)
+        ):
+            results[indexes[start + offset]] = translated
+    return results
+
+
+def _translate_single(
+    line: str, translate_text: Callable[[str], str]
+) -> Optional[str]:
+    """翻译一行文本，请求失败时返回None"""
+    try:
+        return " ".join(translate_text(line).split())
+    except Exception as e:
+        logger.error(f"翻译请求失败: {str(e)}")
+        return None
+
+
+def _translate_group(
+    lines: List[str], translate_text: Callable[[str], str], state: Dict[str, bool]
+) -> List[Optional[str]]:
+    """翻译一包文本，行数对不上时二分重试，请求失败或翻译服务不保留换行时逐行翻译"""
+    if len(lines) == 1 or not state["multiline"]:
+        return [_translate_single(line, translate_text) for line in lines]
+    try:
+        translated = translate_text(LINE_DELIMITER.join(lines))
+    except Exception as e:
+        logger.warning(f"合并翻译请求失败（{len(lines)} 行），逐行重试: {str(e)}")
+        return [_translate_single(line, translate_text) for line in lines]
+
+    parts = [part.strip() for part in translated.strip().split(LINE_DELIMITER)]
+    parts = [part for part in parts if part]
+    if len(parts) == len(lines):
+        return parts  # type: ignore
+    if len(parts) == 1 and len(lines) >= MIN_LINES_TO_DETECT_JOIN:
+        logger.warning("翻译服务没有保留换行，改为逐行翻译")
+        state["multiline"] = False
+        return [_translate_single(line, translate_text) for line in lines]
+
+    logger.warning(f"合并翻译的行数不一致（{len(lines)} -> {len(parts)}），二分重试")
+    middle = len(lines) // 2
+    return _translate_group(lines[:middle], translate_text, state) + _translate_group(
+        lines[middle:], translate_text, state
+    )
+
+
+if __name__ == "__main__":
+    calls = []
+
+    def fake_translate(text: str) -> str:
+        """模拟翻译服务：含有 "merge" 的行会与下一行合并"""
+        calls.append(text)
+        return text.upper().replace("MERGE\n", "MERGE ")
+
+    demo = [f"line {i}" for i in range(20)]
+    demo[7] = "merge"
+    print(translate_lines(demo, fake_translate, max_chars=200))
+    print(f"请求次数: {len(calls)}")
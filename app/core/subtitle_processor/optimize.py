@@ -1,7 +1,7 @@
 import json
 import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from openai import OpenAI
 
@@ -9,8 +9,17 @@ from app.config import CACHE_PATH
 from app.core.bk_asr.asr_data import ASRData, ASRDataSeg
 from app.core.storage.cache_manager import CacheManager
 from app.core.subtitle_processor.alignment import SubtitleAligner
+from app.core.subtitle_processor.chunking import (
+    content_defined_bounds,
+    to_absolute_keys,
+    to_relative_keys,
+)
 from app.core.subtitle_processor.prompt import OPTIMIZER_PROMPT
 import json_repair
+from app.core.utils import tracing
+from app.core.utils.endpoint_health import endpoint_health
+from app.core.utils.hedging import get_hedge_client, hedged_call
+from app.core.utils.llm_usage import LLMUsageTracker, create_completion
 from app.core.utils.logger import setup_logger
 
 logger = setup_logger("subtitle_optimizer")
@@ -29,8 +38,15 @@ class SubtitleOptimizer:
         timeout: int = 60,
         retry_times: int = 1,
         update_callback: Optional[Callable] = None,
+        incremental: bool = False,
+        hedge: bool = False,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        hedge_base_url: Optional[str] = None,
+        hedge_api_key: Optional[str] = None,
+        hedge_model: Optional[str] = None,
     ):
-        self._init_client()
+        self._init_client(base_url, api_key)
         self.thread_num = thread_num
         self.batch_num = batch_num
         self.model = model
@@ -40,16 +56,28 @@ class SubtitleOptimizer:
         self.retry_times = retry_times
         self.is_running = True
         self.update_callback = update_callback
+        self.incremental = incremental
+        # 对冲请求：请求耗时超过p95时再发出一个请求（有备用服务时发往备用服务）
+        self.hedge = hedge
+        self.hedge_client = (
+            get_hedge_client(hedge_base_url, hedge_api_key, hedge_model)
+            if hedge
+            else None
+        )
+        self.usage_tracker = LLMUsageTracker("优化")
+        # 上次优化中失败（保留原文）的字幕数，有失败时结果不写入阶段缓存
+        self.failed_count = 0
         self._init_thread_pool()
         self.cache_manager = CacheManager(str(CACHE_PATH))
 
-    def _init_client(self):
-        """初始化OpenAI客户端"""
-        base_url = os.getenv("OPENAI_BASE_URL")
-        api_key = os.getenv("OPENAI_API_KEY")
+    def _init_client(self, base_url: Optional[str], api_key: Optional[str]):
+        """初始化OpenAI客户端（未传入时读取环境变量 OPENAI_BASE_URL 等）"""
+        base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not (base_url and api_key):
             raise ValueError("环境变量 OPENAI_BASE_URL 和 OPENAI_API_KEY 必须设置")
 
+        self.base_url = base_url
         self.client = OpenAI(base_url=base_url, api_key=api_key)
 
     def _init_thread_pool(self):
@@ -77,7 +105,11 @@ class SubtitleOptimizer:
             chunks = self._split_chunks(subtitle_dict)
 
             # 多线程优化
+            self.usage_tracker = LLMUsageTracker("优化")
             optimized_dict = self._parallel_optimize(chunks)
+            summary = self.usage_tracker.summary()
+            if summary:
+                logger.info(summary)
 
             # 创建新的ASRDataSeg列表
             new_segments = self._create_segments(asr_data.segments, optimized_dict)
@@ -88,8 +120,12 @@ class SubtitleOptimizer:
             raise RuntimeError(f"优化失败：{str(e)}")
 
     def _split_chunks(self, subtitle_dict: Dict[str, str]) -> List[Dict[str, str]]:
-        """将字幕分割成块"""
+        """将字幕分割成块（增量模式下按内容确定分块边界）"""
         items = list(subtitle_dict.items())
+        if self.incremental:
+            texts = list(subtitle_dict.values())
+            bounds = content_defined_bounds(texts, self.batch_num)
+            return [dict(items[start:end]) for start, end in bounds]
         return [
             dict(items[i : i + self.batch_num])
             for i in range(0, len(items), self.batch_num)
@@ -97,14 +133,17 @@ class SubtitleOptimizer:
 
     def _parallel_optimize(self, chunks: List[Dict[str, str]]) -> Dict[str, str]:
         """并行优化所有块"""
-        futures = []
+        futures = {}
         optimized_dict = {}
+        self.failed_count = 0
 
         for chunk in chunks:
             if not self.executor:
                 raise ValueError("线程池未初始化")
-            future = self.executor.submit(self._safe_optimize_chunk, chunk)
-            futures.append(future)
+            future = self.executor.submit(
+                tracing.propagate(self._safe_optimize_chunk), chunk
+            )
+            futures[future] = chunk
 
         for future in as_completed(futures):
             if not self.is_running:
@@ -116,16 +155,28 @@ class SubtitleOptimizer:
             except Exception as e:
                 logger.error(f"优化块失败：{str(e)}")
                 # 对于失败的块，保留原文
-                for k, v in chunk.items():
+                self.failed_count += len(futures[future])
+                for k, v in futures[future].items():
                     optimized_dict[k] = v
 
         return optimized_dict
 
+    @tracing.traced("optimize.chunk")
     def _safe_optimize_chunk(self, chunk: Dict[str, str]) -> Dict[str, str]:
         """安全的优化块，包含重试逻辑"""
         for i in range(self.retry_times):
             try:
-                return self._optimize_chunk(chunk)
+                if self.incremental:
+                    # 使用相对编号，使缓存键只与分块内容有关
+                    relative_chunk, offset = to_relative_keys(chunk)
+                    result = to_absolute_keys(
+                        self._optimize_chunk(relative_chunk), offset
+                    )
+                else:
+                    result = self._optimize_chunk(chunk)
+                if self.update_callback:
+                    self.update_callback(result)
+                return result
             except Exception as e:
                 if i == self.retry_times - 1:
                     raise
@@ -137,11 +188,13 @@ class SubtitleOptimizer:
         logger.info(
             f"[+]正在优化字幕：{next(iter(subtitle_chunk))} - {next(reversed(subtitle_chunk))}"
         )
-        user_prompt = f"Correct the following subtitles. Keep the original language, do not translate:\n<input_subtitle>{str(subtitle_chunk)}</input_subtitle>"
+        # 参考信息放在字幕内容之前，使所有请求共享相同的前缀，便于提示词缓存命中
+        user_prompt = ""
         if self.custom_prompt:
             user_prompt += (
-                f"\nReference content:\n<prompt>{self.custom_prompt}</prompt>"
+                f"Reference content:\n<prompt>{self.custom_prompt}</prompt>\n"
             )
+        user_prompt += f"Correct the following subtitles. Keep the original language, do not translate:\n<input_subtitle>{str(subtitle_chunk)}</input_subtitle>"
 
         # 检查缓存
         cache_params = {
@@ -168,12 +221,8 @@ class SubtitleOptimizer:
         ]
 
         # 调用API优化
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,  # type: ignore
-            temperature=self.temperature,
-            timeout=self.timeout,
-        )
+        response = self._create_completion(messages)
+        self.usage_tracker.record(response)
 
         # 解析结果
         result: Dict[str, str] = json_repair.loads(response.choices[0].message.content)  # type: ignore
@@ -189,11 +238,36 @@ class SubtitleOptimizer:
             **cache_params,
         )
 
-        if self.update_callback:
-            self.update_callback(aligned_result)
-
         return aligned_result
 
+    def _create_completion(self, messages: List[Dict[str, str]]) -> Any:
+        """调用API（开启对冲时，慢请求会再发出一个对冲请求）"""
+
+        def request(client: OpenAI = self.client, model: str = self.model) -> Any:
+            try:
+                return create_completion(
+                    client,
+                    model=model,
+                    messages=messages,  # type: ignore
+                    temperature=self.temperature,
+                    timeout=self.timeout,
+                )
+            except Exception as e:
+                endpoint_health.report_error(client.base_url, client.api_key, model, e)
+                raise
+
+        if not self.hedge:
+            return request()
+        if self.hedge_client:
+            client, base_url, model = self.hedge_client
+            return hedged_call(
+                (self.base_url, self.model),
+                request,
+                (base_url, model),
+                lambda: request(client, model),
+            )
+        return hedged_call((self.base_url, self.model), request)
+
     @staticmethod
     def _repair_subtitle(
         original: Dict[str, str], optimized: Dict[str, str]
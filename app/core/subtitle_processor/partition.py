@@ -0,0 +1,180 @@
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from app.core.bk_asr.asr_data import ASRDataSeg
+from app.core.utils.text_metrics import get_text_metrics
+
+# token 估算系数
+CJK_TOKENS_PER_CHAR = 1.0  # 中日韩等单字文字每个字符的token数
+TOKENS_PER_WORD = 1.3  # 其余文字每个单词的token数
+
+MAX_CHUNK_TOKENS = 650  # 每个分块的最大token数（约500个英文单词）
+MIN_CHUNK_TOKENS = 200  # 为了凑满线程而拆分时，每个分块的最小token数
+CUT_TOLERANCE = 0.15  # 切分点允许偏离理想位置的范围（占平均分块大小的比例）
+
+
+@dataclass
+class Partition:
+    """
+    分块结果
+
+    Attributes:
+        bounds: 每个分块在分段列表中的区间 [start, end)
+        chunk_tokens: 每个分块的估算token数
+        makespan: 按提交顺序分配给线程池时，预计最晚完成的线程的token数
+    """
+
+    bounds: List[Tuple[int, int]] = field(default_factory=list)
+    chunk_tokens: List[float] = field(default_factory=list)
+    makespan: float = 0.0
+
+    @property
+    def total_tokens(self) -> float:
+        return sum(self.chunk_tokens)
+
+
+def estimate_tokens(text: str) -> float:
+    """
+    估算文本的token数
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        float: 估算的token数
+    """
+    metrics = get_text_metrics(text)
+    other_words = max(metrics.word_count - metrics.cjk_count, 0)
+    return metrics.cjk_count * CJK_TOKENS_PER_CHAR + other_words * TOKENS_PER_WORD
+
+
+def estimate_makespan(costs: List[float], thread_num: int) -> float:
+    """
+    估算按顺序提交到线程池后的总耗时（以最忙线程的负载计）
+
+    Args:
+        costs: 每个任务的代价
+        thread_num: 线程数
+
+    Returns:
+        float: 最忙线程的总代价
+    """
+    workers = [0.0] * max(1, thread_num)
+    for cost in costs:
+        heapq.heapreplace(workers, workers[0] + cost)
+    return max(workers)
+
+
+def determine_chunk_count(
+    total_tokens: float,
+    thread_num: int,
+    max_chunk_tokens: float = MAX_CHUNK_TOKENS,
+    min_chunk_tokens: float = MIN_CHUNK_TOKENS,
+) -> int:
+    """
+    根据总token数和线程数确定分块数
+
+    分块数取线程数的整数倍，使各线程的任务量一致；
+    在分块不小于 min_chunk_tokens 的前提下尽量用满所有线程
+
+    Args:
+        total_tokens: 总token数
+        thread_num: 线程数
+        max_chunk_tokens: 每个分块的最大token数
+        min_chunk_tokens: 每个分块的最小token数
+
+    Returns:
+        int: 分块数
+    """
+    thread_num = max(1, thread_num)
+    needed = max(1, math.ceil(total_tokens / max_chunk_tokens))
+    rounds = math.ceil(needed / thread_num)
+    count = rounds * thread_num
+    # 分块过小时减少分块数，但不少于必需的分块数
+    max_count = max(needed, int(total_tokens // min_chunk_tokens))
+    return max(1, min(count, max_count))
+
+
+def partition_segments(
+    segments: List[ASRDataSeg],
+    thread_num: int,
+    max_chunk_tokens: float = MAX_CHUNK_TOKENS,
+) -> Partition:
+    """
+    将分段列表切分为代价（估算token数）均衡的分块
+
+    1. 计算每个分段token数的前缀和，确定分块数，每个切分点的理想位置为剩余部分的均分点
+    2. 在理想位置附近的容差范围内，选择时间间隔最大的位置作为切分点
+
+    Args:
+        segments: 分段列表
+        thread_num: 处理分块的线程数
+        max_chunk_tokens: 每个分块的最大token数
+
+    Returns:
+        Partition: 分块结果
+    """
+    n = len(segments)
+    if n == 0:
+        return Partition()
+
+    prefix = [0.0] * (n + 1)
+    for i, seg in enumerate(segments):
+        prefix[i + 1] = prefix[i] + estimate_tokens(seg.text)
+    total = prefix[n]
+
+    count = min(determine_chunk_count(total, thread_num, max_chunk_tokens), n)
+    average = total / count
+    tolerance = average * CUT_TOLERANCE
+
+    # cut 表示在第 cut 个分段之前切分，取值范围 (上一个切分点, n)
+    cuts = []
+    prev_cut = 0
+    for k in range(1, count):
+        # 根据已切分的位置重新均分剩余部分，避免误差累积
+        target = prefix[prev_cut] + (total - prefix[prev_cut]) / (count - k + 1)
+        lo = max(bisect_left(prefix, target - tolerance), prev_cut + 1)
+        hi = min(bisect_right(prefix, target + tolerance), n - 1)
+        if lo > hi:
+            # 容差范围内没有可选位置，取最接近理想位置的切分点
+            lo = hi = min(max(bisect_left(prefix, target), prev_cut + 1), n - 1)
+        if lo <= prev_cut or lo >= n:
+            continue
+        # 间隔相同时取最接近理想位置的切分点
+        best_cut = max(
+            range(lo, hi + 1),
+            key=lambda c: (
+                segments[c].start_time - segments[c - 1].end_time,
+                -abs(prefix[c] - target),
+            ),
+        )
+        cuts.append(best_cut)
+        prev_cut = best_cut
+
+    bounds = list(zip([0] + cuts, cuts + [n]))
+    chunk_tokens = [prefix[end] - prefix[start] for start, end in bounds]
+    return Partition(
+        bounds=bounds,
+        chunk_tokens=chunk_tokens,
+        makespan=estimate_makespan(chunk_tokens, thread_num),
+    )
+
+
+if __name__ == "__main__":
+    import random
+
+    random.seed(0)
+    demo = []
+    t = 0
+    for _ in range(6000):
+        gap = random.choice([20, 40, 60, 600])
+        demo.append(ASRDataSeg("word ", t + gap, t + gap + 200))
+        t += gap + 200
+
+    result = partition_segments(demo, thread_num=5)
+    print(f"分块数: {len(result.bounds)}")
+    print(f"各分块token数: {[round(c) for c in result.chunk_tokens]}")
+    print(f"预计makespan: {result.makespan:.0f} tokens")
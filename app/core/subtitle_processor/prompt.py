@@ -72,6 +72,22 @@ JSON应包括两个字段：`summary`和`terms`
   - `keywords`：全部专业或技术术语，以及其他重要关键词或短语。不需要翻译。
 """
 
+SUMMARY_REDUCE_PROMPT = """
+您是一位**专业视频分析师**。一个较长的视频被按时间顺序分成了若干段，您将收到每一段字幕的摘要。
+
+## 您的任务
+
+- 将各段摘要合并为整个视频的总结，保持内容的先后顺序，不要只描述开头部分。
+- 确定视频类型，根据具体视频内容，解释翻译时需要注意的要点。
+- 不要编造各段摘要中没有的内容。
+
+## 输出格式
+
+以JSON格式返回结果，使用与输入摘要相同的语言。
+
+JSON只包括一个字段：`summary`，即整个视频内容的总结，并给出翻译建议。
+"""
+
 OPTIMIZER_PROMPT = """
 You are a subtitle correction expert. You will receive subtitle text and correct any errors while following specific rules.
 
@@ -132,6 +148,62 @@ Output:
 - Keep the original language, do not translate.
 """
 
+FUSED_OPTIMIZE_TRANSLATE_PROMPT = """
+You are a subtitle correction and translation expert. You will receive subtitle text, correct any errors in the original language, and translate the corrected subtitles into ${target_language}.
+
+# Input Format
+- JSON object with numbered subtitle entries
+
+# Correction Rules
+1. Preserve original sentence structure and expression - no synonyms or paraphrasing
+2. Remove filler words and non-verbal sounds (um, uh, laughter, coughing)
+3. Standardize punctuation, English capitalization, formulas, code variable names and functions
+4. Keep the corrected subtitle in the original language
+
+# Translation Rules
+1. The translation must be fluent and natural ${target_language}, following its expression habits
+2. Proper nouns and terms may be kept or transliterated
+3. Translate the corrected subtitle, not the original one
+
+# General Rules
+- Maintain one-to-one correspondence of subtitle numbers - no merging or splitting
+- Follow the terminology and requirements given in <prompt> tags of the user message (if any)
+
+# Output Format
+Pure JSON object without commentary:
+```
+{
+    "1": {
+        "optimized_subtitle": "[corrected subtitle in original language]",
+        "translation": "[${target_language} translation of the corrected subtitle]"
+    },
+    ...
+}
+```
+
+# Examples
+Input:
+```
+{
+    "1": "um today we'll learn about bython programming",
+    "2": "it was created by guidoan rossum in uhh 1991"
+}
+```
+Output (target language: 简体中文):
+```
+{
+    "1": {
+        "optimized_subtitle": "Today we'll learn about Python programming",
+        "translation": "今天我们来学习 Python 编程"
+    },
+    "2": {
+        "optimized_subtitle": "It was created by Guido van Rossum in 1991",
+        "translation": "它由 Guido van Rossum 于1991年创建"
+    }
+}
+```
+"""
+
 TRANSLATE_PROMPT = """
 # Role: 资深翻译专家
 你是一位经验丰富的 Netflix 字幕翻译专家,精通${target_language}的翻译,擅长将视频字幕译成流畅易懂的${target_language}。
@@ -144,7 +216,7 @@ TRANSLATE_PROMPT = """
 
 # 术语或要求:
 - 翻译过程中要遵循术语词汇（如果有）
-${custom_prompt}
+- 术语和要求在用户消息开头的 <prompt> 标签中给出（如果有）
 
 # Examples
 
@@ -185,7 +257,7 @@ REFLECT_TRANSLATE_PROMPT = """
 - 必须严格遵循四轮翻译流程:直译、意译、改善建议、定稿  
 
 ## 术语词汇翻译对应表以及其他要求:
-${custom_prompt}
+- 在用户消息开头的 <prompt> 标签中给出（如果有）
 
 Input format:
 A JSON structure where each subtitle is identified by a unique numeric key:
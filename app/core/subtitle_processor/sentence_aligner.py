@@ -0,0 +1,187 @@
+from bisect import bisect_right
+from collections import Counter
+from typing import List, Optional, Tuple
+
+ANCHOR_SIZE = 4  # 锚点（精确匹配的字符片段）长度
+MIN_BAND = 4  # 带状编辑距离的最小带宽
+
+
+def normalize_text(text: str) -> str:
+    """
+    规范化文本用于对齐：转为小写，仅保留字母和数字（含CJK字符）
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        str: 规范化后的字符串
+    """
+    return "".join(c for c in text.lower() if c.isalnum())
+
+
+class SentenceAligner:
+    """
+    句子-分段对齐器，将LLM返回的句子映射回ASR分段的索引区间。
+
+    初始化时将所有分段规范化并拼接为一条字符流，同时记录每个字符所属的分段。
+    对每个句子：
+    1. 先在滑动范围内做精确查找（锚点匹配整句）
+    2. 失败时用若干短锚点投票估计对齐的对角线位置
+    3. 在该对角线附近做带状编辑距离（semi-global），求出最佳起止位置
+    最后将字符偏移映射回分段索引。每个句子的代价只与句子长度和带宽相关，
+    整体耗时与文本长度近似线性。
+
+    使用示例:
+        aligner = SentenceAligner(["hello ", "world ", "foo ", "bar "])
+        aligner.match("Hello world", 0, max_shift=30)  # -> (0, 1, 1.0)
+    """
+
+    def __init__(self, texts: List[str]):
+        chars = []
+        seg_offsets = []
+        for text in texts:
+            seg_offsets.append(len(chars))
+            chars.extend(normalize_text(text))
+        seg_offsets.append(len(chars))
+
+        self.stream = "".join(chars)
+        self.seg_offsets = seg_offsets  # 第i个分段在字符流中的起始偏移
+        self.seg_count = len(texts)
+
+    def _seg_of_char(self, pos: int) -> int:
+        """返回字符偏移所在的分段索引（跳过规范化后为空的分段）"""
+        return bisect_right(self.seg_offsets, pos, 0, self.seg_count) - 1
+
+    def match(
+        self, sentence: str, seg_index: int, max_shift: int = 30
+    ) -> Optional[Tuple[int, int, float]]:
+        """
+        从 seg_index 开始匹配一个句子
+
+        Args:
+            sentence: 待匹配的句子
+            seg_index: 当前未处理分段的索引
+            max_shift: 匹配起点允许向后偏移的最大分段数
+
+        Returns:
+            (起始分段索引, 结束分段索引(含), 相似度)，无法匹配时返回None
+        """
+        if seg_index >= self.seg_count:
+            return None
+        pattern = normalize_text(sentence)
+        m = len(pattern)
+        if m == 0:
+            return None
+
+        base = self.seg_offsets[seg_index]
+        shift_end = self.seg_offsets[min(seg_index + max_shift, self.seg_count)]
+        shift = shift_end - base
+        window = self.stream[base : min(len(self.stream), shift_end + 2 * m)]
+        if not window:
+            return None
+
+        # 1. 整句精确匹配
+        pos = window.find(pattern, 0, shift + m)
+        if pos != -1:
+            start, end, ratio = pos, pos + m, 1.0
+        else:
+            # 2. 锚点投票估计对角线，3. 带状编辑距离
+            diag, band = self._estimate_diagonal(pattern, window, shift)
+            aligned = self._banded_align(pattern, window, diag, band)
+            if aligned is None:
+                return None
+            dist, start, end = aligned
+            if end <= start:
+                return None
+            ratio = max(0.0, 1 - dist / max(m, end - start))
+
+        start_seg = seg_index if start == 0 else self._seg_of_char(base + start)
+        end_seg = self._seg_of_char(base + end - 1)
+        return start_seg, end_seg, ratio
+
+    @staticmethod
+    def _estimate_diagonal(pattern: str, window: str, shift: int) -> Tuple[int, int]:
+        """
+        用不重叠的短锚点在窗口中查找出现位置，投票得出句子起点的对角线
+
+        Returns:
+            (对角线偏移, 带宽)
+        """
+        m = len(pattern)
+        size = min(ANCHOR_SIZE, m)
+        limit = shift + m
+        votes: Counter = Counter()
+        for offset in range(0, m - size + 1, size):
+            anchor = pattern[offset : offset + size]
+            found = window.find(anchor, 0, limit)
+            if found != -1:
+                votes[max(0, found - offset)] += 1
+
+        if votes:
+            diag = votes.most_common(1)[0][0]
+            band = max(MIN_BAND, m // 4)
+        else:
+            # 没有任何锚点命中，在整个偏移范围内搜索（带宽受句长限制）
+            band = min(shift // 2 + m // 2, 2 * m) + MIN_BAND
+            diag = min(shift // 2, band)
+        return diag, band
+
+    @staticmethod
+    def _banded_align(
+        pattern: str, text: str, diag: int, band: int
+    ) -> Optional[Tuple[int, int, int]]:
+        """
+        带状semi-global编辑距离：pattern需完整对齐，text中的起止位置自由
+
+        仅计算满足 |j - i - diag| <= band 的单元格，复杂度 O(len(pattern) * band)
+
+        Returns:
+            (编辑距离, text中的起始位置, text中的结束位置)，带超出text范围时返回None
+        """
+        m, w = len(pattern), len(text)
+        inf = m + w + 1
+
+        prev_lo = max(0, diag - band)
+        prev_hi = min(w, diag + band)
+        if prev_lo > prev_hi:
+            return None
+        prev_cost = [0] * (prev_hi - prev_lo + 1)
+        prev_start = list(range(prev_lo, prev_hi + 1))
+
+        for i in range(1, m + 1):
+            lo = max(0, diag + i - band)
+            hi = min(w, diag + i + band)
+            if lo > hi:
+                return None
+            cost = [inf] * (hi - lo + 1)
+            start = [0] * (hi - lo + 1)
+            pc = pattern[i - 1]
+            for j in range(lo, hi + 1):
+                k = j - lo
+                best, best_start = inf, 0
+                # 对角线：匹配或替换
+                pk = j - 1 - prev_lo
+                if j > 0 and 0 <= pk <= prev_hi - prev_lo:
+                    best = prev_cost[pk] + (pc != text[j - 1])
+                    best_start = prev_start[pk]
+                # 句子字符缺失
+                pk = j - prev_lo
+                if 0 <= pk <= prev_hi - prev_lo and prev_cost[pk] + 1 < best:
+                    best = prev_cost[pk] + 1
+                    best_start = prev_start[pk]
+                # 文本多出字符
+                if k > 0 and cost[k - 1] + 1 < best:
+                    best = cost[k - 1] + 1
+                    best_start = start[k - 1]
+                cost[k] = best
+                start[k] = best_start
+            prev_lo, prev_hi, prev_cost, prev_start = lo, hi, cost, start
+
+        best_k = min(
+            range(len(prev_cost)),
+            key=lambda k: (
+                prev_cost[k],
+                abs(prev_lo + k - prev_start[k] - m),
+            ),
+        )
+        return prev_cost[best_k], prev_start[best_k], prev_lo + best_k
@@ -1,21 +1,37 @@
-import difflib
 import json
 import os
 import re
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from string import Template
-from typing import List, Union
+from typing import List, Optional, Sequence, Union
 
 from openai import OpenAI
 
 from app.config import CACHE_PATH
 from app.core.bk_asr.asr_data import ASRData, ASRDataSeg
 from app.core.storage.cache_manager import CacheManager
+from app.core.subtitle_processor.partition import partition_segments
 from app.core.subtitle_processor.prompt import (
     SPLIT_PROMPT_SEMANTIC,
     SPLIT_PROMPT_SENTENCE,
 )
+from app.core.subtitle_processor.sentence_aligner import SentenceAligner
+from app.core.subtitle_processor.split_by_dp import (
+    PREFIX_SPLIT_WORDS,
+    SUFFIX_SPLIT_WORDS,
+    split_by_dp,
+)
+from app.core.utils import tracing
+from app.core.utils.endpoint_health import endpoint_health
+from app.core.utils.llm_usage import LLMUsageTracker, create_completion
 from app.core.utils.logger import setup_logger
+from app.core.utils.text_metrics import (
+    count_words,
+    get_text_metrics,
+    is_mainly_cjk,
+    word_run_edges,
+)
 
 logger = setup_logger("subtitle_splitter")
 
@@ -28,117 +44,56 @@ SEGMENT_THRESHOLD = 300  # 每个分段的最大字数
 MAX_GAP = 1500  # 允许每个词语之间的最大时间间隔（毫秒）
 
 
-def is_pure_punctuation(text: str) -> bool:
+class _RangeExtremes:
     """
-    检查字符串是否仅由标点符号组成
-
-    Args:
-        text: 待检查的文本
-
-    Returns:
-        bool: 是否仅包含标点符号
+    稀疏表：O(n log n) 预处理，O(1) 查询区间 [lo, hi) 的最大值、最小值及最大值的最左位置
     """
-    return not re.search(r"\w", text, flags=re.UNICODE)
 
+    def __init__(self, values: Sequence[float]):
+        self.values = values
+        self.argmax_table = [list(range(len(values)))]
+        self.min_table = [list(values)]
+        width = 1
+        while width * 2 <= len(values):
+            prev_argmax = self.argmax_table[-1]
+            prev_min = self.min_table[-1]
+            argmax_row = []
+            min_row = []
+            for i in range(len(values) - width * 2 + 1):
+                left, right = prev_argmax[i], prev_argmax[i + width]
+                argmax_row.append(left if values[left] >= values[right] else right)
+                min_row.append(min(prev_min[i], prev_min[i + width]))
+            self.argmax_table.append(argmax_row)
+            self.min_table.append(min_row)
+            width *= 2
+
+    def argmax(self, lo: int, hi: int) -> int:
+        """返回区间内最大值的位置（相等时取最左侧）"""
+        level = (hi - lo).bit_length() - 1
+        row = self.argmax_table[level]
+        left, right = row[lo], row[hi - (1 << level)]
+        return left if self.values[left] >= self.values[right] else right
+
+    def max_value(self, lo: int, hi: int) -> float:
+        return self.values[self.argmax(lo, hi)]
+
+    def min_value(self, lo: int, hi: int) -> float:
+        level = (hi - lo).bit_length() - 1
+        row = self.min_table[level]
+        return min(row[lo], row[hi - (1 << level)])
 
-def is_mainly_cjk(text: str) -> bool:
-    """
-    判断文本是否主要由中日韩文字组成
 
-    Args:
-        text: 输入文本
-
-    Returns:
-        bool: 如果CJK字符占比超过50%则返回True
-    """
-    # 定义以单字形式出现的语言字符范围
-    cjk_patterns = [
-        # 东亚语言
-        r"[\u4e00-\u9fff]",  # 中日韩统一表意文字
-        r"[\u3040-\u309f]",  # 日文平假名
-        r"[\u30a0-\u30ff]",  # 日文片假名
-        r"[\uac00-\ud7af]",  # 韩文音节
-        r"[\u3130-\u318f]",  # 韩文兼容字母
-        # 东南亚语言
-        r"[\u0e00-\u0e7f]",  # 泰文
-        r"[\u0e80-\u0eff]",  # 老挝文
-        r"[\u1000-\u109f]",  # 缅甸文
-        r"[\u1780-\u17ff]",  # 高棉文(柬埔寨)
-        # 南亚语言
-        r"[\u0900-\u097f]",  # 天城文(印地语等)
-        r"[\u0980-\u09ff]",  # 孟加拉语
-        r"[\u0a00-\u0a7f]",  # 古木基文(旁遮普语)
-        r"[\u0b00-\u0b7f]",  # 奥里亚文
-        r"[\u0c00-\u0c7f]",  # 泰卢固文
-        r"[\u0c80-\u0cff]",  # 卡纳达文
-        r"[\u0d00-\u0d7f]",  # 马拉雅拉姆文
-        r"[\u0d80-\u0dff]",  # 僧伽罗文(斯里兰卡)
-        # 其他
-        r"[\u1100-\u11ff]",  # 谚文字母
-        r"[\u3100-\u312f]",  # 注音符号
-    ]
-
-    # 计算CJK字符数
-    cjk_count = 0
-    for pattern in cjk_patterns:
-        cjk_count += len(re.findall(pattern, text))
-
-    # 计算总字符数（不包括空白字符）
-    total_chars = len("".join(text.split()))
-
-    # 如果CJK字符占比超过50%，则认为主要是CJK文本
-    return cjk_count / total_chars > 0.5 if total_chars > 0 else False
-
-
-def count_words(text: str) -> int:
+def is_pure_punctuation(text: str) -> bool:
     """
-    统计多语言文本中的字符/单词数
-    支持:
-    - 英文（按空格分词）
-    - CJK文字（中日韩统一表意文字）
-    - 韩文/谚文
-    - 泰文
-    - 阿拉伯文
-    - 俄文西里尔字母
-    - 希伯来文
-    - 越南文
-    每个字符都计为1个单位，英文按照空格分词计数
+    检查字符串是否仅由标点符号组成
 
     Args:
-        text: 输入文本
+        text: 待检查的文本
 
     Returns:
-        int: 字符/单词总数
+        bool: 是否仅包含标点符号
     """
-    # 定义各种语言的Unicode范围
-    patterns = [
-        r"[\u4e00-\u9fff]",  # 中日韩统一表意文字
-        r"[\u3040-\u309f]",  # 平假名
-        r"[\u30a0-\u30ff]",  # 片假名
-        r"[\uac00-\ud7af]",  # 韩文音节
-        r"[\u0e00-\u0e7f]",  # 泰文
-        r"[\u0600-\u06ff]",  # 阿拉伯文
-        r"[\u0400-\u04ff]",  # 西里尔字母（俄文等）
-        r"[\u0590-\u05ff]",  # 希伯来文
-        r"[\u1e00-\u1eff]",  # 越南文
-        r"[\u3130-\u318f]",  # 韩文兼容字母
-    ]
-
-    # 统计所有非英文字符
-    non_english_chars = 0
-    remaining_text = text
-
-    for pattern in patterns:
-        # 计算当前语言的字符数
-        chars = len(re.findall(pattern, remaining_text))
-        non_english_chars += chars
-        # 从文本中移除已计数的字符
-        remaining_text = re.sub(pattern, " ", remaining_text)
-
-    # 计算英文单词数（处理剩余的文本）
-    english_words = len(remaining_text.strip().split())
-
-    return non_english_chars + english_words
+    return not re.search(r"\w", text, flags=re.UNICODE)
 
 
 def preprocess_segments(
@@ -183,6 +138,8 @@ class SubtitleSplitter:
         max_word_count_cjk: int = MAX_WORD_COUNT_CJK,
         max_word_count_english: int = MAX_WORD_COUNT_ENGLISH,
         use_cache: bool = True,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
     ):
         """
         初始化字幕分割器
@@ -193,12 +150,16 @@ class SubtitleSplitter:
             temperature: LLM温度参数
             timeout: API超时时间（秒）
             retry_times: 重试次数
-            split_type: 分段类型，可选值："semantic"（语义分段）或"sentence"（句子分段）
+            split_type: 分段类型，可选值："semantic"（语义分段）、"sentence"（句子分段）
+                或"offline"（本地分段，不调用LLM）
             max_word_count_cjk: 中日韩文本最大字数
             max_word_count_english: 英文文本最大单词数
             use_cache: 是否使用缓存
+            base_url: LLM服务地址，为空时读取环境变量 OPENAI_BASE_URL
+            api_key: LLM服务的API Key，为空时读取环境变量 OPENAI_API_KEY
         """
-        self._init_client()
+        if split_type != "offline":
+            self._init_client(base_url, api_key)
         self.thread_num = thread_num
         self.model = model
         self.temperature = temperature
@@ -209,19 +170,20 @@ class SubtitleSplitter:
         self.max_word_count_english = max_word_count_english
         self.use_cache = use_cache
         self.is_running = True
+        self.usage_tracker = LLMUsageTracker("断句")
         self._init_thread_pool()
         self.cache_manager = CacheManager(str(CACHE_PATH))
 
         # 验证分段类型
-        if split_type not in ["semantic", "sentence"]:
+        if split_type not in ["semantic", "sentence", "offline"]:
             raise ValueError(
-                f"无效的分段类型: {split_type}，必须是 'semantic' 或 'sentence'"
+                f"无效的分段类型: {split_type}，必须是 'semantic'、'sentence' 或 'offline'"
             )
 
-    def _init_client(self):
+    def _init_client(self, base_url: Optional[str], api_key: Optional[str]):
         """初始化OpenAI客户端"""
-        base_url = os.getenv("OPENAI_BASE_URL")
-        api_key = os.getenv("OPENAI_API_KEY")
+        base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not (base_url and api_key):
             raise ValueError("环境变量 OPENAI_BASE_URL 和 OPENAI_API_KEY 必须设置")
 
@@ -256,18 +218,21 @@ class SubtitleSplitter:
 
             # 预处理ASR数据
             asr_data.segments = preprocess_segments(asr_data.segments, need_lower=False)
-            txt = asr_data.to_txt().replace("\n", "")
 
-            # 确定分段数
-            total_word_count = count_words(txt)
-            num_segments = self._determine_num_segments(total_word_count)
-            logger.info(f"根据字数 {total_word_count}，确定分段数: {num_segments}")
+            # 本地分段：直接对全部分段做动态规划断句
+            if self.split_type == "offline":
+                logger.info(f"使用本地分段，分段数: {len(asr_data.segments)}")
+                return ASRData(self._process_by_dp(asr_data.segments))
 
-            # 分割ASR数据
-            asr_data_list = self._split_asr_data(asr_data, num_segments)
+            # 按估算token数均衡地分割ASR数据
+            asr_data_list = self._split_asr_data(asr_data)
 
             # 多线程处理每个asr_data
+            self.usage_tracker = LLMUsageTracker("断句")
             processed_segments = self._process_segments(asr_data_list)
+            summary = self.usage_tracker.summary()
+            if summary:
+                logger.info(summary)
 
             # 合并所有处理后的分段
             final_segments = self._merge_processed_segments(processed_segments)
@@ -281,88 +246,32 @@ class SubtitleSplitter:
             logger.error(f"分割失败：{str(e)}")
             raise RuntimeError(f"分割失败：{str(e)}")
 
-    def _determine_num_segments(self, word_count: int, threshold: int = 500) -> int:
-        """
-        根据字数确定分段数
-
-        Args:
-            word_count: 总字数
-            threshold: 每段的目标字数
-
-        Returns:
-            分段数
-        """
-        num_segments = word_count // threshold
-        if word_count % threshold > 0:
-            num_segments += 1
-        return max(1, num_segments)
-
-    def _split_asr_data(self, asr_data: ASRData, num_segments: int) -> List[ASRData]:
+    def _split_asr_data(self, asr_data: ASRData) -> List[ASRData]:
         """
-        长文本发送LLM前进行进行分割，根据ASR分段中的时间间隔，将ASRData拆分成多个部分。
+        长文本发送LLM前进行进行分割，使各分块的估算token数均衡，所有线程尽量同时完成。
 
         处理步骤：
-        1. 计算总字数，并确定每个分段的字数范围。
-        2. 确定平均分割点。
-        3. 在分割点前后一定范围内，寻找时间间隔最大的点作为实际的分割点。
+        1. 根据总token数和线程数确定分块数（线程数的整数倍）。
+        2. 按token数前缀和确定各切分点的理想位置。
+        3. 在理想位置的容差范围内，寻找时间间隔最大的点作为实际的切分点。
 
         Args:
             asr_data: ASR数据对象
-            num_segments: 目标分段数
 
         Returns:
             ASR数据对象列表
         """
-        SPLIT_RANGE = 30  # 在分割点前后寻找最大时间间隔的范围
-
-        total_segs = len(asr_data.segments)
-        total_word_count = count_words(asr_data.to_txt())
-        words_per_segment = total_word_count // num_segments
-
-        if num_segments <= 1 or total_segs <= num_segments:
+        partition = partition_segments(asr_data.segments, self.thread_num)
+        logger.info(
+            f"估算token数 {partition.total_tokens:.0f}，分块数: {len(partition.bounds)}，"
+            f"预计最长线程负载 {partition.makespan:.0f} tokens"
+            f"（理想值 {partition.total_tokens / max(1, self.thread_num):.0f}）"
+        )
+        if len(partition.bounds) <= 1:
             return [asr_data]
-
-        # 计算每个分段的大致字数 根据每段字数计算分割点
-        split_indices = [i * words_per_segment for i in range(1, num_segments)]
-
-        # 调整分割点：在每个平均分割点附近寻找时间间隔最大的点
-        adjusted_split_indices = []
-        for split_point in split_indices:
-            # 定义搜索范围
-            start = max(0, split_point - SPLIT_RANGE)
-            end = min(total_segs - 1, split_point + SPLIT_RANGE)
-
-            # 在范围内找到时间间隔最大的点
-            max_gap = -1
-            best_index = split_point
-
-            for j in range(start, end):
-                gap = (
-                    asr_data.segments[j + 1].start_time - asr_data.segments[j].end_time
-                )
-                if gap > max_gap:
-                    max_gap = gap
-                    best_index = j
-
-            adjusted_split_indices.append(best_index)
-
-        # 移除重复的分割点
-        adjusted_split_indices = sorted(list(set(adjusted_split_indices)))
-
-        # 根据调整后的分割点拆分ASRData
-        segments = []
-        prev_index = 0
-        for index in adjusted_split_indices:
-            part = ASRData(asr_data.segments[prev_index : index + 1])
-            segments.append(part)
-            prev_index = index + 1
-
-        # 添加最后一部分
-        if prev_index < total_segs:
-            part = ASRData(asr_data.segments[prev_index:])
-            segments.append(part)
-
-        return segments
+        return [
+            ASRData(asr_data.segments[start:end]) for start, end in partition.bounds
+        ]
 
     def _process_segments(self, asr_data_list: List[ASRData]) -> List[List[ASRDataSeg]]:
         """并行处理所有分段"""
@@ -370,7 +279,9 @@ class SubtitleSplitter:
         for asr_data in asr_data_list:
             if not self.executor:
                 raise ValueError("线程池未初始化")
-            future = self.executor.submit(self._process_single_segment, asr_data)
+            future = self.executor.submit(
+                tracing.propagate(self._process_single_segment), asr_data
+            )
             futures.append(future)
 
         processed_segments = []
@@ -386,6 +297,7 @@ class SubtitleSplitter:
 
         return processed_segments
 
+    @tracing.traced("split.segment")
     def _process_single_segment(self, asr_data_part: ASRData) -> List[ASRDataSeg]:
         """
         处理单个分段
@@ -402,6 +314,21 @@ class SubtitleSplitter:
                 logger.warning(f"分割重试 {i + 1}/{self.retry_times}: {str(e)}")
         return self._process_by_rules(asr_data_part.segments)  # 确保总是有返回值
 
+    def _process_by_dp(self, segments: List[ASRDataSeg]) -> List[ASRDataSeg]:
+        """
+        使用动态规划进行本地断句（不调用LLM）
+
+        Args:
+            segments: ASR数据分段列表
+        Returns:
+            处理后的分段列表
+        """
+        return split_by_dp(
+            segments,
+            max_word_count_cjk=self.max_word_count_cjk,
+            max_word_count_english=self.max_word_count_english,
+        )
+
     def _process_by_llm(self, segments: List[ASRDataSeg]) -> List[ASRDataSeg]:
         """
         使用LLM进行分段处理
@@ -466,15 +393,23 @@ class SubtitleSplitter:
 
         # 调用API
         logger.info(f"开始调用API进行分段，文本长度: {count_words(txt)}")
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=self.temperature,
-            timeout=self.timeout,
-        )
+        try:
+            response = create_completion(
+                self.client,
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=self.temperature,
+                timeout=self.timeout,
+            )
+        except Exception as e:
+            endpoint_health.report_error(
+                self.client.base_url, self.client.api_key, self.model, e
+            )
+            raise
+        self.usage_tracker.record(response)
 
         # 处理响应结果
         result = response.choices[0].message.content
@@ -618,83 +553,6 @@ class SubtitleSplitter:
         Returns:
             分组后的分段列表的列表
         """
-        # 定义在词语前面分割的常见词
-        prefix_split_words = {
-            # 英文连接词和介词
-            "and",
-            "or",
-            "but",
-            "if",
-            "then",
-            "because",
-            "as",
-            "until",
-            "while",
-            "what",
-            "when",
-            "where",
-            "nor",
-            "yet",
-            "so",
-            "for",
-            "however",
-            "moreover",
-            # 中文连接词
-            "和",
-            "及",
-            "与",
-            "但",
-            "而",
-            "或",
-            "因",
-            # 中文代词
-            "我",
-            "你",
-            "他",
-            "她",
-            "它",
-            "咱",
-            "您",
-            "这",
-            "那",
-            "哪",
-        }
-
-        # 定义在词语后面分割的常见词
-        suffix_split_words = {
-            # 标点符号
-            ".",
-            ",",
-            "!",
-            "?",
-            "。",
-            "，",
-            "！",
-            "？",
-            # 中文语气词和助词
-            "的",
-            "了",
-            "着",
-            "过",
-            "吗",
-            "呢",
-            "吧",
-            "啊",
-            "呀",
-            "嘛",
-            "啦",
-            # 英文所有格代词
-            "mine",
-            "yours",
-            "hers",
-            "its",
-            "ours",
-            "theirs",
-            # 英文副词
-            "either",
-            "neither",
-        }
-
         result = []
         current_group = []
 
@@ -707,7 +565,7 @@ class SubtitleSplitter:
 
             # 如果当前词是前缀词且前面已经累积了足够多的词
             if any(
-                seg.text.lower().startswith(word) for word in prefix_split_words
+                seg.text.lower().startswith(word) for word in PREFIX_SPLIT_WORDS
             ) and len(current_group) >= int(max_word_count * 0.6):
                 result.append(current_group)
                 logger.debug(f"在前缀词 {seg.text} 前分割")
@@ -718,7 +576,7 @@ class SubtitleSplitter:
                 i > 0
                 and any(
                     segments[i - 1].text.lower().endswith(word)
-                    for word in suffix_split_words
+                    for word in SUFFIX_SPLIT_WORDS
                 )
                 and len(current_group) >= int(max_word_count * 0.4)
             ):
@@ -738,45 +596,84 @@ class SubtitleSplitter:
         """
         基于最大时间间隔拆分长分段，根据文本类型使用不同的最大词数限制
 
+        预先计算词数、CJK字符数的前缀和以及时间间隔的区间最值表，
+        每次拆分只需 O(1) 查询，整体复杂度为 O(n log n)
+
         Args:
             segments: 要拆分的分段列表
         Returns:
             拆分后的分段列表
         """
         result_segs = []
-        segments_to_process = [segments]  # 使用列表作为处理队列
-
-        while segments_to_process:
-            current_segments = segments_to_process.pop(0)
-
-            # 添加空列表检查
-            if not current_segments:
+        if not segments:
+            return result_segs
+
+        total = len(segments)
+        texts = [seg.text for seg in segments]
+
+        # 前缀和：词数（减去拼接时合并的单词）、CJK字符数、非空白字符数、空文本数
+        word_prefix = [0] * (total + 1)
+        join_prefix = [0] * (total + 1)
+        cjk_prefix = [0] * (total + 1)
+        non_space_prefix = [0] * (total + 1)
+        empty_prefix = [0] * (total + 1)
+        prev_ends_run = False
+        for i, text in enumerate(texts):
+            metrics = get_text_metrics(text)
+            starts_run, ends_run = word_run_edges(text)
+            word_prefix[i + 1] = word_prefix[i] + metrics.word_count
+            join_prefix[i + 1] = join_prefix[i] + (prev_ends_run and starts_run)
+            cjk_prefix[i + 1] = cjk_prefix[i] + metrics.cjk_count
+            non_space_prefix[i + 1] = non_space_prefix[i] + metrics.non_space_count
+            empty_prefix[i + 1] = empty_prefix[i] + (not text)
+            prev_ends_run = ends_run
+
+        gaps = [
+            segments[i + 1].start_time - segments[i].end_time for i in range(total - 1)
+        ]
+        gap_table = _RangeExtremes(gaps)
+
+        # 使用队列按区间 [lo, hi) 进行广度优先拆分
+        ranges_to_process = deque([(0, total)])
+        while ranges_to_process:
+            lo, hi = ranges_to_process.popleft()
+            n = hi - lo
+            if n <= 0:
                 continue
 
-            merged_text = "".join(seg.text for seg in current_segments)
+            non_space = non_space_prefix[hi] - non_space_prefix[lo]
+            mainly_cjk = (
+                (cjk_prefix[hi] - cjk_prefix[lo]) / non_space > 0.5
+                if non_space > 0
+                else False
+            )
             max_word_count = (
-                self.max_word_count_cjk
-                if is_mainly_cjk(merged_text)
-                else self.max_word_count_english
+                self.max_word_count_cjk if mainly_cjk else self.max_word_count_english
             )
-            n = len(current_segments)
+            if empty_prefix[hi] - empty_prefix[lo] > 0:
+                # 空文本会让两侧文本直接相连，此时直接计数
+                word_count = count_words("".join(texts[lo:hi]))
+            else:
+                word_count = (word_prefix[hi] - word_prefix[lo]) - (
+                    join_prefix[hi] - join_prefix[lo + 1]
+                )
 
             # 基本情况：如果分段足够短或无法进一步拆分
-            if count_words(merged_text) <= max_word_count or n < 4:
+            if word_count <= max_word_count or n < 4:
                 merged_seg = ASRDataSeg(
-                    merged_text.strip(),
-                    current_segments[0].start_time,
-                    current_segments[-1].end_time,
+                    "".join(texts[lo:hi]).strip(),
+                    segments[lo].start_time,
+                    segments[hi - 1].end_time,
                 )
                 result_segs.append(merged_seg)
                 continue
 
             # 检查时间间隔是否都相等
-            gaps = [
-                current_segments[i + 1].start_time - current_segments[i].end_time
-                for i in range(n - 1)
-            ]
-            all_equal = all(abs(gap - gaps[0]) < 1e-6 for gap in gaps)
+            first_gap = gaps[lo]
+            all_equal = (
+                gap_table.max_value(lo, hi - 1) - first_gap < 1e-6
+                and first_gap - gap_table.min_value(lo, hi - 1) < 1e-6
+            )
 
             if all_equal:
                 # 如果时间间隔都相等，在中间位置断句
@@ -785,20 +682,16 @@ class SubtitleSplitter:
                 # 在分段中间2/3部分寻找最大时间间隔点
                 start_idx = max(n // 6, 1)
                 end_idx = min((5 * n) // 6, n - 2)
-                split_index = max(
-                    range(start_idx, end_idx),
-                    key=lambda i: current_segments[i + 1].start_time
-                    - current_segments[i].end_time,
-                    default=n // 2,
-                )
+                if start_idx < end_idx:
+                    split_index = gap_table.argmax(lo + start_idx, lo + end_idx) - lo
+                else:
+                    split_index = n // 2
                 if split_index == 0 or split_index == n - 1:
                     split_index = n // 2
 
             # 将分割后的两部分添加到处理队列中
-            first_segs = current_segments[: split_index + 1]
-            second_segs = current_segments[split_index + 1 :]
-
-            segments_to_process.extend([first_segs, second_segs])
+            ranges_to_process.append((lo, lo + split_index + 1))
+            ranges_to_process.append((lo + split_index + 1, hi))
 
         # 按时间排序
         result_segs.sort(key=lambda seg: seg.start_time)
@@ -880,6 +773,7 @@ class SubtitleSplitter:
             else:
                 i += 1
 
+    @tracing.traced("align.sentences")
     def _merge_segments_based_on_sentences(
         self, segments: List[ASRDataSeg], sentences: List[str], max_unmatched: int = 5
     ) -> List[ASRDataSeg]:
@@ -898,12 +792,8 @@ class SubtitleSplitter:
             ValueError: 当未匹配句子数量超过阈值时抛出
         """
 
-        def preprocess_text(s: str) -> str:
-            """通过转换为小写并规范化空格来标准化文本"""
-            return " ".join(s.lower().split())
-
-        asr_texts = [seg.text for seg in segments]
-        asr_len = len(asr_texts)
+        aligner = SentenceAligner([seg.text for seg in segments])
+        asr_len = len(segments)
         asr_index = 0  # 当前分段索引位置
         threshold = 0.5  # 相似度阈值
         max_shift = 30  # 滑动窗口的最大偏移量
@@ -914,45 +804,17 @@ class SubtitleSplitter:
         for sentence in sentences:
             logger.debug("==========")
             logger.debug(f"处理句子: {sentence}")
-            logger.debug("后续句子:" + "".join(asr_texts[asr_index : asr_index + 10]))
-
-            sentence_proc = preprocess_text(sentence)
-            word_count = count_words(sentence_proc)
-            best_ratio = 0.0
-            best_pos = None
-            best_window_size = 0
-
-            # 滑动窗口大小，优先考虑接近句子词数的窗口
-            max_window_size = min(word_count * 2, asr_len - asr_index)
-            min_window_size = max(1, word_count // 2)
-            window_sizes = sorted(
-                range(min_window_size, max_window_size + 1),
-                key=lambda x: abs(x - word_count),
+            logger.debug(
+                "后续句子:"
+                + "".join(seg.text for seg in segments[asr_index : asr_index + 10])
             )
 
-            # 对每个窗口大小尝试匹配
-            for window_size in window_sizes:
-                max_start = min(asr_index + max_shift + 1, asr_len - window_size + 1)
-                for start in range(asr_index, max_start):
-                    substr = "".join(asr_texts[start : start + window_size])
-                    substr_proc = preprocess_text(substr)
-                    ratio = difflib.SequenceMatcher(
-                        None, sentence_proc, substr_proc
-                    ).ratio()
-
-                    if ratio > best_ratio:
-                        best_ratio = ratio
-                        best_pos = start
-                        best_window_size = window_size
-                    if ratio == 1.0:
-                        break
-                if best_ratio == 1.0:
-                    break
+            # 字符流上的锚点匹配 + 带状编辑距离对齐
+            match = aligner.match(sentence, asr_index, max_shift=max_shift)
 
             # 处理匹配结果
-            if best_ratio >= threshold and best_pos is not None:
-                start_seg_index = best_pos
-                end_seg_index = best_pos + best_window_size - 1
+            if match is not None and match[2] >= threshold:
+                start_seg_index, end_seg_index, _ = match
 
                 segs_to_merge = segments[start_seg_index : end_seg_index + 1]
 
@@ -0,0 +1,229 @@
+from typing import List
+
+from app.core.bk_asr.asr_data import ASRDataSeg
+from app.core.utils.logger import setup_logger
+from app.core.utils.text_metrics import get_text_metrics
+
+logger = setup_logger("split_by_dp")
+
+MAX_GAP = 1500  # 超过该时间间隔（毫秒）视为强断点
+MIN_WORD_COUNT = 3  # 少于该词数的句子会被额外惩罚
+TARGET_RATIO = 0.7  # 理想句长占最大词数的比例
+
+# 代价模型权重
+BREAK_COST = 1.0  # 每次断句的固定代价，避免过度切分
+LENGTH_WEIGHT = 4.0  # 句长偏离理想句长的代价
+SHORT_PENALTY = 2.0  # 过短句子的代价
+GAP_WEIGHT = 2.5  # 时间间隔带来的断句收益
+LONG_GAP_BONUS = 10.0  # 超过 MAX_GAP 的间隔带来的额外收益
+STRONG_PUNCT_BONUS = 3.0  # 句末标点带来的断句收益
+WEAK_PUNCT_BONUS = 1.5  # 句中标点带来的断句收益
+CONNECTIVE_BONUS = 1.0  # 连接词、语气词带来的断句收益
+
+STRONG_PUNCTUATIONS = (".", "!", "?", "。", "！", "？", "…")
+WEAK_PUNCTUATIONS = (",", ";", ":", "，", "；", "：", "、")
+
+# 在词语前面分割的常见词
+PREFIX_SPLIT_WORDS = {
+    # 英文连接词和介词
+    "and",
+    "or",
+    "but",
+    "if",
+    "then",
+    "because",
+    "as",
+    "until",
+    "while",
+    "what",
+    "when",
+    "where",
+    "nor",
+    "yet",
+    "so",
+    "for",
+    "however",
+    "moreover",
+    # 中文连接词
+    "和",
+    "及",
+    "与",
+    "但",
+    "而",
+    "或",
+    "因",
+    # 中文代词
+    "我",
+    "你",
+    "他",
+    "她",
+    "它",
+    "咱",
+    "您",
+    "这",
+    "那",
+    "哪",
+}
+
+# 在词语后面分割的常见词
+SUFFIX_SPLIT_WORDS = {
+    # 标点符号
+    ".",
+    ",",
+    "!",
+    "?",
+    "。",
+    "，",
+    "！",
+    "？",
+    # 中文语气词和助词
+    "的",
+    "了",
+    "着",
+    "过",
+    "吗",
+    "呢",
+    "吧",
+    "啊",
+    "呀",
+    "嘛",
+    "啦",
+    # 英文所有格代词
+    "mine",
+    "yours",
+    "hers",
+    "its",
+    "ours",
+    "theirs",
+    # 英文副词
+    "either",
+    "neither",
+}
+
+
+def _break_bonus(segments: List[ASRDataSeg], i: int) -> float:
+    """
+    计算在第 i 个分段之后断句的收益（时间间隔、标点、连接词）
+    """
+    text = segments[i].text.strip()
+    next_text = segments[i + 1].text.strip().lower()
+    gap = segments[i + 1].start_time - segments[i].end_time
+
+    bonus = GAP_WEIGHT * min(max(gap, 0), MAX_GAP) / MAX_GAP
+    if gap > MAX_GAP:
+        bonus += LONG_GAP_BONUS
+    if text.endswith(STRONG_PUNCTUATIONS):
+        bonus += STRONG_PUNCT_BONUS
+    elif text.endswith(WEAK_PUNCTUATIONS):
+        bonus += WEAK_PUNCT_BONUS
+    if text.lower() in SUFFIX_SPLIT_WORDS or next_text in PREFIX_SPLIT_WORDS:
+        bonus += CONNECTIVE_BONUS
+    return bonus
+
+
+def split_by_dp(
+    segments: List[ASRDataSeg],
+    max_word_count_cjk: int,
+    max_word_count_english: int,
+) -> List[ASRDataSeg]:
+    """
+    不依赖LLM的断句：用动态规划在字词级分段上求代价最小的切分方案
+
+    代价由以下部分组成：
+    1. 每个句子的长度代价（偏离理想句长、过短），超过最大词数的句子不可选
+    2. 每个断点的固定代价，减去时间间隔、标点、连接词带来的收益
+
+    候选句子的长度受最大词数限制，复杂度为 O(n * max_word_count)
+
+    Args:
+        segments: 字词级ASR分段列表
+        max_word_count_cjk: 中日韩文本最大字数
+        max_word_count_english: 英文文本最大单词数
+
+    Returns:
+        断句后的分段列表
+    """
+    n = len(segments)
+    if n == 0:
+        return []
+
+    # 前缀和：词数、CJK字符数、非空白字符数
+    word_prefix = [0] * (n + 1)
+    cjk_prefix = [0] * (n + 1)
+    non_space_prefix = [0] * (n + 1)
+    for i, seg in enumerate(segments):
+        metrics = get_text_metrics(seg.text)
+        word_prefix[i + 1] = word_prefix[i] + metrics.word_count
+        cjk_prefix[i + 1] = cjk_prefix[i] + metrics.cjk_count
+        non_space_prefix[i + 1] = non_space_prefix[i] + metrics.non_space_count
+
+    # 在第 i 个分段之后断句的代价（最后一个分段之后不计代价）
+    break_costs = [BREAK_COST - _break_bonus(segments, i) for i in range(n - 1)]
+    break_costs.append(0.0)
+    max_limit = max(max_word_count_cjk, max_word_count_english)
+
+    # best[i]: 前 i 个分段的最小代价；prev[i]: 对应最后一句的起点
+    inf = float("inf")
+    best = [inf] * (n + 1)
+    prev = [0] * (n + 1)
+    best[0] = 0.0
+    for end in range(1, n + 1):
+        break_cost = break_costs[end - 1]
+        for start in range(end - 1, -1, -1):
+            word_count = word_prefix[end] - word_prefix[start]
+            if word_count > max_limit and start < end - 1:
+                break
+            non_space = non_space_prefix[end] - non_space_prefix[start]
+            mainly_cjk = (
+                non_space > 0
+                and (cjk_prefix[end] - cjk_prefix[start]) / non_space > 0.5
+            )
+            limit = max_word_count_cjk if mainly_cjk else max_word_count_english
+            if word_count > limit and start < end - 1:
+                continue
+
+            deviation = (word_count - limit * TARGET_RATIO) / limit
+            cost = best[start] + LENGTH_WEIGHT * deviation * deviation + break_cost
+            if word_count < MIN_WORD_COUNT:
+                cost += SHORT_PENALTY
+            if cost < best[end]:
+                best[end] = cost
+                prev[end] = start
+
+    # 回溯得到切分方案
+    bounds = []
+    end = n
+    while end > 0:
+        start = prev[end]
+        bounds.append((start, end))
+        end = start
+    bounds.reverse()
+
+    result = []
+    for start, end in bounds:
+        text = "".join(seg.text for seg in segments[start:end]).strip()
+        if text:
+            result.append(
+                ASRDataSeg(text, segments[start].start_time, segments[end - 1].end_time)
+            )
+    logger.debug(f"动态规划断句: {n} 个分段 -> {len(result)} 句")
+    return result
+
+
+if __name__ == "__main__":
+    import time
+
+    words = "so today we are going to talk about dynamic programming and why it works".split()
+    demo = []
+    t = 0
+    for k in range(3600 * 3):
+        word = words[k % len(words)]
+        gap = 800 if word == "so" else 60
+        demo.append(ASRDataSeg(word + " ", t + gap, t + gap + 240))
+        t += gap + 240
+
+    start_time = time.time()
+    sentences = split_by_dp(demo, 25, 18)
+    print(f"{len(demo)} 个词 -> {len(sentences)} 句, 耗时 {time.time() - start_time:.3f}s")
+    for seg in sentences[:5]:
+        print(seg.text)
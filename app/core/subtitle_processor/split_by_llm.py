@@ -8,7 +8,9 @@ import retry
 
 from app.config import CACHE_PATH
 
+from ..utils.llm_usage import create_completion
 from ..utils.logger import setup_logger
+from ..utils.text_metrics import count_words
 from .prompt import SPLIT_PROMPT_SEMANTIC
 
 logger = setup_logger("split_by_llm")
@@ -16,16 +18,6 @@ logger = setup_logger("split_by_llm")
 MAX_WORD_COUNT = 20  # 英文单词或中文字符的最大数量
 
 
-def count_words(text: str) -> int:
-    """
-    统计混合文本中英文单词数和中文字符数的总和
-    """
-    chinese_chars = len(re.findall(r"[\u4e00-\u9fff]", text))
-    english_text = re.sub(r"[\u4e00-\u9fff]", " ", text)
-    english_words = len(english_text.strip().split())
-    return english_words + chinese_chars
-
-
 def get_cache_key(text: str, model: str) -> str:
     """
     生成缓存键值
@@ -111,7 +103,8 @@ def split_by_llm_retry(
     logger.info("未命中缓存，开始断句")
     # 初始化OpenAI客户端
     client = openai.OpenAI()
-    response = client.chat.completions.create(
+    response = create_completion(
+        client,
         model=model,
         messages=[
             {"role": "system", "content": system_prompt},
@@ -1,47 +1,251 @@
+import json
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
 
 from openai import OpenAI
 
 import json_repair
+from app.config import CACHE_PATH
+from app.core.storage.cache_manager import CacheManager
+from app.core.subtitle_processor.chunking import content_defined_windows
+from app.core.subtitle_processor.line_batch import pack_lines
+from app.core.utils import tracing
+from app.core.utils.llm_usage import LLMUsageTracker, create_completion
 from ..utils.logger import setup_logger
-from .prompt import SUMMARIZER_PROMPT
+from .prompt import SUMMARIZER_PROMPT, SUMMARY_REDUCE_PROMPT
 
 logger = setup_logger("subtitle_summarizer")
 
+# 分段摘要配置
+SUMMARY_WINDOW_CHARS = 3000  # 每个窗口的目标字符数（不超过时直接整体摘要）
+SUMMARY_MAX_UNIT_CHARS = 500  # 切分窗口时单个片段的最大字符数
+
+# 在句末标点和换行之后切分（保留原文，拼接后与原文一致）
+_SENTENCE_END_RE = re.compile(r"(?<=[。！？；!?;.\n])")
+
+
+def split_units(content: str, max_chars: int = SUMMARY_MAX_UNIT_CHARS) -> List[str]:
+    """
+    将字幕内容切分为句子级的片段，过长的片段按固定长度切开
+
+    Args:
+        content: 字幕内容
+        max_chars: 单个片段的最大字符数
+
+    Returns:
+        List[str]: 片段列表，拼接后与原文一致
+    """
+    units = []
+    for sentence in _SENTENCE_END_RE.split(content):
+        for i in range(0, len(sentence), max_chars):
+            units.append(sentence[i : i + max_chars])
+    return [unit for unit in units if unit]
+
 
 class SubtitleSummarizer:
-    def __init__(self, model) -> None:
-        base_url = os.getenv("OPENAI_BASE_URL")
-        api_key = os.getenv("OPENAI_API_KEY")
+    """
+    字幕摘要器：内容较长时分窗口并行摘要，再逐级合并（map-reduce）
+
+    窗口边界由内容决定（content_defined_windows），每个窗口和每次合并的结果
+    按内容缓存，修改字幕后重新摘要只需重新请求变化的窗口及其上层的合并。
+    """
+
+    def __init__(
+        self,
+        model: str,
+        thread_num: int = 5,
+        window_chars: int = SUMMARY_WINDOW_CHARS,
+        hierarchical: bool = True,
+        use_cache: bool = True,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            model: 使用的LLM模型名称
+            thread_num: 并行摘要的线程数
+            window_chars: 每个窗口的目标字符数
+            hierarchical: 是否分段摘要，为False时只摘要前 window_chars 个字符
+            use_cache: 是否缓存每个窗口及合并的摘要结果
+            base_url: LLM服务地址，为空时读取环境变量 OPENAI_BASE_URL
+            api_key: LLM服务的API Key，为空时读取环境变量 OPENAI_API_KEY
+        """
+        base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
 
         if not base_url or not api_key:
             raise ValueError("环境变量 OPENAI_BASE_URL 和 OPENAI_API_KEY 必须设置")
 
         self.model = model
         self.client = OpenAI(base_url=base_url, api_key=api_key)
+        self.thread_num = thread_num
+        self.window_chars = window_chars
+        self.hierarchical = hierarchical
+        self.use_cache = use_cache
+        self.is_running = True
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.usage_tracker = LLMUsageTracker("摘要")
+        self.cache_manager = CacheManager(str(CACHE_PATH))
 
     def summarize(self, subtitle_content: str) -> str:
         logger.info("开始摘要化字幕内容")
+        self.usage_tracker = LLMUsageTracker("摘要")
         try:
-            subtitle_content = subtitle_content[:3000]
-            response = self.client.chat.completions.create(
-                model=self.model,
-                stream=False,
-                messages=[
-                    {"role": "system", "content": SUMMARIZER_PROMPT},
-                    {
-                        "role": "user",
-                        "content": f"summarize the video content:\n{subtitle_content}",
-                    },
-                ],
-            )
-            content = response.choices[0].message.content
-            if content is None:
-                return ""
-            return str(json_repair.loads(content))
+            if len(subtitle_content) <= self.window_chars or not self.hierarchical:
+                result = self._summarize_window(subtitle_content[: self.window_chars])
+            else:
+                result = self._map_reduce(subtitle_content)
+            return str(result)
         except Exception as e:
             logger.exception(f"摘要化字幕内容失败: {e}")
             return ""
+        finally:
+            summary = self.usage_tracker.summary()
+            if summary:
+                logger.info(summary)
+
+    def _map_reduce(self, subtitle_content: str) -> Dict[str, Any]:
+        """分窗口并行摘要，再合并各窗口的摘要和术语"""
+        units = split_units(subtitle_content)
+        windows = [
+            "".join(units[start:end])
+            for start, end in content_defined_windows(units, self.window_chars)
+        ]
+        logger.info(f"字幕内容较长（{len(subtitle_content)} 字符），分 {len(windows)} 段摘要")
+
+        self.executor = ThreadPoolExecutor(max_workers=self.thread_num)
+        try:
+            partials = self._run_parallel(self._summarize_window, windows)
+            summaries = [str(partial.get("summary", "")) for partial in partials]
+            summary = self._reduce([s for s in summaries if s.strip()])
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+        return {"summary": summary, "terms": self._merge_terms(partials)}
+
+    def _run_parallel(self, func, items: List[str]) -> List[Any]:
+        """并行处理并按输入顺序返回结果"""
+        if len(items) == 1:
+            return [func(items[0])]
+        assert self.executor is not None
+        func = tracing.propagate(func)
+        futures = {self.executor.submit(func, item): i for i, item in enumerate(items)}
+        results: List[Any] = [None] * len(items)
+        for future in as_completed(futures):
+            if not self.is_running:
+                raise RuntimeError("摘要已停止")
+            results[futures[future]] = future.result()
+        return results
+
+    def _reduce(self, summaries: List[str]) -> str:
+        """逐级合并摘要，每次合并的输入不超过窗口大小"""
+        while len(summaries) > 1:
+            bounds = pack_lines(summaries, self.window_chars)
+            if len(bounds) == len(summaries):
+                # 每段摘要都很长时两两合并，保证每一级都在减少
+                bounds = [
+                    (start, min(start + 2, len(summaries)))
+                    for start in range(0, len(summaries), 2)
+                ]
+            groups = [summaries[start:end] for start, end in bounds]
+            logger.info(f"合并 {len(summaries)} 段摘要为 {len(groups)} 段")
+            summaries = self._run_parallel(self._reduce_group, groups)  # type: ignore
+        return summaries[0] if summaries else ""
+
+    def _summarize_window(self, text: str) -> Dict[str, Any]:
+        """摘要一个窗口的字幕内容"""
+        return self._request(
+            SUMMARIZER_PROMPT, f"summarize the video content:\n{text}"
+        )
+
+    def _reduce_group(self, summaries: List[str]) -> str:
+        """合并一组按时间顺序排列的摘要"""
+        if len(summaries) == 1:
+            return summaries[0]
+        parts = "\n\n".join(
+            f"<part{i}>\n{summary}\n</part{i}>" for i, summary in enumerate(summaries, 1)
+        )
+        result = self._request(
+            SUMMARY_REDUCE_PROMPT,
+            f"Merge the summaries of consecutive parts of the video:\n{parts}",
+        )
+        return str(result.get("summary", ""))
+
+    def _request(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+        """调用API并解析JSON结果（按提示词内容缓存）"""
+        cache_key = f"{len(system_prompt)}_{user_prompt}"
+        cache_params = {"model": self.model, "task": "summarize"}
+        if self.use_cache:
+            cache_result = self.cache_manager.get_llm_result(
+                cache_key, self.model, **cache_params
+            )
+            if cache_result:
+                return json.loads(cache_result)
+
+        response = create_completion(
+            self.client,
+            model=self.model,
+            stream=False,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        )
+        self.usage_tracker.record(response)
+        content = response.choices[0].message.content
+        if content is None:
+            return {}
+        result = json_repair.loads(content)
+        if not isinstance(result, dict):
+            result = {"summary": str(result)}
+
+        if self.use_cache:
+            self.cache_manager.set_llm_result(
+                cache_key,
+                json.dumps(result, ensure_ascii=False),
+                self.model,
+                **cache_params,
+            )
+        return result
+
+    @staticmethod
+    def _merge_terms(partials: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """按出现顺序合并各窗口提取的术语并去重"""
+        merged: Dict[str, List[Any]] = {"entities": [], "keywords": []}
+        seen: Dict[str, set] = {key: set() for key in merged}
+        for partial in partials:
+            terms = partial.get("terms")
+            if not isinstance(terms, dict):
+                continue
+            for key, values in terms.items():
+                if not isinstance(values, list):
+                    continue
+                merged.setdefault(key, [])
+                seen.setdefault(key, set())
+                for value in values:
+                    marker = str(value).strip().lower()
+                    if marker and marker not in seen[key]:
+                        seen[key].add(marker)
+                        merged[key].append(value)
+        return merged
+
+    def stop(self):
+        """停止摘要器"""
+        if not self.is_running:
+            return
+
+        logger.info("正在停止摘要器...")
+        self.is_running = False
+        if self.executor is not None:
+            try:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+            except Exception as e:
+                logger.error(f"关闭线程池时出错：{str(e)}")
+            finally:
+                self.executor = None
 
 
 if __name__ == "__main__":
@@ -3,11 +3,13 @@ import html
 import json
 import os
 import re
+import threading
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from enum import Enum
 from string import Template
-from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import quote
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import requests
 from openai import OpenAI
@@ -15,16 +17,51 @@ from openai import OpenAI
 from app.config import CACHE_PATH
 from app.core.bk_asr.asr_data import ASRData, ASRDataSeg
 from app.core.storage.cache_manager import CacheManager
+from app.core.storage.translation_memory import (
+    HINT_SIMILARITY,
+    PREFILL_SIMILARITY,
+    TranslationMatch,
+    TranslationMemory,
+    get_translation_memory,
+    llm_origin,
+    parse_llm_translations,
+)
+from app.core.subtitle_processor.chunking import (
+    content_defined_bounds,
+    to_absolute_keys,
+    to_relative_keys,
+)
+from app.core.subtitle_processor.line_batch import new_line_state, translate_lines
+from app.core.subtitle_processor.optimize import SubtitleOptimizer
 from app.core.subtitle_processor.prompt import (
+    FUSED_OPTIMIZE_TRANSLATE_PROMPT,
     REFLECT_TRANSLATE_PROMPT,
     SINGLE_TRANSLATE_PROMPT,
     TRANSLATE_PROMPT,
 )
 import json_repair
+from app.core.utils import tracing
+from app.core.utils.endpoint_health import endpoint_health
+from app.core.utils.hedging import get_hedge_client, hedged_call
+from app.core.utils.llm_usage import LLMUsageTracker, create_completion
 from app.core.utils.logger import setup_logger
 
 logger = setup_logger("subtitle_translator")
 
+# 机器翻译多行合并请求的长度限制
+GOOGLE_MAX_QUERY_LENGTH = 5000  # 谷歌翻译GET请求中 q 参数URL编码后的最大长度
+DEEPLX_MAX_TEXT_LENGTH = 3000  # DeepLX 每次请求的最大字符数
+
+# 翻译失败时写入结果的错误标记（失败的块为 "原文||ERROR"）
+TRANSLATION_ERROR_MARKERS = frozenset({"ERROR", "TRANSLATION ERROR"})
+
+
+def is_translation_error(value: Optional[str]) -> bool:
+    """翻译结果是否失败（缺失、错误标记或失败块的 "原文||ERROR"）"""
+    if value is None:
+        return True
+    return value.strip() in TRANSLATION_ERROR_MARKERS or value.endswith("||ERROR")
+
 
 class TranslatorType(Enum):
     """翻译器类型"""
@@ -47,6 +84,9 @@ class BaseTranslator(ABC):
         timeout: int = 60,
         update_callback: Optional[Callable] = None,
         custom_prompt: Optional[str] = None,
+        incremental: bool = False,
+        use_memory: bool = False,
+        hedge: bool = False,
     ):
         self.thread_num = thread_num
         self.batch_num = batch_num
@@ -56,6 +96,16 @@ class BaseTranslator(ABC):
         self.is_running = True
         self.update_callback = update_callback
         self.custom_prompt = custom_prompt
+        self.incremental = incremental
+        # 翻译记忆：复用历史上相同原文的译文，相似原文的译文作为参考
+        self.use_memory = use_memory
+        self.memory: Optional[TranslationMemory] = None
+        self._memory_lock = threading.Lock()
+        self.memory_stats = {"prefilled": 0, "hinted": 0}
+        # 上次翻译中失败的字幕数（有失败时结果不写入阶段缓存）
+        self.failed_count = 0
+        # 对冲请求：请求耗时超过该端点的p95时再发出一个请求，取先返回的结果
+        self.hedge = hedge
         self._init_thread_pool()
         self.cache_manager = CacheManager(str(CACHE_PATH))
 
@@ -83,8 +133,23 @@ class BaseTranslator(ABC):
             # 分批处理字幕
             chunks = self._split_chunks(subtitle_dict)
 
+            # 加载翻译记忆
+            self._init_memory()
+
             # 多线程翻译
             translated_dict = self._parallel_translate(chunks)
+            if self.memory is not None:
+                logger.info(
+                    f"翻译记忆: 复用译文 {self.memory_stats['prefilled']} 条, "
+                    f"提供参考 {self.memory_stats['hinted']} 条"
+                )
+
+            self.failed_count = sum(
+                is_translation_error(translated_dict.get(str(i)))
+                for i in range(1, len(asr_data.segments) + 1)
+            )
+            if self.failed_count:
+                logger.warning(f"翻译失败的字幕: {self.failed_count} 条")
 
             # 创建新的ASRDataSeg列表
             new_segments = self._create_segments(asr_data.segments, translated_dict)
@@ -95,8 +160,12 @@ class BaseTranslator(ABC):
             raise RuntimeError(f"翻译失败：{str(e)}")
 
     def _split_chunks(self, subtitle_dict: Dict[str, str]) -> List[Dict[str, str]]:
-        """将字幕分割成块"""
+        """将字幕分割成块（增量模式下按内容确定分块边界）"""
         items = list(subtitle_dict.items())
+        if self.incremental:
+            texts = list(subtitle_dict.values())
+            bounds = content_defined_bounds(texts, self.batch_num)
+            return [dict(items[start:end]) for start, end in bounds]
         return [
             dict(items[i : i + self.batch_num])
             for i in range(0, len(items), self.batch_num)
@@ -104,12 +173,14 @@ class BaseTranslator(ABC):
 
     def _parallel_translate(self, chunks: List[Dict[str, str]]) -> Dict[str, str]:
         """并行翻译所有块"""
-        futures = []
+        futures = {}
         translated_dict = {}
 
         for chunk in chunks:
-            future = self.executor.submit(self._safe_translate_chunk, chunk)
-            futures.append(future)
+            future = self.executor.submit(
+                tracing.propagate(self._safe_translate_chunk), chunk
+            )
+            futures[future] = chunk
 
         for future in as_completed(futures):
             if not self.is_running:
@@ -121,16 +192,25 @@ class BaseTranslator(ABC):
             except Exception as e:
                 logger.error(f"翻译块失败：{str(e)}")
                 # 对于失败的块，保留原文
-                for k, v in chunk.items():
+                for k, v in futures[future].items():
                     translated_dict[k] = f"{v}||ERROR"
 
         return translated_dict
 
+    @tracing.traced("translate.chunk")
     def _safe_translate_chunk(self, chunk: Dict[str, str]) -> Dict[str, str]:
         """安全的翻译块，包含重试逻辑"""
+        # 翻译记忆中有相同原文的字幕直接复用译文，只翻译其余字幕
+        prefilled, pending = self._prefill_from_memory(chunk)
         for i in range(self.retry_times):
             try:
-                result = self._translate_chunk(chunk)
+                result = dict(prefilled)
+                if pending:
+                    translated = self._translate_pending(pending)
+                    self._remember(pending, translated)
+                    result.update(translated)
+                # 保持字幕顺序
+                result = {k: result[k] for k in chunk if k in result}
                 if self.update_callback:
                     self.update_callback(result)
                 return result
@@ -140,6 +220,109 @@ class BaseTranslator(ABC):
                 logger.warning(f"翻译重试 {i + 1}/{self.retry_times}: {str(e)}")
         return chunk  # 返回原始块作为默认值
 
+    def _translate_pending(self, chunk: Dict[str, str]) -> Dict[str, str]:
+        """翻译记忆未命中的字幕"""
+        if not self.incremental:
+            return self._translate_chunk(chunk)
+        # 使用相对编号，使缓存键只与分块内容有关
+        keys = list(chunk)
+        if len(keys) == int(keys[-1]) - int(keys[0]) + 1:
+            relative_chunk, offset = to_relative_keys(chunk)
+            return to_absolute_keys(self._translate_chunk(relative_chunk), offset)
+        # 部分字幕已从翻译记忆复用时编号不连续，按位置映射回原编号
+        relative_chunk = {str(i): text for i, text in enumerate(chunk.values(), 1)}
+        result = self._translate_chunk(relative_chunk)
+        return {
+            keys[int(k) - 1]: v
+            for k, v in result.items()
+            if k.isdigit() and 0 < int(k) <= len(keys)
+        }
+
+    def _hedged(
+        self,
+        key: Any,
+        fn: Callable[[], Any],
+        backup_key: Any = None,
+        backup_fn: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """发送请求，开启对冲时慢请求会再发出一个对冲请求"""
+        if not self.hedge:
+            return fn()
+        return hedged_call(key, fn, backup_key, backup_fn)
+
+    def _init_memory(self) -> None:
+        """加载翻译记忆（同一语言在进程内共享）"""
+        if not self.use_memory:
+            return
+        self.memory = get_translation_memory(
+            self.cache_manager, self._memory_languages()
+        )
+        self.memory_stats = {"prefilled": 0, "hinted": 0}
+
+    def _memory_languages(self) -> List[str]:
+        """目标语言在各翻译器缓存参数中的写法"""
+        languages = [self.target_language]
+        lang_map = getattr(self, "lang_map", {})
+        if self.target_language in lang_map:
+            languages.append(lang_map[self.target_language])
+        return languages
+
+    def _memory_origin(self) -> str:
+        """本翻译器译文在翻译记忆中的来源标识，同一来源的译文才会直接复用"""
+        return self.__class__.__name__
+
+    def _count_memory(self, key: str, count: int) -> None:
+        with self._memory_lock:
+            self.memory_stats[key] += count
+
+    def _prefill_from_memory(
+        self, chunk: Dict[str, str]
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        从翻译记忆中复用译文
+
+        Returns:
+            (复用的译文, 需要翻译的字幕)
+        """
+        if self.memory is None:
+            return {}, chunk
+        origin = self._memory_origin()
+        prefilled = {}
+        pending = {}
+        for key, text in chunk.items():
+            matches = self.memory.lookup(text, PREFILL_SIMILARITY, origin=origin)
+            if matches:
+                prefilled[key] = matches[0].translation
+            else:
+                pending[key] = text
+        if prefilled:
+            self._count_memory("prefilled", len(prefilled))
+        return prefilled, pending
+
+    def _memory_hints(
+        self, chunk: Dict[str, str], limit: int = 5
+    ) -> List[TranslationMatch]:
+        """从翻译记忆中查找与字幕块相似的历史翻译，作为参考译文"""
+        if self.memory is None:
+            return []
+        hints: Dict[str, TranslationMatch] = {}
+        for text in chunk.values():
+            for match in self.memory.lookup(text, HINT_SIMILARITY):
+                hints.setdefault(match.source, match)
+        if hints:
+            self._count_memory("hinted", len(hints))
+        return sorted(hints.values(), key=lambda m: -m.similarity)[:limit]
+
+    def _remember(self, chunk: Dict[str, str], result: Dict[str, str]) -> None:
+        """将本次的翻译结果加入翻译记忆"""
+        if self.memory is None:
+            return
+        origin = self._memory_origin()
+        for key, text in chunk.items():
+            translation = result.get(key)
+            if translation:
+                self.memory.add(text, translation, origin)
+
     @staticmethod
     def _create_segments(
         original_segments: List[ASRDataSeg], translated_dict: Dict[str, str]
@@ -185,10 +368,19 @@ class OpenAITranslator(BaseTranslator):
         model: str = "gpt-4o-mini",
         custom_prompt: str = "",
         is_reflect: bool = False,
+        need_optimize: bool = False,
         temperature: float = 0.7,
         timeout: int = 60,
         retry_times: int = 1,
         update_callback: Optional[Callable] = None,
+        incremental: bool = False,
+        use_memory: bool = False,
+        hedge: bool = False,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        hedge_base_url: Optional[str] = None,
+        hedge_api_key: Optional[str] = None,
+        hedge_model: Optional[str] = None,
     ):
         super().__init__(
             thread_num=thread_num,
@@ -197,98 +389,262 @@ class OpenAITranslator(BaseTranslator):
             retry_times=retry_times,
             timeout=timeout,
             update_callback=update_callback,
+            incremental=incremental,
+            use_memory=use_memory,
+            hedge=hedge,
         )
 
-        self._init_client()
+        self._init_client(base_url, api_key)
         self.model = model
         self.custom_prompt = custom_prompt
         self.is_reflect = is_reflect
+        # 融合模式：同一次请求中同时优化原文，结果为 "优化后原文||译文"
+        self.need_optimize = need_optimize
         self.temperature = temperature
+        self.usage_tracker = LLMUsageTracker("翻译")
+        # 备用LLM服务（对冲请求发往备用服务，未配置时重复发往当前服务）
+        self.hedge_client = (
+            get_hedge_client(hedge_base_url, hedge_api_key, hedge_model)
+            if hedge
+            else None
+        )
+        # 翻译结果缺失时二分重试使用的线程池
+        self._bisect_executor = ThreadPoolExecutor(max_workers=thread_num)
 
-    def _init_client(self):
-        """初始化OpenAI客户端"""
-        base_url = os.getenv("OPENAI_BASE_URL")
-        api_key = os.getenv("OPENAI_API_KEY")
+    def _init_client(self, base_url: Optional[str], api_key: Optional[str]):
+        """初始化OpenAI客户端（未传入时读取环境变量 OPENAI_BASE_URL 等）"""
+        base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not (base_url and api_key):
             raise ValueError("环境变量 OPENAI_BASE_URL 和 OPENAI_API_KEY 必须设置")
 
+        self.base_url = base_url
         self.client = OpenAI(base_url=base_url, api_key=api_key)
 
+    def translate_subtitle(self, subtitle_data: Union[str, ASRData]) -> ASRData:
+        """翻译字幕文件，并记录本次翻译的LLM用量"""
+        self.usage_tracker = LLMUsageTracker("翻译")
+        result = super().translate_subtitle(subtitle_data)
+        summary = self.usage_tracker.summary()
+        if summary:
+            logger.info(summary)
+        return result
+
+    def _create_segments(
+        self, original_segments: List[ASRDataSeg], translated_dict: Dict[str, str]
+    ) -> List[ASRDataSeg]:
+        """创建新的字幕段（融合模式下同时更新优化后的原文）"""
+        if not self.need_optimize:
+            return super()._create_segments(original_segments, translated_dict)
+        for i, seg in enumerate(original_segments, 1):
+            value = translated_dict.get(str(i))
+            if value is None:
+                logger.error(f"创建新的字幕段失败：缺少第 {i} 条字幕")
+                seg.translated_text = seg.text
+            elif is_translation_error(value):
+                logger.error(f"第 {i} 条字幕优化翻译失败，保留原文")
+                seg.translated_text = seg.text
+            elif "||" in value:
+                seg.text, seg.translated_text = value.split("||", 1)
+            else:
+                seg.translated_text = value
+        return original_segments
+
     def _translate_chunk(self, subtitle_chunk: Dict[str, str]) -> Dict[str, str]:
         """翻译字幕块"""
+        if self.need_optimize:
+            return self._optimize_and_translate_chunk(subtitle_chunk)
+
         logger.info(
             f"[+]正在翻译字幕：{next(iter(subtitle_chunk))} - {next(reversed(subtitle_chunk))}"
         )
-
-        # 获取提示词
-        if self.is_reflect:
-            prompt = REFLECT_TRANSLATE_PROMPT
-        else:
-            prompt = TRANSLATE_PROMPT
-        prompt = Template(prompt).safe_substitute(
-            target_language=self.target_language, custom_prompt=self.custom_prompt
-        )
-        prompt_hash = hashlib.md5(prompt.encode()).hexdigest()
-
         try:
-            # 检查缓存
-            cache_params = {
-                "target_language": self.target_language,
-                "is_reflect": self.is_reflect,
-                "temperature": self.temperature,
-                "prompt_hash": prompt_hash,
-            }
-            cache_key = f"{json.dumps(subtitle_chunk, ensure_ascii=False)}"
-            cache_result = self.cache_manager.get_llm_result(
+            result = self._translate_batch(subtitle_chunk)
+        except Exception as e:
+            # 请求失败（服务不可用、认证失败等）时二分重试只会增加请求数，直接使用单条翻译
+            logger.warning(f"翻译请求失败，使用单条翻译模式：{str(e)}")
+            return self._translate_chunk_single(subtitle_chunk)
+
+        # 保留结果中有效的字幕，其余字幕二分后重试
+        missing = {k: v for k, v in subtitle_chunk.items() if k not in result}
+        if missing:
+            logger.warning(
+                f"翻译结果缺少 {len(missing)}/{len(subtitle_chunk)} 条字幕，将二分后重试"
+            )
+            result.update(self._translate_bisect(missing))
+        return {k: result[k] for k in subtitle_chunk if k in result}
+
+    def _translate_batch(self, subtitle_chunk: Dict[str, str]) -> Dict[str, str]:
+        """
+        批量翻译字幕块（单次请求）
+
+        Returns:
+            Dict[str, str]: 结果中编号与输入对应的译文，可能缺少部分字幕；
+                只有完整的结果会写入缓存
+        """
+        prompt = self._build_system_prompt(self._translate_prompt_template())
+        cache_params = {
+            "target_language": self.target_language,
+            "is_reflect": self.is_reflect,
+            "temperature": self.temperature,
+            "prompt_hash": self._prompt_hash(prompt),
+        }
+        cache_key = f"{json.dumps(subtitle_chunk, ensure_ascii=False)}"
+        cache_result = self.cache_manager.get_llm_result(
+            cache_key, self.model, **cache_params
+        )
+        if cache_result:
+            return self._normalize_result(json.loads(cache_result), subtitle_chunk)
+
+        # 调用API翻译
+        response = self._call_api(
+            prompt,
+            subtitle_chunk,
+            reference=self.custom_prompt,
+            examples=self._memory_hints(subtitle_chunk),
+        )
+        parsed = json_repair.loads(response.choices[0].message.content)
+        # 处理json_repair可能返回的元组
+        if isinstance(parsed, tuple):
+            parsed = parsed[0]
+        result = self._normalize_result(parsed, subtitle_chunk)
+        if len(result) == len(subtitle_chunk):
+            # 保存到缓存
+            self.cache_manager.set_llm_result(
                 cache_key,
+                json.dumps(parsed, ensure_ascii=False),
                 self.model,
                 **cache_params,
             )
+        return result
 
-            result = {}
-            if cache_result:
-                result = json.loads(cache_result)
-            else:
-                # 调用API翻译
-                response = self._call_api(prompt, subtitle_chunk)
-                # 解析结果
-                parsed_result = json_repair.loads(response.choices[0].message.content)
-                # 处理json_repair可能返回的元组
-                if isinstance(parsed_result, tuple):
-                    result = parsed_result[0]
-                else:
-                    result = parsed_result
-                # 检查翻译结果数量是否匹配
-                if isinstance(result, dict) and len(result) != len(subtitle_chunk):
-                    logger.warning("翻译结果数量不匹配，将使用单条翻译模式重试")
-                    return self._translate_chunk_single(subtitle_chunk)
-                # 保存到缓存
-                self.cache_manager.set_llm_result(
-                    cache_key,
-                    json.dumps(result, ensure_ascii=False),
-                    self.model,
-                    **cache_params,
-                )
+    def _normalize_result(
+        self, result: Any, subtitle_chunk: Dict[str, str]
+    ) -> Dict[str, str]:
+        """从模型返回的结果中取出与输入编号对应的译文"""
+        if not isinstance(result, dict):
+            return {}
+        normalized = {}
+        for key, value in result.items():
+            if key not in subtitle_chunk:
+                continue
+            if isinstance(value, dict):
+                if not self.is_reflect or "revised_translation" not in value:
+                    continue
+                value = value["revised_translation"]
+            normalized[key] = f"{value}"
+        return normalized
+
+    def _translate_bisect(self, subtitle_chunk: Dict[str, str]) -> Dict[str, str]:
+        """
+        二分重试：将字幕块分成两半并行批量翻译，每一半仍有缺失时继续二分，
+        只有单条字幕或请求失败时才使用单条翻译模式
+        """
+        if len(subtitle_chunk) == 1:
+            return self._translate_chunk_single(subtitle_chunk)
+
+        items = list(subtitle_chunk.items())
+        middle = len(items) // 2
+        left, right = dict(items[:middle]), dict(items[middle:])
+        future = self._bisect_executor.submit(
+            tracing.propagate(self._translate_half), left
+        )
+        result = self._translate_half(right)
+        # 另一半还未开始执行时（线程池已满）在当前线程执行，避免互相等待
+        if future.cancel():
+            result.update(self._translate_half(left))
+        else:
+            result.update(future.result())
+        return result
 
-            if isinstance(result, dict):
-                if self.is_reflect:
-                    result = {
-                        k: f"{v.get('revised_translation', v) if isinstance(v, dict) else v}"
-                        for k, v in result.items()
-                    }
-                else:
-                    result = {k: f"{v}" for k, v in result.items()}
+    def _translate_half(self, subtitle_chunk: Dict[str, str]) -> Dict[str, str]:
+        """二分重试中的一半：先批量翻译，结果中缺失的字幕继续二分，请求失败时使用单条翻译"""
+        if len(subtitle_chunk) == 1:
+            return self._translate_chunk_single(subtitle_chunk)
+        try:
+            result = self._translate_batch(subtitle_chunk)
+        except Exception as e:
+            logger.warning(f"翻译请求失败，使用单条翻译模式：{str(e)}")
+            return self._translate_chunk_single(subtitle_chunk)
+        missing = {k: v for k, v in subtitle_chunk.items() if k not in result}
+        if missing:
+            result.update(self._translate_bisect(missing))
+        return result
+
+    def _optimize_and_translate_chunk(
+        self, subtitle_chunk: Dict[str, str]
+    ) -> Dict[str, str]:
+        """
+        融合模式：一次请求同时优化原文并翻译
+
+        Returns:
+            Dict[str, str]: {编号: "优化后原文||译文"}
+        """
+        logger.info(
+            f"[+]正在优化并翻译字幕：{next(iter(subtitle_chunk))} - {next(reversed(subtitle_chunk))}"
+        )
+        prompt = self._build_system_prompt(self._batch_prompt_template())
+        cache_params = {
+            "target_language": self.target_language,
+            "need_optimize": True,
+            "temperature": self.temperature,
+            "prompt_hash": self._prompt_hash(prompt),
+        }
+        cache_key = f"{json.dumps(subtitle_chunk, ensure_ascii=False)}"
+        cache_result = self.cache_manager.get_llm_result(
+            cache_key, self.model, **cache_params
+        )
+        if cache_result:
+            logger.info("使用缓存的优化翻译结果")
+            return json.loads(cache_result)
+
+        response = self._call_api(
+            prompt,
+            subtitle_chunk,
+            reference=self.custom_prompt,
+            examples=self._memory_hints(subtitle_chunk),
+        )
+        parsed = json_repair.loads(response.choices[0].message.content)
+        if isinstance(parsed, tuple):
+            parsed = parsed[0]
+        if not isinstance(parsed, dict):
+            raise ValueError("优化翻译结果不是字典格式")
+
+        optimized = {}
+        translations = {}
+        for key, value in parsed.items():
+            if isinstance(value, dict):
+                optimized[key] = str(value.get("optimized_subtitle", ""))
+                translations[key] = str(value.get("translation", ""))
             else:
-                # 如果结果不是字典，返回原始内容
-                return subtitle_chunk
+                optimized[key] = str(value)
 
+        # 修复优化后原文的对齐问题（与字幕优化相同的对齐修复）
+        aligned_optimized = SubtitleOptimizer._repair_subtitle(
+            subtitle_chunk, optimized
+        )
+        if list(optimized) == list(subtitle_chunk) and len(translations) == len(
+            optimized
+        ):
+            aligned_translations = dict(zip(aligned_optimized, translations.values()))
+        else:
+            # 条目数量不一致时，对修复后的原文重新翻译
+            logger.warning("优化翻译结果数量不匹配，将重新翻译修复后的原文")
+            aligned_translations = self._translate_half(aligned_optimized)
+
+        result = {
+            key: f"{text}||{aligned_translations.get(key, '')}"
+            for key, text in aligned_optimized.items()
+        }
+        if any(map(is_translation_error, result.values())):
             return result
-        except Exception:
-            try:
-                return self._translate_chunk_single(subtitle_chunk)
-            except Exception as e:
-                logger.error(f"翻译失败：{str(e)}")
-                raise RuntimeError(f"OpenAI API调用失败：{str(e)}")
+        self.cache_manager.set_llm_result(
+            cache_key,
+            json.dumps(result, ensure_ascii=False),
+            self.model,
+            **cache_params,
+        )
+        return result
 
     def _translate_chunk_single(self, subtitle_chunk: Dict[str, str]) -> Dict[str, str]:
         """单条翻译模式"""
@@ -338,25 +694,121 @@ class OpenAITranslator(BaseTranslator):
 
         return result
 
-    def _call_api(self, prompt: str, user_content: Union[str, Dict[str, str]]) -> Any:
-        """调用OpenAI API"""
+    def _batch_prompt_template(self) -> str:
+        """批量翻译使用的提示词模板"""
+        if self.need_optimize:
+            return FUSED_OPTIMIZE_TRANSLATE_PROMPT
+        return self._translate_prompt_template()
+
+    def _translate_prompt_template(self) -> str:
+        """只翻译（不优化原文）时使用的提示词模板"""
+        if self.is_reflect:
+            return REFLECT_TRANSLATE_PROMPT
+        return TRANSLATE_PROMPT
+
+    def _memory_origin(self) -> str:
+        """模型和提示词（含自定义提示词）都相同时才直接复用译文"""
+        prompt = self._build_system_prompt(self._batch_prompt_template())
+        return llm_origin(self.model, self._prompt_hash(prompt))
+
+    def _prefill_from_memory(
+        self, chunk: Dict[str, str]
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """融合模式下原文也需要优化，不直接复用译文"""
+        if self.need_optimize:
+            return {}, chunk
+        return super()._prefill_from_memory(chunk)
+
+    def _remember(self, chunk: Dict[str, str], result: Dict[str, str]) -> None:
+        """将本次的翻译结果加入翻译记忆（融合模式下只记录原文未被修改的字幕）"""
+        if self.memory is None:
+            return
+        origin = self._memory_origin()
+        for source, translation in parse_llm_translations(
+            chunk, result, self.need_optimize
+        ):
+            self.memory.add(source, translation, origin)
+
+    def _build_system_prompt(self, template: str) -> str:
+        """
+        生成系统提示词。自定义提示词不放入系统提示词，而是放在用户消息开头（见 _call_api），
+        使同一次处理中所有请求共享相同的前缀，便于服务商的提示词缓存命中
+        """
+        return Template(template).safe_substitute(target_language=self.target_language)
+
+    def _prompt_hash(self, prompt: str) -> str:
+        """提示词（含自定义提示词）的哈希，用于区分缓存"""
+        return hashlib.md5((prompt + (self.custom_prompt or "")).encode()).hexdigest()
+
+    def _call_api(
+        self,
+        prompt: str,
+        user_content: Union[str, Dict[str, str]],
+        reference: str = "",
+        examples: Optional[List[TranslationMatch]] = None,
+    ) -> Any:
+        """
+        调用OpenAI API
+
+        消息顺序为：系统提示词 -> 参考信息（术语、要求） -> 参考译文 -> 字幕内容，
+        参考信息在同一次处理中保持不变，便于提示词缓存命中
+        """
         # 将user_content转换为字符串
         if isinstance(user_content, dict):
             content_str = json.dumps(user_content, ensure_ascii=False)
         else:
             content_str = user_content
+        if examples:
+            # 翻译记忆中相似字幕的历史译文，供保持用词一致
+            lines = "\n".join(f"{m.source} => {m.translation}" for m in examples)
+            content_str = (
+                "Previous translations of similar lines (for consistency, "
+                f"adapt as needed):\n<reference>\n{lines}\n</reference>\n\n"
+                f"{content_str}"
+            )
+        if reference:
+            content_str = (
+                f"Terminology and requirements:\n<prompt>{reference}</prompt>\n\n"
+                f"{content_str}"
+            )
 
         messages: Any = [
             {"role": "system", "content": prompt},
             {"role": "user", "content": content_str},
         ]
 
-        return self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=self.temperature,
-            timeout=self.timeout,
-        )
+        def request(client: OpenAI = self.client, model: str = self.model) -> Any:
+            try:
+                return create_completion(
+                    client,
+                    model=model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    timeout=self.timeout,
+                )
+            except Exception as e:
+                endpoint_health.report_error(client.base_url, client.api_key, model, e)
+                raise
+
+        if self.hedge_client:
+            client, base_url, model = self.hedge_client
+            response = self._hedged(
+                (self.base_url, self.model),
+                request,
+                (base_url, model),
+                lambda: request(client, model),
+            )
+        else:
+            response = self._hedged((self.base_url, self.model), request)
+        self.usage_tracker.record(response)
+        return response
+
+    def stop(self):
+        """停止翻译器"""
+        super().stop()
+        # 初始化失败时（atexit 已注册）线程池可能尚未创建
+        if hasattr(self, "_bisect_executor"):
+            self._bisect_executor.shutdown(wait=False, cancel_futures=True)
 
     def _parse_response(self, response: Any) -> Dict[str, str]:
         """解析API响应"""
@@ -396,6 +848,9 @@ class GoogleTranslator(BaseTranslator):
         retry_times: int = 1,
         timeout: int = 20,
         update_callback: Optional[Callable] = None,
+        incremental: bool = False,
+        use_memory: bool = False,
+        hedge: bool = False,
     ):
         super().__init__(
             thread_num=thread_num,
@@ -404,9 +859,16 @@ class GoogleTranslator(BaseTranslator):
             retry_times=retry_times,
             timeout=timeout,
             update_callback=update_callback,
+            incremental=incremental,
+            use_memory=use_memory,
+            hedge=hedge,
         )
         self.session = requests.Session()
-        self.endpoint = "http://translate.google.com/m"
+        self.endpoint = os.getenv(
+            "GOOGLE_TRANSLATE_ENDPOINT", "http://translate.google.com/m"
+        )
+        # 多行合并请求的状态（翻译服务不保留换行时改为逐行请求）
+        self.line_state = new_line_state()
         self.headers = {
             "User-Agent": "Mozilla/4.0 (compatible;MSIE 6.0;Windows NT 5.1;SV1;.NET CLR 1.1.4322;.NET CLR 2.0.50727;.NET CLR 3.0.04506.30)"
         }
@@ -425,61 +887,72 @@ class GoogleTranslator(BaseTranslator):
             "土耳其语": "tr",
         }
 
+    def _memory_origin(self) -> str:
+        return TranslatorType.GOOGLE.value
+
     def _translate_chunk(self, subtitle_chunk: Dict[str, str]) -> Dict[str, str]:
-        """翻译字幕块"""
+        """翻译字幕块（多行合并为一次请求）"""
         result = {}
         if self.target_language in self.lang_map.values():
             target_lang = self.target_language
         else:
             target_lang = self.lang_map.get(self.target_language, "zh-CN")
 
+        # 检查缓存
+        cache_params = {"target_language": target_lang}
+        pending = {}
         for idx, text in subtitle_chunk.items():
-            try:
-                # 检查缓存
-                cache_params = {"target_language": target_lang}
-                cache_result = self.cache_manager.get_translation(
-                    text, TranslatorType.GOOGLE.value, **cache_params
-                )
-
-                if cache_result:
-                    result[idx] = cache_result
-                    logger.info(f"使用缓存的Google翻译结果：{idx}")
-                    continue
-
-                text = text[:5000]  # google translate max length
-                response = self.session.get(
-                    self.endpoint,
-                    params={"tl": target_lang, "sl": "auto", "q": text},
-                    headers=self.headers,
-                    timeout=self.timeout,
-                )
-
-                if response.status_code == 400:
-                    result[idx] = "TRANSLATION ERROR"
-                    continue
-
-                response.raise_for_status()
-                re_result = re.findall(
-                    r'(?s)class="(?:t0|result-container)">(.*?)<', response.text
-                )
-                if re_result:
-                    translated_text = html.unescape(re_result[0])
-                    # 保存到缓存
-                    self.cache_manager.set_translation(
-                        text,
-                        translated_text,
-                        TranslatorType.GOOGLE.value,
-                        **cache_params,
-                    )
-                    result[idx] = translated_text
-                else:
-                    result[idx] = "ERROR"
-                    logger.warning(f"无法从Google翻译响应中提取翻译结果: {idx}")
-            except Exception as e:
-                logger.error(f"Google翻译失败 {idx}: {str(e)}")
+            cache_result = self.cache_manager.get_translation(
+                text, TranslatorType.GOOGLE.value, **cache_params
+            )
+            if cache_result:
+                result[idx] = cache_result
+                logger.info(f"使用缓存的Google翻译结果：{idx}")
+            else:
+                pending[idx] = text
+
+        translations = translate_lines(
+            list(pending.values()),
+            lambda text: self._hedged(
+                (self.endpoint, TranslatorType.GOOGLE.value),
+                lambda: self._request(text, target_lang),
+            ),
+            max_chars=GOOGLE_MAX_QUERY_LENGTH,
+            measure=lambda text: len(quote(text)),
+            state=self.line_state,
+        )
+        for (idx, text), translated_text in zip(pending.items(), translations):
+            if translated_text is None:
                 result[idx] = "ERROR"
+                continue
+            # 保存到缓存
+            self.cache_manager.set_translation(
+                text,
+                translated_text,
+                TranslatorType.GOOGLE.value,
+                **cache_params,
+            )
+            result[idx] = translated_text
         return result
 
+    def _request(self, text: str, target_lang: str) -> str:
+        """请求谷歌翻译，返回译文"""
+        response = self.session.get(
+            self.endpoint,
+            params={"tl": target_lang, "sl": "auto", "q": text},
+            headers=self.headers,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        re_result = re.findall(
+            r'(?s)class="(?:t0|result-container)">(.*?)</div>', response.text
+        )
+        if not re_result:
+            raise ValueError("无法从Google翻译响应中提取翻译结果")
+        # 多行合并请求的译文中换行可能以 <br> 表示，去除其余标签
+        text = re.sub(r"(?i)<br\s*/?>", "\n", re_result[0])
+        return html.unescape(re.sub(r"<[^>]+>", "", text))
+
 
 class BingTranslator(BaseTranslator):
     """必应翻译器"""
@@ -492,6 +965,9 @@ class BingTranslator(BaseTranslator):
         retry_times: int = 1,
         timeout: int = 20,
         update_callback: Optional[Callable] = None,
+        incremental: bool = False,
+        use_memory: bool = False,
+        hedge: bool = False,
     ):
         super().__init__(
             thread_num=thread_num,
@@ -500,6 +976,9 @@ class BingTranslator(BaseTranslator):
             retry_times=retry_times,
             timeout=timeout,
             update_callback=update_callback,
+            incremental=incremental,
+            use_memory=use_memory,
+            hedge=hedge,
         )
         self.session = requests.Session()
         self.auth_endpoint = "https://edge.microsoft.com/translate/auth"
@@ -544,6 +1023,9 @@ class BingTranslator(BaseTranslator):
             logger.error(f"初始化必应翻译会话失败: {str(e)}")
             raise RuntimeError(f"初始化必应翻译会话失败: {str(e)}")
 
+    def _memory_origin(self) -> str:
+        return TranslatorType.BING.value
+
     def _translate_chunk(self, subtitle_chunk: Dict[str, str]) -> Dict[str, str]:
         """翻译字幕块"""
         result = {}
@@ -631,6 +1113,10 @@ class DeepLXTranslator(BaseTranslator):
         retry_times: int = 1,
         timeout: int = 20,
         update_callback: Optional[Callable] = None,
+        incremental: bool = False,
+        use_memory: bool = False,
+        hedge: bool = False,
+        endpoint: Optional[str] = None,
     ):
         super().__init__(
             thread_num=thread_num,
@@ -639,9 +1125,16 @@ class DeepLXTranslator(BaseTranslator):
             retry_times=retry_times,
             timeout=timeout,
             update_callback=update_callback,
+            incremental=incremental,
+            use_memory=use_memory,
+            hedge=hedge,
         )
         self.session = requests.Session()
-        self.endpoint = os.getenv("DEEPLX_ENDPOINT", "https://api.deeplx.org/translate")
+        self.endpoint = endpoint or os.getenv(
+            "DEEPLX_ENDPOINT", "https://api.deeplx.org/translate"
+        )
+        # 多行合并请求的状态（翻译服务不保留换行时改为逐行请求）
+        self.line_state = new_line_state()
         self.lang_map = {
             "简体中文": "zh",
             "繁体中文": "zh-TW",
@@ -664,53 +1157,67 @@ class DeepLXTranslator(BaseTranslator):
             "Russian": "ru",
         }
 
+    def _memory_origin(self) -> str:
+        return TranslatorType.DEEPLX.value
+
     def _translate_chunk(self, subtitle_chunk: Dict[str, str]) -> Dict[str, str]:
-        """翻译字幕块"""
+        """翻译字幕块（多行合并为一次请求）"""
         result = {}
         if self.target_language in self.lang_map.values():
             target_lang = self.target_language
         else:
             target_lang = self.lang_map.get(self.target_language, "zh").lower()
 
+        # 检查缓存
+        cache_params = {
+            "target_language": target_lang,
+            "endpoint": self.endpoint,
+        }
+        pending = {}
         for idx, text in subtitle_chunk.items():
-            try:
-                # 检查缓存
-                cache_params = {
-                    "target_language": target_lang,
-                    "endpoint": self.endpoint,
-                }
-                cache_result = self.cache_manager.get_translation(
-                    text, TranslatorType.DEEPLX.value, **cache_params
-                )
-
-                if cache_result:
-                    result[idx] = cache_result
-                    logger.info(f"使用缓存的DeepLX翻译结果：{idx}")
-                    continue
-
-                response = self.session.post(
-                    self.endpoint,
-                    json={
-                        "text": text,
-                        "source_lang": "auto",
-                        "target_lang": target_lang,
-                    },
-                    timeout=self.timeout,
-                )
-                response.raise_for_status()
-                translated_text = response.json()["data"]
-
-                # 保存到缓存
-                self.cache_manager.set_translation(
-                    text, translated_text, TranslatorType.DEEPLX.value, **cache_params
-                )
-
-                result[idx] = translated_text
-            except Exception as e:
-                logger.error(f"DeepLX翻译失败 {idx}: {str(e)}")
+            cache_result = self.cache_manager.get_translation(
+                text, TranslatorType.DEEPLX.value, **cache_params
+            )
+            if cache_result:
+                result[idx] = cache_result
+                logger.info(f"使用缓存的DeepLX翻译结果：{idx}")
+            else:
+                pending[idx] = text
+
+        translations = translate_lines(
+            list(pending.values()),
+            lambda text: self._hedged(
+                (self.endpoint, TranslatorType.DEEPLX.value),
+                lambda: self._request(text, target_lang),
+            ),
+            max_chars=DEEPLX_MAX_TEXT_LENGTH,
+            state=self.line_state,
+        )
+        for (idx, text), translated_text in zip(pending.items(), translations):
+            if translated_text is None:
                 result[idx] = "ERROR"
+                continue
+            # 保存到缓存
+            self.cache_manager.set_translation(
+                text, translated_text, TranslatorType.DEEPLX.value, **cache_params
+            )
+            result[idx] = translated_text
         return result
 
+    def _request(self, text: str, target_lang: str) -> str:
+        """请求DeepLX翻译，返回译文"""
+        response = self.session.post(
+            self.endpoint,
+            json={
+                "text": text,
+                "source_lang": "auto",
+                "target_lang": target_lang,
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()["data"]
+
 
 class TranslatorFactory:
     """翻译器工厂类"""
@@ -725,9 +1232,23 @@ class TranslatorFactory:
         custom_prompt: str = "",
         temperature: float = 0.7,
         is_reflect: bool = False,
+        need_optimize: bool = False,
         update_callback: Optional[Callable] = None,
+        incremental: bool = False,
+        use_memory: bool = False,
+        hedge: bool = False,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        hedge_base_url: Optional[str] = None,
+        hedge_api_key: Optional[str] = None,
+        hedge_model: Optional[str] = None,
+        deeplx_endpoint: Optional[str] = None,
     ) -> BaseTranslator:
-        """创建翻译器实例"""
+        """
+        创建翻译器实例
+
+        LLM服务地址、API Key 和 DeepLX 接口地址未传入时读取对应的环境变量
+        """
         try:
             if translator_type == TranslatorType.OPENAI:
                 return OpenAITranslator(
@@ -737,16 +1258,29 @@ class TranslatorFactory:
                     model=model,
                     custom_prompt=custom_prompt,
                     is_reflect=is_reflect,
+                    need_optimize=need_optimize,
                     temperature=temperature,
                     update_callback=update_callback,
+                    incremental=incremental,
+                    use_memory=use_memory,
+                    hedge=hedge,
+                    base_url=base_url,
+                    api_key=api_key,
+                    hedge_base_url=hedge_base_url,
+                    hedge_api_key=hedge_api_key,
+                    hedge_model=hedge_model,
                 )
             elif translator_type == TranslatorType.GOOGLE:
-                batch_num = 5
+                # 每个分块合并为一次（超长时为几次）请求
+                batch_num = 20
                 return GoogleTranslator(
                     thread_num=thread_num,
                     batch_num=batch_num,
                     target_language=target_language,
                     update_callback=update_callback,
+                    incremental=incremental,
+                    use_memory=use_memory,
+                    hedge=hedge,
                 )
             elif translator_type == TranslatorType.BING:
                 batch_num = 10
@@ -755,14 +1289,21 @@ class TranslatorFactory:
                     batch_num=batch_num,
                     target_language=target_language,
                     update_callback=update_callback,
+                    incremental=incremental,
+                    use_memory=use_memory,
+                    hedge=hedge,
                 )
             elif translator_type == TranslatorType.DEEPLX:
-                batch_num = 5
+                batch_num = 20
                 return DeepLXTranslator(
                     thread_num=thread_num,
                     batch_num=batch_num,
                     target_language=target_language,
                     update_callback=update_callback,
+                    incremental=incremental,
+                    use_memory=use_memory,
+                    hedge=hedge,
+                    endpoint=deeplx_endpoint,
                 )
             else:
                 raise ValueError(f"不支持的翻译器类型：{translator_type}")
@@ -1,14 +1,12 @@
 import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
-from app.common.config import cfg
 from app.config import MODEL_PATH, SUBTITLE_STYLE_PATH
 from app.core.entities import (
     LANGUAGES,
     FullProcessTask,
     LLMServiceEnum,
-    SplitTypeEnum,
     SubtitleConfig,
     SubtitleTask,
     SynthesisConfig,
@@ -18,6 +16,30 @@ from app.core.entities import (
     TranscriptAndSubtitleTask,
 )
 
+# 创建任务时读取的配置，默认为图形界面的配置（app.common.config.cfg）
+_config: Any = None
+
+
+def set_config(config: Any) -> None:
+    """
+    设置创建任务时读取的配置（命令行模式使用不依赖Qt的 HeadlessConfig）
+
+    Args:
+        config: 提供 config.<配置项>.value 接口的配置对象
+    """
+    global _config
+    _config = config
+
+
+def get_config() -> Any:
+    """获取创建任务时读取的配置，未设置时使用图形界面的配置"""
+    global _config
+    if _config is None:
+        from app.common.config import cfg
+
+        _config = cfg
+    return _config
+
 
 class TaskFactory:
     """任务工厂类，用于创建各种类型的任务"""
@@ -42,6 +64,7 @@ class TaskFactory:
         file_path: str, need_next_task: bool = False
     ) -> TranscribeTask:
         """创建转录任务"""
+        cfg = get_config()
 
         # 根据是否需要分段来决定是否需要词级时间戳
 
@@ -65,6 +88,7 @@ class TaskFactory:
             transcribe_model=cfg.transcribe_model.value,
             transcribe_language=LANGUAGES[cfg.transcribe_language.value.value],
             use_asr_cache=cfg.use_asr_cache.value,
+            use_stage_cache=cfg.use_stage_cache.value,
             need_word_time_stamp=need_word_time_stamp,
             # Whisper Cpp 配置
             whisper_model=cfg.whisper_model.value,
@@ -99,6 +123,7 @@ class TaskFactory:
         file_path: str, video_path: Optional[str] = None, need_next_task: bool = False
     ) -> SubtitleTask:
         """创建字幕任务"""
+        cfg = get_config()
         output_name = (
             Path(file_path).stem.replace("【原始字幕】", "").replace("【下载字幕】", "")
         )
@@ -116,11 +141,6 @@ class TaskFactory:
                 Path(file_path).parent / f"【字幕】{output_name}{suffix}.srt"
             )
 
-        if cfg.split_type.value == SplitTypeEnum.SENTENCE.value:
-            split_type = "sentence"
-        else:
-            split_type = "semantic"
-
         # 根据当前选择的LLM服务获取对应的配置
         current_service = cfg.llm_service.value
         if current_service == LLMServiceEnum.OPENAI:
@@ -169,11 +189,7 @@ class TaskFactory:
             # 翻译服务
             translator_service=cfg.translator_service.value,
             # 字幕处理
-            split_type=(
-                SplitTypeEnum.SENTENCE
-                if split_type == "sentence"
-                else SplitTypeEnum.SEMANTIC
-            ),
+            split_type=cfg.split_type.value,
             need_reflect=cfg.need_reflect_translate.value,
             need_translate=cfg.need_translate.value,
             need_optimize=cfg.need_optimize.value,
@@ -194,6 +210,19 @@ class TaskFactory:
             need_remove_punctuation=cfg.needs_remove_punctuation.value,
             # 字幕提示
             custom_prompt_text=cfg.custom_prompt_text.value,
+            # 增量处理
+            incremental_process=cfg.incremental_process.value,
+            # 优化与翻译合并请求
+            fuse_optimize_translate=cfg.fuse_optimize_translate.value,
+            # 翻译记忆
+            use_translation_memory=cfg.use_translation_memory.value,
+            # 对冲请求
+            hedge_requests=cfg.hedge_requests.value,
+            hedge_base_url=cfg.hedge_api_base.value,
+            hedge_api_key=cfg.hedge_api_key.value,
+            hedge_model=cfg.hedge_model.value,
+            # 阶段缓存
+            use_stage_cache=cfg.use_stage_cache.value,
         )
 
         return SubtitleTask(
@@ -210,6 +239,7 @@ class TaskFactory:
         video_path: str, subtitle_path: str, need_next_task: bool = False
     ) -> SynthesisTask:
         """创建视频合成任务"""
+        cfg = get_config()
         if need_next_task:
             output_path = str(
                 Path(video_path).parent / f"【卡卡】{Path(video_path).stem}.mp4"
@@ -222,6 +252,7 @@ class TaskFactory:
         config = SynthesisConfig(
             need_video=cfg.need_video.value,
             soft_subtitle=cfg.soft_subtitle.value,
+            use_stage_cache=cfg.use_stage_cache.value,
         )
 
         return SynthesisTask(
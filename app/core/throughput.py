@@ -0,0 +1,384 @@
+"""
+阶段耗时模型：记录每个阶段的耗时和输入特征（时长、字幕条数、字符数、模型、设备），
+按历史记录估计新任务各阶段的耗时，用于批量处理的进度、剩余时间和短任务优先调度
+"""
+
+import os
+import shutil
+import statistics
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config import CACHE_PATH
+from app.core.entities import (
+    SubtitleConfig,
+    SynthesisConfig,
+    TranscribeConfig,
+    TranscribeModelEnum,
+)
+from app.core.storage.timing_store import TimingRecord, TimingStore
+from app.core.utils.logger import setup_logger
+
+logger = setup_logger("throughput")
+
+# 没有历史记录时，每秒音视频需要的处理时间（秒）
+DEFAULT_SECONDS_PER_MEDIA_SECOND = {
+    "download": 0.05,
+    "transcribe": 0.3,
+    "subtitle": 0.15,
+    "synthesize": 0.5,
+}
+# 时长未知且没有历史记录时的阶段耗时（秒）
+DEFAULT_STAGE_SECONDS = 60.0
+# 同一配置的记录少于该数量时，使用该阶段所有配置的记录
+MIN_SAMPLES = 3
+# 拟合时使用的最近记录数
+HISTORY_LIMIT = 200
+
+SUBTITLE_SUFFIXES = {".srt", ".vtt", ".ass", ".json"}
+
+
+def _media_seconds(path: str) -> float:
+    from app.core.utils.video_utils import get_video_info
+
+    if not shutil.which("ffmpeg"):
+        return 0.0
+    info = get_video_info(path)
+    return float(info["duration_seconds"]) if info else 0.0
+
+
+def _subtitle_features(path: str) -> Dict[str, float]:
+    from app.core.bk_asr.asr_data import ASRData
+
+    segments = ASRData.from_subtitle_file(path).segments
+    return {
+        "media_seconds": max((seg.end_time for seg in segments), default=0) / 1000,
+        "segments": len(segments),
+        "chars": sum(len(seg.text) for seg in segments),
+    }
+
+
+_features_cache: Dict[Tuple[str, float, int], Dict[str, float]] = {}
+_features_lock = threading.Lock()
+
+
+def input_features(path: Optional[str]) -> Dict[str, float]:
+    """
+    输入文件的特征（按文件路径、修改时间和大小缓存）
+
+    Args:
+        path: 音视频或字幕文件
+
+    Returns:
+        {"media_seconds": 时长, "segments": 字幕条数, "chars": 字幕字符数}，
+        音视频文件没有字幕条数和字符数
+    """
+    if not path or not os.path.isfile(path):
+        return {}
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+    with _features_lock:
+        cached = _features_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        if Path(path).suffix.lower() in SUBTITLE_SUFFIXES:
+            features = _subtitle_features(path)
+        else:
+            features = {"media_seconds": _media_seconds(path)}
+    except Exception as e:
+        logger.warning(f"读取文件特征失败: {path}: {e}")
+        features = {}
+    with _features_lock:
+        _features_cache[key] = features
+    return features
+
+
+def stage_profile(stage: str, config: Any) -> str:
+    """
+    阶段中影响处理速度的配置（模型、设备等），相同配置的记录一起拟合
+
+    Args:
+        stage: 阶段名称
+        config: 阶段的配置（TranscribeConfig、SubtitleConfig 或 SynthesisConfig）
+
+    Returns:
+        str: 配置描述
+    """
+    if isinstance(config, TranscribeConfig):
+        model = config.transcribe_model
+        parts = [model.value if model else ""]
+        if model == TranscribeModelEnum.FASTER_WHISPER:
+            parts.append(getattr(config.faster_whisper_model, "value", ""))
+            parts.append(config.faster_whisper_device)
+        elif model == TranscribeModelEnum.WHISPER_CPP:
+            parts.append(getattr(config.whisper_model, "value", ""))
+        elif model == TranscribeModelEnum.WHISPER_API:
+            parts.append(config.whisper_api_model or "")
+        return "/".join(parts)
+    if isinstance(config, SubtitleConfig):
+        steps = [
+            name
+            for name, enabled in (
+                ("split", config.need_split),
+                ("optimize", config.need_optimize),
+                ("translate", config.need_translate),
+                ("reflect", config.need_translate and config.need_reflect),
+            )
+            if enabled
+        ]
+        translator = config.translator_service
+        return "/".join(
+            [
+                config.llm_model or "",
+                translator.value if translator and config.need_translate else "",
+                "+".join(steps),
+            ]
+        )
+    if isinstance(config, SynthesisConfig):
+        if not config.need_video:
+            return "none"
+        return "soft" if config.soft_subtitle else "hard"
+    return stage
+
+
+def _fit(xs: List[float], ys: List[float]) -> Tuple[float, float]:
+    """
+    拟合 耗时 = a + b * x（a、b 不小于0）
+
+    Returns:
+        (固定耗时 a, 单位耗时 b)
+    """
+    if not any(xs):
+        return statistics.median(ys), 0.0
+    n = len(xs)
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x > 0:
+        b = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+        a = mean_y - b * mean_x
+        if a >= 0 and b >= 0:
+            return a, b
+    # 样本不足以拟合固定耗时时，按比例估计
+    return 0.0, sum(ys) / sum(xs)
+
+
+class ThroughputModel:
+    """
+    按历史耗时估计阶段耗时
+
+    每个 (阶段, 配置) 用最近的记录拟合 耗时 = 固定耗时 + 单位耗时 * 输入量，
+    输入量为音视频时长；字幕处理阶段在字幕字符数已知时使用字符数（与LLM的token数成正比）。
+    同一配置的记录不足时使用该阶段所有配置的记录，没有记录时使用默认的处理速度。
+
+    使用示例:
+        model = get_throughput_model()
+        seconds = model.estimate("transcribe", "FasterWhisper ✨/large-v2/cuda", {"media_seconds": 600})
+    """
+
+    def __init__(self, store: Optional[TimingStore] = None):
+        self.store = store
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, Optional[str]], List[TimingRecord]] = {}
+
+    def record(
+        self, stage: str, profile: str, features: Dict[str, float], seconds: float
+    ) -> None:
+        """
+        记录一次阶段执行的耗时
+
+        Args:
+            stage: 阶段名称
+            profile: 配置（stage_profile 的结果）
+            features: 输入特征（input_features 的结果）
+            seconds: 耗时
+        """
+        record = TimingRecord(
+            stage,
+            profile,
+            float(features.get("media_seconds", 0)),
+            int(features.get("segments", 0)),
+            int(features.get("chars", 0)),
+            seconds,
+        )
+        if self.store:
+            try:
+                self.store.add(record)
+            except Exception as e:
+                logger.warning(f"保存阶段耗时失败: {e}")
+        with self._lock:
+            for key in ((stage, profile), (stage, None)):
+                if key in self._samples:
+                    samples = self._samples[key]
+                    samples.insert(0, record)
+                    del samples[HISTORY_LIMIT:]
+
+    def estimate(self, stage: str, profile: str, features: Dict[str, float]) -> float:
+        """
+        估计阶段耗时（秒）
+
+        Args:
+            stage: 阶段名称
+            profile: 配置
+            features: 输入特征
+
+        Returns:
+            float: 估计的耗时
+        """
+        samples = self._load(stage, profile)
+        if len(samples) < MIN_SAMPLES:
+            samples = self._load(stage, None) or samples
+        media_seconds = float(features.get("media_seconds", 0))
+        if not samples:
+            if media_seconds <= 0:
+                return DEFAULT_STAGE_SECONDS
+            rate = DEFAULT_SECONDS_PER_MEDIA_SECOND.get(stage, 0.2)
+            return media_seconds * rate
+
+        feature = "media_seconds"
+        chars = [s for s in samples if s.chars > 0]
+        if features.get("chars") and len(chars) >= MIN_SAMPLES:
+            feature, samples = "chars", chars
+        a, b = _fit(
+            [float(getattr(s, feature)) for s in samples], [s.seconds for s in samples]
+        )
+        return a + b * float(features.get(feature, 0))
+
+    def record_task(self, stage: str, task: Any, seconds: float) -> None:
+        """记录转录、字幕处理或视频合成任务的耗时（输入特征从任务中读取）"""
+        try:
+            path, config = _task_input(stage, task)
+            self.record(
+                stage, stage_profile(stage, config), input_features(path), seconds
+            )
+        except Exception as e:
+            logger.warning(f"记录阶段耗时失败: {e}")
+
+    def estimate_task(self, stage: str, file_path: str, config: Any) -> float:
+        """估计处理文件的阶段耗时（输入特征从文件中读取）"""
+        return self.estimate(
+            stage, stage_profile(stage, config), input_features(file_path)
+        )
+
+    def _load(self, stage: str, profile: Optional[str]) -> List[TimingRecord]:
+        key = (stage, profile)
+        with self._lock:
+            samples = self._samples.get(key)
+        if samples is None:
+            samples = []
+            if self.store:
+                try:
+                    samples = self.store.recent(stage, profile, HISTORY_LIMIT)
+                except Exception as e:
+                    logger.warning(f"读取阶段耗时失败: {e}")
+            with self._lock:
+                samples = self._samples.setdefault(key, samples)
+        return list(samples)
+
+
+def _task_input(stage: str, task: Any) -> Tuple[Optional[str], Any]:
+    """阶段任务的输入文件和配置"""
+    if stage == "transcribe":
+        return task.file_path, task.transcribe_config
+    if stage == "subtitle":
+        return task.subtitle_path, task.subtitle_config
+    if stage == "synthesize":
+        return task.video_path, task.synthesis_config
+    raise ValueError(f"未知的阶段: {stage}")
+
+
+def estimate_stages(
+    file_path: str,
+    stages: Iterable[str],
+    create_task: Optional[Callable[..., Any]] = None,
+) -> Dict[str, float]:
+    """
+    估计处理文件的各阶段耗时
+
+    Args:
+        file_path: 输入文件（音视频或字幕）
+        stages: 阶段名称
+        create_task: 创建阶段任务的函数 create_task(TaskFactory方法名, *参数)，
+                     默认直接调用 TaskFactory（读取 task_factory 当前的配置）
+
+    Returns:
+        Dict[str, float]: 阶段名称 -> 估计耗时（秒），估计失败时返回空字典
+    """
+    from app.core.task_factory import TaskFactory
+
+    def create_task_default(method: str, *args: Any) -> Any:
+        return getattr(TaskFactory, method)(*args)
+
+    create_task = create_task or create_task_default
+    model = get_throughput_model()
+    estimates: Dict[str, float] = {}
+    try:
+        for stage in stages:
+            if stage == "transcribe":
+                task = create_task("create_transcribe_task", file_path)
+                config = task.transcribe_config
+            elif stage == "subtitle":
+                config = create_task("create_subtitle_task", file_path).subtitle_config
+            elif stage == "synthesize":
+                task = create_task("create_synthesis_task", file_path, file_path)
+                config = task.synthesis_config
+            else:
+                config = None
+            estimates[stage] = model.estimate_task(stage, file_path, config)
+    except Exception as e:
+        logger.warning(f"估计任务耗时失败: {file_path}: {e}")
+        return {}
+    return estimates
+
+
+def stage_ranges(
+    stages: List[str], estimates: Optional[Dict[str, float]] = None
+) -> Dict[str, Tuple[int, int]]:
+    """
+    各阶段在任务总进度中的区间（按估计耗时分配，没有估计时平均分配）
+
+    Args:
+        stages: 阶段名称（按执行顺序）
+        estimates: 各阶段的估计耗时
+
+    Returns:
+        Dict[str, Tuple[int, int]]: 阶段名称 -> (开始进度, 结束进度)
+    """
+    weights = [max((estimates or {}).get(stage, 0.0), 0.0) for stage in stages]
+    if not sum(weights):
+        weights = [1.0] * len(stages)
+    total = sum(weights)
+    ranges: Dict[str, Tuple[int, int]] = {}
+    done = 0.0
+    for stage, weight in zip(stages, weights):
+        start = round(done / total * 100)
+        done += weight
+        ranges[stage] = (start, round(done / total * 100))
+    return ranges
+
+
+def format_eta(seconds: float) -> str:
+    """格式化剩余时间，如 1:05:03、4:32"""
+    seconds = max(0, int(round(seconds)))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+_model: Optional[ThroughputModel] = None
+_model_lock = threading.Lock()
+
+
+def get_throughput_model() -> ThroughputModel:
+    """获取进程内共享的耗时模型（记录保存在缓存数据库中）"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            from app.core.storage.database import DatabaseManager
+
+            _model = ThroughputModel(TimingStore(DatabaseManager(str(CACHE_PATH))))
+        return _model
@@ -1,23 +1,17 @@
 import re
 from typing import Dict, Optional
 
+from .text_metrics import get_text_metrics, is_east_asian_char
+
 
 def is_mainly_cjk(text: str) -> bool:
     """
     判断文本是否主要由中日韩文字组成
     """
-    # 定义CJK字符的Unicode范围
-    cjk_patterns = [
-        r"[\u4e00-\u9fff]",  # 中日韩统一表意文字
-        r"[\u3040-\u309f]",  # 平假名
-        r"[\u30a0-\u30ff]",  # 片假名
-        r"[\uac00-\ud7af]",  # 韩文音节
-    ]
-    cjk_count = 0
-    for pattern in cjk_patterns:
-        cjk_count += len(re.findall(pattern, text))
-    total_chars = len("".join(text.split()))
-    return cjk_count / total_chars > 0.4 if total_chars > 0 else False
+    metrics = get_text_metrics(text)
+    if metrics.non_space_count == 0:
+        return False
+    return metrics.east_asian_count / metrics.non_space_count > 0.4
 
 
 def parse_ass_info(ass_content: str) -> tuple[int, Dict[str, int]]:
@@ -81,7 +75,7 @@ def estimate_text_width(text: str, font_size: int) -> int:
     # 英文字符宽度约为字体大小的一半
     width = 0
     for char in text:
-        if re.match(r"[\u4e00-\u9fff\u3040-\u309f\u30a0-\u30ff\uac00-\ud7af]", char):
+        if is_east_asian_char(char):
             width += font_size
         else:
             width += font_size * 0.5
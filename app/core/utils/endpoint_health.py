@@ -0,0 +1,177 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+import openai
+
+from app.core.utils.logger import setup_logger
+from app.core.utils.test_opanai import test_openai
+
+logger = setup_logger("endpoint_health")
+
+# LLM服务检测结果的缓存配置
+ENDPOINT_HEALTH_TTL = 30 * 60  # 检测通过的结果有效期（秒）
+ENDPOINT_REFRESH_AFTER = 20 * 60  # 超过该时间后使用缓存结果，同时在后台重新检测（秒）
+
+# 不说明服务本身有问题的错误（限流、请求内容有误），不使检测结果失效
+_REQUEST_ERRORS = (openai.RateLimitError, openai.BadRequestError)
+
+EndpointKey = Tuple[str, str, str]
+
+
+@dataclass
+class _Health:
+    checked_at: float
+    message: Optional[str]
+
+
+def endpoint_key(base_url: str, api_key: str, model: str) -> EndpointKey:
+    """(服务地址, API Key的哈希, 模型)，不在内存中保存API Key原文"""
+    key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    return str(base_url).rstrip("/"), key_hash, model
+
+
+class EndpointHealthCache:
+    """
+    缓存LLM服务的检测结果（线程安全）
+
+    检测通过后在 ttl 内直接返回缓存结果；超过 refresh_after 后在后台重新检测。
+    实际请求出现服务级别的错误（连接失败、认证失败、模型不存在等）时，
+    通过 report_error 使结果失效，下一次检查会重新同步检测。检测失败的结果不缓存。
+
+    使用示例:
+        ok, message = endpoint_health.check(base_url, api_key, model)
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[str, str, str], Tuple[bool, Optional[str]]] = test_openai,
+        ttl: float = ENDPOINT_HEALTH_TTL,
+        refresh_after: float = ENDPOINT_REFRESH_AFTER,
+    ):
+        self.probe = probe
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        self._lock = threading.Lock()
+        self._entries: Dict[EndpointKey, _Health] = {}
+        self._probe_locks: Dict[EndpointKey, threading.Lock] = {}
+        self._refreshing: Set[EndpointKey] = set()
+
+    def check(
+        self, base_url: str, api_key: str, model: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        检查LLM服务是否可用，优先使用缓存的检测结果
+
+        Args:
+            base_url: 服务地址
+            api_key: API Key
+            model: 模型
+
+        Returns:
+            (是否可用, 错误信息或模型的回复)
+        """
+        key = endpoint_key(base_url, api_key, model)
+        cached = self._get_fresh(key, base_url, api_key, model)
+        if cached is not None:
+            return True, cached.message
+
+        # 同一服务同时只检测一次，其余等待检测结果
+        with self._lock:
+            probe_lock = self._probe_locks.setdefault(key, threading.Lock())
+        with probe_lock:
+            cached = self._get_fresh(key, base_url, api_key, model)
+            if cached is not None:
+                return True, cached.message
+            return self._probe(key, base_url, api_key, model)
+
+    def _get_fresh(
+        self, key: EndpointKey, base_url: str, api_key: str, model: str
+    ) -> Optional[_Health]:
+        """返回有效期内的检测结果，快过期时在后台刷新"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry.checked_at >= self.ttl:
+                return None
+            refresh = (
+                now - entry.checked_at >= self.refresh_after
+                and key not in self._refreshing
+            )
+            if refresh:
+                self._refreshing.add(key)
+        if refresh:
+            threading.Thread(
+                target=self._refresh,
+                args=(key, base_url, api_key, model),
+                daemon=True,
+            ).start()
+        return entry
+
+    def _probe(
+        self, key: EndpointKey, base_url: str, api_key: str, model: str
+    ) -> Tuple[bool, Optional[str]]:
+        ok, message = self.probe(base_url, api_key, model)
+        with self._lock:
+            if ok:
+                self._entries[key] = _Health(time.monotonic(), message)
+            else:
+                self._entries.pop(key, None)
+        if not ok:
+            logger.warning(f"LLM服务检测失败: {key[0]} ({model}): {message}")
+        return ok, message
+
+    def _refresh(self, key: EndpointKey, base_url: str, api_key: str, model: str):
+        try:
+            self._probe(key, base_url, api_key, model)
+        except Exception as e:
+            logger.error(f"后台检测LLM服务出错: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def invalidate(self, base_url: str, api_key: str, model: str) -> None:
+        """使某个服务的检测结果失效"""
+        with self._lock:
+            self._entries.pop(endpoint_key(base_url, api_key, model), None)
+
+    def report_error(
+        self, base_url: Any, api_key: str, model: str, error: BaseException
+    ) -> None:
+        """
+        报告实际请求的错误，服务级别的错误会使检测结果失效
+
+        Args:
+            base_url: 服务地址（可以是OpenAI客户端的 base_url）
+            api_key: API Key
+            model: 模型
+            error: 请求抛出的异常
+        """
+        if not isinstance(error, openai.APIError) or isinstance(error, _REQUEST_ERRORS):
+            return
+        key = endpoint_key(str(base_url), api_key, model)
+        with self._lock:
+            removed = self._entries.pop(key, None)
+        if removed is not None:
+            logger.info(f"LLM请求失败，下次任务将重新检测服务: {key[0]} ({model})")
+
+
+# 进程内共享的检测结果
+endpoint_health = EndpointHealthCache()
+
+
+if __name__ == "__main__":
+    calls = []
+
+    def fake_probe(base_url: str, api_key: str, model: str):
+        calls.append(model)
+        time.sleep(0.1)
+        return True, "Hello!"
+
+    cache = EndpointHealthCache(probe=fake_probe, ttl=1.0, refresh_after=0.5)
+    start = time.monotonic()
+    for _ in range(300):
+        cache.check("https://api.openai.com/v1", "sk-xxx", "gpt-4o-mini")
+    print(f"300次检查耗时: {time.monotonic() - start:.3f}s, 实际检测次数: {len(calls)}")
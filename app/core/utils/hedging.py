@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple, TypeVar
+
+from app.core.utils import tracing
+from app.core.utils.logger import setup_logger
+
+logger = setup_logger("hedging")
+
+T = TypeVar("T")
+
+# 对冲请求配置
+HEDGE_QUANTILE = 0.95  # 请求耗时超过该分位数时发出对冲请求
+HEDGE_MIN_SAMPLES = 10  # 统计到足够的耗时样本后才开始对冲
+HEDGE_WINDOW = 200  # 每个端点保留最近的耗时样本数
+HEDGE_MIN_DELAY = 1.0  # 对冲等待时间的下限（秒），避免对很快的请求也发出对冲
+HEDGE_MAX_WORKERS = 64  # 执行请求的线程数
+
+_executor = ThreadPoolExecutor(
+    max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="hedge"
+)
+
+
+class LatencyTracker:
+    """
+    按 (端点, 模型) 统计最近请求的耗时分布（线程安全）
+
+    使用示例:
+        tracker = LatencyTracker()
+        tracker.record(("https://api.openai.com/v1", "gpt-4o-mini"), 2.3)
+        tracker.quantile(("https://api.openai.com/v1", "gpt-4o-mini"))
+    """
+
+    def __init__(
+        self, window: int = HEDGE_WINDOW, min_samples: int = HEDGE_MIN_SAMPLES
+    ):
+        self.window = window
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples: Dict[Hashable, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=self.window)
+        )
+        self.hedged: Dict[Hashable, int] = defaultdict(int)  # 发出对冲的次数
+        self.hedge_wins: Dict[Hashable, int] = defaultdict(int)  # 对冲请求先完成的次数
+
+    def record(self, key: Hashable, seconds: float) -> None:
+        """记录一次成功请求的耗时"""
+        with self._lock:
+            self._samples[key].append(seconds)
+
+    def quantile(self, key: Hashable, q: float = HEDGE_QUANTILE) -> Optional[float]:
+        """
+        返回该端点请求耗时的分位数，样本不足时返回None
+
+        Args:
+            key: (端点, 模型)
+            q: 分位数
+
+        Returns:
+            Optional[float]: 耗时（秒）
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def hedge_delay(
+        self, key: Hashable, min_delay: float = HEDGE_MIN_DELAY
+    ) -> Optional[float]:
+        """发出对冲请求前的等待时间，样本不足时返回None（不对冲）"""
+        value = self.quantile(key)
+        return None if value is None else max(value, min_delay)
+
+    def count_hedge(self, key: Hashable, won: bool = False) -> None:
+        """记录一次对冲（won 为 True 时记录对冲请求先完成）"""
+        with self._lock:
+            if won:
+                self.hedge_wins[key] += 1
+            else:
+                self.hedged[key] += 1
+
+
+# 进程内共享的耗时统计
+latency_tracker = LatencyTracker()
+
+
+def _submit(
+    key: Hashable, fn: Callable[[], T], tracker: LatencyTracker
+) -> "Future[T]":
+    """在线程池中执行请求，并记录成功请求的耗时"""
+
+    def run() -> T:
+        start = time.monotonic()
+        result = fn()
+        tracker.record(key, time.monotonic() - start)
+        return result
+
+    return _executor.submit(tracing.propagate(run))
+
+
+def hedged_call(
+    key: Hashable,
+    fn: Callable[[], T],
+    backup_key: Optional[Hashable] = None,
+    backup_fn: Optional[Callable[[], T]] = None,
+    tracker: Optional[LatencyTracker] = None,
+    min_delay: float = HEDGE_MIN_DELAY,
+) -> T:
+    """
+    对冲请求：请求耗时超过该端点的p95时，再发出一个相同的请求（或发往备用服务），
+    取先成功返回的结果。慢的请求不会被取消，其结果被丢弃。
+
+    Args:
+        key: 主请求的 (端点, 模型)
+        fn: 主请求
+        backup_key: 备用请求的 (端点, 模型)，为None时与主请求相同
+        backup_fn: 备用请求，为None时重复发送主请求
+        tracker: 耗时统计，默认使用进程内共享的统计
+        min_delay: 对冲等待时间的下限（秒）
+
+    Returns:
+        先成功返回的请求结果；两个请求都失败时抛出最后一个异常
+    """
+    tracker = tracker or latency_tracker
+    delay = tracker.hedge_delay(key, min_delay)
+    primary = _submit(key, fn, tracker)
+    if delay is None:
+        return primary.result()
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+
+    if backup_fn is None:
+        backup_key, backup_fn = key, fn
+    if backup_key is None:
+        backup_key = key
+    logger.info(f"请求耗时超过 {delay:.1f}s，发出对冲请求: {backup_key}")
+    tracker.count_hedge(key)
+    backup = _submit(backup_key, backup_fn, tracker)
+
+    pending = {primary, backup}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            error = future.exception()
+            if error is None:
+                if future is backup:
+                    tracker.count_hedge(key, won=True)
+                return future.result()
+    raise error  # type: ignore
+
+
+def get_hedge_client(
+    base_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    model: Optional[str] = None,
+) -> Optional[Tuple[Any, str, str]]:
+    """
+    创建备用LLM服务的客户端
+
+    未传入 base_url 时读取环境变量 OPENAI_HEDGE_BASE_URL、OPENAI_HEDGE_API_KEY、
+    OPENAI_HEDGE_MODEL（同一进程中并发处理不同配置的任务时应显式传入）
+
+    Args:
+        base_url: 备用服务地址，为空字符串时表示不使用备用服务
+        api_key: 备用服务的API Key
+        model: 备用服务使用的模型
+
+    Returns:
+        (OpenAI客户端, 备用服务地址, 备用模型)，未配置时返回None
+    """
+    if base_url is None:
+        base_url = os.getenv("OPENAI_HEDGE_BASE_URL")
+        api_key = os.getenv("OPENAI_HEDGE_API_KEY")
+        model = os.getenv("OPENAI_HEDGE_MODEL")
+    if not (base_url and api_key and model):
+        return None
+
+    from openai import OpenAI
+
+    return OpenAI(base_url=base_url, api_key=api_key), base_url, model
+
+
+if __name__ == "__main__":
+    import random
+
+    random.seed(0)
+    tracker = LatencyTracker()
+
+    def slow_request() -> str:
+        # 5% 的请求耗时是正常请求的10倍
+        time.sleep(0.5 if random.random() < 0.05 else 0.05)
+        return "ok"
+
+    start = time.monotonic()
+    for _ in range(100):
+        hedged_call("demo", slow_request, tracker=tracker, min_delay=0.05)
+    print(f"总耗时: {time.monotonic() - start:.2f}s")
+    print(f"p95: {tracker.quantile('demo'):.3f}s")
+    print(f"对冲次数: {tracker.hedged['demo']}, 对冲成功: {tracker.hedge_wins['demo']}")
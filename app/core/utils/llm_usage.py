@@ -0,0 +1,111 @@
+import threading
+from typing import Any, Dict, Optional
+
+from app.core.utils import tracing
+
+
+def _get_field(obj: Any, name: str) -> Any:
+    """兼容对象属性和字典两种形式的字段读取"""
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def get_cached_tokens(usage: Any) -> int:
+    """
+    从API返回的usage中读取命中提示词缓存的token数
+
+    支持:
+    - OpenAI 等: usage.prompt_tokens_details.cached_tokens
+    - DeepSeek: usage.prompt_cache_hit_tokens
+
+    Args:
+        usage: 响应中的usage字段
+
+    Returns:
+        int: 命中缓存的token数，没有相关字段时返回0
+    """
+    details = _get_field(usage, "prompt_tokens_details")
+    cached = _get_field(details, "cached_tokens")
+    if cached is None:
+        cached = _get_field(usage, "prompt_cache_hit_tokens")
+    return int(cached or 0)
+
+
+def usage_attributes(response: Any) -> Dict[str, int]:
+    """API响应的token用量（用于追踪span的属性），没有usage字段时返回空字典"""
+    usage = _get_field(response, "usage")
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": int(_get_field(usage, "prompt_tokens") or 0),
+        "completion_tokens": int(_get_field(usage, "completion_tokens") or 0),
+        "cached_tokens": get_cached_tokens(usage),
+    }
+
+
+def create_completion(client: Any, **kwargs: Any) -> Any:
+    """
+    调用 client.chat.completions.create，并把请求记录为追踪span（模型、端点、token数）
+
+    Args:
+        client: OpenAI 客户端
+        **kwargs: chat.completions.create 的参数
+
+    Returns:
+        API响应
+    """
+    with tracing.span(
+        "llm.request", model=kwargs.get("model"), endpoint=str(client.base_url)
+    ) as span:
+        response = client.chat.completions.create(**kwargs)
+        span.set(**usage_attributes(response))
+    return response
+
+
+class LLMUsageTracker:
+    """
+    统计一次处理过程中的LLM调用次数和token用量（线程安全）
+
+    使用示例:
+        tracker = LLMUsageTracker("翻译")
+        response = client.chat.completions.create(...)
+        tracker.record(response)
+        logger.info(tracker.summary())
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+
+    def record(self, response: Any) -> None:
+        """记录一次API响应的token用量"""
+        usage = _get_field(response, "usage")
+        with self._lock:
+            self.requests += 1
+            if usage is None:
+                return
+            self.prompt_tokens += int(_get_field(usage, "prompt_tokens") or 0)
+            self.completion_tokens += int(_get_field(usage, "completion_tokens") or 0)
+            self.cached_tokens += get_cached_tokens(usage)
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        """提示词token中命中缓存的比例"""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def summary(self) -> Optional[str]:
+        """返回用量统计的描述，没有请求时返回None"""
+        if not self.requests:
+            return None
+        return (
+            f"{self.name}LLM用量: 请求 {self.requests} 次, "
+            f"输入 {self.prompt_tokens} tokens (缓存命中 {self.cached_tokens}, "
+            f"{self.cache_hit_ratio:.0%}), 输出 {self.completion_tokens} tokens"
+        )
@@ -0,0 +1,261 @@
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# 文本度量缓存的最大条目数（按分段文本缓存）
+METRICS_CACHE_SIZE = 65536
+
+
+class Script(str, Enum):
+    """字符所属的文字类别，值为分类表中使用的单字符编码"""
+
+    HAN = "H"  # 中日韩统一表意文字
+    HIRAGANA = "h"  # 日文平假名
+    KATAKANA = "k"  # 日文片假名
+    HANGUL = "K"  # 韩文音节
+    HANGUL_COMPAT = "j"  # 韩文兼容字母
+    HANGUL_JAMO = "J"  # 谚文字母
+    BOPOMOFO = "B"  # 注音符号
+    THAI = "T"  # 泰文
+    LAO = "L"  # 老挝文
+    MYANMAR = "M"  # 缅甸文
+    KHMER = "X"  # 高棉文
+    DEVANAGARI = "D"  # 天城文
+    BENGALI = "b"  # 孟加拉文
+    GURMUKHI = "G"  # 古木基文
+    ORIYA = "O"  # 奥里亚文
+    TELUGU = "t"  # 泰卢固文
+    KANNADA = "n"  # 卡纳达文
+    MALAYALAM = "m"  # 马拉雅拉姆文
+    SINHALA = "s"  # 僧伽罗文
+    ARABIC = "A"  # 阿拉伯文
+    CYRILLIC = "C"  # 西里尔字母
+    HEBREW = "E"  # 希伯来文
+    VIETNAMESE = "V"  # 越南文（拉丁扩展附加）
+    SPACE = " "  # 空白字符
+    OTHER = "o"  # 其他字符（拉丁字母、数字、标点等）
+
+
+# 各文字的Unicode范围（均位于基本多文种平面内）
+SCRIPT_RANGES = [
+    (0x4E00, 0x9FFF, Script.HAN),
+    (0x3040, 0x309F, Script.HIRAGANA),
+    (0x30A0, 0x30FF, Script.KATAKANA),
+    (0xAC00, 0xD7AF, Script.HANGUL),
+    (0x3130, 0x318F, Script.HANGUL_COMPAT),
+    (0x1100, 0x11FF, Script.HANGUL_JAMO),
+    (0x3100, 0x312F, Script.BOPOMOFO),
+    (0x0E00, 0x0E7F, Script.THAI),
+    (0x0E80, 0x0EFF, Script.LAO),
+    (0x1000, 0x109F, Script.MYANMAR),
+    (0x1780, 0x17FF, Script.KHMER),
+    (0x0900, 0x097F, Script.DEVANAGARI),
+    (0x0980, 0x09FF, Script.BENGALI),
+    (0x0A00, 0x0A7F, Script.GURMUKHI),
+    (0x0B00, 0x0B7F, Script.ORIYA),
+    (0x0C00, 0x0C7F, Script.TELUGU),
+    (0x0C80, 0x0CFF, Script.KANNADA),
+    (0x0D00, 0x0D7F, Script.MALAYALAM),
+    (0x0D80, 0x0DFF, Script.SINHALA),
+    (0x0600, 0x06FF, Script.ARABIC),
+    (0x0400, 0x04FF, Script.CYRILLIC),
+    (0x0590, 0x05FF, Script.HEBREW),
+    (0x1E00, 0x1EFF, Script.VIETNAMESE),
+]
+
+# 每个字符计为一个单位的文字（其余文本按空白分词计数）
+WORD_SCRIPTS = frozenset(
+    {
+        Script.HAN,
+        Script.HIRAGANA,
+        Script.KATAKANA,
+        Script.HANGUL,
+        Script.THAI,
+        Script.ARABIC,
+        Script.CYRILLIC,
+        Script.HEBREW,
+        Script.VIETNAMESE,
+        Script.HANGUL_COMPAT,
+    }
+)
+
+# 以单字形式出现的文字（用于判断是否主要为CJK文本）
+CJK_SCRIPTS = frozenset(
+    {
+        Script.HAN,
+        Script.HIRAGANA,
+        Script.KATAKANA,
+        Script.HANGUL,
+        Script.HANGUL_COMPAT,
+        Script.THAI,
+        Script.LAO,
+        Script.MYANMAR,
+        Script.KHMER,
+        Script.DEVANAGARI,
+        Script.BENGALI,
+        Script.GURMUKHI,
+        Script.ORIYA,
+        Script.TELUGU,
+        Script.KANNADA,
+        Script.MALAYALAM,
+        Script.SINHALA,
+        Script.HANGUL_JAMO,
+        Script.BOPOMOFO,
+    }
+)
+
+# 中日韩方块字（字幕渲染时宽度约等于字体大小）
+EAST_ASIAN_SCRIPTS = frozenset(
+    {Script.HAN, Script.HIRAGANA, Script.KATAKANA, Script.HANGUL}
+)
+
+
+def _build_script_table() -> str:
+    """
+    构建基本多文种平面的分类表：第i个字符为码位i所属文字的编码
+    """
+    table = [Script.OTHER.value] * 0x10000
+    for start, end, script in SCRIPT_RANGES:
+        table[start : end + 1] = script.value * (end - start + 1)
+    for code in range(0x10000):
+        if chr(code).isspace():
+            table[code] = Script.SPACE.value
+    return "".join(table)
+
+
+# str.translate 以码位为下标查表，超出BMP的字符保持原样（按其他字符处理）
+_SCRIPT_TABLE = _build_script_table()
+_SCRIPT_BY_CODE = {script.value: script for script in Script}
+# 不按单字计数、也不是空白的连续片段，每段计为一个单词
+_WORD_RUN_RE = re.compile(
+    "[^%s]+" % re.escape("".join(s.value for s in WORD_SCRIPTS) + Script.SPACE.value)
+)
+
+
+@dataclass(frozen=True)
+class TextMetrics:
+    """
+    文本度量结果
+
+    Attributes:
+        word_count: 字符/单词总数（单字文字按字计数，其余按空白分词）
+        cjk_count: 以单字形式出现的文字（CJK及东南亚、南亚文字）字符数
+        east_asian_count: 中日韩方块字字符数
+        non_space_count: 非空白字符数
+        script_counts: 各文字的字符数
+    """
+
+    word_count: int
+    cjk_count: int
+    east_asian_count: int
+    non_space_count: int
+    script_counts: Dict[Script, int] = field(default_factory=dict)
+
+    @property
+    def cjk_ratio(self) -> float:
+        """CJK字符占非空白字符的比例"""
+        return self.cjk_count / self.non_space_count if self.non_space_count else 0.0
+
+
+def classify(text: str) -> str:
+    """
+    将文本中的每个字符映射为所属文字的编码（见 Script）
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        str: 与输入等长的分类字符串
+    """
+    return text.translate(_SCRIPT_TABLE)
+
+
+@lru_cache(maxsize=METRICS_CACHE_SIZE)
+def get_text_metrics(text: str) -> TextMetrics:
+    """
+    一次遍历计算文本的字数、CJK占比和文字构成（结果按文本缓存）
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        TextMetrics: 文本度量结果
+    """
+    classes = classify(text)
+    script_counts: Dict[Script, int] = {}
+    for code, count in Counter(classes).items():
+        script = _SCRIPT_BY_CODE.get(code, Script.OTHER)
+        script_counts[script] = script_counts.get(script, 0) + count
+
+    word_chars = sum(script_counts.get(s, 0) for s in WORD_SCRIPTS)
+    word_runs = len(_WORD_RUN_RE.findall(classes))
+    return TextMetrics(
+        word_count=word_chars + word_runs,
+        cjk_count=sum(script_counts.get(s, 0) for s in CJK_SCRIPTS),
+        east_asian_count=sum(script_counts.get(s, 0) for s in EAST_ASIAN_SCRIPTS),
+        non_space_count=len(text) - script_counts.get(Script.SPACE, 0),
+        script_counts=script_counts,
+    )
+
+
+def count_words(text: str) -> int:
+    """
+    统计多语言文本中的字符/单词数
+    中日韩、泰文、阿拉伯文、西里尔字母、希伯来文、越南文等每个字符计为1个单位，
+    其余文本（如英文）按照空格分词计数
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        int: 字符/单词总数
+    """
+    return get_text_metrics(text).word_count
+
+
+def is_mainly_cjk(text: str, threshold: float = 0.5) -> bool:
+    """
+    判断文本是否主要由中日韩等单字形式的文字组成
+
+    Args:
+        text: 输入文本
+        threshold: CJK字符占非空白字符的比例阈值
+
+    Returns:
+        bool: 如果CJK字符占比超过阈值则返回True
+    """
+    return get_text_metrics(text).cjk_ratio > threshold
+
+
+def word_run_edges(text: str) -> Tuple[bool, bool]:
+    """
+    判断文本首、尾字符是否属于按空白分词的片段。
+    两段文本直接拼接时，若前者尾字符与后者首字符都属于这类片段，则会合并为一个单词
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        (首字符是否属于分词片段, 尾字符是否属于分词片段)
+    """
+    if not text:
+        return False, False
+    return (
+        _WORD_RUN_RE.match(classify(text[0])) is not None,
+        _WORD_RUN_RE.match(classify(text[-1])) is not None,
+    )
+
+
+def is_east_asian_char(char: str) -> bool:
+    """判断单个字符是否为中日韩方块字"""
+    code = ord(char)
+    return code < 0x10000 and _SCRIPT_BY_CODE[_SCRIPT_TABLE[code]] in EAST_ASIAN_SCRIPTS
+
+
+if __name__ == "__main__":
+    for sample in ["Hello world", "你好，世界", "こんにちは world", "สวัสดี ครับ"]:
+        metrics = get_text_metrics(sample)
+        print(sample, metrics.word_count, f"{metrics.cjk_ratio:.2f}")
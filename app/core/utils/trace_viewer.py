@@ -0,0 +1,251 @@
+"""
+读取 tracing 导出的 JSONL / OTLP JSON 文件，按任务（调用树）显示关键路径
+
+关键路径：从根span的结束时间往前回溯，每次选择在当前时间点之前最晚结束的子span，
+并在子span内部递归回溯。路径上各span的自身耗时（不被子span覆盖的部分）之和等于任务总耗时，
+自身耗时大的步骤即为缩短任务耗时时应优先优化的步骤（job 的自身耗时为阶段排队等待的时间）。
+
+使用示例:
+    python -m app.cli trace AppData/logs/trace.jsonl --job video.mp4
+"""
+
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+# 显示属性值的最大长度
+MAX_ATTRIBUTE_LENGTH = 40
+
+
+@dataclass
+class SpanRecord:
+    """文件中读取的span（时间单位为秒）"""
+
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start: float
+    end: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class PathNode:
+    """关键路径上的span（start、end 为在路径上的区间）"""
+
+    span: SpanRecord
+    start: float
+    end: float
+    children: List["PathNode"] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def self_time(self) -> float:
+        """不被路径上的子span覆盖的耗时"""
+        return self.duration - sum(child.duration for child in self.children)
+
+
+def _otlp_value(value: Dict[str, Any]) -> Any:
+    if "intValue" in value:
+        return int(value["intValue"])
+    for key in ("boolValue", "doubleValue", "stringValue"):
+        if key in value:
+            return value[key]
+    return None
+
+
+def _parse_line(data: Dict[str, Any]) -> Iterable[SpanRecord]:
+    if "resourceSpans" not in data:
+        yield SpanRecord(
+            data["trace_id"],
+            data["span_id"],
+            data.get("parent_id"),
+            data["name"],
+            float(data["start"]),
+            float(data["end"]),
+            data.get("attributes") or {},
+            data.get("error"),
+        )
+        return
+    for resource_spans in data["resourceSpans"]:
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                status = span.get("status") or {}
+                yield SpanRecord(
+                    span["traceId"],
+                    span["spanId"],
+                    span.get("parentSpanId") or None,
+                    span["name"],
+                    int(span["startTimeUnixNano"]) / 1e9,
+                    int(span["endTimeUnixNano"]) / 1e9,
+                    {
+                        item["key"]: _otlp_value(item["value"])
+                        for item in span.get("attributes", [])
+                    },
+                    status.get("message") if status.get("code") == 2 else None,
+                )
+
+
+def load_spans(paths: Iterable[str]) -> List[SpanRecord]:
+    """
+    读取追踪文件（可以是多个进程的文件，如协调进程和工作进程），跳过无法解析的行
+
+    Args:
+        paths: JSONL 或 OTLP JSON 文件
+
+    Returns:
+        List[SpanRecord]: 所有span
+    """
+    spans: List[SpanRecord] = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    spans.extend(_parse_line(json.loads(line)))
+                except (ValueError, KeyError, TypeError):
+                    continue
+    return spans
+
+
+def group_traces(spans: List[SpanRecord]) -> Dict[str, List[SpanRecord]]:
+    """按调用树分组"""
+    traces: Dict[str, List[SpanRecord]] = defaultdict(list)
+    for span in spans:
+        traces[span.trace_id].append(span)
+    return dict(traces)
+
+
+def find_root(spans: List[SpanRecord]) -> SpanRecord:
+    """调用树的根：父span不在文件中的span里耗时最长的一个"""
+    ids = {span.span_id for span in spans}
+    roots = [span for span in spans if span.parent_id not in ids]
+    return max(roots or spans, key=lambda span: (span.duration, -span.start))
+
+
+def critical_path(spans: List[SpanRecord], root: Optional[SpanRecord] = None) -> PathNode:
+    """
+    计算调用树的关键路径
+
+    Args:
+        spans: 同一调用树的span
+        root: 根span，默认为 find_root 的结果
+
+    Returns:
+        PathNode: 关键路径（根节点）
+    """
+    children: Dict[str, List[SpanRecord]] = defaultdict(list)
+    for span in spans:
+        if span.parent_id:
+            children[span.parent_id].append(span)
+    root = root or find_root(spans)
+
+    def walk(span: SpanRecord, start: float, end: float) -> PathNode:
+        node = PathNode(span, start, end)
+        cursor = end
+        candidates = [c for c in children.get(span.span_id, []) if c.end > start]
+        while True:
+            before = [c for c in candidates if c.start < cursor]
+            if not before:
+                break
+            child = max(before, key=lambda c: (min(c.end, cursor), c.duration))
+            child_end = min(child.end, cursor)
+            child_start = max(child.start, start)
+            node.children.append(walk(child, child_start, child_end))
+            candidates.remove(child)
+            cursor = child_start
+        node.children.reverse()
+        return node
+
+    return walk(root, root.start, root.end)
+
+
+def _format_attributes(attributes: Dict[str, Any]) -> str:
+    parts = []
+    for key, value in attributes.items():
+        text = str(value)
+        if len(text) > MAX_ATTRIBUTE_LENGTH:
+            text = "…" + text[-(MAX_ATTRIBUTE_LENGTH - 1) :]
+        parts.append(f"{key}={text}")
+    return " ".join(parts)
+
+
+def render_trace(spans: List[SpanRecord], top: int = 10) -> str:
+    """
+    格式化一个调用树的关键路径
+
+    Args:
+        spans: 同一调用树的span
+        top: 按自身耗时汇总时显示的步骤数
+
+    Returns:
+        str: 关键路径的文本
+    """
+    path = critical_path(spans)
+    total = path.duration or 1e-9
+    root = path.span
+    lines = [
+        f"{root.name} {_format_attributes(root.attributes)}".rstrip(),
+        f"  总耗时 {root.duration:.2f}s，{len(spans)} 个span，trace {root.trace_id}",
+        "  关键路径（耗时 / 自身耗时 / 占比）:",
+    ]
+    totals: Dict[str, float] = defaultdict(float)
+
+    def add(node: PathNode, depth: int) -> None:
+        totals[node.span.name] += node.self_time
+        error = f"  失败: {node.span.error}" if node.span.error else ""
+        lines.append(
+            f"  {node.duration:8.2f}s {node.self_time:8.2f}s "
+            f"{node.self_time / total:6.1%}  {'  ' * depth}{node.span.name}  "
+            f"{_format_attributes(node.span.attributes)}{error}".rstrip()
+        )
+        for child in node.children:
+            add(child, depth + 1)
+
+    add(path, 0)
+    lines.append("  关键路径上自身耗时最多的步骤:")
+    for name, seconds in sorted(totals.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"  {seconds:8.2f}s {seconds / total:6.1%}  {name}")
+    return "\n".join(lines)
+
+
+def render_file(
+    paths: Iterable[str], job: Optional[str] = None, limit: int = 10, top: int = 10
+) -> str:
+    """
+    格式化追踪文件中各任务的关键路径（最近开始的任务在最后）
+
+    Args:
+        paths: 追踪文件
+        job: 只显示根span的名称或属性中包含该文本的任务
+        limit: 最多显示的任务数（最近的任务），0 表示不限制
+        top: 按自身耗时汇总时显示的步骤数
+
+    Returns:
+        str: 文本，没有任务时返回提示
+    """
+    traces = []
+    for spans in group_traces(load_spans(paths)).values():
+        root = find_root(spans)
+        text = " ".join([root.name, *map(str, root.attributes.values())])
+        if job and job not in text:
+            continue
+        traces.append((root.start, spans))
+    traces.sort(key=lambda item: item[0])
+    if limit:
+        traces = traces[-limit:]
+    if not traces:
+        return "没有找到任务"
+    return "\n\n".join(render_trace(spans, top) for _, spans in traces)
@@ -0,0 +1,382 @@
+"""
+轻量的处理过程追踪：记录音频提取、转录、缓存查询、LLM请求、对齐、写文件、视频合成等步骤的
+耗时区间（span），按父子关系组成一次任务的调用树，导出为 JSONL 或 OTLP JSON 文件
+
+未启用时 span() 返回空操作对象，开销可以忽略。
+
+启用方式:
+    tracing.configure("trace.jsonl")                    # 每行一个span
+    tracing.configure("trace.otlp.jsonl", FORMAT_OTLP)  # 每行一个 OTLP 导出请求
+    或设置环境变量 VIDEOCAPTIONER_TRACE=文件路径（VIDEOCAPTIONER_TRACE_FORMAT=otlp）
+
+使用示例:
+    with tracing.span("video2audio", input=path) as span:
+        ...
+        span.set(output_bytes=os.path.getsize(output))
+
+    # 在线程池中执行时保留当前span（子span归入提交时的span）
+    executor.submit(tracing.propagate(func), item)
+
+查看任务的关键路径:
+    python -m app.cli trace trace.jsonl
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar, Union
+
+from app.core.utils.logger import setup_logger
+
+logger = setup_logger("tracing")
+
+T = TypeVar("T")
+
+# 导出格式
+FORMAT_JSONL = "jsonl"  # 每行一个span（本模块的格式）
+FORMAT_OTLP = "otlp"  # 每行一个 OTLP/JSON ExportTraceServiceRequest（OpenTelemetry 文件格式）
+FORMATS = (FORMAT_JSONL, FORMAT_OTLP)
+
+# 启用追踪的环境变量（图形界面等没有命令行参数的场景）
+TRACE_ENV = "VIDEOCAPTIONER_TRACE"
+TRACE_FORMAT_ENV = "VIDEOCAPTIONER_TRACE_FORMAT"
+
+SERVICE_NAME = "VideoCaptioner"
+
+
+class Span:
+    """
+    一个步骤的耗时区间
+
+    Attributes:
+        name: 步骤名称
+        trace_id: 所属调用树（一次任务）的ID
+        span_id: ID
+        parent_id: 父span的ID，根span为None
+        start_ns: 开始时间（unix 纳秒）
+        end_ns: 结束时间，未结束时为0
+        attributes: 属性（字节数、token数、是否命中缓存等）
+        error: 步骤失败时的错误信息
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+    )
+
+    recording = True
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        attributes: Dict[str, Any],
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.set(**attributes)
+
+    def set(self, **attributes: Any) -> "Span":
+        """设置属性（值为None的属性忽略）"""
+        self.attributes.update(
+            (key, value) for key, value in attributes.items() if value is not None
+        )
+        return self
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        """结束并导出（重复调用无效）"""
+        if self.end_ns:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = str(error) or type(error).__name__
+        exporter = _exporter
+        if exporter is not None:
+            exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "end": self.end_ns / 1e9,
+            "duration": (self.end_ns - self.start_ns) / 1e9,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """转换为 OTLP/JSON 导出请求"""
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": (
+                {"code": 2, "message": self.error} if self.error else {"code": 1}
+            ),
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": SERVICE_NAME},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": [span]}],
+                }
+            ]
+        }
+
+
+class _NoopSpan:
+    """未启用追踪时使用的空操作span"""
+
+    recording = False
+    span_id = None
+
+    def set(self, **attributes: Any) -> "_NoopSpan":
+        return self
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+AnySpan = Union[Span, _NoopSpan]
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class _Exporter:
+    """把结束的span逐行追加到文件（线程安全）"""
+
+    def __init__(self, path: str, fmt: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.fmt = fmt
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        self._failed = False
+
+    def export(self, span: Span) -> None:
+        data = span.to_otlp() if self.fmt == FORMAT_OTLP else span.to_dict()
+        line = json.dumps(data, ensure_ascii=False, default=str)
+        with self._lock:
+            try:
+                self._file.write(line + "\n")
+                self._file.flush()
+            except (OSError, ValueError) as e:
+                if not self._failed:
+                    self._failed = True
+                    logger.warning(f"写入追踪文件失败: {self.path}: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+_exporter: Optional[_Exporter] = None
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "tracing_span", default=None
+)
+
+
+def configure(path: Optional[str], fmt: str = FORMAT_JSONL) -> None:
+    """
+    启用或关闭追踪
+
+    Args:
+        path: 导出文件（追加写入），为None时关闭追踪
+        fmt: 导出格式（FORMATS 之一）
+    """
+    global _exporter
+    if fmt not in FORMATS:
+        raise ValueError(f"未知的追踪格式: {fmt}")
+    previous = _exporter
+    _exporter = _Exporter(path, fmt) if path else None
+    if previous is not None:
+        previous.close()
+    if path:
+        logger.info(f"追踪已启用，写入: {path}")
+
+
+def enabled() -> bool:
+    return _exporter is not None
+
+
+def current_span() -> AnySpan:
+    """当前的span，没有时返回空操作span"""
+    return _current.get() or NOOP_SPAN
+
+
+def start_span(
+    name: str, parent: Optional[AnySpan] = None, root: bool = False, **attributes: Any
+) -> AnySpan:
+    """
+    开始一个span（不设为当前span，需手动调用 end()）
+
+    Args:
+        name: 步骤名称
+        parent: 父span，默认为当前span
+        root: 是否开始新的调用树（忽略当前span）
+        **attributes: 属性
+
+    Returns:
+        Span，未启用追踪时为空操作span
+    """
+    if _exporter is None:
+        return NOOP_SPAN
+    if root:
+        parent = None
+    elif parent is None:
+        parent = _current.get()
+    if isinstance(parent, Span):
+        return Span(name, parent.trace_id, parent.span_id, attributes)
+    return Span(name, uuid.uuid4().hex, None, attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[AnySpan]:
+    """
+    记录一个步骤：作为当前span的子span，执行期间设为当前span；抛出异常时记录错误
+
+    Args:
+        name: 步骤名称
+        **attributes: 属性
+    """
+    if _exporter is None:
+        yield NOOP_SPAN
+        return
+    current = start_span(name, **attributes)
+    token = _current.set(current)  # type: ignore
+    try:
+        yield current
+    except BaseException as e:
+        current.end(e)
+        raise
+    else:
+        current.end()
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def use_span(parent: Optional[AnySpan]) -> Iterator[None]:
+    """把已有的span设为当前span（在其他线程中继续记录它的子span）"""
+    token = _current.set(parent if isinstance(parent, Span) else None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def inject() -> Optional[Dict[str, str]]:
+    """当前span的标识（随任务发送到其他进程），没有当前span时返回None"""
+    current = _current.get()
+    if current is None:
+        return None
+    return {"trace_id": current.trace_id, "span_id": current.span_id}
+
+
+def extract(context: Optional[Dict[str, str]]) -> Optional[Span]:
+    """
+    由 inject() 的结果还原父span（只用作父span，不会导出）
+
+    Returns:
+        Optional[Span]: 父span，context 为空或未启用追踪时返回None
+    """
+    if not context or _exporter is None:
+        return None
+    parent = Span("remote", context["trace_id"], None, {})
+    parent.span_id = context["span_id"]
+    return parent
+
+
+def traced(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """装饰器：把函数的每次调用记录为一个span"""
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            if _exporter is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def propagate(func: Callable[..., T]) -> Callable[..., T]:
+    """在其他线程中执行时保留当前span（用于线程池的 submit）"""
+    parent = _current.get()
+    if parent is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        with use_span(parent):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def file_size(path: Optional[str]) -> Optional[int]:
+    """文件大小（字节），文件不存在时返回None"""
+    try:
+        return os.path.getsize(path) if path else None
+    except OSError:
+        return None
+
+
+if os.environ.get(TRACE_ENV):
+    try:
+        configure(
+            os.environ[TRACE_ENV], os.environ.get(TRACE_FORMAT_ENV, FORMAT_JSONL)
+        )
+    except (OSError, ValueError) as e:
+        logger.warning(f"启用追踪失败: {e}")
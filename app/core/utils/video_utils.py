@@ -7,14 +7,18 @@ from pathlib import Path
 from typing import Optional, Callable
 from typing import Dict, Literal
 
+from ..utils import tracing
 from ..utils.ass_auto_wrap import auto_wrap_ass_file
 from ..utils.logger import setup_logger
 
 logger = setup_logger("video_utils")
 
 
+@tracing.traced("video2audio")
 def video2audio(input_file: str, output: str = "") -> bool:
     """使用ffmpeg将视频转换为音频"""
+    span = tracing.current_span()
+    span.set(input_bytes=tracing.file_size(input_file))
     # 创建output目录
     output_path = Path(output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -48,6 +52,7 @@ def video2audio(input_file: str, output: str = "") -> bool:
             ),
         )
         if result.returncode == 0 and Path(output).is_file():
+            span.set(output_bytes=tracing.file_size(output))
             return True
         else:
             logger.error("音频转换失败")
@@ -100,6 +105,7 @@ def check_cuda_available() -> bool:
         return False
 
 
+@tracing.traced("add_subtitles")
 def add_subtitles(
     input_file: str,
     subtitle_file: str,
@@ -121,6 +127,11 @@ def add_subtitles(
 ) -> None:
     assert Path(input_file).is_file(), "输入文件不存在"
     assert Path(subtitle_file).is_file(), "字幕文件不存在"
+    span = tracing.current_span()
+    span.set(
+        input_bytes=tracing.file_size(input_file),
+        soft_subtitle=soft_subtitle,
+    )
 
     # 移动到临时文件  Fix: 路径错误
     suffix = Path(subtitle_file).suffix.lower()
@@ -171,6 +182,7 @@ def add_subtitles(
                 getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
             ),
         )
+        span.set(output_bytes=tracing.file_size(output))
     else:
         logger.info("使用硬字幕")
         subtitle_file = Path(subtitle_file).as_posix().replace(":", r"\:")
@@ -266,6 +278,7 @@ def add_subtitles(
                 logger.error(f"视频合成失败， {error_info}")
                 raise Exception(return_code)
             logger.info("视频合成完成")
+            span.set(output_bytes=tracing.file_size(output), cuda=use_cuda)
 
         except Exception as e:
             logger.exception(f"关闭 FFmpeg: {str(e)}")
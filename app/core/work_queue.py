@@ -0,0 +1,696 @@
+"""
+分布式工作队列：协调进程把阶段放入共享队列，多台机器上的工作进程领取执行
+
+支持两种后端:
+    - 共享目录（NFS、SMB 等）：通过原子重命名领取任务
+    - Redis 协议的服务（Redis、Valkey 等）：redis://host:port/db
+
+工作进程领取阶段后持有租约，需要定期续约（heartbeat）；
+租约过期的阶段（例如工作进程崩溃）会重新放回队列，超过最大尝试次数后标记为失败。
+阶段的输入和输出文件通过 put_artifact/fetch_artifact 在机器之间传递，
+文件以绝对路径和内容指纹为标识，各机器应使用相同的目录结构
+（本机已存在且内容相同的文件不会复制，内容不同时重新下载）。
+任务完成后由协调进程通过 delete_artifact 删除其传递的文件。
+
+阶段参数中包含协调进程的配置（其中有 API 密钥等凭据），阶段结束后参数即被删除，
+协调进程读取结果后通过 delete 删除阶段的全部记录。
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import unquote, urlparse
+
+from app.core.storage.job_store import file_fingerprint
+from app.core.utils.logger import setup_logger
+
+logger = setup_logger("work_queue")
+
+# 租约时长（秒），工作进程应每隔 1/3 租约时长续约一次
+LEASE_SECONDS = 60
+# 租约过期后重新放回队列的最大尝试次数
+MAX_ATTEMPTS = 3
+# Redis 键的前缀
+REDIS_PREFIX = "videocaptioner"
+# Redis 中文件按块存储的块大小（Redis 单个值最大 512MB）
+ARTIFACT_CHUNK_SIZE = 32 * 1024 * 1024
+
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+class LeaseLostError(Exception):
+    """租约已过期，阶段已被重新放回队列或由其他工作进程领取"""
+
+
+@dataclass
+class WorkItem:
+    """
+    队列中的一个阶段
+
+    Attributes:
+        item_id: 标识
+        resource: 资源类型（工作进程按资源领取）
+        payload: 阶段参数
+        attempts: 已领取的次数
+        worker: 当前持有租约的工作进程
+    """
+
+    item_id: str
+    resource: str
+    payload: Dict[str, Any]
+    attempts: int = 0
+    worker: str = ""
+
+
+def _artifact_key(path: str, fingerprint: str) -> str:
+    name = f"{os.path.abspath(path)}\n{fingerprint}"
+    return hashlib.sha256(name.encode("utf-8")).hexdigest()[:32]
+
+
+def _is_current(path: str, fingerprint: str) -> bool:
+    """本机文件是否存在且内容与指纹一致"""
+    return bool(fingerprint) and file_fingerprint(path) == fingerprint
+
+
+def _replace_from(path: str, write: Any) -> bool:
+    """
+    调用 write(文件对象) 写入临时文件，成功时替换 path
+
+    Returns:
+        bool: write 的返回值，为False时不替换并删除临时文件
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            ok = write(f)
+        if ok:
+            os.replace(tmp, path)
+        return ok
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    """先写入临时文件再替换，其他进程不会读到写了一半的文件"""
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+class FileWorkQueue:
+    """
+    基于共享目录的工作队列
+
+    目录结构:
+        pending/<资源>/<id>.json   等待领取
+        claimed/<id>.json          已领取（文件修改时间为租约续约时间）
+        results/<id>.json          执行结果
+        artifacts/<key>            传递的文件
+    """
+
+    def __init__(
+        self,
+        root: str,
+        lease_seconds: float = LEASE_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        self.root = Path(root)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        for name in ("pending", "claimed", "results", "artifacts"):
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+
+    def put(self, resource: str, payload: Dict[str, Any]) -> str:
+        """放入阶段，返回标识"""
+        item_id = uuid.uuid4().hex
+        pending = self.root / "pending" / resource
+        pending.mkdir(parents=True, exist_ok=True)
+        data = {"item_id": item_id, "resource": resource, "payload": payload}
+        _write_json(pending / f"{item_id}.json", {**data, "attempts": 0})
+        return item_id
+
+    def claim(self, worker: str, resources: Iterable[str]) -> Optional[WorkItem]:
+        """领取一个阶段（按放入顺序），没有可领取的阶段时返回None"""
+        for resource in resources:
+            pending = self.root / "pending" / resource
+            if not pending.exists():
+                continue
+            entries = sorted(pending.glob("*.json"), key=_mtime)
+            for entry in entries:
+                claimed = self.root / "claimed" / entry.name
+                try:
+                    # 先刷新修改时间（重命名后保留），避免刚领取就被当作租约过期；
+                    # 重命名是原子的，只有一个工作进程能成功
+                    os.utime(entry)
+                    os.rename(entry, claimed)
+                except OSError:
+                    continue
+                data = _read_json(claimed)
+                if data is None:
+                    continue
+                data["attempts"] = data.get("attempts", 0) + 1
+                data["worker"] = worker
+                # 重写文件同时刷新修改时间（租约开始）
+                _write_json(claimed, data)
+                return WorkItem(
+                    data["item_id"],
+                    data["resource"],
+                    data["payload"],
+                    data["attempts"],
+                    worker,
+                )
+        return None
+
+    def heartbeat(self, item: WorkItem) -> None:
+        """续约，租约已丢失时抛出 LeaseLostError"""
+        claimed = self._check_owner(item)
+        try:
+            os.utime(claimed)
+        except OSError:
+            raise LeaseLostError(item.item_id)
+
+    def complete(self, item: WorkItem, result: Any) -> None:
+        """记录阶段完成，租约已丢失时抛出 LeaseLostError（结果被丢弃）"""
+        self._finish(item, {"status": STATUS_COMPLETED, "result": result})
+
+    def fail(self, item: WorkItem, error: str) -> None:
+        """记录阶段失败（不再重试）"""
+        self._finish(item, {"status": STATUS_FAILED, "error": error})
+
+    def get_result(self, item_id: str) -> Optional[Tuple[str, Any]]:
+        """
+        获取阶段结果
+
+        Returns:
+            (STATUS_COMPLETED, 结果) 或 (STATUS_FAILED, 错误信息)，未结束时返回None
+        """
+        data = _read_json(self.root / "results" / f"{item_id}.json")
+        if data is None:
+            return None
+        if data["status"] == STATUS_COMPLETED:
+            return STATUS_COMPLETED, data.get("result")
+        return STATUS_FAILED, data.get("error", "")
+
+    def delete(self, item_id: str) -> None:
+        """删除阶段的记录和结果（协调进程读取结果后调用；未领取的阶段不再执行）"""
+        name = f"{item_id}.json"
+        paths = [self.root / "results" / name, self.root / "claimed" / name]
+        paths.extend((self.root / "pending").glob(f"*/{name}"))
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def requeue_expired(self) -> int:
+        """把租约过期的阶段放回队列（超过最大尝试次数的标记为失败），返回处理的数量"""
+        count = 0
+        deadline = time.time() - self.lease_seconds
+        for claimed in (self.root / "claimed").glob("*.json"):
+            if _mtime(claimed) > deadline:
+                continue
+            data = _read_json(claimed)
+            if data is None:
+                continue
+            # 先移到临时名称，保证只有一个进程处理
+            expired = claimed.with_name(f".{claimed.stem}.expired")
+            try:
+                os.rename(claimed, expired)
+            except OSError:
+                continue
+            count += 1
+            if data.get("attempts", 0) >= self.max_attempts:
+                logger.warning(f"阶段 {data['item_id']} 超过最大尝试次数，标记为失败")
+                _write_json(
+                    self.root / "results" / claimed.name,
+                    {"status": STATUS_FAILED, "error": "工作进程多次未能完成该阶段"},
+                )
+                expired.unlink()
+                continue
+            logger.info(f"阶段 {data['item_id']} 的租约已过期，重新放回队列")
+            data.pop("worker", None)
+            pending = self.root / "pending" / data["resource"]
+            pending.mkdir(parents=True, exist_ok=True)
+            _write_json(pending / claimed.name, data)
+            expired.unlink()
+        return count
+
+    def put_artifact(self, path: str) -> str:
+        """
+        上传文件，供其他机器获取（相同内容已上传时跳过）
+
+        Returns:
+            str: 文件内容的指纹，获取和删除时使用
+        """
+        fingerprint = file_fingerprint(path)
+        target = self.root / "artifacts" / _artifact_key(path, fingerprint)
+        if not target.exists():
+            tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, target)
+        return fingerprint
+
+    def fetch_artifact(self, path: str, fingerprint: str) -> bool:
+        """
+        确保本机文件与上传时的内容一致，不存在或内容不同时从队列下载到相同路径
+
+        Args:
+            path: 文件路径
+            fingerprint: put_artifact 返回的指纹
+
+        Returns:
+            bool: 文件是否可用
+        """
+        if _is_current(path, fingerprint):
+            return True
+        source = self.root / "artifacts" / _artifact_key(path, fingerprint)
+        if not source.exists():
+            return False
+
+        def write(f: Any) -> bool:
+            with open(source, "rb") as src:
+                shutil.copyfileobj(src, f)
+            return True
+
+        return _replace_from(path, write)
+
+    def delete_artifact(self, path: str, fingerprint: str) -> None:
+        """删除上传的文件"""
+        try:
+            (self.root / "artifacts" / _artifact_key(path, fingerprint)).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _check_owner(self, item: WorkItem) -> Path:
+        claimed = self.root / "claimed" / f"{item.item_id}.json"
+        data = _read_json(claimed)
+        if data is None or data.get("worker") != item.worker:
+            raise LeaseLostError(item.item_id)
+        if data.get("attempts") != item.attempts:
+            raise LeaseLostError(item.item_id)
+        return claimed
+
+    def _finish(self, item: WorkItem, result: Dict[str, Any]) -> None:
+        claimed = self._check_owner(item)
+        # 先移走已领取的文件，与 requeue_expired 竞争时只有一方成功
+        finished = claimed.with_name(f".{claimed.stem}.finished")
+        try:
+            os.rename(claimed, finished)
+        except OSError:
+            raise LeaseLostError(item.item_id)
+        _write_json(self.root / "results" / claimed.name, result)
+        finished.unlink()
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+class RespClient:
+    """Redis 协议（RESP2）的最小客户端，线程安全，断线后自动重连"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        timeout: float = 10,
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._file: Any = None
+        self._lock = threading.Lock()
+
+    def execute(self, *args: Any) -> Any:
+        """执行命令，返回解析后的回复（错误回复抛出 RuntimeError）"""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._send(args)
+                    return self._read_reply()
+                except (OSError, ConnectionError):
+                    self.close()
+                    if attempt:
+                        raise
+        raise ConnectionError("Redis 连接失败")
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), self.timeout)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._send(("AUTH", self.password))
+            self._read_reply()
+        if self.db:
+            self._send(("SELECT", self.db))
+            self._read_reply()
+
+    def _send(self, args: Tuple[Any, ...]) -> None:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        assert self._sock is not None
+        self._sock.sendall(b"".join(parts))
+
+    def _read_reply(self) -> Any:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Redis 连接已关闭")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RuntimeError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"无法解析的回复: {line!r}")
+
+
+def _text(value: Any) -> Optional[str]:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class RedisWorkQueue:
+    """
+    基于 Redis 协议服务的工作队列
+
+    键:
+        <前缀>:item:<id>          阶段信息（哈希）
+        <前缀>:pending:<资源>      等待领取（列表）
+        <前缀>:claimed            已领取（列表）
+        <前缀>:leases             租约到期时间（有序集合）
+        <前缀>:artifact:<key>     传递的文件信息（哈希：大小、块数，写入所有块后设置）
+        <前缀>:artifact:<key>:<n> 传递的文件内容的第 n 块
+    """
+
+    def __init__(
+        self,
+        client: RespClient,
+        prefix: str = REDIS_PREFIX,
+        lease_seconds: float = LEASE_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        self.client = client
+        self.prefix = prefix
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix, *parts))
+
+    def put(self, resource: str, payload: Dict[str, Any]) -> str:
+        """放入阶段，返回标识"""
+        item_id = uuid.uuid4().hex
+        self.client.execute(
+            "HSET",
+            self._key("item", item_id),
+            "resource",
+            resource,
+            "payload",
+            json.dumps(payload, ensure_ascii=False),
+            "attempts",
+            0,
+        )
+        self.client.execute("LPUSH", self._key("pending", resource), item_id)
+        return item_id
+
+    def claim(self, worker: str, resources: Iterable[str]) -> Optional[WorkItem]:
+        """领取一个阶段（按放入顺序），没有可领取的阶段时返回None"""
+        for resource in resources:
+            item_id = _text(
+                self.client.execute(
+                    "RPOPLPUSH", self._key("pending", resource), self._key("claimed")
+                )
+            )
+            if item_id is None:
+                continue
+            key = self._key("item", item_id)
+            attempts = self.client.execute("HINCRBY", key, "attempts", 1)
+            self.client.execute("HSET", key, "worker", worker)
+            self.client.execute(
+                "ZADD", self._key("leases"), time.time() + self.lease_seconds, item_id
+            )
+            payload = _text(self.client.execute("HGET", key, "payload"))
+            if payload is None:
+                # 阶段信息已丢失（例如被手动删除），丢弃该阶段
+                logger.warning(f"阶段 {item_id} 的信息不存在，已丢弃")
+                self.client.execute("ZREM", self._key("leases"), item_id)
+                self.client.execute("LREM", self._key("claimed"), 0, item_id)
+                self.client.execute("DEL", key)
+                continue
+            return WorkItem(item_id, resource, json.loads(payload), attempts, worker)
+        return None
+
+    def heartbeat(self, item: WorkItem) -> None:
+        """续约，租约已丢失时抛出 LeaseLostError"""
+        self._check_owner(item)
+        if self.client.execute("ZSCORE", self._key("leases"), item.item_id) is None:
+            raise LeaseLostError(item.item_id)
+        self.client.execute(
+            "ZADD",
+            self._key("leases"),
+            "XX",
+            time.time() + self.lease_seconds,
+            item.item_id,
+        )
+
+    def complete(self, item: WorkItem, result: Any) -> None:
+        """记录阶段完成，租约已丢失时抛出 LeaseLostError（结果被丢弃）"""
+        self._finish(item, STATUS_COMPLETED, "result", json.dumps(result))
+
+    def fail(self, item: WorkItem, error: str) -> None:
+        """记录阶段失败（不再重试）"""
+        self._finish(item, STATUS_FAILED, "error", error)
+
+    def get_result(self, item_id: str) -> Optional[Tuple[str, Any]]:
+        """
+        获取阶段结果
+
+        Returns:
+            (STATUS_COMPLETED, 结果) 或 (STATUS_FAILED, 错误信息)，未结束时返回None
+        """
+        key = self._key("item", item_id)
+        status = _text(self.client.execute("HGET", key, "status"))
+        if status == STATUS_COMPLETED:
+            result = _text(self.client.execute("HGET", key, "result"))
+            return status, json.loads(result) if result is not None else None
+        if status == STATUS_FAILED:
+            return status, _text(self.client.execute("HGET", key, "error")) or ""
+        return None
+
+    def delete(self, item_id: str) -> None:
+        """删除阶段的记录和结果（协调进程读取结果后调用；未领取的阶段不再执行）"""
+        key = self._key("item", item_id)
+        resource = _text(self.client.execute("HGET", key, "resource"))
+        if resource is not None:
+            self.client.execute("LREM", self._key("pending", resource), 0, item_id)
+        self.client.execute("LREM", self._key("claimed"), 0, item_id)
+        self.client.execute("ZREM", self._key("leases"), item_id)
+        self.client.execute("DEL", key)
+
+    def requeue_expired(self) -> int:
+        """把租约过期的阶段放回队列（超过最大尝试次数的标记为失败），返回处理的数量"""
+        leases = self._key("leases")
+        claimed = self._key("claimed")
+        # 领取后还没来得及写入租约就崩溃的阶段，补上租约，到期后按过期处理
+        for item_id in self.client.execute("LRANGE", claimed, 0, -1) or []:
+            self.client.execute(
+                "ZADD", leases, "NX", time.time() + self.lease_seconds, item_id
+            )
+
+        count = 0
+        expired = self.client.execute("ZRANGEBYSCORE", leases, "-inf", time.time())
+        for raw_id in expired or []:
+            item_id = _text(raw_id)
+            # ZREM 成功的进程负责处理，避免重复放回
+            if item_id is None or not self.client.execute("ZREM", leases, item_id):
+                continue
+            self.client.execute("LREM", claimed, 0, item_id)
+            count += 1
+            key = self._key("item", item_id)
+            self.client.execute("HDEL", key, "worker")
+            attempts = int(self.client.execute("HGET", key, "attempts") or 0)
+            resource = _text(self.client.execute("HGET", key, "resource"))
+            if attempts >= self.max_attempts or resource is None:
+                logger.warning(f"阶段 {item_id} 超过最大尝试次数，标记为失败")
+                self.client.execute(
+                    "HSET",
+                    key,
+                    "status",
+                    STATUS_FAILED,
+                    "error",
+                    "工作进程多次未能完成该阶段",
+                )
+                self.client.execute("HDEL", key, "payload")
+                continue
+            logger.info(f"阶段 {item_id} 的租约已过期，重新放回队列")
+            self.client.execute("RPUSH", self._key("pending", resource), item_id)
+        return count
+
+    def put_artifact(self, path: str) -> str:
+        """
+        上传文件，供其他机器获取（相同内容已上传时跳过），文件按块存储
+
+        Returns:
+            str: 文件内容的指纹，获取和删除时使用
+        """
+        fingerprint = file_fingerprint(path)
+        key = self._key("artifact", _artifact_key(path, fingerprint))
+        if self.client.execute("EXISTS", key):
+            return fingerprint
+        size = 0
+        chunks = 0
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(ARTIFACT_CHUNK_SIZE)
+                if not data:
+                    break
+                self.client.execute("SET", f"{key}:{chunks}", data)
+                size += len(data)
+                chunks += 1
+        # 所有块写入后再写入文件信息，其他进程不会读到上传了一半的文件
+        self.client.execute("HSET", key, "size", size, "chunks", chunks)
+        return fingerprint
+
+    def fetch_artifact(self, path: str, fingerprint: str) -> bool:
+        """
+        确保本机文件与上传时的内容一致，不存在或内容不同时从队列下载到相同路径
+
+        Args:
+            path: 文件路径
+            fingerprint: put_artifact 返回的指纹
+
+        Returns:
+            bool: 文件是否可用
+        """
+        if _is_current(path, fingerprint):
+            return True
+        key = self._key("artifact", _artifact_key(path, fingerprint))
+        size, chunks = self.client.execute("HMGET", key, "size", "chunks")
+        if chunks is None:
+            return False
+
+        def write(f: Any) -> bool:
+            for n in range(int(chunks)):
+                data = self.client.execute("GET", f"{key}:{n}")
+                if data is None:
+                    return False
+                f.write(data)
+            return f.tell() == int(size or 0)
+
+        return _replace_from(path, write)
+
+    def delete_artifact(self, path: str, fingerprint: str) -> None:
+        """删除上传的文件"""
+        key = self._key("artifact", _artifact_key(path, fingerprint))
+        chunks = self.client.execute("HGET", key, "chunks")
+        self.client.execute("DEL", key)
+        for n in range(int(chunks or 0)):
+            self.client.execute("DEL", f"{key}:{n}")
+
+    def _check_owner(self, item: WorkItem) -> None:
+        key = self._key("item", item.item_id)
+        worker, attempts = self.client.execute("HMGET", key, "worker", "attempts")
+        if _text(worker) != item.worker or int(attempts or 0) != item.attempts:
+            raise LeaseLostError(item.item_id)
+
+    def _finish(self, item: WorkItem, status: str, field: str, value: str) -> None:
+        self._check_owner(item)
+        # 与 requeue_expired 竞争时，ZREM 成功的一方处理
+        if not self.client.execute("ZREM", self._key("leases"), item.item_id):
+            raise LeaseLostError(item.item_id)
+        self.client.execute("LREM", self._key("claimed"), 0, item.item_id)
+        key = self._key("item", item.item_id)
+        self.client.execute("HSET", key, "status", status, field, value)
+        # 结束后不再需要阶段参数（其中有配置中的凭据）
+        self.client.execute("HDEL", key, "payload")
+
+
+WorkQueue = Union[FileWorkQueue, RedisWorkQueue]
+
+
+def open_queue(url: str, **kwargs: Any) -> WorkQueue:
+    """
+    根据地址打开工作队列
+
+    Args:
+        url: 共享目录路径（或 file:///路径），或 redis://[:密码@]主机:端口/数据库
+        **kwargs: lease_seconds、max_attempts 等参数
+
+    Returns:
+        FileWorkQueue 或 RedisWorkQueue
+    """
+    parsed = urlparse(url)
+    if parsed.scheme in ("redis", "valkey"):
+        db = parsed.path.strip("/")
+        client = RespClient(
+            parsed.hostname or "127.0.0.1",
+            parsed.port or 6379,
+            int(db) if db else 0,
+            unquote(parsed.password) if parsed.password else None,
+        )
+        return RedisWorkQueue(client, **kwargs)
+    if parsed.scheme == "file":
+        return FileWorkQueue(unquote(parsed.path), **kwargs)
+    if parsed.scheme and len(parsed.scheme) > 1:
+        raise ValueError(f"不支持的队列地址: {url}")
+    return FileWorkQueue(url, **kwargs)
+
+
+def artifact_paths(values: Iterable[Any]) -> List[str]:
+    """阶段结果中的文件路径（字符串或字符串列表）"""
+    paths: List[str] = []
+    for value in values:
+        if isinstance(value, str) and value:
+            paths.append(value)
+        elif isinstance(value, (list, tuple)):
+            paths.extend(v for v in value if isinstance(v, str) and v)
+    return paths
@@ -0,0 +1,717 @@
+"""
+后台服务：通过本地HTTP接口提交任务（文件路径或视频链接），在工作线程池中执行
+
+进程常驻，模块、ASR缓存、翻译记忆、LLM接口检测结果等在任务之间复用。
+
+接口:
+    GET    /health                       服务状态
+    POST   /jobs                         提交任务
+    GET    /jobs                         任务列表
+    GET    /jobs/<id>                    任务状态
+    DELETE /jobs/<id>                    取消任务
+    GET    /jobs/<id>/events             进度事件流（SSE）
+    GET    /jobs/<id>/artifacts/<name>   下载产物文件
+
+提交任务示例:
+    curl -X POST http://127.0.0.1:8770/jobs -d '{
+        "type": "process",
+        "input": "/data/video.mp4",
+        "settings": {"need_translate": true, "Subtitle.TargetLanguage": "英语"},
+        "subtitle_config": {"thread_num": 4},
+        "deadline": 1767225600
+    }'
+
+任务状态中的 eta 为按历史耗时估计的剩余时间（秒）；服务以 --order deadline 启动时，
+截止时间（unix 时间戳）早的任务优先执行。
+"""
+
+import dataclasses
+import json
+import mimetypes
+import os
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlparse
+
+from app.core.entities import (
+    SubtitleConfig,
+    SynthesisConfig,
+    TranscribeConfig,
+    TranscribeModelEnum,
+)
+from app.core.settings import HeadlessConfig, SettingItem
+from app.core.storage.constants import JobStatus
+from app.core.task_scheduler import (
+    ORDER_FIFO,
+    RESOURCE_DOWNLOAD,
+    RESOURCE_FFMPEG,
+    RESOURCE_LLM,
+    RESOURCE_LOCAL_ASR,
+    RESOURCE_NETWORK_ASR,
+    Stage,
+    TaskScheduler,
+)
+from app.core.throughput import estimate_stages, stage_ranges
+from app.core.utils.logger import setup_logger
+
+logger = setup_logger("daemon")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8770
+
+# 任务类型：转录、字幕处理、全流程（转录、字幕处理、视频合成）
+JOB_TYPES = ("transcribe", "subtitle", "process")
+
+# 保留的已结束任务数，超过时删除最早结束的任务
+MAX_FINISHED_JOBS = 500
+# SSE 连接空闲时发送心跳的间隔（秒）
+SSE_KEEPALIVE = 15
+# 下载产物文件时每次读取的大小
+ARTIFACT_CHUNK_SIZE = 1024 * 1024
+
+# 在本地运行的转录模型（与批量处理一致，和在线转录分开限制并发）
+LOCAL_TRANSCRIBE_MODELS = {
+    TranscribeModelEnum.FASTER_WHISPER,
+    TranscribeModelEnum.WHISPER_CPP,
+}
+
+# 可以按任务覆盖的配置字段
+_CONFIG_TYPES = {
+    "transcribe_config": TranscribeConfig,
+    "subtitle_config": SubtitleConfig,
+    "synthesis_config": SynthesisConfig,
+}
+
+_URL_PATTERN = re.compile(r"^https?://", re.IGNORECASE)
+_FINISHED = (JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value)
+
+
+class JobError(Exception):
+    """提交或操作任务失败（返回给客户端的错误）"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class DaemonJob:
+    """
+    后台服务中的任务
+
+    Attributes:
+        job_id: 任务ID
+        task_type: 任务类型（JOB_TYPES）
+        input: 文件路径或视频链接
+        config: 任务使用的配置（设置文件加上提交时的 settings）
+        overrides: 按任务覆盖的 TranscribeConfig/SubtitleConfig/SynthesisConfig 字段
+        artifacts: 各阶段的产物文件（阶段名称 -> 路径）
+        events: 进度事件，SSE 连接从中按序号读取
+        deadline: 截止时间（unix 时间戳）
+        estimates: 各阶段的估计耗时（秒）
+        eta: 估计的剩余时间（秒）
+    """
+
+    job_id: str
+    task_type: str
+    input: str
+    config: HeadlessConfig
+    overrides: Dict[str, Dict[str, Any]]
+    stages: List[str] = field(default_factory=list)
+    status: str = JobStatus.WAITING.value
+    stage: str = ""
+    progress: int = 0
+    message: str = ""
+    error: str = ""
+    artifacts: Dict[str, str] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    deadline: Optional[float] = None
+    estimates: Dict[str, float] = field(default_factory=dict)
+    eta: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _FINISHED
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.job_id,
+            "type": self.task_type,
+            "input": self.input,
+            "status": self.status,
+            "stage": self.stage,
+            "stages": self.stages,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "artifacts": {
+                name: f"/jobs/{self.job_id}/artifacts/{name}" for name in self.artifacts
+            },
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "deadline": self.deadline,
+            "eta": None if self.eta is None else round(self.eta, 1),
+        }
+
+
+def _apply_overrides(config: Any, overrides: Dict[str, Any]) -> None:
+    """按任务覆盖配置字段，布尔、数字、枚举字段的值按原字段类型转换"""
+    for key, value in overrides.items():
+        current = getattr(config, key)
+        if isinstance(current, (Enum, bool, int, float)):
+            value = SettingItem(type(config).__name__, key, current).parse(value)
+        setattr(config, key, value)
+
+
+class JobManager:
+    """
+    管理后台服务的任务：每个任务按阶段提交到调度器，
+    下载、本地转录、在线转录、LLM、视频编码分别限制并发
+    """
+
+    def __init__(
+        self,
+        settings_path: Optional[str] = None,
+        pools: Optional[Dict[str, int]] = None,
+        buffers: Optional[Dict[str, int]] = None,
+        order: str = ORDER_FIFO,
+    ):
+        from app.core.task_factory import TaskFactory
+
+        self.settings_path = settings_path
+        self.factory = TaskFactory()
+        self.scheduler = TaskScheduler(pools, buffers, order)
+        self._jobs: Dict[str, DaemonJob] = {}
+        self._cond = threading.Condition()
+        # TaskFactory 从全局配置创建任务，不同任务的配置不同，创建时需要串行
+        self._factory_lock = threading.Lock()
+
+    def submit(self, payload: Dict[str, Any]) -> DaemonJob:
+        """
+        提交任务
+
+        Args:
+            payload: {"type": 任务类型, "input": 文件路径或视频链接,
+                      "settings": {配置项: 值}, "transcribe_config": {字段: 值}, ...,
+                      "deadline": 截止时间（unix 时间戳，可选）}
+
+        Returns:
+            DaemonJob: 新建的任务
+        """
+        task_type = payload.get("type", "process")
+        if task_type not in JOB_TYPES:
+            raise JobError(400, f"任务类型应为 {', '.join(JOB_TYPES)}: {task_type}")
+        source = payload.get("input")
+        if not isinstance(source, str) or not source:
+            raise JobError(400, "缺少 input（文件路径或视频链接）")
+        is_url = bool(_URL_PATTERN.match(source))
+        if is_url and task_type == "subtitle":
+            raise JobError(400, "字幕任务的输入必须是字幕文件")
+        if not is_url and not os.path.isfile(source):
+            raise JobError(400, f"文件不存在: {source}")
+        deadline = payload.get("deadline")
+        if deadline is not None and (
+            isinstance(deadline, bool) or not isinstance(deadline, (int, float))
+        ):
+            raise JobError(400, "deadline 必须是 unix 时间戳（数字）")
+
+        config = HeadlessConfig(self.settings_path)
+        settings = payload.get("settings") or {}
+        if not isinstance(settings, dict):
+            raise JobError(400, "settings 必须是对象")
+        try:
+            for key, value in settings.items():
+                config.set(key, value)
+        except (KeyError, ValueError) as e:
+            raise JobError(400, str(e.args[0] if e.args else e))
+
+        overrides: Dict[str, Dict[str, Any]] = {}
+        for name, config_type in _CONFIG_TYPES.items():
+            values = payload.get(name) or {}
+            if not isinstance(values, dict):
+                raise JobError(400, f"{name} 必须是对象")
+            known = {f.name for f in dataclasses.fields(config_type)}
+            unknown = sorted(set(values) - known)
+            if unknown:
+                raise JobError(400, f"{name} 中的字段不存在: {unknown}")
+            overrides[name] = values
+
+        job = DaemonJob(uuid.uuid4().hex[:12], task_type, source, config, overrides)
+        job.deadline = deadline
+        stages = self._build_stages(job, is_url)
+        job.stages = [stage.name for stage in stages]
+        job.estimates = estimate_stages(
+            source, job.stages, create_task=partial(self._create_task, job)
+        )
+        with self._cond:
+            self._jobs[job.job_id] = job
+            self._add_event(job, {"event": "status", "status": job.status})
+        self.scheduler.submit(
+            job.job_id,
+            stages,
+            on_stage_start=partial(self._on_stage_start, job),
+            on_done=partial(self._on_done, job),
+            estimates=job.estimates,
+            deadline=deadline,
+        )
+        logger.info(f"提交任务 {job.job_id}: {task_type} {source}")
+        return job
+
+    def get(self, job_id: str) -> DaemonJob:
+        with self._cond:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobError(404, f"任务不存在: {job_id}")
+        self._update_etas([job])
+        return job
+
+    def list(self) -> List[DaemonJob]:
+        with self._cond:
+            jobs = list(self._jobs.values())
+        self._update_etas(jobs)
+        return jobs
+
+    def _update_etas(self, jobs: List[DaemonJob]) -> None:
+        """按调度器的估计更新任务的剩余时间（已结束的任务为None）"""
+        etas = self.scheduler.etas()
+        with self._cond:
+            for job in jobs:
+                job.eta = None if job.finished else etas.get(job.job_id)
+
+    def cancel(self, job_id: str) -> DaemonJob:
+        """取消任务：未开始的阶段不再执行，正在执行的阶段结束后丢弃结果"""
+        job = self.get(job_id)
+        if not self.scheduler.cancel(job_id):
+            raise JobError(409, f"任务已结束: {job_id}")
+        self._finish(job, JobStatus.CANCELLED, "已取消")
+        return job
+
+    def wait_events(
+        self, job: DaemonJob, start: int, timeout: float
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        等待任务的新事件
+
+        Args:
+            job: 任务
+            start: 已读取的事件数
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            (新事件, 任务是否已结束)
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: len(job.events) > start or job.finished, timeout
+            )
+            return job.events[start:], job.finished
+
+    def shutdown(self) -> None:
+        self.scheduler.shutdown()
+
+    def _build_stages(self, job: DaemonJob, is_url: bool) -> List[Stage]:
+        if job.task_type == "subtitle":
+            return [Stage("subtitle", RESOURCE_LLM, partial(self._subtitle, job))]
+
+        stages = []
+        transcribe_deps = []
+        if is_url:
+            stages.append(
+                Stage("download", RESOURCE_DOWNLOAD, partial(self._download, job))
+            )
+            transcribe_deps = ["download"]
+        if job.config.transcribe_model.value in LOCAL_TRANSCRIBE_MODELS:
+            asr_resource = RESOURCE_LOCAL_ASR
+        else:
+            asr_resource = RESOURCE_NETWORK_ASR
+        stages.append(
+            Stage(
+                "transcribe",
+                asr_resource,
+                partial(self._transcribe, job),
+                transcribe_deps,
+            )
+        )
+        if job.task_type == "process":
+            stages.append(
+                Stage(
+                    "subtitle",
+                    RESOURCE_LLM,
+                    partial(self._subtitle, job),
+                    ["transcribe"],
+                )
+            )
+            if job.config.need_video.value:
+                stages.append(
+                    Stage(
+                        "synthesize",
+                        RESOURCE_FFMPEG,
+                        partial(self._synthesize, job),
+                        ["subtitle"],
+                    )
+                )
+        return stages
+
+    def _create_task(self, job: DaemonJob, method: str, *args: Any, **kwargs: Any):
+        """使用任务自己的配置创建 TaskFactory 任务，并应用按任务覆盖的字段"""
+        from app.core import task_factory
+
+        with self._factory_lock:
+            task_factory.set_config(job.config)
+            task = getattr(self.factory, method)(*args, **kwargs)
+        for name in _CONFIG_TYPES:
+            config = getattr(task, name, None)
+            if config is not None and job.overrides.get(name):
+                _apply_overrides(config, job.overrides[name])
+        return task
+
+    def _source_path(self, job: DaemonJob, results: Dict[str, Any]) -> str:
+        return results.get("download") or job.input
+
+    def _download(self, job: DaemonJob, results: Dict[str, Any]) -> str:
+        from app.core.utils.video_download import download_video
+
+        video_path, _, _, _ = download_video(
+            job.input,
+            job.config.work_dir.value,
+            progress_callback=self._progress_callback(job, "download"),
+        )
+        if not video_path:
+            raise RuntimeError(f"视频下载失败: {job.input}")
+        return self._add_artifact(job, "download", video_path)
+
+    def _transcribe(self, job: DaemonJob, results: Dict[str, Any]) -> str:
+        from app.core.pipeline import run_transcribe
+
+        task = self._create_task(
+            job,
+            "create_transcribe_task",
+            self._source_path(job, results),
+            need_next_task=job.task_type != "transcribe",
+        )
+        run_transcribe(task, self._progress_callback(job, "transcribe"))
+        return self._add_artifact(job, "transcribe", task.output_path)
+
+    def _subtitle(self, job: DaemonJob, results: Dict[str, Any]) -> List[str]:
+        from app.core.pipeline import run_subtitle
+
+        if "transcribe" in results:
+            video_path = self._source_path(job, results)
+            task = self._create_task(
+                job,
+                "create_subtitle_task",
+                results["transcribe"],
+                video_path,
+                need_next_task=True,
+            )
+        else:
+            video_path = ""
+            task = self._create_task(job, "create_subtitle_task", job.input)
+        run_subtitle(task, self._progress_callback(job, "subtitle"))
+        return [video_path, self._add_artifact(job, "subtitle", task.output_path)]
+
+    def _synthesize(self, job: DaemonJob, results: Dict[str, Any]) -> str:
+        from app.core.pipeline import run_synthesis
+
+        video_path, subtitle_path = results["subtitle"]
+        task = self._create_task(
+            job, "create_synthesis_task", video_path, subtitle_path
+        )
+        run_synthesis(task, self._progress_callback(job, "synthesize"))
+        return self._add_artifact(job, "synthesize", task.output_path)
+
+    def _add_artifact(self, job: DaemonJob, stage: str, path: Optional[str]) -> str:
+        if not path:
+            raise RuntimeError(f"阶段 {stage} 没有输出文件")
+        with self._cond:
+            if os.path.isfile(path):
+                job.artifacts[stage] = path
+        return path
+
+    def _progress_callback(self, job: DaemonJob, stage: str):
+        # 阶段在总进度中的区间按估计耗时分配
+        start, end = stage_ranges(job.stages, job.estimates)[stage]
+
+        def callback(value: int, message: str) -> None:
+            # 在 _cond 之外读取调度器的估计（调度器回调中会获取 _cond）
+            eta = self.scheduler.etas().get(job.job_id)
+            with self._cond:
+                if job.finished:
+                    return
+                job.stage = stage
+                job.progress = start + min(max(value, 0), 100) * (end - start) // 100
+                job.message = message
+                job.eta = eta
+                self._add_event(
+                    job,
+                    {
+                        "event": "progress",
+                        "stage": stage,
+                        "progress": job.progress,
+                        "message": message,
+                        "eta": None if eta is None else round(eta, 1),
+                    },
+                )
+
+        return callback
+
+    def _on_stage_start(self, job: DaemonJob, job_id: str, stage: str) -> None:
+        with self._cond:
+            if job.finished:
+                return
+            job.status = JobStatus.RUNNING.value
+            job.stage = stage
+            self._add_event(
+                job, {"event": "status", "status": job.status, "stage": stage}
+            )
+
+    def _on_done(
+        self,
+        job: DaemonJob,
+        job_id: str,
+        error: Optional[BaseException],
+        results: Dict[str, Any],
+    ) -> None:
+        if error is not None:
+            logger.error(f"任务 {job_id} 失败: {error}")
+            self._finish(job, JobStatus.FAILED, str(error))
+        else:
+            logger.info(f"任务 {job_id} 完成")
+            self._finish(job, JobStatus.COMPLETED, "完成")
+
+    def _finish(self, job: DaemonJob, status: JobStatus, message: str) -> None:
+        with self._cond:
+            if job.finished:
+                return
+            job.status = status.value
+            job.message = message
+            job.finished_at = time.time()
+            if status == JobStatus.COMPLETED:
+                job.progress = 100
+            elif status == JobStatus.FAILED:
+                job.error = message
+            self._add_event(job, {"event": "status", **job.to_dict()})
+            self._prune()
+
+    def _add_event(self, job: DaemonJob, event: Dict[str, Any]) -> None:
+        """记录事件并唤醒等待的 SSE 连接（需持有锁）"""
+        job.events.append(event)
+        self._cond.notify_all()
+
+    def _prune(self) -> None:
+        """删除超出保留数量的已结束任务（需持有锁）"""
+        finished = [job for job in self._jobs.values() if job.finished]
+        if len(finished) <= MAX_FINISHED_JOBS:
+            return
+        finished.sort(key=lambda job: job.finished_at or 0)
+        for job in finished[: len(finished) - MAX_FINISHED_JOBS]:
+            del self._jobs[job.job_id]
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """HTTP 请求处理（server.manager 为 JobManager 实例，server.token 为访问令牌）"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    @property
+    def manager(self) -> JobManager:
+        return self.server.manager  # type: ignore
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self) -> List[str]:
+        path = urlparse(self.path).path
+        return [unquote(part) for part in path.strip("/").split("/") if part]
+
+    def _authorized(self) -> bool:
+        token = getattr(self.server, "token", None)
+        if not token or self.headers.get("Authorization") == f"Bearer {token}":
+            return True
+        self._send_json(401, {"error": "未授权"})
+        return False
+
+    def _handle(self, method: str) -> None:
+        if not self._authorized():
+            return
+        try:
+            self._dispatch(method, self._route())
+        except JobError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            logger.exception(f"处理请求出错: {self.path}: {e}")
+            self._send_json(500, {"error": str(e)})
+
+    def _dispatch(self, method: str, parts: List[str]) -> None:
+        if method == "GET" and parts == ["health"]:
+            jobs = self.manager.list()
+            self._send_json(
+                200,
+                {
+                    "status": "ok",
+                    "jobs": len(jobs),
+                    "running": sum(not job.finished for job in jobs),
+                },
+            )
+        elif method == "GET" and parts == ["jobs"]:
+            self._send_json(200, [job.to_dict() for job in self.manager.list()])
+        elif method == "POST" and parts == ["jobs"]:
+            job = self.manager.submit(self._read_json())
+            self._send_json(201, job.to_dict())
+        elif method == "GET" and len(parts) == 2 and parts[0] == "jobs":
+            self._send_json(200, self.manager.get(parts[1]).to_dict())
+        elif method == "DELETE" and len(parts) == 2 and parts[0] == "jobs":
+            self._send_json(200, self.manager.cancel(parts[1]).to_dict())
+        elif method == "GET" and len(parts) == 3 and parts[2] == "events":
+            self._stream_events(self.manager.get(parts[1]))
+        elif method == "GET" and len(parts) == 4 and parts[2] == "artifacts":
+            self._send_artifact(self.manager.get(parts[1]), parts[3])
+        else:
+            raise JobError(404, f"接口不存在: {method} {self.path}")
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise JobError(400, "请求内容不是有效的JSON")
+        if not isinstance(payload, dict):
+            raise JobError(400, "请求内容必须是JSON对象")
+        return payload
+
+    def _stream_events(self, job: DaemonJob) -> None:
+        """以 SSE 发送任务事件，任务结束并发送完所有事件后关闭连接"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        # 断线重连时从 Last-Event-ID 之后继续发送
+        index = int(self.headers.get("Last-Event-ID") or 0)
+        while True:
+            events, finished = self.manager.wait_events(job, index, SSE_KEEPALIVE)
+            for event in events:
+                index += 1
+                data = json.dumps(event, ensure_ascii=False)
+                self.wfile.write(
+                    f"id: {index}\nevent: {event['event']}\ndata: {data}\n\n".encode(
+                        "utf-8"
+                    )
+                )
+            if not events:
+                if finished:
+                    return
+                self.wfile.write(b": keepalive\n\n")
+            self.wfile.flush()
+
+    def _send_artifact(self, job: DaemonJob, name: str) -> None:
+        path = job.artifacts.get(name)
+        if not path or not os.path.isfile(path):
+            raise JobError(404, f"产物不存在: {name}")
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.send_header(
+            "Content-Disposition",
+            f"attachment; filename*=UTF-8''{quote(os.path.basename(path))}",
+        )
+        self.end_headers()
+        with open(path, "rb") as f:
+            while chunk := f.read(ARTIFACT_CHUNK_SIZE):
+                self.wfile.write(chunk)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+
+def _warm_up() -> None:
+    """预先导入处理模块，使第一个任务不必等待导入"""
+    try:
+        import app.core.bk_asr  # noqa: F401
+        import app.core.pipeline  # noqa: F401
+        import app.core.subtitle_processor.optimize  # noqa: F401
+        import app.core.subtitle_processor.split  # noqa: F401
+        import app.core.subtitle_processor.translate  # noqa: F401
+    except Exception as e:
+        logger.warning(f"预加载模块失败: {e}")
+
+
+def create_server(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    settings_path: Optional[str] = None,
+    pools: Optional[Dict[str, int]] = None,
+    token: Optional[str] = None,
+    buffers: Optional[Dict[str, int]] = None,
+    order: str = ORDER_FIFO,
+) -> ThreadingHTTPServer:
+    """
+    创建后台服务（调用 serve_forever() 启动）
+
+    Args:
+        host: 监听地址
+        port: 监听端口，0 表示随机端口
+        settings_path: 设置文件路径，默认使用图形界面的设置
+        pools: 各资源同时执行的阶段数，默认为 DEFAULT_POOLS
+        token: 访问令牌，设置后请求需携带 Authorization: Bearer <token>
+        buffers: 各资源前的缓冲区大小，默认为 DEFAULT_BUFFERS
+        order: 任务顺序（fifo、sjf 或 deadline）
+
+    Returns:
+        ThreadingHTTPServer: HTTP服务（server.manager 为任务管理器）
+    """
+    server = ThreadingHTTPServer((host, port), DaemonHandler)
+    server.daemon_threads = True
+    server.manager = JobManager(settings_path, pools, buffers, order)  # type: ignore
+    server.token = token  # type: ignore
+    threading.Thread(target=_warm_up, daemon=True).start()
+    return server
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    settings_path: Optional[str] = None,
+    pools: Optional[Dict[str, int]] = None,
+    token: Optional[str] = None,
+    buffers: Optional[Dict[str, int]] = None,
+    order: str = ORDER_FIFO,
+) -> None:
+    """启动后台服务，直到被中断"""
+    server = create_server(host, port, settings_path, pools, token, buffers, order)
+    logger.info(f"后台服务已启动: http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("后台服务停止")
+    finally:
+        server.manager.shutdown()  # type: ignore
+        server.server_close()
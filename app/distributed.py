@@ -0,0 +1,292 @@
+"""
+分布式处理：协调进程（python -m app.cli process ... --queue URL）把每个阶段放入共享队列，
+多台机器上的工作进程（python -m app.cli worker --queue URL）领取并执行
+
+阶段的执行代码与本机处理相同（pipeline.create_stage_task / run_stage_task），
+输入和输出文件通过队列在机器之间传递：阶段参数和结果中带有各文件的内容指纹，
+接收方本机的文件内容不同时重新下载。
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from app.core.settings import HeadlessConfig
+from app.core.task_scheduler import DEFAULT_POOLS
+from app.core.utils import tracing
+from app.core.utils.logger import setup_logger
+from app.core.work_queue import (
+    STATUS_COMPLETED,
+    LeaseLostError,
+    WorkItem,
+    WorkQueue,
+    artifact_paths,
+)
+
+logger = setup_logger("distributed")
+
+# 协调进程查询阶段结果的间隔（秒）
+POLL_INTERVAL = 1.0
+# 工作进程没有可领取的阶段时的等待时间（秒）
+IDLE_INTERVAL = 1.0
+# 协调进程同时等待的阶段数（实际并发由工作进程的数量和并发配置决定）
+DISPATCH_POOL_SIZE = 64
+
+
+def _jsonable_settings(config: HeadlessConfig) -> Dict[str, Any]:
+    return {
+        attr: value.value if isinstance(value, Enum) else value
+        for attr, value in config.items().items()
+    }
+
+
+class RemoteDispatcher:
+    """协调进程：把阶段放入队列并等待工作进程返回结果"""
+
+    def __init__(self, queue: WorkQueue, config: HeadlessConfig):
+        self.queue = queue
+        self.settings = _jsonable_settings(config)
+        self.pools = {resource: DISPATCH_POOL_SIZE for resource in DEFAULT_POOLS}
+        # 每个任务（按输入文件）上传到队列的文件及指纹，任务结束后删除
+        self._artifacts: Dict[str, Set[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        # 定期回收租约过期的阶段（工作进程也会回收，任一进程在运行即可）
+        threading.Thread(target=self._sweep, daemon=True).start()
+
+    def run(
+        self,
+        stage: str,
+        resource: str,
+        command: str,
+        file_path: str,
+        results: Dict[str, Any],
+        progress: Optional[Callable[[int, str], None]] = None,
+    ) -> Any:
+        """
+        在工作进程中执行阶段，返回阶段结果（输出文件会下载到本机）
+
+        Args:
+            stage: 阶段名称
+            resource: 资源类型
+            command: 任务类型（transcribe、subtitle、process）
+            file_path: 输入文件
+            results: 依赖阶段的结果
+            progress: 进度回调
+        """
+        inputs = {
+            path: self.queue.put_artifact(path)
+            for path in [file_path, *artifact_paths(results.values())]
+        }
+        self._track(file_path, inputs)
+        item_id = self.queue.put(
+            resource,
+            {
+                "stage": stage,
+                "command": command,
+                "file_path": file_path,
+                "results": results,
+                "artifacts": inputs,
+                "settings": self.settings,
+                "trace": tracing.inject(),
+            },
+        )
+        if progress:
+            progress(0, "等待工作进程")
+        try:
+            while True:
+                outcome = self.queue.get_result(item_id)
+                if outcome is not None:
+                    break
+                time.sleep(POLL_INTERVAL)
+        finally:
+            # 读取结果后（或等待被中断时）删除队列中的阶段记录
+            try:
+                self.queue.delete(item_id)
+            except Exception as e:
+                logger.warning(f"删除队列中的阶段失败: {item_id}: {e}")
+
+        status, value = outcome
+        if status != STATUS_COMPLETED:
+            raise RuntimeError(value)
+        outputs: Dict[str, str] = value.get("artifacts") or {}
+        self._track(file_path, outputs)
+        for path, fingerprint in outputs.items():
+            if not self.queue.fetch_artifact(path, fingerprint):
+                raise RuntimeError(f"无法获取阶段 {stage} 的输出文件: {path}")
+        if progress:
+            progress(100, "完成")
+        return value.get("result")
+
+    def release(self, file_path: str) -> None:
+        """任务结束（成功或失败）后删除其上传到队列的输入和输出文件"""
+        with self._lock:
+            artifacts = self._artifacts.pop(file_path, set())
+        for path, fingerprint in artifacts:
+            try:
+                self.queue.delete_artifact(path, fingerprint)
+            except Exception as e:
+                logger.warning(f"删除队列中的文件失败: {path}: {e}")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _track(self, file_path: str, artifacts: Dict[str, str]) -> None:
+        with self._lock:
+            self._artifacts.setdefault(file_path, set()).update(artifacts.items())
+
+    def _sweep(self) -> None:
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not self._stop_event.wait(interval):
+            try:
+                self.queue.requeue_expired()
+            except Exception as e:
+                logger.warning(f"回收过期租约失败: {e}")
+
+
+class Worker:
+    """
+    工作进程：按资源领取阶段并执行，执行期间定期续约
+
+    使用示例:
+        worker = Worker(open_queue("/mnt/shared/queue"), {"local_asr": 2, "llm": 4})
+        worker.run()
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        pools: Optional[Dict[str, int]] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.queue = queue
+        self.pools = dict(DEFAULT_POOLS if pools is None else pools)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.is_running = True
+        self._held: Dict[str, WorkItem] = {}
+        self._running: Dict[str, int] = {resource: 0 for resource in self.pools}
+        self._lock = threading.Lock()
+        # TaskFactory 从全局配置创建任务，不同阶段的配置可能不同，创建时需要串行
+        self._factory_lock = threading.Lock()
+        self._configs: Dict[str, HeadlessConfig] = {}
+
+    def run(self) -> None:
+        """领取并执行阶段，直到调用 stop()"""
+        logger.info(f"工作进程 {self.worker_id} 启动，资源: {self.pools}")
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        last_sweep = 0.0
+        while self.is_running:
+            now = time.time()
+            if now - last_sweep > self.queue.lease_seconds / 3:
+                last_sweep = now
+                try:
+                    self.queue.requeue_expired()
+                except Exception as e:
+                    logger.warning(f"回收过期租约失败: {e}")
+            try:
+                item = self._claim()
+            except Exception as e:
+                logger.warning(f"领取阶段失败: {e}")
+                item = None
+            if item is None:
+                time.sleep(IDLE_INTERVAL)
+                continue
+            threading.Thread(target=self._execute, args=(item,), daemon=True).start()
+        self._wait_idle()
+        logger.info(f"工作进程 {self.worker_id} 停止")
+
+    def stop(self) -> None:
+        """不再领取新的阶段，正在执行的阶段完成后 run() 返回"""
+        self.is_running = False
+
+    def _claim(self) -> Optional[WorkItem]:
+        with self._lock:
+            free = [r for r, n in self.pools.items() if self._running[r] < n]
+        if not free:
+            return None
+        item = self.queue.claim(self.worker_id, free)
+        if item is not None:
+            with self._lock:
+                self._running[item.resource] = self._running.get(item.resource, 0) + 1
+                self._held[item.item_id] = item
+        return item
+
+    def _execute(self, item: WorkItem) -> None:
+        from app.core import task_factory
+        from app.core.pipeline import create_stage_task, run_stage_task
+
+        payload = item.payload
+        stage = payload["stage"]
+        logger.info(f"执行阶段 {stage}: {payload['file_path']}（第 {item.attempts} 次）")
+        try:
+            for path, fingerprint in payload["artifacts"].items():
+                if not self.queue.fetch_artifact(path, fingerprint):
+                    raise RuntimeError(f"无法获取输入文件: {path}")
+            config = self._config(payload["settings"])
+            with self._factory_lock:
+                task_factory.set_config(config)
+                task = create_stage_task(
+                    stage, payload["command"], payload["file_path"], payload["results"]
+                )
+            with tracing.use_span(tracing.extract(payload.get("trace"))), tracing.span(
+                f"worker.{stage}", worker=self.worker_id, attempt=item.attempts
+            ):
+                result = run_stage_task(stage, task)
+            outputs = {
+                path: self.queue.put_artifact(path) for path in artifact_paths([result])
+            }
+            self.queue.complete(item, {"result": result, "artifacts": outputs})
+            logger.info(f"阶段 {stage} 完成: {result}")
+        except LeaseLostError:
+            logger.warning(f"阶段 {item.item_id} 的租约已丢失，结果被丢弃")
+        except Exception as e:
+            logger.exception(f"阶段 {stage} 失败: {e}")
+            try:
+                self.queue.fail(item, str(e))
+            except LeaseLostError:
+                logger.warning(f"阶段 {item.item_id} 的租约已丢失")
+        finally:
+            with self._lock:
+                self._running[item.resource] -= 1
+                self._held.pop(item.item_id, None)
+
+    def _config(self, settings: Dict[str, Any]) -> HeadlessConfig:
+        """按协调进程发送的配置创建 HeadlessConfig（相同的配置复用）"""
+        key = json.dumps(settings, sort_keys=True, ensure_ascii=False)
+        with self._lock:
+            config = self._configs.get(key)
+        if config is None:
+            config = HeadlessConfig()
+            for attr, value in settings.items():
+                config.set(attr, value)
+            with self._lock:
+                self._configs[key] = config
+        return config
+
+    def _heartbeat_loop(self) -> None:
+        interval = max(0.5, self.queue.lease_seconds / 3)
+        while self.is_running or self._held:
+            time.sleep(interval)
+            with self._lock:
+                held = list(self._held.values())
+            for item in held:
+                try:
+                    self.queue.heartbeat(item)
+                except LeaseLostError:
+                    logger.warning(f"阶段 {item.item_id} 的租约已丢失")
+                    with self._lock:
+                        self._held.pop(item.item_id, None)
+                except Exception as e:
+                    logger.warning(f"续约失败: {e}")
+
+    def _wait_idle(self) -> None:
+        while True:
+            with self._lock:
+                if not any(self._running.values()):
+                    return
+            time.sleep(0.2)
@@ -1,16 +1,31 @@
-import queue
-import time
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import QObject, Qt, QThread, pyqtSignal
 
+from app.common.config import cfg
+from app.config import CACHE_PATH
 from app.core.entities import (
     BatchTaskStatus,
     BatchTaskType,
-    TranscribeTask,
+    TranscribeModelEnum,
 )
+from app.core.storage.constants import JobStatus
+from app.core.storage.database import DatabaseManager
+from app.core.storage.job_store import JobStore, config_hash, inputs_hash
 from app.core.task_factory import TaskFactory
+from app.core.task_scheduler import (
+    RESOURCE_FFMPEG,
+    RESOURCE_LLM,
+    RESOURCE_LOCAL_ASR,
+    RESOURCE_NETWORK_ASR,
+    Stage,
+    TaskScheduler,
+)
+from app.core.throughput import estimate_stages, format_eta, stage_ranges
 from app.core.utils.logger import setup_logger
 from app.thread.subtitle_thread import SubtitleThread
 from app.thread.transcript_thread import TranscriptThread
@@ -18,6 +33,24 @@ from app.thread.video_synthesis_thread import VideoSynthesisThread
 
 logger = setup_logger("batch_process_thread")
 
+# 在本地运行的转录模型（占用CPU/GPU，与在线转录分开限制并发）
+LOCAL_TRANSCRIBE_MODELS = {
+    TranscribeModelEnum.FASTER_WHISPER,
+    TranscribeModelEnum.WHISPER_CPP,
+}
+
+# 各任务类型包含的阶段及其在总进度中的区间（没有耗时估计时使用）
+STAGE_PROGRESS: Dict[BatchTaskType, Dict[str, Tuple[int, int]]] = {
+    BatchTaskType.TRANSCRIBE: {"transcribe": (0, 100)},
+    BatchTaskType.SUBTITLE: {"subtitle": (0, 100)},
+    BatchTaskType.TRANS_SUB: {"transcribe": (0, 50), "subtitle": (50, 100)},
+    BatchTaskType.FULL_PROCESS: {
+        "transcribe": (0, 33),
+        "subtitle": (33, 66),
+        "synthesize": (66, 100),
+    },
+}
+
 
 class BatchTask:
     def __init__(self, file_path: str, task_type: BatchTaskType):
@@ -27,310 +60,372 @@ class BatchTask:
         self.progress = 0
         self.error_message = ""
         self.current_thread: Optional[QThread] = None
+        self.job_id: Optional[int] = None  # 持久化任务的ID
+        # 各阶段在总进度中的区间（按估计耗时分配）
+        self.stage_ranges = STAGE_PROGRESS[task_type]
+
 
+class BatchProcessThread(QObject):
+    """
+    批量处理：每个文件按 转录 -> 字幕处理 -> 视频合成 的阶段提交到调度器，
+    本地转录、在线转录、LLM、视频编码分别限制并发，不同文件的阶段可以同时进行。
+    任务和各阶段的结果保存在数据库中，重启后从第一个未完成的阶段继续
+
+    阶段在调度器的工作线程中执行，本对象本身不是线程，只负责发出进度信号
+    """
 
-class BatchProcessThread(QThread):
     # 信号定义
     task_progress = pyqtSignal(str, int, str)  # file_path, progress, status
     task_error = pyqtSignal(str, str)  # file_path, error_message
     task_completed = pyqtSignal(str)  # file_path
 
-    def __init__(self):
+    def __init__(self, pools: Optional[Dict[str, int]] = None):
         super().__init__()
-        self.task_queue = queue.Queue()
         self.current_tasks: Dict[str, BatchTask] = {}
-        self.max_concurrent_tasks = 1
-        self.is_running = False
+        self.is_running = True
         self.factory = TaskFactory()
-        self.threads = []  # 保存所有创建的线程
+        self.scheduler = TaskScheduler(pools, order=cfg.batch_order.value)
+        self.threads: List[QThread] = []  # 保存所有正在执行的线程
+        self._threads_lock = threading.Lock()
+        self.job_store = JobStore(DatabaseManager(str(CACHE_PATH)))
+        # 估计耗时需要读取媒体信息和历史记录，在后台逐个进行，不阻塞界面线程
+        self._estimator = ThreadPoolExecutor(max_workers=1)
 
     def add_task(self, task: BatchTask):
-        self.task_queue.put(task)
+        current = self.current_tasks.get(task.file_path)
+        if current is not None:
+            active = (BatchTaskStatus.WAITING, BatchTaskStatus.RUNNING)
+            if current.task_type == task.task_type and current.status in active:
+                return  # 同一任务已在处理（例如重启后已恢复）
+            self.stop_task(task.file_path)
         self.current_tasks[task.file_path] = task
-        if not self.isRunning():
-            self.is_running = True
-            self.start()
-
-    def run(self):
-        while self.is_running:
-            # 检查是否有正在运行的任务数量是否达到上限
-            running_tasks = sum(
-                1
-                for task in self.current_tasks.values()
-                if task.status == BatchTaskStatus.RUNNING
+        if task.job_id is None:
+            task.job_id = self.job_store.create_job(
+                task.file_path, task.task_type.name
             )
-
-            if running_tasks < self.max_concurrent_tasks:
-                try:
-                    # 非阻塞方式获取任务
-                    task = self.task_queue.get_nowait()
-                    self._process_task(task)
-                except queue.Empty:
-                    time.sleep(0.1)  # 避免CPU过度使用
-            else:
-                time.sleep(0.1)
-
-    def _process_task(self, batch_task: BatchTask):
-        try:
-            batch_task.status = BatchTaskStatus.RUNNING
-            self.task_progress.emit(
-                batch_task.file_path, 0, str(BatchTaskStatus.RUNNING)
-            )
-
-            if batch_task.task_type == BatchTaskType.TRANSCRIBE:
-                self._handle_transcribe_task(batch_task)
-            elif batch_task.task_type == BatchTaskType.SUBTITLE:
-                self._handle_subtitle_task(batch_task)
-            elif batch_task.task_type == BatchTaskType.TRANS_SUB:
-                self._handle_trans_sub_task(batch_task)
-            elif batch_task.task_type == BatchTaskType.FULL_PROCESS:
-                self._handle_full_process_task(batch_task)
-
-        except Exception as e:
-            logger.exception(f"处理任务失败: {str(e)}")
-            batch_task.status = BatchTaskStatus.FAILED
-            batch_task.error_message = str(e)
-            self.task_error.emit(batch_task.file_path, str(e))
-
-    def _on_progress_wrapper(self, batch_task: BatchTask, progress: int, message: str):
-        """进度信号包装器"""
-        self.task_progress.emit(batch_task.file_path, progress, message)
-
-    def _on_error_wrapper(self, batch_task: BatchTask, error: str):
-        """错误信号包装器"""
-        batch_task.status = BatchTaskStatus.FAILED
-        batch_task.error_message = error
-        self.task_error.emit(batch_task.file_path, error)
-
-    def _on_finished_wrapper(self, batch_task: BatchTask, task=None):
-        """完成信号包装器"""
-        batch_task.status = BatchTaskStatus.COMPLETED
-        batch_task.progress = 100
-        self.task_completed.emit(batch_task.file_path)
-        if batch_task.current_thread in self.threads:
-            self.threads.remove(batch_task.current_thread)
-
-    def _handle_transcribe_task(self, batch_task: BatchTask):
-        # self.max_concurrent_tasks = 3
-        task = self.factory.create_transcribe_task(batch_task.file_path)
-        thread = TranscriptThread(task)
-        batch_task.current_thread = thread
-
-        # 保存线程引用
-        self.threads.append(thread)
-
-        thread.progress.connect(  # type: ignore
-            partial(self._on_progress_wrapper, batch_task)  # type: ignore
+        self.scheduler.submit(
+            task.file_path,
+            self._build_stages(task),
+            on_stage_start=partial(self._on_stage_start, task),
+            on_done=partial(self._on_task_done, task),
         )
-        thread.error.connect(  # type: ignore
-            partial(self._on_error_wrapper, batch_task)  # type: ignore
-        )
-        thread.finished.connect(  # type: ignore
-            partial(self._on_finished_wrapper, batch_task)  # type: ignore
+        self._estimator.submit(self._estimate_task, task)
+
+    def _estimate_task(self, task: BatchTask):
+        """在后台估计任务各阶段的耗时，更新进度区间和调度器中的排序"""
+        if self.current_tasks.get(task.file_path) is not task:
+            return  # 任务已停止或被替换
+        estimates = estimate_stages(
+            task.file_path,
+            STAGE_PROGRESS[task.task_type].keys(),
+            create_task=lambda method, *args: getattr(self.factory, method)(*args),
         )
+        if not estimates or self.current_tasks.get(task.file_path) is not task:
+            return
+        # 已开始的任务保持原来的区间，避免进度回退
+        if task.status == BatchTaskStatus.WAITING:
+            task.stage_ranges = stage_ranges(list(estimates), estimates)
+        self.scheduler.set_estimates(task.file_path, estimates)
+
+    def _build_stages(self, batch_task: BatchTask) -> List[Stage]:
+        """根据任务类型构建阶段"""
+        task_type = batch_task.task_type
+        if task_type == BatchTaskType.SUBTITLE:
+            return [
+                Stage(
+                    "subtitle",
+                    RESOURCE_LLM,
+                    partial(self._run_subtitle, batch_task),
+                )
+            ]
+
+        if cfg.transcribe_model.value in LOCAL_TRANSCRIBE_MODELS:
+            asr_resource = RESOURCE_LOCAL_ASR
+        else:
+            asr_resource = RESOURCE_NETWORK_ASR
+        stages = [
+            Stage("transcribe", asr_resource, partial(self._run_transcribe, batch_task))
+        ]
+        if task_type in (BatchTaskType.TRANS_SUB, BatchTaskType.FULL_PROCESS):
+            stages.append(
+                Stage(
+                    "subtitle",
+                    RESOURCE_LLM,
+                    partial(self._run_subtitle, batch_task),
+                    ["transcribe"],
+                )
+            )
+        if task_type == BatchTaskType.FULL_PROCESS:
+            stages.append(
+                Stage(
+                    "synthesize",
+                    RESOURCE_FFMPEG,
+                    partial(self._run_synthesis, batch_task),
+                    ["subtitle"],
+                )
+            )
+        return stages
 
-        thread.start()
-
-    def _handle_subtitle_task(self, batch_task: BatchTask):
-        logger.info(f"开始处理字幕任务: {batch_task.file_path}")
-
-        task = self.factory.create_subtitle_task(batch_task.file_path)
-        thread = SubtitleThread(task)
-        batch_task.current_thread = thread
-
-        # 保存线程引用
-        self.threads.append(thread)
-
-        thread.progress.connect(  # type: ignore
-            partial(self._on_progress_wrapper, batch_task)  # type: ignore
-        )
-        thread.error.connect(  # type: ignore
-            partial(self._on_error_wrapper, batch_task)  # type: ignore
+    def _run_transcribe(self, batch_task: BatchTask, results: Dict[str, Any]) -> Any:
+        need_next_task = batch_task.task_type != BatchTaskType.TRANSCRIBE
+        task = self.factory.create_transcribe_task(
+            batch_task.file_path, need_next_task=need_next_task
         )
-        thread.finished.connect(  # type: ignore
-            partial(self._on_finished_wrapper, batch_task)  # type: ignore
-        )
-
-        thread.start()
 
-    def _handle_trans_sub_task(self, batch_task: BatchTask):
-        trans_task = self.factory.create_transcribe_task(
-            batch_task.file_path, need_next_task=True
+        def run() -> str:
+            (done_task,) = self._run_thread(
+                batch_task, "transcribe", TranscriptThread(task)
+            )
+            return done_task.output_path
+
+        # 返回字幕文件路径
+        return self._run_checkpointed(
+            batch_task,
+            "transcribe",
+            [batch_task.file_path],
+            (task.transcribe_config, task.output_path),
+            run,
+            lambda output_path: [output_path],
         )
-        thread = TranscriptThread(trans_task)
-        batch_task.current_thread = thread
-        self.current_tasks[batch_task.file_path] = batch_task
 
-        # 保存线程引用
-        self.threads.append(thread)
+    def _run_subtitle(self, batch_task: BatchTask, results: Dict[str, Any]) -> Any:
+        logger.info(f"开始处理字幕任务: {batch_task.file_path}")
+        if "transcribe" in results:
+            if not results["transcribe"]:
+                raise ValueError("Task output_path is None")
+            task = self.factory.create_subtitle_task(
+                results["transcribe"],
+                batch_task.file_path,
+                need_next_task=True,
+            )
+        else:
+            task = self.factory.create_subtitle_task(batch_task.file_path)
 
-        thread.progress.connect(
-            partial(self._on_trans_sub_progress_wrapper, batch_task)
-        )
-        thread.error.connect(partial(self._on_error_wrapper, batch_task))
-        thread.finished.connect(
-            partial(self._on_trans_sub_finished_wrapper, batch_task)
+        def run() -> List[str]:
+            video_path, subtitle_path = self._run_thread(
+                batch_task, "subtitle", SubtitleThread(task)
+            )
+            return [video_path, subtitle_path]
+
+        # 返回 [video_path, subtitle_path]
+        return self._run_checkpointed(
+            batch_task,
+            "subtitle",
+            [task.subtitle_path],
+            (task.subtitle_config, task.output_path),
+            run,
+            lambda paths: [paths[1]],
         )
 
-        thread.start()
-
-    def _on_trans_sub_progress_wrapper(
-        self, batch_task: BatchTask, progress: int, message: str
-    ):
-        """转录+字幕任务进度包装器"""
-        progress = progress // 2  # 转录占50%进度
-        self.task_progress.emit(batch_task.file_path, progress, message)
+    def _run_synthesis(self, batch_task: BatchTask, results: Dict[str, Any]) -> Any:
+        video_path, subtitle_path = results["subtitle"]
+        task = self.factory.create_synthesis_task(video_path, subtitle_path)
 
-    def _on_trans_sub_finished_wrapper(
-        self, batch_task: BatchTask, task: TranscribeTask
-    ):
-        """转录+字幕任务转录完成包装器"""
-        if batch_task.current_thread in self.threads:
-            self.threads.remove(batch_task.current_thread)
-
-        # 创建字幕任务
-        if not task.output_path:
-            raise ValueError("Task output_path is None")
-        subtitle_task = self.factory.create_subtitle_task(
-            task.output_path, batch_task.file_path, need_next_task=True
+        def run() -> Optional[str]:
+            (done_task,) = self._run_thread(
+                batch_task, "synthesize", VideoSynthesisThread(task)
+            )
+            return done_task.output_path
+
+        return self._run_checkpointed(
+            batch_task,
+            "synthesize",
+            [video_path, subtitle_path],
+            (task.synthesis_config, task.output_path),
+            run,
+            lambda output_path: [output_path],
         )
-        thread = SubtitleThread(subtitle_task)
-        batch_task.current_thread = thread
-        self.current_tasks[batch_task.file_path] = batch_task
-
-        # 保存线程引用
-        self.threads.append(thread)
-
-        from functools import partial
 
-        thread.progress.connect(
-            partial(self._on_trans_sub_subtitle_progress_wrapper, batch_task)
+    def _run_checkpointed(
+        self,
+        batch_task: BatchTask,
+        stage: str,
+        inputs: List[Optional[str]],
+        config: Any,
+        run: Callable[[], Any],
+        outputs: Callable[[Any], List[str]],
+    ) -> Any:
+        """
+        执行阶段并记录检查点；输入文件和配置都未变化且产物仍存在时跳过
+
+        Args:
+            batch_task: 批量任务
+            stage: 阶段名称
+            inputs: 输入文件
+            config: 阶段配置
+            run: 执行阶段，返回可序列化为JSON的结果
+            outputs: 从结果中取出产物文件路径
+        """
+        job_id = batch_task.job_id
+        if job_id is None:
+            return run()
+
+        input_hash = inputs_hash(inputs)
+        stage_config_hash = config_hash(config)
+        result = self.job_store.get_checkpoint(
+            job_id, stage, input_hash, stage_config_hash
         )
-        thread.error.connect(partial(self._on_error_wrapper, batch_task))
-        thread.finished.connect(partial(self._on_finished_wrapper, batch_task))
+        if result is not None:
+            logger.info(f"阶段 {stage} 已完成，跳过: {batch_task.file_path}")
+            self._on_progress_wrapper(batch_task, stage, 100, "已完成")
+            return result
 
-        thread.start()
-
-    def _on_trans_sub_subtitle_progress_wrapper(
-        self, batch_task: BatchTask, progress: int, message: str
-    ):
-        """转录+字幕任务字幕进度包装器"""
-        progress = 50 + progress // 2  # 字幕处理占后50%进度
-        self.task_progress.emit(batch_task.file_path, progress, message)
-
-    def _handle_full_process_task(self, batch_task: BatchTask):
-        # 首先创建转录任务
-        trans_task = self.factory.create_transcribe_task(
-            batch_task.file_path, need_next_task=True
+        self.job_store.start_stage(job_id, stage, input_hash, stage_config_hash)
+        try:
+            result = run()
+        except Exception as e:
+            self.job_store.fail_stage(job_id, stage, str(e))
+            raise
+        self.job_store.complete_stage(
+            job_id, stage, input_hash, stage_config_hash, result, outputs(result)
         )
-        thread = TranscriptThread(trans_task)
-        batch_task.current_thread = thread
-
-        # 保存线程引用
-        self.threads.append(thread)
+        return result
 
-        thread.progress.connect(partial(self.on_full_process_progress, batch_task))
-        thread.error.connect(partial(self._on_error_wrapper, batch_task))
-        thread.finished.connect(partial(self.on_full_process_finished, batch_task))
+    def _run_thread(self, batch_task: BatchTask, stage: str, thread: QThread) -> tuple:
+        """
+        在调度器的工作线程中执行一个处理线程并等待其结束
 
-        thread.start()
+        信号使用直接连接，在处理线程中调用（调度器的工作线程没有事件循环）
 
-    def on_full_process_progress(
-        self, batch_task: BatchTask, progress: int, message: str
-    ):
-        """处理全流程任务的转录进度"""
-        if batch_task.status == BatchTaskStatus.RUNNING:
-            progress_value = progress // 3  # 转录占33%进度
-            self.task_progress.emit(batch_task.file_path, progress_value, message)
-
-    def on_full_process_finished(self, batch_task: BatchTask, task: TranscribeTask):
-        """处理转录完成后开始字幕任务"""
-        if batch_task.current_thread in self.threads:
-            self.threads.remove(batch_task.current_thread)
-
-        # 转录完成后创建字幕任务
-        if not task.output_path:
-            raise ValueError("Task output_path is None")
-        subtitle_task = self.factory.create_subtitle_task(
-            task.output_path,
-            batch_task.file_path,
-            need_next_task=True,
+        Returns:
+            tuple: 处理线程 finished 信号的参数
+        """
+        outcome: Dict[str, Any] = {}
+        thread.progress.connect(  # type: ignore
+            partial(self._on_progress_wrapper, batch_task, stage),
+            Qt.DirectConnection,
         )
-        thread = SubtitleThread(subtitle_task)
-        batch_task.current_thread = thread
-
-        # 保存线程引用
-        self.threads.append(thread)
-
-        thread.progress.connect(
-            partial(self.on_full_process_subtitle_progress, batch_task)
+        thread.error.connect(  # type: ignore
+            lambda error: outcome.setdefault("error", error), Qt.DirectConnection
         )
-        thread.error.connect(partial(self._on_error_wrapper, batch_task))
-        thread.finished.connect(
-            partial(self.on_full_process_subtitle_finished, batch_task)
+        thread.finished.connect(  # type: ignore
+            lambda *args: outcome.setdefault("result", args), Qt.DirectConnection
         )
 
-        thread.start()
+        batch_task.current_thread = thread
+        with self._threads_lock:
+            self.threads.append(thread)
+        try:
+            thread.start()
+            thread.wait()
+        finally:
+            with self._threads_lock:
+                if thread in self.threads:
+                    self.threads.remove(thread)
+
+        if "error" in outcome:
+            raise RuntimeError(outcome["error"])
+        if "result" not in outcome:
+            raise RuntimeError("任务已终止")
+        return outcome["result"]
+
+    def _on_stage_start(self, batch_task: BatchTask, job_id: str, stage: str):
+        """第一个阶段开始时将任务标记为处理中"""
+        if batch_task.status == BatchTaskStatus.WAITING:
+            batch_task.status = BatchTaskStatus.RUNNING
+            self.task_progress.emit(
+                batch_task.file_path, 0, str(BatchTaskStatus.RUNNING)
+            )
 
-    def on_full_process_subtitle_progress(
-        self, batch_task: BatchTask, progress: int, message: str
+    def _on_progress_wrapper(
+        self, batch_task: BatchTask, stage: str, progress: int, message: str
     ):
-        """处理全流程任务中字幕部分的进度"""
-        if batch_task.status == BatchTaskStatus.RUNNING:
-            progress_value = 33 + progress // 3  # 字幕处理占中间33%进度
-            self.task_progress.emit(batch_task.file_path, progress_value, message)
-
-    def on_full_process_subtitle_finished(
-        self, batch_task: BatchTask, video_path: str, subtitle_path: str
+        """进度信号包装器：将阶段内的进度换算为任务的总进度，并附上剩余时间"""
+        if batch_task.status != BatchTaskStatus.RUNNING:
+            return
+        start, end = batch_task.stage_ranges[stage]
+        batch_task.progress = start + progress * (end - start) // 100
+        eta = self.scheduler.etas().get(batch_task.file_path)
+        if eta is not None and progress < 100:
+            message = f"{message}（剩余 {format_eta(eta)}）"
+        self.task_progress.emit(batch_task.file_path, batch_task.progress, message)
+
+    def _on_task_done(
+        self,
+        batch_task: BatchTask,
+        job_id: str,
+        error: Optional[BaseException],
+        results: Dict[str, Any],
     ):
-        """处理字幕完成后开始视频合成任务"""
-        if batch_task.current_thread in self.threads:
-            self.threads.remove(batch_task.current_thread)
-
-        # 字幕完成后创建视频合成任务
-        synthesis_task = self.factory.create_synthesis_task(video_path, subtitle_path)
-        thread = VideoSynthesisThread(synthesis_task)
-        batch_task.current_thread = thread
-
-        # 保存线程引用
-        self.threads.append(thread)
+        """任务的全部阶段完成或某个阶段失败"""
+        if error is not None:
+            logger.error(f"处理任务失败: {batch_task.file_path}: {str(error)}")
+            self._set_job_status(batch_task, JobStatus.FAILED, str(error))
+            batch_task.status = BatchTaskStatus.FAILED
+            batch_task.error_message = str(error)
+            self.task_error.emit(batch_task.file_path, str(error))
+            return
+        self._set_job_status(batch_task, JobStatus.COMPLETED)
+        batch_task.status = BatchTaskStatus.COMPLETED
+        batch_task.progress = 100
+        self.task_completed.emit(batch_task.file_path)
 
-        thread.progress.connect(
-            partial(self.on_full_process_synthesis_progress, batch_task)
-        )
-        thread.error.connect(partial(self._on_error_wrapper, batch_task))
-        thread.finished.connect(partial(self._on_finished_wrapper, batch_task))
+    def _set_job_status(self, batch_task: BatchTask, status: JobStatus, error=""):
+        if batch_task.job_id is None:
+            return
+        try:
+            self.job_store.set_job_status(batch_task.job_id, status, error)
+        except Exception as e:
+            logger.error(f"保存任务状态失败: {str(e)}")
 
-        thread.start()
+    def resume_unfinished_tasks(self) -> List[BatchTask]:
+        """
+        重新提交上次未完成的任务（已完成的阶段会被跳过）
 
-    def on_full_process_synthesis_progress(
-        self, batch_task: BatchTask, progress: int, message: str
-    ):
-        """处理全流程任务中视频合成部分的进度"""
-        if batch_task.status == BatchTaskStatus.RUNNING:
-            progress_value = 66 + progress // 3  # 视频合成占最后34%进度
-            self.task_progress.emit(batch_task.file_path, progress_value, message)
+        Returns:
+            List[BatchTask]: 重新提交的任务
+        """
+        tasks: List[BatchTask] = []
+        try:
+            jobs = self.job_store.unfinished_jobs()
+        except Exception as e:
+            logger.error(f"读取未完成的任务失败: {str(e)}")
+            return tasks
+        for job in jobs:
+            if job.file_path in self.current_tasks:
+                continue
+            task_type = BatchTaskType.__members__.get(job.task_type)
+            if task_type is None or not os.path.exists(job.file_path):
+                self.job_store.set_job_status(
+                    job.job_id, JobStatus.FAILED, "输入文件不存在"
+                )
+                continue
+            task = BatchTask(job.file_path, task_type)
+            task.job_id = job.job_id
+            logger.info(f"恢复未完成的任务: {job.file_path}")
+            self.add_task(task)
+            tasks.append(task)
+        return tasks
 
     def stop_task(self, file_path: str):
-        if file_path in self.current_tasks:
-            task = self.current_tasks[file_path]
-            if task.current_thread:
-                if hasattr(task.current_thread, "stop"):
-                    task.current_thread.stop()  # type: ignore
-            del self.current_tasks[file_path]
-            # 从队列中移除任务
-            with self.task_queue.mutex:
-                self.task_queue.queue.clear()
-
-    def stop_all(self):
-        self.is_running = False
+        task = self.current_tasks.pop(file_path, None)
+        if task is None:
+            return
+        # 先取消未开始的阶段，再停止正在执行的线程
+        self.scheduler.cancel(file_path)
+        self._set_job_status(task, JobStatus.CANCELLED)
+        if task.current_thread and hasattr(task.current_thread, "stop"):
+            task.current_thread.stop()  # type: ignore
+
+    def stop_all(self, cancel_jobs: bool = True):
+        """
+        停止所有任务
+
+        Args:
+            cancel_jobs: 是否同时取消持久化的任务（为False时下次启动会继续处理）
+        """
+        self.scheduler.cancel_all()
+        if cancel_jobs:
+            for task in self.current_tasks.values():
+                if task.status in (BatchTaskStatus.WAITING, BatchTaskStatus.RUNNING):
+                    self._set_job_status(task, JobStatus.CANCELLED)
         # 停止所有线程
-        for thread in self.threads:
+        with self._threads_lock:
+            threads = list(self.threads)
+        for thread in threads:
             if hasattr(thread, "stop"):
                 thread.stop()  # type: ignore
             thread.wait()  # 等待线程结束
-        self.threads.clear()
+        with self._threads_lock:
+            self.threads.clear()
         self.current_tasks.clear()
-        # 清空任务队列
-        with self.task_queue.mutex:
-            self.task_queue.queue.clear()
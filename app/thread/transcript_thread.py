@@ -1,6 +1,6 @@
 import datetime
 import os
-import tempfile
+import time
 from pathlib import Path
 
 from PyQt5.QtCore import QThread, pyqtSignal
@@ -8,10 +8,12 @@ from PyQt5.QtCore import QThread, pyqtSignal
 from app.config import CACHE_PATH
 from app.core.bk_asr import transcribe
 from app.core.entities import TranscribeModelEnum, TranscribeTask
+from app.core.pipeline import extract_audio, get_stage_cache, transcribe_cache_key
 from app.core.storage.cache_manager import ServiceUsageManager
 from app.core.storage.database import DatabaseManager
+from app.core.throughput import get_throughput_model
+from app.core.utils import tracing
 from app.core.utils.logger import setup_logger
-from app.core.utils.video_utils import video2audio
 
 logger = setup_logger("transcript_thread")
 
@@ -28,9 +30,17 @@ class TranscriptThread(QThread):
         # 初始化服务管理器
         db_manager = DatabaseManager(str(CACHE_PATH))
         self.service_manager = ServiceUsageManager(db_manager)
+        # 在批量处理的阶段中创建时，线程中记录的span归入该阶段
+        self.trace_parent = tracing.current_span()
 
     def run(self):
-        temp_file = None
+        with tracing.use_span(self.trace_parent), tracing.span(
+            "thread.transcribe", file=self.task.file_path
+        ):
+            self._run()
+
+    def _run(self):
+        audio_path, is_temp = None, False
         try:
             logger.info("\n===========转录任务开始===========")
             logger.info(f"时间：{datetime.datetime.now()}")
@@ -82,19 +92,21 @@ class TranscriptThread(QThread):
                     self.finished.emit(self.task)
                     return
 
+            # 输入和配置都未变化时，直接恢复上次的字幕
+            cache = get_stage_cache(self.task.transcribe_config)
+            cache_key = transcribe_cache_key(cache, self.task) if cache else ""
+            if cache and cache.restore(cache_key) is not None:
+                logger.info("使用阶段缓存，跳过转录")
+                self.progress.emit(100, self.tr("转录完成"))
+                self.finished.emit(self.task)
+                return
+
+            started = time.monotonic()
             self.progress.emit(5, self.tr("转换音频中"))
             logger.info("开始转换音频")
 
-            # 转换音频文件
-            temp_dir = tempfile.gettempdir()
-            temp_file = tempfile.NamedTemporaryFile(
-                suffix=".wav", dir=temp_dir, delete=False
-            )
-            temp_file.close()
-            is_success = video2audio(str(video_path), output=temp_file.name)
-            if not is_success:
-                logger.error("音频转换失败")
-                raise RuntimeError(self.tr("音频转换失败"))
+            # 转换音频文件（开启阶段缓存时复用同一文件提取过的音频）
+            audio_path, is_temp = extract_audio(str(video_path), cache)
 
             self.progress.emit(20, self.tr("语音转录中"))
             logger.info("开始语音转录")
@@ -103,7 +115,7 @@ class TranscriptThread(QThread):
             if not self.task.transcribe_config:
                 raise ValueError(self.tr("转录配置为空"))
             asr_data = transcribe(
-                temp_file.name,
+                audio_path,
                 self.task.transcribe_config,
                 callback=self.progress_callback,
             )
@@ -122,6 +134,11 @@ class TranscriptThread(QThread):
             output_path.parent.mkdir(parents=True, exist_ok=True)
             asr_data.to_srt(save_path=str(output_path))
             logger.info("字幕文件已保存到: %s", str(output_path))
+            get_throughput_model().record_task(
+                "transcribe", self.task, time.monotonic() - started
+            )
+            if cache:
+                cache.save(cache_key, [str(output_path)])
 
             self.progress.emit(100, self.tr("转录完成"))
             self.finished.emit(self.task)
@@ -131,9 +148,9 @@ class TranscriptThread(QThread):
             self.progress.emit(100, self.tr("转录失败"))
         finally:
             # 清理临时文件
-            if temp_file and os.path.exists(temp_file.name):
+            if is_temp and audio_path and os.path.exists(audio_path):
                 try:
-                    os.unlink(temp_file.name)
+                    os.unlink(audio_path)
                 except Exception as e:
                     logger.warning(f"清理临时文件失败: {e}")
 
@@ -1,8 +1,12 @@
 import datetime
+import time
 
 from PyQt5.QtCore import QThread, pyqtSignal
 
 from app.core.entities import SynthesisTask
+from app.core.pipeline import get_stage_cache, synthesis_cache_key
+from app.core.throughput import get_throughput_model
+from app.core.utils import tracing
 from app.core.utils.logger import setup_logger
 from app.core.utils.video_utils import add_subtitles
 
@@ -18,8 +22,16 @@ class VideoSynthesisThread(QThread):
         super().__init__()
         self.task = task
         logger.debug(f"初始化 VideoSynthesisThread，任务: {self.task}")
+        # 在批量处理的阶段中创建时，线程中记录的span归入该阶段
+        self.trace_parent = tracing.current_span()
 
     def run(self):
+        with tracing.use_span(self.trace_parent), tracing.span(
+            "thread.synthesize", file=self.task.video_path
+        ):
+            self._run()
+
+    def _run(self):
         try:
             logger.info("\n===========视频合成任务开始===========")
             logger.info(f"时间：{datetime.datetime.now()}")
@@ -45,6 +57,16 @@ class VideoSynthesisThread(QThread):
             if not output_path:
                 raise ValueError(self.tr("输出路径为空"))
 
+            # 视频、字幕和配置都未变化时，直接恢复上次合成的视频
+            cache = get_stage_cache(self.task.synthesis_config)
+            cache_key = synthesis_cache_key(cache, self.task) if cache else ""
+            if cache and cache.restore(cache_key) is not None:
+                logger.info("使用阶段缓存，跳过视频合成")
+                self.progress.emit(100, self.tr("合成完成"))
+                self.finished.emit(self.task)
+                return
+
+            started = time.monotonic()
             add_subtitles(
                 video_file,
                 subtitle_file,
@@ -53,6 +75,11 @@ class VideoSynthesisThread(QThread):
                 progress_callback=self.progress_callback,
             )
 
+            get_throughput_model().record_task(
+                "synthesize", self.task, time.monotonic() - started
+            )
+            if cache:
+                cache.save(cache_key, [output_path])
             self.progress.emit(100, self.tr("合成完成"))
             logger.info(f"视频合成完成，保存路径: {output_path}")
 
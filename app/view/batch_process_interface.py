@@ -26,6 +26,7 @@ from qfluentwidgets import (
     FluentIcon as FIF,
 )
 
+from app.common.config import cfg
 from app.core.entities import (
     BatchTaskStatus,
     BatchTaskType,
@@ -49,6 +50,7 @@ class BatchProcessInterface(QWidget):
 
         self.init_ui()
         self.setup_connections()
+        self.resume_unfinished_tasks()
 
     def init_ui(self):
         # 创建主布局
@@ -65,6 +67,14 @@ class BatchProcessInterface(QWidget):
         self.task_type_combo.addItems([str(task_type) for task_type in BatchTaskType])
         self.task_type_combo.setCurrentText(str(BatchTaskType.FULL_PROCESS))
 
+        # 任务顺序选择
+        self.order_combo = ComboBox()
+        self.order_combo.addItem("提交顺序", userData="fifo")
+        self.order_combo.addItem("短任务优先", userData="sjf")
+        self.order_combo.setCurrentIndex(
+            max(self.order_combo.findData(cfg.batch_order.value), 0)
+        )
+
         # 控制按钮
         self.add_file_btn = PushButton("添加文件", icon=FIF.ADD)
         self.start_all_btn = PushButton("开始处理", icon=FIF.PLAY)
@@ -72,6 +82,7 @@ class BatchProcessInterface(QWidget):
 
         # 添加到顶部布局
         top_layout.addWidget(self.task_type_combo)
+        top_layout.addWidget(self.order_combo)
         top_layout.addWidget(self.add_file_btn)
         top_layout.addWidget(self.clear_btn)
 
@@ -116,6 +127,7 @@ class BatchProcessInterface(QWidget):
         self.start_all_btn.clicked.connect(self.start_all_tasks)
         self.clear_btn.clicked.connect(self.clear_tasks)
         self.task_type_combo.currentTextChanged.connect(self.on_task_type_changed)
+        self.order_combo.currentIndexChanged.connect(self.on_order_changed)
 
     def setup_connections(self):
         # 批处理线程信号连接
@@ -127,6 +139,20 @@ class BatchProcessInterface(QWidget):
         self.task_table.setContextMenuPolicy(Qt.CustomContextMenu)  # type: ignore
         self.task_table.customContextMenuRequested.connect(self.show_context_menu)
 
+    def resume_unfinished_tasks(self):
+        """恢复上次退出时未完成的任务"""
+        tasks = self.batch_thread.resume_unfinished_tasks()
+        for task in tasks:
+            self.add_task_to_table(task.file_path)
+        if tasks:
+            InfoBar.info(
+                title="恢复任务",
+                content=f"继续处理上次未完成的 {len(tasks)} 个任务",
+                duration=3000,
+                position=InfoBarPosition.TOP,
+                parent=self,
+            )
+
     def on_add_file_clicked(self):
         task_type = self.task_type_combo.currentText()
         file_filter = ""
@@ -422,8 +448,15 @@ class BatchProcessInterface(QWidget):
         # 清空当前任务列表
         self.clear_tasks()
 
+    def on_order_changed(self, index):
+        """切换任务顺序（对尚未开始的阶段生效）"""
+        order = self.order_combo.itemData(index)
+        cfg.set(cfg.batch_order, order)
+        self.batch_thread.scheduler.set_order(order)
+
     def closeEvent(self, event):
-        self.batch_thread.stop_all()
+        # 保留未完成的任务，下次启动时继续处理
+        self.batch_thread.stop_all(cancel_jobs=False)
         super().closeEvent(event)
 
     def on_table_double_clicked(self, index):
@@ -156,6 +156,13 @@ class SettingInterface(ScrollArea):
             cfg.get(cfg.work_dir),
             self.saveGroup,
         )
+        self.stageCacheCard = SwitchSettingCard(
+            FIF.HISTORY,
+            self.tr("阶段缓存"),
+            self.tr("文件和配置都未变化时，直接使用上次处理的结果（音频、字幕、视频）"),
+            cfg.use_stage_cache,
+            self.saveGroup,
+        )
 
         # 个性化配置卡片
         self.themeCard = OptionsSettingCard(
@@ -230,6 +237,7 @@ class SettingInterface(ScrollArea):
         self.subtitleGroup.addSettingCard(self.softSubtitleCard)
 
         self.saveGroup.addSettingCard(self.savePathCard)
+        self.saveGroup.addSettingCard(self.stageCacheCard)
 
         self.personalGroup.addSettingCard(self.themeCard)
         self.personalGroup.addSettingCard(self.themeColorCard)
@@ -0,0 +1,148 @@
+"""
+字幕对齐（SubtitleAligner）的基准测试和与 difflib.ndiff 的一致性检查
+
+- 一致性：随机生成的修改（替换块不超过 MAX_EXACT_PAIRS 个行对）与 ndiff 的对齐结果必须完全相同
+- 基准：部分行修改（替换块较小）和逐行改写（整个文件是一个替换块）两种情况下
+  LineDiffer 与 ndiff 的耗时，以及大块时与 ndiff 结果相同的行所占比例
+
+用法:
+    python scripts/bench_alignment.py                 # 一致性检查 + 默认基准
+    python scripts/bench_alignment.py --sizes 500 2000 --skip-ndiff-above 1000
+    python scripts/bench_alignment.py --parity-only   # 只做一致性检查（不一致时返回 1）
+"""
+
+import argparse
+import os
+import sys
+import time
+from random import Random
+from typing import Callable, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.subtitle_processor.alignment import SubtitleAligner  # noqa: E402
+
+VOCAB = (
+    "the a of to and in is it you that he was for on are with as we they "
+    "this have from or one had by word but not what all were when your can"
+).split()
+
+Aligned = Tuple[List[str], List[str]]
+
+
+def _sentence(rng: Random) -> str:
+    return " ".join(rng.choices(VOCAB, k=rng.randint(3, 12)))
+
+
+def _edit(rng: Random, line: str) -> str:
+    """把一行中的一个词换成另一个词（模拟LLM优化字幕）"""
+    words = line.split()
+    n = rng.randrange(len(words))
+    words[n] = rng.choice([word for word in VOCAB if word != words[n]])
+    return " ".join(words)
+
+
+def partial_fixture(size: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """约 60% 的行修改一个词，少量行删除、插入或与下一行合并"""
+    rng = Random(seed)
+    source = [_sentence(rng) for _ in range(size)]
+    target: List[str] = []
+    skip = False
+    for n, line in enumerate(source):
+        if skip:
+            skip = False
+            continue
+        roll = rng.random()
+        if roll < 0.02:
+            continue
+        if roll < 0.04:
+            target.append(_sentence(rng))
+        if roll < 0.06 and n + 1 < size:
+            target.append(f"{line} {source[n + 1]}")
+            skip = True
+            continue
+        target.append(_edit(rng, line) if rng.random() < 0.6 else line)
+    return source, target
+
+
+def rewrite_fixture(size: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """每一行都修改（整个文件是一个替换块，ndiff 的最坏情况）"""
+    rng = Random(seed)
+    source = [_sentence(rng) for _ in range(size)]
+    lines = set(source)
+    target = []
+    for line in source:
+        edited = _edit(rng, line)
+        # 修改后的行恰好与另一行原文相同时会把替换块切开，重新修改
+        while edited in lines:
+            edited = _edit(rng, line)
+        target.append(edited)
+    return source, target
+
+
+def _timed(fn: Callable[[], Aligned]) -> Tuple[Aligned, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _agreement(result: Aligned, expected: Aligned) -> float:
+    """对齐后目标行与 ndiff 结果相同的比例"""
+    if len(result[1]) != len(expected[1]):
+        return 0.0
+    same = sum(x == y for x, y in zip(result[1], expected[1]))
+    return same / max(1, len(expected[1]))
+
+
+def check_parity(cases: int = 200) -> int:
+    """随机小规模修改与 ndiff 的对齐结果必须相同，返回不一致的用例数"""
+    failures = 0
+    for seed in range(cases):
+        rng = Random(seed)
+        fixture = partial_fixture if seed % 2 else rewrite_fixture
+        source, target = fixture(rng.randint(1, 50), seed)
+        expected = SubtitleAligner()._align_texts_ndiff(source, target)
+        result = SubtitleAligner().align_texts(source, target)
+        if result != expected:
+            failures += 1
+            print(f"不一致: {fixture.__name__}(seed={seed}, size={len(source)})")
+    print(f"一致性检查: {cases - failures}/{cases} 与 ndiff 相同")
+    return failures
+
+
+def benchmark(sizes: List[int], skip_ndiff_above: int) -> None:
+    print(f"{'用例':<16}{'行数':>6}{'ndiff':>10}{'LineDiffer':>12}{'加速':>8}{'一致':>8}")
+    for name, fixture in (("partial", partial_fixture), ("rewrite", rewrite_fixture)):
+        for size in sizes:
+            source, target = fixture(size)
+            result, fast = _timed(lambda: SubtitleAligner().align_texts(source, target))
+            if size > skip_ndiff_above:
+                print(f"{name:<16}{size:>6}{'-':>10}{fast:>11.3f}s{'-':>8}{'-':>8}")
+                continue
+            expected, slow = _timed(
+                lambda: SubtitleAligner()._align_texts_ndiff(source, target)
+            )
+            print(
+                f"{name:<16}{size:>6}{slow:>9.3f}s{fast:>11.3f}s"
+                f"{slow / max(fast, 1e-9):>7.1f}x{_agreement(result, expected):>8.1%}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="字幕对齐的基准测试和一致性检查")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument(
+        "--skip-ndiff-above", type=int, default=2000, help="行数超过该值时不运行 ndiff"
+    )
+    parser.add_argument("--cases", type=int, default=200, help="一致性检查的用例数")
+    parser.add_argument("--parity-only", action="store_true")
+    args = parser.parse_args()
+
+    failures = check_parity(args.cases)
+    if not args.parity_only:
+        benchmark(args.sizes, args.skip_ndiff_above)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
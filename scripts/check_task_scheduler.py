@@ -0,0 +1,137 @@
+"""
+任务调度器（TaskScheduler）的回归检查：缓冲区背压不会导致死锁，且仍然限制上游领先的阶段数
+
+- 同一资源上的前后阶段（z -> end 都使用同一资源、缓冲区为1）
+- 默认配置下 LLM 资源繁忙时提交两个 断句(llm) -> 翻译(llm) 的任务
+- 不同任务在两种资源上方向相反的阶段（x(r1) -> y(r2) 与 p(r2) -> q(r1)）互相等待缓冲区
+- 转录 -> 字幕 的流水线中，转录开始时字幕资源前等待的阶段数不超过缓冲区大小
+
+用法:
+    python scripts/check_task_scheduler.py   # 任一检查失败时返回 1
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.task_scheduler import (  # noqa: E402
+    RESOURCE_LLM,
+    Stage,
+    TaskScheduler,
+)
+
+# 每项检查等待任务完成的最长时间（秒）
+TIMEOUT = 10
+
+
+def _sleep(seconds: float) -> Callable[[Dict], None]:
+    return lambda results: time.sleep(seconds)
+
+
+def _finishes(scheduler: TaskScheduler, jobs: Dict[str, List[Stage]]) -> bool:
+    """提交任务并等待全部完成，返回是否在超时前完成且没有失败"""
+    errors: List[BaseException] = []
+    for job_id, stages in jobs.items():
+        scheduler.submit(
+            job_id,
+            stages,
+            on_done=lambda _, error, __: errors.append(error) if error else None,
+        )
+    finished = scheduler.wait(timeout=TIMEOUT)
+    scheduler.shutdown()
+    return finished and not errors
+
+
+def check_same_resource_chain() -> bool:
+    scheduler = TaskScheduler({"c": 1}, buffers={"c": 1})
+    stages = [Stage("z", "c", _sleep(0)), Stage("end", "c", _sleep(0), ["z"])]
+    return _finishes(scheduler, {"job": stages})
+
+
+def check_busy_llm_split_translate() -> bool:
+    scheduler = TaskScheduler()
+    jobs: Dict[str, List[Stage]] = {
+        # 占满 LLM 资源，后提交的断句阶段都留在就绪队列中
+        f"busy{i}": [Stage("work", RESOURCE_LLM, _sleep(0.3))] for i in range(2)
+    }
+    for i in range(2):
+        jobs[f"video{i}"] = [
+            Stage("split", RESOURCE_LLM, _sleep(0.01)),
+            Stage("translate", RESOURCE_LLM, _sleep(0.01), ["split"]),
+        ]
+    return _finishes(scheduler, jobs)
+
+
+def check_cross_resource_wait() -> bool:
+    scheduler = TaskScheduler({"r1": 1, "r2": 1}, buffers={"r1": 1, "r2": 1})
+    return _finishes(
+        scheduler,
+        {
+            # 先占满两种资源，使 x 和 p 同时留在就绪队列中
+            "busy1": [Stage("work", "r1", _sleep(0.1))],
+            "busy2": [Stage("work", "r2", _sleep(0.1))],
+            "a": [Stage("x", "r1", _sleep(0)), Stage("y", "r2", _sleep(0), ["x"])],
+            "b": [Stage("p", "r2", _sleep(0)), Stage("q", "r1", _sleep(0), ["p"])],
+        },
+    )
+
+
+def check_backpressure() -> bool:
+    buffer_size = 2
+    scheduler = TaskScheduler(
+        {"asr": 2, RESOURCE_LLM: 1}, buffers={RESOURCE_LLM: buffer_size}
+    )
+    lock = threading.Lock()
+    peak: List[int] = [0]
+    transcribed: List[int] = [0]
+    subtitled: List[int] = [0]
+
+    def transcribe(results: Dict) -> None:
+        with lock:
+            # 已转录但字幕处理还没开始的文件数
+            peak[0] = max(peak[0], transcribed[0] - subtitled[0])
+        time.sleep(0.01)
+        with lock:
+            transcribed[0] += 1
+
+    def subtitle(results: Dict) -> None:
+        with lock:
+            subtitled[0] += 1
+        time.sleep(0.05)
+
+    jobs = {
+        f"video{i}": [
+            Stage("transcribe", "asr", transcribe),
+            Stage("subtitle", RESOURCE_LLM, subtitle, ["transcribe"]),
+        ]
+        for i in range(10)
+    }
+    if not _finishes(scheduler, jobs):
+        return False
+    # 两个转录阶段可能同时开始，允许比缓冲区多一个
+    print(f"  转录领先字幕处理最多 {peak[0]} 个文件")
+    return peak[0] <= buffer_size + 1
+
+
+def main() -> None:
+    checks = [
+        check_same_resource_chain,
+        check_busy_llm_split_translate,
+        check_cross_resource_wait,
+        check_backpressure,
+    ]
+    failures = 0
+    for check in checks:
+        start = time.monotonic()
+        ok: Optional[bool] = check()
+        failures += not ok
+        print(f"{'通过' if ok else '失败'} {check.__name__} ({time.monotonic() - start:.2f}s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
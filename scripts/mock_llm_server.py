@@ -0,0 +1,511 @@
+"""
+本地模拟的 OpenAI 兼容 LLM 服务，用于离线测试断句、优化、翻译流程的吞吐量
+
+根据系统提示词识别请求类型，返回确定性的结果：
+- 断句：按最大字数/单词数用 <br> 分隔原文
+- 优化：返回与输入编号一致的 JSON（去除语气词）
+- 翻译 / 反思翻译 / 优化翻译融合：返回对应格式的 JSON
+- 单条翻译、摘要：返回对应格式的文本
+
+可配置延迟、限流和错误注入，同一请求（及其第几次重试）的延迟和错误是确定的，
+便于复现地比较并发和缓存相关的改动。
+
+用法:
+    python scripts/mock_llm_server.py --port 8765 --profile realistic
+    export OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+    export OPENAI_API_KEY=mock
+
+    # 查看统计
+    curl http://127.0.0.1:8765/stats
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass, fields, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from random import Random
+from typing import Any, Dict, List, Optional, Tuple
+
+# 中日韩等按字计数的文字
+_CJK_PATTERN = r"぀-ヿ㐀-䶿一-鿿가-힯豈-﫿"
+_UNIT_RE = re.compile(rf"[{_CJK_PATTERN}]\s*|[^\s{_CJK_PATTERN}]+\s*|\s+")
+_CJK_RE = re.compile(rf"[{_CJK_PATTERN}]")
+_FILLER_RE = re.compile(r"\b(?:um+|uh+|erm|hmm)\b[,.]?\s*", re.IGNORECASE)
+
+
+@dataclass
+class MockProfile:
+    """
+    模拟服务的延迟、限流和错误注入配置
+
+    Attributes:
+        first_token_ms: 首个token的延迟（毫秒）
+        ms_per_token: 每个输出token的延迟（毫秒）
+        jitter: 延迟的随机浮动比例
+        tail_rate: 长尾请求的比例
+        tail_factor: 长尾请求的延迟倍数
+        error_rate: 返回 500 错误的比例
+        malformed_rate: 返回缺少条目的 JSON 的比例（用于测试结果修复）
+        rate_limit: 每秒允许的请求数，0 表示不限流（超出时返回 429）
+        cache_min_tokens: 提示词缓存的最小前缀token数
+        seed: 随机种子
+    """
+
+    first_token_ms: float = 0.0
+    ms_per_token: float = 0.0
+    jitter: float = 0.0
+    tail_rate: float = 0.0
+    tail_factor: float = 10.0
+    error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    rate_limit: float = 0.0
+    cache_min_tokens: int = 1024
+    seed: int = 0
+
+
+PROFILES: Dict[str, MockProfile] = {
+    # 无延迟，用于测试程序本身的开销
+    "fast": MockProfile(),
+    # 接近真实服务的延迟
+    "realistic": MockProfile(first_token_ms=400, ms_per_token=15, jitter=0.3),
+    # 少量请求特别慢，用于测试对冲请求
+    "slow-tail": MockProfile(
+        first_token_ms=400, ms_per_token=15, jitter=0.3, tail_rate=0.05
+    ),
+    # 有错误、格式问题和限流，用于测试重试和容错
+    "flaky": MockProfile(
+        first_token_ms=400,
+        ms_per_token=15,
+        jitter=0.3,
+        error_rate=0.05,
+        malformed_rate=0.05,
+        rate_limit=10,
+    ),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """估算token数：中日韩文字每字1个，其余每4个字符1个"""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+class RateLimiter:
+    """令牌桶限流"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class MockLLM:
+    """根据请求内容生成确定性的模拟响应"""
+
+    def __init__(self, profile: MockProfile):
+        self.profile = profile
+        self.limiter = RateLimiter(profile.rate_limit)
+        self._lock = threading.Lock()
+        self._attempts: Dict[str, int] = defaultdict(int)
+        self._seen_prefixes: set = set()
+        self.stats: Dict[str, int] = defaultdict(int)
+
+    def _count(self, key: str, value: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += value
+
+    def _rng(self, body: Dict[str, Any]) -> Random:
+        """同一请求第n次发送时的随机数生成器（与并发顺序无关）"""
+        digest = hashlib.sha256(
+            json.dumps(body.get("messages", []), sort_keys=True).encode()
+        ).hexdigest()
+        with self._lock:
+            attempt = self._attempts[digest]
+            self._attempts[digest] += 1
+        return Random(f"{self.profile.seed}:{digest}:{attempt}")
+
+    def handle(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any], float]:
+        """
+        处理一次 chat.completions 请求
+
+        Returns:
+            (HTTP状态码, 响应内容, 模拟延迟秒数)
+        """
+        self._count("requests")
+        if not self.limiter.acquire():
+            self._count("rate_limited")
+            return 429, _error("Rate limit exceeded", "rate_limit_error"), 0.0
+
+        rng = self._rng(body)
+        if rng.random() < self.profile.error_rate:
+            self._count("errors")
+            return 500, _error("Injected server error", "server_error"), 0.05
+
+        messages = body.get("messages", [])
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = next(
+            (m["content"] for m in reversed(messages) if m["role"] == "user"), ""
+        )
+        malformed = rng.random() < self.profile.malformed_rate
+        if malformed:
+            self._count("malformed")
+        content = respond(system, user, malformed)
+
+        prompt_tokens = estimate_tokens(system) + estimate_tokens(user)
+        completion_tokens = estimate_tokens(content)
+        cached_tokens = self._cached_tokens(system, user)
+        self._count("prompt_tokens", prompt_tokens)
+        self._count("completion_tokens", completion_tokens)
+        self._count("cached_tokens", cached_tokens)
+
+        delay = self._latency(rng, completion_tokens)
+        payload = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        }
+        return 200, payload, delay
+
+    def _latency(self, rng: Random, completion_tokens: int) -> float:
+        profile = self.profile
+        delay = profile.first_token_ms + profile.ms_per_token * completion_tokens
+        delay *= 1 + profile.jitter * (2 * rng.random() - 1)
+        if rng.random() < profile.tail_rate:
+            delay *= profile.tail_factor
+        return max(delay, 0.0) / 1000
+
+    def _cached_tokens(self, system: str, user: str) -> int:
+        """
+        模拟提示词缓存：系统提示词加上用户消息中字幕内容之前的部分作为前缀，
+        之前出现过且不少于 cache_min_tokens 时按128的倍数计为命中
+        """
+        prefix = system + user[: _content_start(user)]
+        tokens = estimate_tokens(prefix)
+        if tokens < self.profile.cache_min_tokens:
+            return 0
+        with self._lock:
+            if prefix not in self._seen_prefixes:
+                self._seen_prefixes.add(prefix)
+                return 0
+        return tokens // 128 * 128
+
+
+def _error(message: str, error_type: str) -> Dict[str, Any]:
+    return {"error": {"message": message, "type": error_type, "code": None}}
+
+
+def _content_start(user: str) -> int:
+    """用户消息中字幕内容的起始位置（跳过参考信息等固定前缀）"""
+    start = 0
+    for tag in ("</prompt>", "</reference>"):
+        index = user.rfind(tag)
+        if index >= 0:
+            start = max(start, index + len(tag))
+    return start
+
+
+def _parse_subtitles(user: str) -> Dict[str, str]:
+    """从用户消息中解析字幕字典（JSON，或优化请求中的Python字典格式）"""
+    match = re.search(r"<input_subtitle>(.*)</input_subtitle>", user, re.DOTALL)
+    if match:
+        text = match.group(1)
+        try:
+            return {str(k): str(v) for k, v in ast.literal_eval(text).items()}
+        except (ValueError, SyntaxError):
+            pass
+    else:
+        text = user[_content_start(user) :]
+        text = text[text.find("{") :] if "{" in text else text
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return {}
+    return {str(k): str(v) for k, v in data.items()} if isinstance(data, dict) else {}
+
+
+def _target_language(system: str) -> str:
+    match = re.search(r"(?:into|精通)\s*([^\s,，.。的]+)", system)
+    return match.group(1) if match else "Chinese"
+
+
+def _optimize(text: str) -> str:
+    text = _FILLER_RE.sub("", text).strip()
+    return text[:1].upper() + text[1:] if text else text
+
+
+def _translate(text: str, language: str) -> str:
+    return f"[{language}] {text}"
+
+
+def _split_sentences(text: str, system: str) -> str:
+    """按提示词中的最大字数/单词数，用 <br> 分隔原文（不修改原文内容）"""
+    numbers = [int(n) for n in re.findall(r"不得超过(\d+)个", system)]
+    max_cjk = numbers[0] if numbers else 18
+    max_words = numbers[1] if len(numbers) > 1 else 12
+    parts: List[str] = []
+    current = ""
+    cjk_count = word_count = 0
+    for unit in _UNIT_RE.findall(text):
+        if unit.isspace():
+            current += unit
+            continue
+        is_cjk = bool(_CJK_RE.match(unit))
+        cjk_count += is_cjk
+        word_count += not is_cjk
+        # 每段约取上限的 70%，模拟按语义提前断开
+        if cjk_count > max_cjk * 0.7 or word_count > max_words * 0.7:
+            parts.append(current)
+            current = ""
+            cjk_count, word_count = int(is_cjk), int(not is_cjk)
+        current += unit
+    parts.append(current)
+    return "<br>".join(part for part in parts if part.strip())
+
+
+def respond(system: str, user: str, malformed: bool = False) -> str:
+    """
+    根据系统提示词识别请求类型，生成确定性的响应内容
+
+    Args:
+        system: 系统提示词
+        user: 用户消息
+        malformed: 是否故意丢弃结果中的一个条目
+
+    Returns:
+        str: 响应内容
+    """
+    if "<br>" in system:
+        text = user.split("\n", 1)[1] if "\n" in user else user
+        return _split_sentences(text, system)
+    if "视频分析师" in system:
+        return json.dumps(
+            {"summary": user[:100], "terms": {"entities": [], "keywords": []}},
+            ensure_ascii=False,
+        )
+
+    language = _target_language(system)
+    if "Return the translation result directly" in system:
+        return _translate(user, language)
+
+    subtitles = _parse_subtitles(user)
+    if "optimized_subtitle" in system:
+        result: Dict[str, Any] = {
+            k: {
+                "optimized_subtitle": _optimize(v),
+                "translation": _translate(_optimize(v), language),
+            }
+            for k, v in subtitles.items()
+        }
+    elif "revised_translation" in system:
+        result = {
+            k: {
+                "translation": _translate(v, language),
+                "free_translation": _translate(v, language),
+                "revise_suggestions": "",
+                "revised_translation": _translate(v, language),
+            }
+            for k, v in subtitles.items()
+        }
+    elif "subtitle correction expert" in system:
+        result = {k: _optimize(v) for k, v in subtitles.items()}
+    elif subtitles:
+        result = {k: _translate(v, language) for k, v in subtitles.items()}
+    else:
+        return "Hello! This is a mock LLM server."
+
+    if malformed and len(result) > 1:
+        result.pop(sorted(result)[len(result) // 2])
+    return json.dumps(result, ensure_ascii=False)
+
+
+def _stream_chunks(payload: Dict[str, Any], pieces: int = 8) -> List[Dict[str, Any]]:
+    """将完整响应拆分为流式响应的数据块"""
+    content = payload["choices"][0]["message"]["content"]
+    size = max(1, math.ceil(len(content) / pieces))
+    base = {k: payload[k] for k in ("id", "created", "model")}
+    base["object"] = "chat.completion.chunk"
+    chunks = [
+        {
+            **base,
+            "choices": [
+                {"index": 0, "delta": {"role": "assistant", "content": ""}}
+            ],
+        }
+    ]
+    for i in range(0, len(content), size):
+        chunks.append(
+            {
+                **base,
+                "choices": [{"index": 0, "delta": {"content": content[i : i + size]}}],
+            }
+        )
+    chunks.append(
+        {
+            **base,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "usage": payload["usage"],
+        }
+    )
+    return chunks
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """HTTP 请求处理（server.mock 为 MockLLM 实例）"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        mock: MockLLM = self.server.mock  # type: ignore
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(
+                200,
+                {
+                    "object": "list",
+                    "data": [{"id": "mock-model", "object": "model", "owned_by": "mock"}],
+                },
+            )
+        elif self.path.rstrip("/") == "/stats":
+            self._send_json(
+                200, {"profile": asdict(mock.profile), "stats": dict(mock.stats)}
+            )
+        else:
+            self._send_json(404, _error("Not found", "invalid_request_error"))
+
+    def do_POST(self) -> None:
+        mock: MockLLM = self.server.mock  # type: ignore
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, _error("Invalid JSON", "invalid_request_error"))
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, _error("Not found", "invalid_request_error"))
+            return
+
+        status, payload, delay = mock.handle(body)
+        if status != 200 or not body.get("stream"):
+            time.sleep(delay)
+            self._send_json(status, payload)
+            return
+
+        # 流式响应：首个数据块在首token延迟后发送，其余均匀分布在剩余时间内
+        chunks = _stream_chunks(payload)
+        first_delay = min(delay, mock.profile.first_token_ms / 1000)
+        interval = (delay - first_delay) / max(1, len(chunks) - 1)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        time.sleep(first_delay)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(interval)
+            data = json.dumps(chunk, ensure_ascii=False)
+            self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def create_server(
+    host: str = "127.0.0.1", port: int = 8765, profile: Optional[MockProfile] = None
+) -> ThreadingHTTPServer:
+    """
+    创建模拟服务（调用 serve_forever() 启动）
+
+    Args:
+        host: 监听地址
+        port: 监听端口，0 表示随机端口
+        profile: 延迟、限流和错误注入配置
+
+    Returns:
+        ThreadingHTTPServer: HTTP服务
+    """
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.mock = MockLLM(profile or MockProfile())  # type: ignore
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地模拟的 OpenAI 兼容 LLM 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast")
+    # 覆盖预设配置中的单项
+    for item in fields(MockProfile):
+        parser.add_argument(
+            f"--{item.name.replace('_', '-')}", type=type(item.default), default=None
+        )
+    args = parser.parse_args()
+
+    overrides = {
+        item.name: getattr(args, item.name)
+        for item in fields(MockProfile)
+        if getattr(args, item.name) is not None
+    }
+    profile = replace(PROFILES[args.profile], **overrides)
+    server = create_server(args.host, args.port, profile)
+    print(f"Mock LLM server: http://{args.host}:{server.server_port}/v1")
+    print(f"Profile: {asdict(profile)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
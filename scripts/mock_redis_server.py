@@ -0,0 +1,306 @@
+"""
+本地模拟的 Redis 协议服务（内存存储），用于在没有 Redis 的环境中测试分布式队列
+
+只实现 app/core/work_queue.py 使用的命令:
+    PING AUTH SELECT GET SET STRLEN EXISTS DEL FLUSHALL
+    HSET HGET HMGET HINCRBY HDEL
+    LPUSH RPUSH RPOPLPUSH LRANGE LREM
+    ZADD(NX/XX) ZSCORE ZREM ZRANGEBYSCORE
+
+用法:
+    python scripts/mock_redis_server.py --port 6390
+    python -m app.cli worker --queue redis://127.0.0.1:6390/0
+"""
+
+import argparse
+import socketserver
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class RespError(Exception):
+    pass
+
+
+def _int(value: bytes) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        raise RespError("ERR value is not an integer or out of range")
+
+
+def _score(value: bytes) -> float:
+    text = value.decode().lower()
+    if text in ("-inf", "+inf", "inf"):
+        return float(text if text != "+inf" else "inf")
+    try:
+        return float(text)
+    except ValueError:
+        raise RespError("ERR value is not a valid float")
+
+
+class MockRedis:
+    """内存中的数据（按数据库编号分开）及命令实现"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.dbs: Dict[int, Dict[bytes, Any]] = {}
+        self.stats: Dict[str, int] = {}
+
+    def execute(self, db: int, args: List[bytes]) -> Any:
+        name = args[0].decode().upper()
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            raise RespError(f"ERR unknown command '{name}'")
+        with self.lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+            return handler(self.dbs.setdefault(db, {}), *args[1:])
+
+    @staticmethod
+    def _typed(data: Dict[bytes, Any], key: bytes, kind: type, create: bool) -> Any:
+        value = data.get(key)
+        if value is None:
+            if not create:
+                return None
+            value = data[key] = kind()
+        if not isinstance(value, kind):
+            raise RespError(
+                "WRONGTYPE Operation against a key holding the wrong kind of value"
+            )
+        return value
+
+    # 通用与字符串
+    def cmd_ping(self, data: Dict, *args: bytes) -> Any:
+        return args[0] if args else "PONG"
+
+    def cmd_get(self, data: Dict, key: bytes) -> Optional[bytes]:
+        return self._typed(data, key, bytes, False)
+
+    def cmd_set(self, data: Dict, key: bytes, value: bytes) -> str:
+        data[key] = bytes(value)
+        return "OK"
+
+    def cmd_strlen(self, data: Dict, key: bytes) -> int:
+        value = self._typed(data, key, bytes, False)
+        return len(value) if value is not None else 0
+
+    def cmd_exists(self, data: Dict, *keys: bytes) -> int:
+        return sum(key in data for key in keys)
+
+    def cmd_del(self, data: Dict, *keys: bytes) -> int:
+        return sum(data.pop(key, None) is not None for key in keys)
+
+    def cmd_flushall(self, data: Dict) -> str:
+        self.dbs.clear()
+        return "OK"
+
+    # 哈希
+    def cmd_hset(self, data: Dict, key: bytes, *pairs: bytes) -> int:
+        if not pairs or len(pairs) % 2:
+            raise RespError("ERR wrong number of arguments for 'hset' command")
+        value = self._typed(data, key, dict, True)
+        added = 0
+        for field, item in zip(pairs[::2], pairs[1::2]):
+            added += field not in value
+            value[field] = item
+        return added
+
+    def cmd_hget(self, data: Dict, key: bytes, field: bytes) -> Optional[bytes]:
+        value = self._typed(data, key, dict, False) or {}
+        return value.get(field)
+
+    def cmd_hmget(self, data: Dict, key: bytes, *fields: bytes) -> List:
+        value = self._typed(data, key, dict, False) or {}
+        return [value.get(field) for field in fields]
+
+    def cmd_hincrby(self, data: Dict, key: bytes, field: bytes, amount: bytes) -> int:
+        value = self._typed(data, key, dict, True)
+        result = _int(value.get(field, b"0")) + _int(amount)
+        value[field] = str(result).encode()
+        return result
+
+    def cmd_hdel(self, data: Dict, key: bytes, *fields: bytes) -> int:
+        value = self._typed(data, key, dict, False) or {}
+        return sum(value.pop(field, None) is not None for field in fields)
+
+    # 列表
+    def cmd_lpush(self, data: Dict, key: bytes, *items: bytes) -> int:
+        value = self._typed(data, key, list, True)
+        for item in items:
+            value.insert(0, item)
+        return len(value)
+
+    def cmd_rpush(self, data: Dict, key: bytes, *items: bytes) -> int:
+        value = self._typed(data, key, list, True)
+        value.extend(items)
+        return len(value)
+
+    def cmd_rpoplpush(self, data: Dict, source: bytes, target: bytes) -> Any:
+        value = self._typed(data, source, list, False)
+        if not value:
+            return None
+        item = value.pop()
+        if not value:
+            del data[source]
+        self._typed(data, target, list, True).insert(0, item)
+        return item
+
+    def cmd_lrange(self, data: Dict, key: bytes, start: bytes, stop: bytes) -> List:
+        value = self._typed(data, key, list, False) or []
+        end = _int(stop)
+        return value[_int(start) : (None if end == -1 else end + 1)]
+
+    def cmd_lrem(self, data: Dict, key: bytes, count: bytes, item: bytes) -> int:
+        value = self._typed(data, key, list, False)
+        if not value:
+            return 0
+        limit = _int(count)
+        indexes = [i for i, v in enumerate(value) if v == item]
+        if limit < 0:
+            indexes = indexes[::-1][: -limit]
+        elif limit > 0:
+            indexes = indexes[:limit]
+        for i in sorted(indexes, reverse=True):
+            del value[i]
+        if not value:
+            del data[key]
+        return len(indexes)
+
+    # 有序集合
+    def cmd_zadd(self, data: Dict, key: bytes, *args: bytes) -> int:
+        flags = set()
+        args_list = list(args)
+        while args_list and args_list[0].upper() in (b"NX", b"XX"):
+            flags.add(args_list.pop(0).upper())
+        if not args_list or len(args_list) % 2:
+            raise RespError("ERR syntax error")
+        value = self._typed(data, key, dict, True)
+        added = 0
+        for score, member in zip(args_list[::2], args_list[1::2]):
+            exists = member in value
+            if (b"NX" in flags and exists) or (b"XX" in flags and not exists):
+                continue
+            added += not exists
+            value[member] = _score(score)
+        if not value:
+            del data[key]
+        return added
+
+    def cmd_zscore(self, data: Dict, key: bytes, member: bytes) -> Optional[bytes]:
+        value = self._typed(data, key, dict, False) or {}
+        score = value.get(member)
+        return None if score is None else repr(score).encode()
+
+    def cmd_zrem(self, data: Dict, key: bytes, *members: bytes) -> int:
+        value = self._typed(data, key, dict, False) or {}
+        removed = sum(value.pop(member, None) is not None for member in members)
+        if key in data and not value:
+            del data[key]
+        return removed
+
+    def cmd_zrangebyscore(
+        self, data: Dict, key: bytes, low: bytes, high: bytes
+    ) -> List[bytes]:
+        value = self._typed(data, key, dict, False) or {}
+        lo, hi = _score(low), _score(high)
+        items = sorted((score, member) for member, score in value.items())
+        return [member for score, member in items if lo <= score <= hi]
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    """按 RESP2 协议读取命令并返回结果（server.redis 为 MockRedis 实例）"""
+
+    def handle(self) -> None:
+        db = 0
+        while True:
+            try:
+                args = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            try:
+                name = args[0].upper()
+                if name == b"SELECT":
+                    db = _int(args[1])
+                    reply: Any = "OK"
+                elif name == b"AUTH":
+                    reply = "OK"
+                else:
+                    reply = self.server.redis.execute(db, args)  # type: ignore
+            except RespError as e:
+                reply = e
+            except (IndexError, TypeError):
+                reply = RespError("ERR wrong number of arguments")
+            self.wfile.write(_encode(reply))
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # 内联命令（如 telnet 中输入的 PING）
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:])):
+            header = self.rfile.readline()
+            length = int(header[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+
+def _encode(value: Any) -> bytes:
+    if isinstance(value, RespError):
+        return f"-{value}\r\n".encode()
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, str):
+        return f"+{value}\r\n".encode()
+    if isinstance(value, bool) or isinstance(value, int):
+        return f":{int(value)}\r\n".encode()
+    if isinstance(value, bytes):
+        return f"${len(value)}\r\n".encode() + value + b"\r\n"
+    if isinstance(value, list):
+        return f"*{len(value)}\r\n".encode() + b"".join(_encode(v) for v in value)
+    raise TypeError(f"无法编码的回复: {value!r}")
+
+
+class MockRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def create_server(host: str = "127.0.0.1", port: int = 6390) -> MockRedisServer:
+    """
+    创建模拟服务（调用 serve_forever() 启动）
+
+    Args:
+        host: 监听地址
+        port: 监听端口，0 表示随机端口
+
+    Returns:
+        MockRedisServer: 服务（server.redis 为 MockRedis 实例）
+    """
+    server = MockRedisServer((host, port), RespHandler)
+    server.redis = MockRedis()  # type: ignore
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地模拟的 Redis 协议服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port)
+    print(f"Mock Redis server: redis://{args.host}:{server.server_address[1]}/0")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+本地模拟的谷歌翻译（移动版网页）和 DeepLX 服务，用于离线测试机器翻译的多行合并请求
+
+- GET /m?tl=..&sl=auto&q=..   返回与谷歌翻译移动版相同结构的网页（译文在 result-container 中）
+- POST /translate             DeepLX 接口，请求 {"text", "source_lang", "target_lang"}，返回 {"code", "data"}
+- GET /stats                  各接口的请求次数和行数
+
+译文为逐行加上目标语言前缀（"[zh-CN] 原文"）。可配置换行的处理方式、长度限制和错误注入，
+用于检查合并请求在翻译服务合并换行、请求超长、请求失败时的行为。
+
+用法:
+    python scripts/mock_translate_server.py --port 8766 --newlines br
+    export GOOGLE_TRANSLATE_ENDPOINT=http://127.0.0.1:8766/m
+    export DEEPLX_ENDPOINT=http://127.0.0.1:8766/translate
+
+    # 查看统计
+    curl http://127.0.0.1:8766/stats
+"""
+
+import argparse
+import html
+import json
+import threading
+import zlib
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# 换行的处理方式
+NEWLINES_KEEP = "keep"  # 保留换行
+NEWLINES_BR = "br"  # 网页中用 <br> 表示换行
+NEWLINES_DROP = "drop"  # 换行合并为空格（不支持多行合并请求的服务）
+NEWLINE_MODES = (NEWLINES_KEEP, NEWLINES_BR, NEWLINES_DROP)
+
+
+@dataclass
+class MockTranslateProfile:
+    """
+    模拟服务的配置
+
+    Attributes:
+        newlines: 谷歌翻译网页中换行的处理方式（NEWLINE_MODES 之一），DeepLX 总是保留换行
+        google_max_query: 谷歌翻译 q 参数URL编码后的最大长度，超过时返回 400
+        deeplx_max_text: DeepLX 文本的最大字符数，超过时返回 413
+        error_rate: 返回 500 错误的比例（按请求内容确定，同一请求的结果相同）
+        merge_marker: 含有该文本的行与下一行合并（模拟翻译服务合并短句），为空时不合并
+    """
+
+    newlines: str = NEWLINES_KEEP
+    google_max_query: int = 16000
+    deeplx_max_text: int = 5000
+    error_rate: float = 0.0
+    merge_marker: str = ""
+
+
+def _translate(text: str, language: str, profile: MockTranslateProfile) -> str:
+    """逐行加上目标语言前缀，含有 merge_marker 的行与下一行合并"""
+    merged = []
+    merge_next = False
+    for line in text.split("\n"):
+        translated = f"[{language}] {line}" if line.strip() else line
+        if merge_next:
+            merged[-1] = f"{merged[-1]} {translated}"
+        else:
+            merged.append(translated)
+        merge_next = bool(profile.merge_marker) and profile.merge_marker in line
+    return "\n".join(merged)
+
+
+def _failed(text: str, profile: MockTranslateProfile) -> bool:
+    return (zlib.crc32(text.encode("utf-8")) % 1000) < profile.error_rate * 1000
+
+
+class MockTranslate:
+    """请求统计及接口实现，返回 (状态码, 内容类型, 响应内容)"""
+
+    def __init__(self, profile: MockTranslateProfile):
+        self.profile = profile
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = defaultdict(int)
+
+    def _count(self, name: str, text: str) -> None:
+        with self.lock:
+            self.stats[f"{name}_requests"] += 1
+            self.stats[f"{name}_lines"] += text.count("\n") + 1
+
+    def google(self, raw_query: str) -> Tuple[int, str, str]:
+        query = parse_qs(raw_query)
+        text = query.get("q", [""])[0]
+        language = query.get("tl", ["zh-CN"])[0]
+        self._count("google", text)
+        if len(raw_query) > self.profile.google_max_query:
+            return 400, "text/html", "<html><body>400 Bad Request</body></html>"
+        if _failed(text, self.profile):
+            return 500, "text/html", "<html><body>500 Server Error</body></html>"
+        translated = html.escape(_translate(text, language, self.profile))
+        if self.profile.newlines == NEWLINES_BR:
+            translated = translated.replace("\n", "<br>")
+        elif self.profile.newlines == NEWLINES_DROP:
+            translated = " ".join(translated.split())
+        page = (
+            "<html><head><title>Google Translate</title></head><body>"
+            '<div class="result-container">'
+            f"{translated}</div></body></html>"
+        )
+        return 200, "text/html; charset=utf-8", page
+
+    def deeplx(self, body: Dict[str, Any]) -> Tuple[int, str, str]:
+        text = str(body.get("text", ""))
+        language = str(body.get("target_lang", "zh"))
+        self._count("deeplx", text)
+        if len(text) > self.profile.deeplx_max_text:
+            payload: Dict[str, Any] = {"code": 413, "message": "text too long"}
+            return 413, "application/json", json.dumps(payload)
+        if _failed(text, self.profile):
+            payload = {"code": 500, "message": "server error"}
+            return 500, "application/json", json.dumps(payload)
+        payload = {
+            "code": 200,
+            "data": _translate(text, language, self.profile),
+            "source_lang": "EN",
+            "target_lang": language.upper(),
+        }
+        return 200, "application/json", json.dumps(payload, ensure_ascii=False)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """HTTP 请求处理（server.mock 为 MockTranslate 实例）"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, content_type: str, content: str) -> None:
+        data = content.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        mock: MockTranslate = self.server.mock  # type: ignore
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") == "/m":
+            status, content_type, content = mock.google(url.query)
+            self._send(status, content_type, content)
+        elif url.path.rstrip("/") == "/stats":
+            payload = {"profile": asdict(mock.profile), "stats": dict(mock.stats)}
+            self._send(200, "application/json", json.dumps(payload))
+        else:
+            self._send(404, "text/plain", "Not found")
+
+    def do_POST(self) -> None:
+        mock: MockTranslate = self.server.mock  # type: ignore
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send(400, "application/json", json.dumps({"code": 400}))
+            return
+        if urlsplit(self.path).path.rstrip("/") != "/translate":
+            self._send(404, "text/plain", "Not found")
+            return
+        status, content_type, content = mock.deeplx(body)
+        self._send(status, content_type, content)
+
+
+def create_server(
+    host: str = "127.0.0.1",
+    port: int = 8766,
+    profile: Optional[MockTranslateProfile] = None,
+) -> ThreadingHTTPServer:
+    """
+    创建模拟服务（调用 serve_forever() 启动）
+
+    Args:
+        host: 监听地址
+        port: 监听端口，0 表示随机端口
+        profile: 换行处理、长度限制和错误注入配置
+
+    Returns:
+        ThreadingHTTPServer: HTTP服务
+    """
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.mock = MockTranslate(profile or MockTranslateProfile())  # type: ignore
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地模拟的谷歌翻译和 DeepLX 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--newlines", choices=NEWLINE_MODES, default=NEWLINES_KEEP)
+    parser.add_argument("--google-max-query", type=int, default=16000)
+    parser.add_argument("--deeplx-max-text", type=int, default=5000)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--merge-marker", default="")
+    args = parser.parse_args()
+
+    profile = MockTranslateProfile(
+        newlines=args.newlines,
+        google_max_query=args.google_max_query,
+        deeplx_max_text=args.deeplx_max_text,
+        error_rate=args.error_rate,
+        merge_marker=args.merge_marker,
+    )
+    server = create_server(args.host, args.port, profile)
+    base = f"http://{args.host}:{server.server_port}"
+    print(f"Mock Google Translate: {base}/m")
+    print(f"Mock DeepLX: {base}/translate")
+    print(f"Profile: {asdict(profile)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()